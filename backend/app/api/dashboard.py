@@ -2,6 +2,7 @@
 
 from fastapi import APIRouter, HTTPException, Request
 from typing import List
+from pathlib import Path
 import logging
 
 from app.models.dashboard import (
@@ -12,6 +13,7 @@ from app.models.dashboard import (
     PatternSummary,
     UploadedFile
 )
+from app.core.db_health import get_cached_status
 
 # Import CredentialsManager from mcp directory using importlib
 import importlib.util
@@ -28,16 +30,6 @@ if credentials_manager_spec and credentials_manager_spec.loader:
 else:
     raise ImportError("Failed to load credentials_manager module")
 
-# Import OracleConnector
-oracle_connector_spec = importlib.util.spec_from_file_location(
-    "oracle_connector",
-    mcp_path / "oracle_connector.py"
-)
-if oracle_connector_spec and oracle_connector_spec.loader:
-    oracle_connector_module = importlib.util.module_from_spec(oracle_connector_spec)
-    oracle_connector_spec.loader.exec_module(oracle_connector_module)
-    OracleConnector = oracle_connector_module.OracleConnector  # type: ignore
-
 logger = logging.getLogger(__name__)
 
 # Global manager
@@ -82,29 +74,18 @@ async def get_dashboard_summary(request: Request):
                 creds = credentials_manager.load_credentials(sid)
                 vector_info = vector_db_map.get(sid, {})
                 
-                # Check actual connection (simple health check)
-                is_connected = False
-                try:
-                    connector = OracleConnector(
-                        host=creds['host'],
-                        port=creds['port'],
-                        service_name=creds['service_name'],
-                        user=creds['user'],
-                        password=creds['password']
-                    )
-                    # We don't want to block too long, but simple connect/disconnect
-                    is_connected = connector.connect()
-                    if is_connected:
-                        connector.disconnect()
-                except:
-                    is_connected = False
+                # Connection status from the background health monitor (no connection per request)
+                health = get_cached_status(request.app.state, sid)
 
                 registered_databases.append(DatabaseInfo(
                     database_sid=sid,
                     schema_name=creds.get('schema_name', creds.get('user', 'unknown').upper()),
                     table_count=vector_info.get("table_count", 0),
                     last_updated=vector_info.get("last_updated"),
-                    connection_status="connected" if is_connected else "disconnected"
+                    connection_status=health["status"],
+                    latency_ms=health["latency_ms"],
+                    last_error=health["last_error"],
+                    checked_at=health["checked_at"]
                 ))
             except Exception as e:
                 logger.error(f"Failed to process dashboard info for {sid}: {e}")
@@ -176,28 +157,17 @@ async def list_databases(request: Request):
                 creds = credentials_manager.load_credentials(sid)
                 vector_info = vector_db_map.get(sid, {})
                 
-                # Simple connection check
-                is_connected = False
-                try:
-                    connector = OracleConnector(
-                        host=creds['host'],
-                        port=creds['port'],
-                        service_name=creds['service_name'],
-                        user=creds['user'],
-                        password=creds['password']
-                    )
-                    is_connected = connector.connect()
-                    if is_connected:
-                        connector.disconnect()
-                except:
-                    pass
+                health = get_cached_status(request.app.state, sid)
 
                 databases.append(DatabaseInfo(
                     database_sid=sid,
                     schema_name=creds.get('schema_name', creds.get('user', 'unknown').upper()),
                     table_count=vector_info.get("table_count", 0),
                     last_updated=vector_info.get("last_updated"),
-                    connection_status="connected" if is_connected else "disconnected"
+                    connection_status=health["status"],
+                    latency_ms=health["latency_ms"],
+                    last_error=health["last_error"],
+                    checked_at=health["checked_at"]
                 ))
             except:
                 continue
@@ -6,6 +6,7 @@ Handle registered database credentials management
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 from typing import List, Dict, Optional
+import asyncio
 import logging
 import sys
 import importlib.util
@@ -31,6 +32,7 @@ else:
     raise ImportError("Failed to load credentials_manager module")
 
 from app.core.tnsnames_instance import get_tnsnames_parser
+from app.core.db_health import STATUS_CONNECTED, get_cached_status, request_refresh
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -64,6 +66,10 @@ class RegisteredDatabase(BaseModel):
     service_name: str
     user: str
     is_connected: bool = False
+    connection_status: str = "unknown"
+    latency_ms: Optional[float] = None
+    last_error: Optional[str] = None
+    checked_at: Optional[str] = None
     table_count: int = 0
     last_updated: Optional[str] = None
 
@@ -74,31 +80,19 @@ class DatabaseListResponse(BaseModel):
     total_count: int
 
 
-# Import OracleConnector
-oracle_connector_spec = importlib.util.spec_from_file_location(
-    "oracle_connector",
-    mcp_path / "oracle_connector.py"
-)
-if oracle_connector_spec and oracle_connector_spec.loader:
-    oracle_connector_module = importlib.util.module_from_spec(oracle_connector_spec)
-    oracle_connector_spec.loader.exec_module(oracle_connector_module)
-    OracleConnector = oracle_connector_module.OracleConnector  # type: ignore
-
 @router.get("/list", response_model=DatabaseListResponse)
-async def list_registered_databases():
+async def list_registered_databases(request: Request):
     """
     Get list of registered databases with connection status
+
+    Connection status comes from the background DB health monitor cache,
+    so listing never waits on a database.
     """
     try:
         database_sids = credentials_manager.list_databases()
 
         # Get Vector DB metadata for table counts
-        from app.main import app_instance  # Assuming we can get it or just use a local VectorStore
-        # Alternative: use req.app.state.vector_store if we have request, but this is a simple get
-        # For simplicity, let's use the global vector_store if available or re-instantiate
-        from app.core.vector_store import VectorStore
-        vector_store = VectorStore() # It uses the default persist_directory
-        databases_raw = vector_store.get_all_databases()
+        databases_raw = request.app.state.vector_store.get_all_databases()
         vector_db_map = {f"{db['database_sid']}": db for db in databases_raw}
 
         databases = []
@@ -107,21 +101,7 @@ async def list_registered_databases():
                 credentials = credentials_manager.load_credentials(sid)
                 vector_info = vector_db_map.get(sid, {})
                 
-                # Check connection status
-                is_connected = False
-                try:
-                    connector = OracleConnector(
-                        host=credentials['host'],
-                        port=credentials['port'],
-                        service_name=credentials['service_name'],
-                        user=credentials['user'],
-                        password=credentials['password']
-                    )
-                    is_connected = connector.connect()
-                    if is_connected:
-                        connector.disconnect()
-                except:
-                    is_connected = False
+                health = get_cached_status(request.app.state, sid)
 
                 databases.append(RegisteredDatabase(
                     database_sid=sid,
@@ -130,7 +110,11 @@ async def list_registered_databases():
                     port=credentials.get('port', 0),
                     service_name=credentials.get('service_name', 'unknown'),
                     user=credentials.get('user', 'unknown'),
-                    is_connected=is_connected,
+                    is_connected=health["status"] == STATUS_CONNECTED,
+                    connection_status=health["status"],
+                    latency_ms=health["latency_ms"],
+                    last_error=health["last_error"],
+                    checked_at=health["checked_at"],
                     table_count=vector_info.get("table_count", 0),
                     last_updated=vector_info.get("last_updated")
                 ))
@@ -148,8 +132,27 @@ async def list_registered_databases():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/health")
+async def get_database_health(request: Request, refresh: bool = False):
+    """
+    Cached connection status of all registered databases
+
+    **입력:**
+    - refresh: true면 캐시를 읽기 전에 전체 DB를 동시에 다시 확인 (DB_HEALTH_TIMEOUT_SECONDS 로 제한)
+
+    **출력:**
+    - SID별 status (connected/disconnected/unknown), latency_ms, last_error, checked_at
+    """
+    monitor = getattr(request.app.state, "db_health_monitor", None)
+    if monitor is None:
+        raise HTTPException(status_code=503, detail="DB health monitor is not running")
+
+    statuses = await asyncio.to_thread(monitor.refresh) if refresh else monitor.snapshot()
+    return {"databases": list(statuses.values()), "total_count": len(statuses)}
+
+
 @router.post("/register")
-async def register_database(credentials: DatabaseCredentials):
+async def register_database(credentials: DatabaseCredentials, request: Request):
     """
     Register new database credentials
 
@@ -182,6 +185,7 @@ async def register_database(credentials: DatabaseCredentials):
         )
 
         if success:
+            request_refresh(request.app.state)
             return {
                 "success": True,
                 "message": f"Database {credentials.database_sid} registered successfully",
@@ -196,7 +200,7 @@ async def register_database(credentials: DatabaseCredentials):
 
 
 @router.delete("/{database_sid}")
-async def delete_database(database_sid: str):
+async def delete_database(database_sid: str, request: Request):
     """
     Delete registered database
 
@@ -214,6 +218,7 @@ async def delete_database(database_sid: str):
         success = credentials_manager.delete_credentials(database_sid)
 
         if success:
+            request_refresh(request.app.state)
             return {
                 "success": True,
                 "message": f"Database {database_sid} deleted successfully",
@@ -238,7 +243,7 @@ class RegisterFromTnsnamesRequest(BaseModel):
 
 
 @router.post("/register-from-tnsnames/{sid}")
-async def register_from_tnsnames(sid: str, request: RegisterFromTnsnamesRequest):
+async def register_from_tnsnames(sid: str, request: RegisterFromTnsnamesRequest, req: Request):
     """
     Register database from tnsnames.ora parsed data
 
@@ -277,6 +282,7 @@ async def register_from_tnsnames(sid: str, request: RegisterFromTnsnamesRequest)
         success = credentials_manager.save_credentials(sid, credentials_dict)
 
         if success:
+            request_refresh(req.app.state)
             return {
                 "success": True,
                 "message": f"Database {sid} registered from tnsnames.ora",
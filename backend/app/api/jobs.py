@@ -0,0 +1,138 @@
+"""
+Background Job API Endpoints
+Status, cancellation and history for jobs run by the job queue (app/core/job_queue.py),
+plus Server-Sent Events streams that push state and progress changes as they happen.
+"""
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Any, AsyncIterator, Dict, Optional
+from app.core.job_handlers import JOB_COLUMN_VECTORIZE
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+# Seconds between keep-alive comments on idle event streams (keeps proxies from closing them)
+SSE_HEARTBEAT_SECONDS = 15.0
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no"
+}
+
+
+class ColumnVectorizeRequest(BaseModel):
+    """Request for column re-vectorization"""
+    database_sid: str = Field(..., description="Database SID")
+    schema_name: str = Field(..., description="Schema name")
+    force_rebuild: bool = Field(False, description="Delete and rebuild the whole partition")
+
+
+@router.get("")
+async def list_jobs(req: Request, kind: Optional[str] = None, limit: int = 100):
+    """List recent jobs (newest first), optionally filtered by kind"""
+    jobs = req.app.state.job_queue.list(kind=kind, limit=limit)
+    return {
+        "jobs": jobs,
+        "total_count": len(jobs)
+    }
+
+
+def _sse_event(job: Dict[str, Any]) -> str:
+    """Format a job state as one SSE "job" event (checkpoint is internal resume state)"""
+    payload = {key: value for key, value in job.items() if key != "checkpoint"}
+    return f"event: job\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+async def _event_stream(req: Request, job_id: Optional[str] = None,
+                        kind: Optional[str] = None) -> AsyncIterator[str]:
+    async for job in req.app.state.job_queue.stream(job_id, heartbeat=SSE_HEARTBEAT_SECONDS):
+        if await req.is_disconnected():
+            break
+        if job is None:
+            yield ": keep-alive\n\n"
+        elif kind is None or job["kind"] == kind:
+            yield _sse_event(job)
+
+
+@router.get("/events")
+async def stream_all_jobs(req: Request, kind: Optional[str] = None):
+    """
+    Server-Sent Events stream of every job change (optionally filtered by kind)
+
+    Each event is `event: job` with the job record as JSON data.
+    """
+    return StreamingResponse(_event_stream(req, kind=kind), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.get("/{job_id}/events")
+async def stream_job(job_id: str, req: Request):
+    """
+    Server-Sent Events stream for one job
+
+    Sends the current state immediately, then every state / progress change
+    (percent, message, throughput counters); the stream closes when the job
+    is completed, failed or cancelled.
+    """
+    if req.app.state.job_queue.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return StreamingResponse(_event_stream(req, job_id=job_id), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str, req: Request):
+    """Get job status, progress and result"""
+    job = req.app.state.job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/{job_id}/cancel")
+async def cancel_job(job_id: str, req: Request):
+    """Cancel a queued job, or ask a running job to stop at its next progress update"""
+    job_queue = req.app.state.job_queue
+    if job_queue.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not job_queue.cancel(job_id):
+        raise HTTPException(status_code=409, detail="Job already finished")
+
+    return {
+        "success": True,
+        "message": f"Job {job_id} cancellation requested"
+    }
+
+
+@router.delete("/{job_id}")
+async def delete_job(job_id: str, req: Request):
+    """Delete a finished job from history"""
+    job_queue = req.app.state.job_queue
+    if job_queue.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not job_queue.delete(job_id):
+        raise HTTPException(status_code=409, detail="Running jobs cannot be deleted; cancel first")
+
+    return {
+        "success": True,
+        "message": f"Job {job_id} deleted"
+    }
+
+
+@router.post("/vectorize-columns")
+async def vectorize_columns(request: ColumnVectorizeRequest, req: Request):
+    """Queue incremental column re-vectorization for one SID/schema"""
+    job_id = req.app.state.job_queue.submit(JOB_COLUMN_VECTORIZE, {
+        "database_sid": request.database_sid,
+        "schema_name": request.schema_name,
+        "force_rebuild": request.force_rebuild
+    })
+    logger.info(f"Column vectorize job queued: {job_id} ({request.database_sid}.{request.schema_name})")
+
+    return {
+        "success": True,
+        "job_id": job_id,
+        "status": "queued"
+    }
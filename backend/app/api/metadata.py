@@ -12,7 +12,8 @@
 *
 * 유지보수 팁:
 * - 임베딩 텍스트 구조 변경: `generate_document_text` 함수를 수정하세요.
-* - DB 추출 정보 추가: `process_metadata` 루프 내의 OracleConnector 호출 부분을 수정하세요.
+* - DB 추출 정보 추가: `process_metadata` 의 OracleConnector 대량 조회(extract_columns_bulk /
+*   extract_primary_keys_bulk) 부분을 수정하세요. 테이블별 딕셔너리 조회는 왕복 횟수가 많아 사용하지 않습니다.
 """
 
 from fastapi import APIRouter, HTTPException, Request, UploadFile, File, Form
@@ -24,13 +25,11 @@ from app.models.metadata import (
     MigrationRequest,
     MigrationResponse
 )
-from app.utils.metadata_migrator import MetadataMigrator
+from app.utils.csv_stream import spool_upload
 import logging
-import csv
-import io
-import json
+import shutil
+import uuid
 from pathlib import Path
-from datetime import datetime
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -48,7 +47,7 @@ async def search_metadata(request: MetadataSearchRequest, req: Request):
         embedding_service = req.app.state.embedding_service
 
         # Create embedding for the question
-        query_embedding = embedding_service.embed_text(request.question)
+        query_embedding = embedding_service.embed_query(request.question)
 
         # Prepare filter
         filter_dict = None
@@ -104,25 +103,36 @@ async def migrate_metadata(request: MigrationRequest, req: Request):
     Migrate JSON metadata files to Vector DB
 
     This is a one-time migration operation for existing projects.
+    Runs as a "metadata_migrate" job; with wait=false only the job ID is returned.
     """
+    from app.core.job_handlers import JOB_METADATA_MIGRATE
+
     try:
-        vector_store = req.app.state.vector_store
-        embedding_service = req.app.state.embedding_service
+        job_queue = req.app.state.job_queue
+        job_id = job_queue.submit(JOB_METADATA_MIGRATE, {
+            "metadata_dir": request.metadata_dir,
+            "database_sid": request.database_sid,
+            "schema_name": request.schema_name
+        })
 
-        migrator = MetadataMigrator(vector_store, embedding_service)
+        if not request.wait:
+            return MigrationResponse(
+                success=True,
+                tables_migrated=0,
+                database_sid=request.database_sid,
+                schema_name=request.schema_name,
+                job_id=job_id
+            )
 
-        result = await migrator.migrate_from_json(
-            metadata_dir=request.metadata_dir,
-            database_sid=request.database_sid,
-            schema_name=request.schema_name
-        )
+        job = await job_queue.wait(job_id)
 
-        if result["success"]:
+        if job["status"] == "completed":
             return MigrationResponse(
                 success=True,
-                tables_migrated=result["tables_migrated"],
+                tables_migrated=job["result"]["tables_migrated"],
                 database_sid=request.database_sid,
-                schema_name=request.schema_name
+                schema_name=request.schema_name,
+                job_id=job_id
             )
         else:
             return MigrationResponse(
@@ -130,7 +140,8 @@ async def migrate_metadata(request: MigrationRequest, req: Request):
                 tables_migrated=0,
                 database_sid=request.database_sid,
                 schema_name=request.schema_name,
-                error=result.get("error", "Unknown error")
+                error=job.get("error") or f"Migration job {job['status']}",
+                job_id=job_id
             )
 
     except Exception as e:
@@ -166,421 +177,90 @@ async def get_metadata_stats(req: Request):
 
 @router.post("/process")
 async def process_metadata(
+    req: Request,
     db_key: str = Form(...),
     table_metadata: UploadFile = File(...),
     column_definitions: UploadFile = File(...),
-    background_tasks: BackgroundTasks = BackgroundTasks()
+    wait: bool = Form(True)
 ):
     """
     메타데이터 처리 엔드포인트 (2종 CSV 통합)
-    
+
+    업로드 파일을 디스크에 저장한 뒤 작업 큐(metadata_process)에 등록합니다.
+    실제 처리(DB 조회, 임베딩, Vector DB 저장)는 job worker 에서 실행되며
+    서버가 재시작되어도 이어서 처리됩니다 (app/core/job_handlers.py).
+
     Args:
         db_key: DB Connection Key (SID)
         table_metadata: table_metadata.csv (테이블 정의)
         column_definitions: column_definitions.csv (컬럼/코드 정의)
+        wait: True 면 작업 완료까지 기다렸다가 결과 반환 (기존 동작),
+              False 면 job_id 만 바로 반환 (진행 상황은 /api/v1/jobs/{job_id})
     """
     try:
         logger.info(f"Processing metadata for DB: {db_key}")
-        
-        # 1. 파일 읽기 및 파싱 함수
-        async def read_csv(file_obj: UploadFile) -> list:
-            content = await file_obj.read()
-            try:
-                text = content.decode('utf-8')
-            except UnicodeDecodeError:
-                try:
-                    text = content.decode('cp949')
-                except UnicodeDecodeError:
-                    text = content.decode('euc-kr', errors='replace')
-            
-            # BOM 제거 및 파싱
-            if text.startswith('\ufeff'):
-                text = text[1:]
-                
-            return list(csv.DictReader(io.StringIO(text)))
-
-        # 2. CSV 데이터 로드
-        tables_data = await read_csv(table_metadata)
-        columns_data = await read_csv(column_definitions)
-        
-        # 딕셔너리로 변환
-        table_info_map = {row['table_name'].strip(): row for row in tables_data if row.get('table_name', '').strip()}
-        
-        # 공통 컬럼 정의 맵 (컬럼명 -> 정보)
-        # table_name이 있으면 그것도 고려해야 하지만, 현재 데이터 구조상 empty인 경우가 많음 (공통 정의)
-        col_def_map = {}
-        for row in columns_data:
-            cname = row.get('column_name', '').strip()
-            if cname:
-                col_def_map[cname] = row
-
-        logger.info(f"Loaded {len(table_info_map)} tables and {len(col_def_map)} column definitions")
-
-        # 3. 데이터 저장 (백업용)
+
+        # 1. credentials 확인 (password 는 작업 파라미터에 남기지 않고 worker 에서 다시 로드)
         project_root = Path(__file__).parent.parent.parent.parent
-        # DB 이름을 정확히 알기 어렵지만 db_key 사용
-        # 실제로는 get_db_config(db_key)['name'] 등이 필요하나, 
-        # 여기서는 경로 구조를 단순화하거나 기존 로직을 따라감.
-        # 일단 db_key를 폴더명으로 사용 (나중에 credentials에서 정확한 SID 확인 가능)
-        
-        # credentials 로딩 및 오라클 연결 준비
         import importlib.util
-        from app.utils.enhanced_metadata_builder import EnhancedMetadataBuilder
+        from app.core.job_handlers import JOB_METADATA_PROCESS
 
-        mcp_path = project_root / "mcp"
-        
-        # CredentialsManager 동적 로드
-        cred_spec = importlib.util.spec_from_file_location("credentials_manager", mcp_path / "credentials_manager.py")
+        cred_spec = importlib.util.spec_from_file_location(
+            "credentials_manager", project_root / "mcp" / "credentials_manager.py"
+        )
         cred_module = importlib.util.module_from_spec(cred_spec)
         cred_spec.loader.exec_module(cred_module)
-        CredentialsManager = cred_module.CredentialsManager
-        
-        # OracleConnector 동적 로드
-        ora_spec = importlib.util.spec_from_file_location("oracle_connector", mcp_path / "oracle_connector.py")
-        ora_module = importlib.util.module_from_spec(ora_spec)
-        ora_spec.loader.exec_module(ora_module)
-        OracleConnector = ora_module.OracleConnector
-        
-        # Credentials 로드
-        credentials_dir = project_root / "data" / "credentials"
-        cred_manager = CredentialsManager(credentials_dir=str(credentials_dir))
+        cred_manager = cred_module.CredentialsManager(credentials_dir=str(project_root / "data" / "credentials"))
         credentials = cred_manager.load_credentials(db_key)
-        
+
         if not credentials:
             raise HTTPException(status_code=404, detail=f"Database credentials not found for {db_key}")
 
         schema_name = credentials['user'].upper() # Default schema is user
-        vector_store = req.app.state.vector_store # req 객체 필요
-        embedding_service = req.app.state.embedding_service
-
-        # 4. 파일 저장 경로 설정 (실제 경로)
-        # data/{db_key}/csv_uploads
-        # db_key가 SID와 다를 수 있으나, 보통 매핑됨.
-        data_dir = project_root / "data" / db_key / schema_name
-        csv_uploads_dir = data_dir / "csv_uploads"
-        csv_uploads_dir.mkdir(parents=True, exist_ok=True)
-        
-        # 파일 저장 (seek(0) 하고 다시 읽어야 함)
-        await table_metadata.seek(0)
-        await column_definitions.seek(0)
-        with open(csv_uploads_dir / "table_metadata.csv", "wb") as f:
-            f.write(await table_metadata.read())
-        with open(csv_uploads_dir / "column_definitions.csv", "wb") as f:
-            f.write(await column_definitions.read())
-
-        # 5. 메타데이터 처리 (동기 실행 - 작업량에 따라 백그라운드로 이동 고려)
-        # 여기서는 사용자 피드백을 위해 동기로 처리하되, 타임아웃 주의
-        
-        logger.info(f"Connecting to Oracle DB: {db_key}")
-        oracle = OracleConnector(
-            host=credentials['host'],
-            port=credentials['port'],
-            service_name=credentials['service_name'],
-            user=credentials['user'],
-            password=credentials['password']
-        )
-        
-        if not oracle.connect():
-             raise HTTPException(status_code=500, detail="Failed to connect to Oracle DB")
 
-        processed_count = 0
+        # 2. 업로드 파일을 업로드별 디렉토리로 스풀 (청크 단위, 전체를 메모리에 올리지 않음)
+        # data/{db_key}/{schema}/csv_uploads/{upload_id}
+        # 대기/실행/재시도 중인 다른 작업의 입력을 덮어쓰지 않도록 업로드마다 분리하고,
+        # 작업이 끝나면 finalizer 가 정리합니다 (완료 시 csv_uploads/ 로 옮겨 최신본 보관)
+        upload_dir = project_root / "data" / db_key / schema_name / "csv_uploads" / str(uuid.uuid4())
         try:
-            for table_name, table_csv_info in table_info_map.items():
-                logger.info(f"Processing table: {table_name}")
-                
-                # DB에서 컬럼 정보 조회
-                db_columns = oracle.extract_table_columns(schema_name, table_name)
-                if not db_columns:
-                    logger.warning(f"Table {table_name} not found in DB or has no columns")
-                    continue
-                
-                # DB PK 정보 조회
-                pks = oracle.extract_primary_keys(schema_name, table_name)
-                
-                # 컬럼 정보 병합
-                enhanced_columns = []
-                for col in db_columns:
-                    col_name = col['name']
-                    # CSV 정의 찾기
-                    csv_col_def = col_def_map.get(col_name)
-                    
-                    merged_col = col.copy()
-                    merged_col['is_key'] = col_name in pks
-                    
-                    if csv_col_def:
-                        merged_col['korean_name'] = csv_col_def.get('korean_name', '')
-                        merged_col['description'] = csv_col_def.get('description', '')
-                        merged_col['code_values'] = csv_col_def.get('code_values', '') # JSON string
-                    
-                    enhanced_columns.append(merged_col)
-                
-                # 임베딩 텍스트 생성
-                summary_text = EnhancedMetadataBuilder.create_summary_text(
-                    database_sid=db_key,
-                    schema_name=schema_name,
-                    table_name=table_name,
-                    korean_name=table_csv_info.get('description_ko', ''), # description_ko를 한글명으로 사용?
-                    # 주의: table_metadata.csv의 description_ko는 "테이블 설명" 역할. 
-                    # create_summary_text 인자의 korean_name은 "한글 테이블명"
-                    # CSV의 description_ko가 "품목 정보 조회" 같다면 description에 넣는 게 맞음.
-                    # 하지만 기존 데이터 보면 description_ko에 "Item/BOM Management (품목/BOM 관리)" 같은 게 들어있음.
-                    # 이를 description으로 넘김.
-                    description=table_csv_info.get('description_ko', ''), 
-                    columns=enhanced_columns,
-                    domain=table_csv_info.get('domain', ''),
-                    keywords=table_csv_info.get('keywords', ''),
-                    sample_queries=table_csv_info.get('sample_queries', ''),
-                    related_tables=[{'table_name': t.strip()} for t in table_csv_info.get('related_tables', '').split(',') if t.strip()]
-                )
-                
-                # 임베딩 벡터 생성
-                embedding = embedding_service.embed_text(summary_text)
-                
-                # Vector DB 저장
-                metadata_dict = {
-                    "table_name": table_name,
-                    "schema_name": schema_name,
-                    "database_sid": db_key,
-                    "korean_name": "", # CSV에서 한글명을 따로 분리 안 했으면 description에 포함됨
-                    "description": table_csv_info.get('description_ko', ''),
-                    "domain": table_csv_info.get('domain', ''),
-                    "keywords": table_csv_info.get('keywords', ''),
-                    "column_count": len(enhanced_columns),
-                    "update_date": datetime.now().isoformat()
-                }
-                
-                vector_store.add_metadata(
-                    table_id=f"{db_key}.{schema_name}.{table_name}",
-                    summary_text=summary_text,
-                    embedding=embedding,
-                    metadata=metadata_dict
-                )
-                processed_count += 1
-                
-        finally:
-            oracle.disconnect()
-            
-        return {
-            "success": True,
-            "tables_processed": processed_count,
-            "database_sid": db_key,
-            "schema_name": schema_name
-        }
-
-    except Exception as e:
-        logger.error(f"Error in process_metadata: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+            table_csv_path = await spool_upload(table_metadata, upload_dir / "table_metadata.csv")
+            column_csv_path = await spool_upload(column_definitions, upload_dir / "column_definitions.csv")
 
-        # 5. 통합 메타정보 생성
-        tables_processed = 0
-        metadata_list = []
-
-        # 공통 컬럼 딕셔너리 생성 (column_name을 키로)
-        common_columns_dict = {}
-        for col_row in common_columns_data:
-            col_name = col_row.get('column_name', '').strip()
-            if col_name:
-                common_columns_dict[col_name] = {
-                    "column_name": col_name,
-                    "korean_name": col_row.get('korean_name', ''),
-                    "description": col_row.get('description', ''),
-                    "business_rule": col_row.get('business_rule', ''),
-                    "sample_values": col_row.get('sample_values', ''),
-                    "unit": col_row.get('unit', ''),
-                    "is_code_column": col_row.get('is_code_column', 'N'),
-                    "aggregation_functions": col_row.get('aggregation_functions', ''),
-                    "is_sensitive": col_row.get('is_sensitive', 'N')
-                }
-
-        # 코드 정의 딕셔너리 생성 (column_name을 키로)
-        code_definitions_dict = {}
-        for code_row in code_definitions_data:
-            col_name = code_row.get('column_name', '').strip()
-            code_value = code_row.get('code_value', '').strip()
-            code_label = code_row.get('code_label', '')
-
-            if col_name and code_value:
-                if col_name not in code_definitions_dict:
-                    code_definitions_dict[col_name] = {}
-                code_definitions_dict[col_name][code_value] = code_label
-
-        # 테이블별로 메타정보 통합
-        logger.info(f"Starting table processing loop with {len(table_info_data)} rows")
-        for idx, table_row in enumerate(table_info_data):
-            table_name = table_row.get('table_name', '').strip()
-            if not table_name:
-                continue
-
-            # Skip if table not found in DB schema
-            if table_name not in schema_tables_columns:
-                logger.warning(f"Table {table_name} not found in DB schema, skipping")
-                continue
-
-            # 테이블 기본 정보
-            table_metadata = {
-                "database_sid": database_sid,
+            # 3. 작업 등록
+            job_queue = req.app.state.job_queue
+            job_id = job_queue.submit(JOB_METADATA_PROCESS, {
+                "db_key": db_key,
                 "schema_name": schema_name,
-                "table_name": table_name,
-                "table_comment": table_row.get('business_purpose', ''),
-                "business_purpose": table_row.get('business_purpose', ''),
-                "usage_scenarios": [
-                    table_row.get('usage_scenario_1', ''),
-                    table_row.get('usage_scenario_2', ''),
-                    table_row.get('usage_scenario_3', '')
-                ],
-                "related_tables": table_row.get('related_tables', ''),
-                "columns": [],
-                "code_definitions": {},
-                "created_at": datetime.now().isoformat(),
-            }
-
-            # Match actual DB columns with CSV column definitions
-            db_columns = schema_tables_columns[table_name]
-            table_pks = schema_tables_pks.get(table_name, [])
-            matched_columns = []
-            table_code_definitions = {}
-
-            for db_col in db_columns:
-                col_name = db_col['COLUMN_NAME']
-                is_pk = col_name in table_pks
-
-                # Start with DB column info
-                column_info = {
-                    "column_name": col_name,
-                    "data_type": db_col['DATA_TYPE'],
-                    "data_length": db_col['DATA_LENGTH'],
-                    "nullable": db_col['NULLABLE'],
-                    "column_id": db_col['COLUMN_ID'],
-                    "is_pk": is_pk,
-                    "db_comment": db_col.get('COMMENTS', '')
-                }
-
-                # Enhance with CSV metadata if available
-                if col_name in common_columns_dict:
-                    csv_col = common_columns_dict[col_name]
-                    column_info.update({
-                        "korean_name": csv_col.get('korean_name', ''),
-                        "description": csv_col.get('description', '') or db_col.get('COMMENTS', ''),
-                        "business_rule": csv_col.get('business_rule', ''),
-                        "sample_values": csv_col.get('sample_values', ''),
-                        "unit": csv_col.get('unit', ''),
-                        "is_code_column": csv_col.get('is_code_column', 'N'),
-                        "aggregation_functions": csv_col.get('aggregation_functions', ''),
-                        "is_sensitive": csv_col.get('is_sensitive', 'N')
-                    })
-
-                    # Add code definitions if this is a code column
-                    if col_name in code_definitions_dict:
-                        table_code_definitions[col_name] = code_definitions_dict[col_name]
-                else:
-                    # No CSV metadata, use DB comment if available
-                    column_info.update({
-                        "korean_name": "",
-                        "description": db_col.get('COMMENTS', ''),
-                        "business_rule": "",
-                        "sample_values": "",
-                        "unit": "",
-                        "is_code_column": "N",
-                        "aggregation_functions": "",
-                        "is_sensitive": "N"
-                    })
-
-                matched_columns.append(column_info)
-
-            table_metadata["columns"] = matched_columns
-            table_metadata["code_definitions"] = table_code_definitions
-
-            # JSON 파일로 저장
-            metadata_file = metadata_dir / f"{table_name}.json"
-            metadata_file.write_text(json.dumps(table_metadata, ensure_ascii=False, indent=2), encoding='utf-8')
-
-            metadata_list.append(table_metadata)
-            tables_processed += 1
-
-            logger.info(f"Processed metadata for table: {table_name}")
-
-        # 6. 임베딩 생성 및 Vector DB 저장
-        logger.info(f"Adding {tables_processed} tables to Vector DB")
-        embedding_service = request.app.state.embedding_service
-
-        for metadata in metadata_list:
-            table_name = metadata["table_name"]
-            table_id = f"{database_sid}.{schema_name}.{table_name}"
-
-            # 최적화된 CSV 데이터 병합 (있는 경우)
-            if table_name in optimized_metadata_data:
-                opt_data = optimized_metadata_data[table_name]
-                metadata["description_ko"] = opt_data.get("description_ko", "")
-                metadata["domain"] = opt_data.get("domain", "")
-                metadata["keywords"] = opt_data.get("keywords", "")
-                metadata["sample_queries"] = opt_data.get("sample_queries", "")
-                metadata["database_sid"] = database_sid
-                metadata["schema_name"] = schema_name
-                logger.debug(f"Merged optimized metadata for: {table_name}")
-
-            # 임베딩을 위한 텍스트 생성 (최적화된 필드 포함)
-            document_text = generate_document_text(metadata)
-
-            # 임베딩 생성
-            embedding = embedding_service.embed_text(document_text)
-
-            # Vector DB에 추가
-            vector_store.add_metadata(
-                table_id=table_id,
-                summary_text=document_text,
-                embedding=embedding,
-                metadata={
-                    "database_sid": database_sid,
-                    "schema_name": schema_name,
-                    "table_name": table_name,
-                    "description": metadata.get("table_comment", ""),
-                    "description_ko": metadata.get("description_ko", ""),
-                    "domain": metadata.get("domain", ""),
-                    "keywords": metadata.get("keywords", ""),
-                    "sample_queries": metadata.get("sample_queries", ""),
-                    "column_count": len(metadata.get("columns", [])),
-                    "created_at": metadata.get("created_at", ""),
-                    # 상세 정보 추가 (JSON 문자열로 저장)
-                    "has_primary_key": any(col.get("is_pk") for col in metadata.get("columns", [])),
-                    "has_foreign_keys": bool(metadata.get("related_tables")),
-                    "key_columns": json.dumps([col for col in metadata.get("columns", []) if col.get("is_pk")], ensure_ascii=False),
-                    "related_tables": json.dumps(metadata.get("related_tables", "").split(",") if metadata.get("related_tables") else [], ensure_ascii=False),
-                    "business_rules": json.dumps([{"rule": metadata.get("business_purpose", "")}], ensure_ascii=False)
-                }
-            )
-
-        # 7. 업로드 히스토리 저장
-        history_file = data_dir / "upload_history.json"
-        history = []
-        if history_file.exists():
-            history = json.loads(history_file.read_text(encoding='utf-8'))
-
-        history.append({
-            "timestamp": datetime.now().isoformat(),
-            "database_sid": database_sid,
-            "schema_name": schema_name,
-            "tables_processed": tables_processed,
-            "files": {
-                "table_info": table_info.filename,
-                "common_columns": common_columns.filename,
-                "code_definitions": code_definitions.filename,
+                "upload_dir": str(upload_dir),
+                "table_csv": str(table_csv_path),
+                "column_csv": str(column_csv_path)
+            })
+        except BaseException:
+            shutil.rmtree(upload_dir, ignore_errors=True)
+            raise
+
+        if not wait:
+            return {
+                "success": True,
+                "job_id": job_id,
+                "status": "queued",
+                "database_sid": db_key,
+                "schema_name": schema_name
             }
-        })
-
-        history_file.write_text(json.dumps(history, ensure_ascii=False, indent=2), encoding='utf-8')
 
-        logger.info(f"Successfully processed {tables_processed} tables for {database_sid}.{schema_name}")
+        # 완료까지 대기 (event loop 는 막지 않음)
+        job = await job_queue.wait(job_id)
+        if job["status"] != "completed":
+            raise HTTPException(status_code=500, detail=job.get("error") or f"Metadata job {job['status']}")
 
-        return {
-            "success": True,
-            "tables_processed": tables_processed,
-            "database_sid": database_sid,
-            "schema_name": schema_name,
-        }
+        return {**job["result"], "job_id": job_id}
 
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Failed to process metadata: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"메타데이터 처리 중 오류가 발생했습니다: {str(e)}")
+        logger.error(f"Error in process_metadata: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/list")
@@ -631,24 +311,6 @@ async def list_metadata(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-def parse_csv(csv_content: str) -> list[dict]:
-    """CSV 콘텐츠를 파싱하여 딕셔너리 리스트로 반환"""
-    # Remove BOM if present
-    if csv_content.startswith('\ufeff'):
-        csv_content = csv_content[1:]
-
-    reader = csv.DictReader(io.StringIO(csv_content))
-    rows = list(reader)
-
-    # Debug: Log first row to check parsing
-    if rows:
-        logger.info(f"CSV parsed - Total rows: {len(rows)}")
-        logger.info(f"First CSV row keys: {list(rows[0].keys())}")
-        logger.info(f"First CSV row sample: {rows[0]}")
-
-    return rows
-
-
 def generate_document_text(metadata: dict) -> str:
     """
     메타데이터를 임베딩을 위한 텍스트로 변환
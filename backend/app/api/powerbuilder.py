@@ -2,82 +2,52 @@
 PowerBuilder Upload and Processing API Endpoints
 """
 
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request, BackgroundTasks
-from typing import List
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request
+from typing import List, Dict, Any
 from app.models.powerbuilder import (
     PowerBuilderProcessResponse,
     PowerBuilderJobStatus,
     PowerBuilderSummary
 )
-from app.core.powerbuilder_parser import PowerBuilderParser
-from app.core.legacy_analyzer import LegacyAnalyzer
+from app.core.job_handlers import JOB_POWERBUILDER_PARSE
+from app.utils.csv_stream import spool_upload
 import logging
+import shutil
 import uuid
 from pathlib import Path
-import shutil
-import asyncio
-from datetime import datetime
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# In-memory job tracking (in production, use Redis or database)
-jobs = {}
-
-
-async def process_powerbuilder_files_background(
-    job_id: str,
-    file_paths: List[str],
-    database_sid: str,
-    schema_name: str,
-    vector_store,
-    embedding_service
-):
-    """Background task to process PowerBuilder files"""
-    try:
-        jobs[job_id]["status"] = "processing"
-        jobs[job_id]["started_at"] = datetime.utcnow().isoformat()
-
-        # Initialize parser and analyzer
-        pb_parser = PowerBuilderParser()
-        legacy_analyzer = LegacyAnalyzer(vector_store, embedding_service, pb_parser)
-
-        # Process files
-        result = await legacy_analyzer.process_powerbuilder_files(
-            file_paths=file_paths,
-            database_sid=database_sid,
-            schema_name=schema_name
-        )
 
-        # Update job status
-        jobs[job_id]["status"] = "completed"
-        jobs[job_id]["progress_percent"] = 100
-        jobs[job_id]["files_processed"] = result["files_processed"]
-        jobs[job_id]["sql_queries_extracted"] = result["sql_queries_extracted"]
-        jobs[job_id]["business_rules_extracted"] = result["business_rules_extracted"]
-        jobs[job_id]["tables_discovered"] = result["table_list"]
-        jobs[job_id]["completed_at"] = datetime.utcnow().isoformat()
+def _to_job_status(job: Dict[str, Any]) -> PowerBuilderJobStatus:
+    """Map a job queue record to the PowerBuilder job status model"""
+    result = job["result"] or {}
+    progress = job["progress"]
 
-        logger.info(f"Job {job_id} completed successfully")
+    return PowerBuilderJobStatus(
+        job_id=job["job_id"],
+        status=job["status"],
+        progress_percent=100 if job["status"] == "completed" else progress.get("percent", 0),
+        files_processed=result.get("files_processed", 0),
+        sql_queries_extracted=result.get("sql_queries_extracted", 0),
+        business_rules_extracted=result.get("business_rules_extracted", 0),
+        tables_discovered=result.get("table_list", []),
+        error=job["error"],
+        started_at=job["started_at"],
+        completed_at=job["completed_at"]
+    )
 
-    except Exception as e:
-        logger.error(f"Job {job_id} failed: {e}")
-        jobs[job_id]["status"] = "failed"
-        jobs[job_id]["error"] = str(e)
-        jobs[job_id]["completed_at"] = datetime.utcnow().isoformat()
 
-    finally:
-        # Cleanup uploaded files
-        for file_path in file_paths:
-            try:
-                Path(file_path).unlink()
-            except:
-                pass
+def _get_powerbuilder_job(request: Request, job_id: str) -> Dict[str, Any]:
+    job = request.app.state.job_queue.get(job_id)
+    if job is None or job["kind"] != JOB_POWERBUILDER_PARSE:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
 
 @router.post("/upload", response_model=PowerBuilderProcessResponse)
 async def upload_powerbuilder_files(
-    background_tasks: BackgroundTasks,
     request: Request,
     files: List[UploadFile] = File(...),
     database_sid: str = Form(...),
@@ -86,8 +56,8 @@ async def upload_powerbuilder_files(
     """
     Upload PowerBuilder files (.srw, .srd, .pbl) for processing
 
-    The files will be parsed in the background to extract SQL queries,
-    business rules, and table relationships.
+    The files will be parsed by a background job ("powerbuilder_parse") to extract
+    SQL queries, business rules, and table relationships. Queued jobs survive restarts.
     """
     try:
         # Validate file extensions
@@ -106,43 +76,27 @@ async def upload_powerbuilder_files(
                        f"Only .srw, .srd, .pbl, .sra files are allowed."
             )
 
-        # Create upload directory
-        upload_dir = Path("./uploads") / str(uuid.uuid4())
+        # Create upload directory (absolute paths: the job may run after a restart)
+        upload_dir = (Path("./uploads") / str(uuid.uuid4())).resolve()
         upload_dir.mkdir(parents=True, exist_ok=True)
 
-        # Save uploaded files
-        saved_paths = []
-        for file in files:
-            file_path = upload_dir / file.filename
-            with open(file_path, "wb") as f:
-                shutil.copyfileobj(file.file, f)
-            saved_paths.append(str(file_path))
-
-        # Create job
-        job_id = str(uuid.uuid4())
-        jobs[job_id] = {
-            "job_id": job_id,
-            "status": "queued",
-            "progress_percent": 0,
-            "files_processed": 0,
-            "sql_queries_extracted": 0,
-            "business_rules_extracted": 0,
-            "tables_discovered": [],
-            "error": None,
-            "started_at": None,
-            "completed_at": None
-        }
-
-        # Start background processing
-        background_tasks.add_task(
-            process_powerbuilder_files_background,
-            job_id,
-            saved_paths,
-            database_sid,
-            schema_name,
-            request.app.state.vector_store,
-            request.app.state.embedding_service
-        )
+        try:
+            # Save uploaded files (streamed to disk in chunks, never held in memory whole)
+            saved_paths = []
+            for file in files:
+                file_path = await spool_upload(file, upload_dir / Path(file.filename).name)
+                saved_paths.append(str(file_path))
+
+            # Queue job (the upload directory is removed when it finishes)
+            job_id = request.app.state.job_queue.submit(JOB_POWERBUILDER_PARSE, {
+                "file_paths": saved_paths,
+                "upload_dir": str(upload_dir),
+                "database_sid": database_sid,
+                "schema_name": schema_name
+            })
+        except BaseException:
+            shutil.rmtree(upload_dir, ignore_errors=True)
+            raise
 
         logger.info(f"PowerBuilder upload job created: {job_id} ({len(files)} files)")
 
@@ -160,49 +114,48 @@ async def upload_powerbuilder_files(
 
 
 @router.get("/jobs/{job_id}", response_model=PowerBuilderJobStatus)
-async def get_job_status(job_id: str):
+async def get_job_status(job_id: str, request: Request):
     """
     Get the status of a PowerBuilder processing job
     """
-    if job_id not in jobs:
-        raise HTTPException(status_code=404, detail="Job not found")
-
-    job_data = jobs[job_id]
-
-    return PowerBuilderJobStatus(
-        job_id=job_data["job_id"],
-        status=job_data["status"],
-        progress_percent=job_data["progress_percent"],
-        files_processed=job_data["files_processed"],
-        sql_queries_extracted=job_data["sql_queries_extracted"],
-        business_rules_extracted=job_data["business_rules_extracted"],
-        tables_discovered=job_data["tables_discovered"],
-        error=job_data["error"],
-        started_at=job_data["started_at"],
-        completed_at=job_data["completed_at"]
-    )
+    return _to_job_status(_get_powerbuilder_job(request, job_id))
 
 
 @router.get("/jobs")
-async def list_jobs():
+async def list_jobs(request: Request):
     """
     List all PowerBuilder processing jobs
     """
+    jobs = request.app.state.job_queue.list(kind=JOB_POWERBUILDER_PARSE)
     return {
-        "jobs": list(jobs.values()),
+        "jobs": [_to_job_status(job).dict() for job in jobs],
         "total_count": len(jobs)
     }
 
 
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str, request: Request):
+    """
+    Cancel a queued or running job
+    """
+    _get_powerbuilder_job(request, job_id)
+    if not request.app.state.job_queue.cancel(job_id):
+        raise HTTPException(status_code=409, detail="Job already finished")
+
+    return {
+        "success": True,
+        "message": f"Job {job_id} cancellation requested"
+    }
+
+
 @router.delete("/jobs/{job_id}")
-async def delete_job(job_id: str):
+async def delete_job(job_id: str, request: Request):
     """
     Delete a job from history
     """
-    if job_id not in jobs:
-        raise HTTPException(status_code=404, detail="Job not found")
-
-    del jobs[job_id]
+    _get_powerbuilder_job(request, job_id)
+    if not request.app.state.job_queue.delete(job_id):
+        raise HTTPException(status_code=409, detail="Running jobs cannot be deleted; cancel first")
 
     return {
         "success": True,
@@ -0,0 +1,58 @@
+"""
+Database Health Monitor
+Loads the DB health monitor shared with the MCP server (mcp/db_health_monitor.py)
+and wires it to the registered credentials and OracleConnector
+"""
+
+import importlib.util
+from pathlib import Path
+from typing import Any, Dict
+
+project_root = Path(__file__).parent.parent.parent.parent
+mcp_path = project_root / "mcp"
+
+
+def _load_mcp_module(name: str):
+    spec = importlib.util.spec_from_file_location(name, mcp_path / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_db_health_monitor_module = _load_mcp_module("db_health_monitor")
+DBHealthMonitor: Any = _db_health_monitor_module.DBHealthMonitor
+STATUS_CONNECTED = _db_health_monitor_module.STATUS_CONNECTED
+unknown_status = _db_health_monitor_module.unknown_status
+
+
+def create_db_health_monitor() -> DBHealthMonitor:
+    """
+    Create a monitor for the databases registered in data/credentials
+
+    Interval / timeout / concurrency come from DB_HEALTH_INTERVAL_SECONDS,
+    DB_HEALTH_TIMEOUT_SECONDS and DB_HEALTH_MAX_WORKERS.
+    """
+    CredentialsManager = _load_mcp_module("credentials_manager").CredentialsManager
+    OracleConnector = _load_mcp_module("oracle_connector").OracleConnector
+
+    credentials_manager = CredentialsManager(credentials_dir=str(project_root / "data" / "credentials"))
+    return DBHealthMonitor(credentials_manager, OracleConnector)
+
+
+def get_cached_status(app_state, database_sid: str) -> Dict[str, Any]:
+    """
+    Cached connection status of a SID (never opens a connection)
+
+    Returns status "unknown" when the monitor is not running or has not probed the SID yet.
+    """
+    monitor = getattr(app_state, "db_health_monitor", None)
+    if monitor is None:
+        return unknown_status(database_sid)
+    return monitor.get_status(database_sid)
+
+
+def request_refresh(app_state):
+    """Probe all databases now (after a database is registered or deleted)"""
+    monitor = getattr(app_state, "db_health_monitor", None)
+    if monitor is not None:
+        monitor.request_refresh()
@@ -3,13 +3,40 @@ Embedding Service
 Converts text to vector embeddings using sentence-transformers
 """
 
-from sentence_transformers import SentenceTransformer
-from typing import List, Union
+from typing import List, Optional, Union
+from pathlib import Path
+import importlib.util
 import logging
+import os
 import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Query embedding cache shared with the MCP server (mcp/embedding_cache.py)
+project_root = Path(__file__).parent.parent.parent.parent
+_embedding_cache_spec = importlib.util.spec_from_file_location(
+    "embedding_cache",
+    project_root / "mcp" / "embedding_cache.py"
+)
+_embedding_cache_module = importlib.util.module_from_spec(_embedding_cache_spec)
+_embedding_cache_spec.loader.exec_module(_embedding_cache_module)
+create_query_cache_from_env = _embedding_cache_module.create_query_cache_from_env
+create_embedding_store_from_env = _embedding_cache_module.create_embedding_store_from_env
+encode_documents = _embedding_cache_module.encode_documents
+model_cache_key = _embedding_cache_module.model_cache_key
+
+# Inference backend (PyTorch / ONNX Runtime) shared with the MCP server (mcp/embedding_backend.py)
+_embedding_backend_spec = importlib.util.spec_from_file_location(
+    "embedding_backend",
+    project_root / "mcp" / "embedding_backend.py"
+)
+_embedding_backend_module = importlib.util.module_from_spec(_embedding_backend_spec)
+_embedding_backend_spec.loader.exec_module(_embedding_backend_module)
+load_embedding_model = _embedding_backend_module.load_embedding_model
+
+# Default encode batch size for embed_batch (ingestion pipelines)
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+
 
 class EmbeddingService:
     """Text to vector embedding service"""
@@ -24,18 +51,28 @@ class EmbeddingService:
                        Alternatives:
                        - all-mpnet-base-v2 (768 dim, better quality, slower)
                        - paraphrase-multilingual-MiniLM-L12-v2 (384 dim, multilingual)
+
+        The inference backend is chosen by EMBEDDING_BACKEND (torch | onnx),
+        EMBEDDING_ONNX_QUANTIZE and EMBEDDING_NUM_THREADS.
         """
         self.model_name = model_name
         logger.info(f"Loading embedding model: {model_name}")
 
         try:
-            self.model = SentenceTransformer(model_name)
+            self.model = load_embedding_model(model_name, project_root)
             self.embedding_dim = self.model.get_sentence_embedding_dimension()
             logger.info(f"✓ Embedding model loaded (dimension: {self.embedding_dim})")
         except Exception as e:
             logger.error(f"✗ Failed to load embedding model: {e}")
             raise
 
+        # LRU cache for natural-language query embeddings
+        self.query_cache = create_query_cache_from_env(project_root)
+
+        # On-disk cache for document embeddings (keyed by model name + text),
+        # shared with the vectorize scripts so rebuilds only embed changed texts
+        self.document_store = create_embedding_store_from_env(project_root)
+
     def embed_text(self, text: str) -> List[float]:
         """
         Convert single text to embedding
@@ -53,13 +90,49 @@ class EmbeddingService:
         embedding = self.model.encode(text, convert_to_numpy=True)
         return embedding.tolist()
 
-    def embed_batch(self, texts: List[str], batch_size: int = 32) -> List[List[float]]:
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Convert a natural-language search query to embedding (cached)
+
+        Use this for user questions; document texts should go through
+        embed_document/embed_batch, which use the on-disk document cache.
+
+        Args:
+            text: Query text
+
+        Returns:
+            List of floats representing the embedding
+        """
+        if not text or not text.strip():
+            return [0.0] * self.embedding_dim
+
+        return self.query_cache.get_or_compute(
+            model_cache_key(self.model, self.model_name), text, self.embed_text
+        )
+
+    def embed_document(self, text: str) -> List[float]:
+        """
+        Convert a document text (table summary, column summary, ...) to embedding
+
+        Looks up the on-disk document cache first and only calls the model on a miss.
+
+        Args:
+            text: Document text
+
+        Returns:
+            List of floats representing the embedding
+        """
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: List[str], batch_size: Optional[int] = None) -> List[List[float]]:
         """
         Convert multiple texts to embeddings (more efficient than one-by-one)
 
+        Texts already in the on-disk document cache are not re-encoded.
+
         Args:
             texts: List of input texts
-            batch_size: Batch size for encoding (default: 32)
+            batch_size: Batch size for encoding (default: EMBEDDING_BATCH_SIZE env var, else 32)
 
         Returns:
             List of embeddings
@@ -67,6 +140,8 @@ class EmbeddingService:
         if not texts:
             return []
 
+        batch_size = batch_size or EMBEDDING_BATCH_SIZE
+
         # Filter out empty texts and track indices
         non_empty_texts = []
         non_empty_indices = []
@@ -79,18 +154,19 @@ class EmbeddingService:
         result = [[0.0] * self.embedding_dim for _ in texts]
 
         if non_empty_texts:
-            # Encode non-empty texts
-            embeddings = self.model.encode(
+            # Encode non-empty texts (cache misses only)
+            embeddings = encode_documents(
+                self.document_store,
+                self.model,
+                self.model_name,
                 non_empty_texts,
-                batch_size=batch_size,
-                convert_to_numpy=True,
-                show_progress_bar=len(non_empty_texts) > 100
+                batch_size=batch_size
             )
 
             # Place embeddings at correct indices
             for i, embedding in enumerate(embeddings):
                 original_index = non_empty_indices[i]
-                result[original_index] = embedding.tolist()
+                result[original_index] = embedding
 
         return result
 
@@ -123,7 +199,7 @@ class EmbeddingService:
             summary_parts.append("Columns: " + ", ".join(top_columns))
 
         summary_text = "\n".join(summary_parts)
-        return self.embed_text(summary_text)
+        return self.embed_document(summary_text)
 
     def embed_sql_pattern(self, question: str, sql_query: str) -> List[float]:
         """
@@ -139,7 +215,7 @@ class EmbeddingService:
         # We primarily embed the question (since that's what we'll search)
         # But include SQL keywords for context
         pattern_text = f"{question}\nSQL: {sql_query}"
-        return self.embed_text(pattern_text)
+        return self.embed_document(pattern_text)
 
     def calculate_similarity(
         self,
@@ -175,5 +251,8 @@ class EmbeddingService:
         return {
             "model_name": self.model_name,
             "embedding_dimension": self.embedding_dim,
-            "max_seq_length": self.model.max_seq_length
+            "max_seq_length": self.model.max_seq_length,
+            "inference_backend": type(self.model).__name__,
+            "query_cache": self.query_cache.stats(),
+            "document_store": self.document_store.stats() if self.document_store else None
         }
@@ -0,0 +1,353 @@
+"""
+Background Job Handlers
+Long-running backend work executed by the job queue (app/core/job_queue.py):
+metadata processing, metadata migration, PowerBuilder parsing and column re-vectorization.
+
+Handlers run on job worker threads, not on the HTTP event loop.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import os
+import shutil
+import time
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, List
+
+from app.utils.csv_stream import iter_csv_rows
+from app.utils.enhanced_metadata_builder import EnhancedMetadataBuilder
+from app.utils.metadata_migrator import MetadataMigrator, upsert_metadata_entries
+
+logger = logging.getLogger(__name__)
+
+project_root = Path(__file__).parent.parent.parent.parent
+
+JOB_METADATA_PROCESS = "metadata_process"
+JOB_METADATA_MIGRATE = "metadata_migrate"
+JOB_POWERBUILDER_PARSE = "powerbuilder_parse"
+JOB_COLUMN_VECTORIZE = "column_vectorize"
+
+
+def _load_module(name: str, path: Path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _load_mcp_module(name: str):
+    return _load_module(name, project_root / "mcp" / f"{name}.py")
+
+
+def _load_credentials(db_key: str) -> Dict[str, Any]:
+    CredentialsManager = _load_mcp_module("credentials_manager").CredentialsManager
+    cred_manager = CredentialsManager(credentials_dir=str(project_root / "data" / "credentials"))
+    credentials = cred_manager.load_credentials(db_key)
+    if not credentials:
+        raise RuntimeError(f"Database credentials not found for {db_key}")
+    return credentials
+
+
+def merge_db_columns(
+    db_columns: List[Dict[str, Any]],
+    pks: List[str],
+    col_def_map: Dict[str, Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Merge Oracle dictionary rows (extract_columns_bulk) with the uploaded column definitions
+
+    Dictionary rows keep Oracle's uppercase keys (COLUMN_NAME, DATA_TYPE, NULLABLE, COMMENTS);
+    they are mapped to the column_name / data_type / nullable / description keys that
+    EnhancedMetadataBuilder reads. CSV descriptions take precedence over column comments.
+    """
+    merged_columns = []
+    for col in db_columns:
+        col_name = col['COLUMN_NAME']
+        merged_col = {
+            'column_name': col_name,
+            'data_type': col.get('DATA_TYPE') or '',
+            'nullable': col.get('NULLABLE', 'Y') == 'Y',
+            'description': col.get('COMMENTS') or '',
+            'is_key': col_name in pks,
+            'is_pk': col_name in pks
+        }
+
+        # CSV 정의 찾기
+        csv_col_def = col_def_map.get(col_name)
+        if csv_col_def:
+            merged_col['korean_name'] = csv_col_def.get('korean_name', '')
+            merged_col['description'] = csv_col_def.get('description') or merged_col['description']
+            merged_col['code_values'] = csv_col_def.get('code_values', '') # JSON string
+
+        merged_columns.append(merged_col)
+    return merged_columns
+
+
+def process_metadata_job(app_state, ctx, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge uploaded CSV metadata with the Oracle dictionary and store table summaries
+
+    params: db_key, schema_name, upload_dir, table_csv, column_csv (spooled upload paths,
+    private to this job so the checkpoint always refers to the same CSV)
+    """
+    db_key = params["db_key"]
+    schema_name = params["schema_name"]
+    table_csv_path = Path(params["table_csv"])
+    column_csv_path = Path(params["column_csv"])
+    vector_store = app_state.vector_store
+    embedding_service = app_state.embedding_service
+
+    # 1. CSV 행 단위 파싱 (인코딩은 파일 전체를 한 번 스트리밍 검증해 판별, sniff_encoding)
+    table_info_map = {}
+    for row in iter_csv_rows(table_csv_path):
+        table_name = (row.get('table_name') or '').strip()
+        if table_name:
+            table_info_map[table_name] = row
+
+    # 공통 컬럼 정의 맵 (컬럼명 -> 정보)
+    # table_name이 있으면 그것도 고려해야 하지만, 현재 데이터 구조상 empty인 경우가 많음 (공통 정의)
+    col_def_map = {}
+    for row in iter_csv_rows(column_csv_path):
+        cname = (row.get('column_name') or '').strip()
+        if cname:
+            col_def_map[cname] = row
+
+    logger.info(f"Loaded {len(table_info_map)} tables and {len(col_def_map)} column definitions")
+    ctx.update(percent=5, message="CSV 파싱 완료", tables_total=len(table_info_map))
+
+    # 2. DB 컬럼 정보 병합 (password 는 job params 에 남기지 않고 실행 시점에 로드)
+    credentials = _load_credentials(db_key)
+    OracleConnector = _load_mcp_module("oracle_connector").OracleConnector
+
+    logger.info(f"Connecting to Oracle DB: {db_key}")
+    oracle = OracleConnector(
+        host=credentials['host'],
+        port=credentials['port'],
+        service_name=credentials['service_name'],
+        user=credentials['user'],
+        password=credentials['password']
+    )
+
+    if not oracle.connect():
+        raise RuntimeError("Failed to connect to Oracle DB")
+
+    # 적재 대상 (텍스트 생성 → 배치 임베딩 → 청크 upsert 순서로 처리)
+    table_ids = []
+    summary_texts = []
+    metadatas = []
+    try:
+        # 대상 테이블 전체의 컬럼/PK 를 집합 단위로 조회 (테이블당 왕복 2회 → 전체 몇 회)
+        target_tables = list(table_info_map.keys())
+        columns_by_table = oracle.extract_columns_bulk(schema_name, target_tables)
+        pks_by_table = oracle.extract_primary_keys_bulk(schema_name, target_tables)
+        logger.info(f"Fetched columns for {len(columns_by_table)}/{len(target_tables)} tables in bulk")
+        ctx.update(percent=20, message="DB 스키마 조회 완료")
+
+        for table_name, table_csv_info in table_info_map.items():
+            logger.info(f"Processing table: {table_name}")
+
+            # DB 컬럼 정보 (메모리에서 조인)
+            db_columns = columns_by_table.get(table_name.upper(), [])
+            if not db_columns:
+                logger.warning(f"Table {table_name} not found in DB or has no columns")
+                continue
+
+            # DB PK 정보
+            pks = pks_by_table.get(table_name.upper(), [])
+
+            # 컬럼 정보 병합
+            enhanced_columns = merge_db_columns(db_columns, pks, col_def_map)
+
+            # 임베딩 텍스트 생성
+            summary_text = EnhancedMetadataBuilder.create_summary_text(
+                database_sid=db_key,
+                schema_name=schema_name,
+                table_name=table_name,
+                korean_name=table_csv_info.get('description_ko', ''), # description_ko를 한글명으로 사용?
+                # 주의: table_metadata.csv의 description_ko는 "테이블 설명" 역할.
+                # create_summary_text 인자의 korean_name은 "한글 테이블명"
+                # CSV의 description_ko가 "품목 정보 조회" 같다면 description에 넣는 게 맞음.
+                # 하지만 기존 데이터 보면 description_ko에 "Item/BOM Management (품목/BOM 관리)" 같은 게 들어있음.
+                # 이를 description으로 넘김.
+                description=table_csv_info.get('description_ko', ''),
+                columns=enhanced_columns,
+                domain=table_csv_info.get('domain', ''),
+                keywords=table_csv_info.get('keywords', ''),
+                sample_queries=table_csv_info.get('sample_queries', ''),
+                related_tables=[{'table_name': t.strip()} for t in table_csv_info.get('related_tables', '').split(',') if t.strip()]
+            )
+
+            # Vector DB 저장용 메타데이터
+            metadata_dict = {
+                "table_name": table_name,
+                "schema_name": schema_name,
+                "database_sid": db_key,
+                "korean_name": "", # CSV에서 한글명을 따로 분리 안 했으면 description에 포함됨
+                "description": table_csv_info.get('description_ko', ''),
+                "domain": table_csv_info.get('domain', ''),
+                "keywords": table_csv_info.get('keywords', ''),
+                "column_count": len(enhanced_columns),
+                "update_date": datetime.now().isoformat()
+            }
+
+            table_ids.append(f"{db_key}.{schema_name}.{table_name}")
+            summary_texts.append(summary_text)
+            metadatas.append(metadata_dict)
+
+    finally:
+        oracle.disconnect()
+
+    # 3. 배치 임베딩 + 청크 단위 upsert (재처리 시 같은 ID는 교체)
+    # 재시도/재시작 시 이미 저장된 앞부분(written 개)은 건너뜀 - 작업 전용 CSV 이므로 순서도 같음
+    start = min(ctx.checkpoint.get("written", 0), len(table_ids))
+    if start:
+        logger.info(f"Resuming metadata upsert at {start}/{len(table_ids)}")
+    ctx.update(percent=30, message="임베딩 / Vector DB 저장 중", tables_matched=len(table_ids))
+    started_at = time.perf_counter()
+
+    def on_chunk(written: int, total: int):
+        done = start + written
+        ctx.save_checkpoint(written=done)
+        elapsed = time.perf_counter() - started_at
+        ctx.update(
+            percent=30 + 70 * done / max(len(table_ids), 1),
+            tables_processed=done,
+            tables_per_second=round(written / elapsed, 1) if elapsed > 0 else None
+        )
+
+    upsert_metadata_entries(
+        vector_store, embedding_service,
+        table_ids[start:], summary_texts[start:], metadatas[start:],
+        progress_callback=on_chunk
+    )
+
+    return {
+        "success": True,
+        "tables_processed": len(table_ids),
+        "database_sid": db_key,
+        "schema_name": schema_name
+    }
+
+
+def cleanup_metadata_uploads(job: Dict[str, Any]):
+    """
+    Remove the job's upload directory once the job has finished (kept between retries)
+
+    CSVs of a completed job replace csv_uploads/table_metadata.csv and
+    column_definitions.csv, the latest-upload copies other tools read.
+    """
+    upload_dir = job["params"].get("upload_dir")
+    if not upload_dir:
+        return
+    upload_dir = Path(upload_dir)
+
+    if job["status"] == "completed":
+        for key in ("table_csv", "column_csv"):
+            csv_path = Path(job["params"][key])
+            try:
+                os.replace(csv_path, upload_dir.parent / csv_path.name)
+            except OSError as e:
+                logger.warning(f"Could not keep uploaded {csv_path.name}: {e}")
+
+    shutil.rmtree(upload_dir, ignore_errors=True)
+
+
+def migrate_metadata_job(app_state, ctx, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Re-vectorize table metadata from JSON files
+
+    params: metadata_dir, database_sid, schema_name
+    """
+    ctx.update(percent=0, message="마이그레이션 중")
+    migrator = MetadataMigrator(app_state.vector_store, app_state.embedding_service)
+    result = asyncio.run(migrator.migrate_from_json(
+        metadata_dir=params["metadata_dir"],
+        database_sid=params["database_sid"],
+        schema_name=params["schema_name"]
+    ))
+    if not result.get("success"):
+        raise RuntimeError(result.get("error", "Migration failed"))
+    return result
+
+
+def parse_powerbuilder_job(app_state, ctx, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Parse uploaded PowerBuilder files and store the extracted knowledge
+
+    params: file_paths, upload_dir, database_sid, schema_name
+    """
+    from app.core.powerbuilder_parser import PowerBuilderParser
+    from app.core.legacy_analyzer import LegacyAnalyzer
+
+    ctx.update(percent=0, message="파일 파싱 중", files_total=len(params["file_paths"]))
+    analyzer = LegacyAnalyzer(app_state.vector_store, app_state.embedding_service, PowerBuilderParser())
+
+    def on_progress(phase: str, done: int, total: int):
+        # 파싱 0~40%, 지식 저장 40~100%
+        if phase == "parse":
+            ctx.update(percent=40 * done / max(total, 1), message="파일 파싱 중", files_parsed=done)
+        else:
+            ctx.update(percent=40 + 60 * done / max(total, 1), message="지식 저장 중",
+                       entries_stored=done, entries_total=total)
+
+    return asyncio.run(analyzer.process_powerbuilder_files(
+        file_paths=params["file_paths"],
+        database_sid=params["database_sid"],
+        schema_name=params["schema_name"],
+        progress_callback=on_progress
+    ))
+
+
+def cleanup_powerbuilder_uploads(job: Dict[str, Any]):
+    """Remove the job's upload directory once the job has finished (kept between retries)"""
+    upload_dir = job["params"].get("upload_dir")
+    if upload_dir:
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        return
+
+    # Jobs queued before upload_dir was recorded
+    for file_path in job["params"].get("file_paths", []):
+        try:
+            Path(file_path).unlink()
+        except OSError:
+            pass
+
+
+def vectorize_columns_job(app_state, ctx, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Incrementally re-vectorize column definitions for one SID/schema (vectorize_columns.py)
+
+    params: database_sid, schema_name, force_rebuild
+    """
+    ctx.update(percent=0, message="컬럼 벡터화 중")
+    vectorize_columns = _load_module("vectorize_columns", project_root / "vectorize_columns.py")
+
+    # Reuse the backend's model and Chroma client so this process stays the only writer
+    vectorizer = vectorize_columns.ColumnVectorizer(
+        params["database_sid"],
+        params["schema_name"],
+        collection_layout=app_state.vector_store.router.layout,
+        model=app_state.embedding_service.model,
+        client=app_state.vector_store.client
+    )
+    processed, deleted, total = vectorizer.vectorize(force_rebuild=params.get("force_rebuild", False))
+    return {"columns_processed": processed, "columns_deleted": deleted, "columns_total": total}
+
+
+def register_job_handlers(job_queue, app_state):
+    """Register every backend job kind; app_state provides vector_store / embedding_service"""
+    job_queue.register_handler(
+        JOB_METADATA_PROCESS,
+        partial(process_metadata_job, app_state),
+        on_finish=cleanup_metadata_uploads
+    )
+    job_queue.register_handler(JOB_METADATA_MIGRATE, partial(migrate_metadata_job, app_state))
+    job_queue.register_handler(
+        JOB_POWERBUILDER_PARSE,
+        partial(parse_powerbuilder_job, app_state),
+        on_finish=cleanup_powerbuilder_uploads
+    )
+    job_queue.register_handler(JOB_COLUMN_VECTORIZE, partial(vectorize_columns_job, app_state))
@@ -0,0 +1,501 @@
+"""
+Durable Job Queue
+SQLite-backed background job queue for long-running backend work
+(metadata processing, PowerBuilder parsing, re-vectorization).
+
+Jobs survive restarts: a job that was processing when the server stopped is
+re-queued on startup and resumes from its last saved checkpoint. Work runs on
+a pool of worker threads, so HTTP workers are never held by heavy jobs.
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STATUS_QUEUED = "queued"
+STATUS_PROCESSING = "processing"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+
+TERMINAL_STATUSES = (STATUS_COMPLETED, STATUS_FAILED, STATUS_CANCELLED)
+
+# Number of worker threads (JOB_WORKER_CONCURRENCY env var)
+DEFAULT_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", "2"))
+
+# Attempts per job before it is marked failed (JOB_MAX_ATTEMPTS env var)
+DEFAULT_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+# Delay before retry n is 2^(n-1) * RETRY_BACKOFF_SECONDS
+RETRY_BACKOFF_SECONDS = 5.0
+
+# Idle workers re-check the queue at least this often (retries become due over time)
+POLL_INTERVAL_SECONDS = 1.0
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when cancellation was requested"""
+
+
+class JobContext:
+    """Handle passed to job handlers for progress, checkpoints and cancellation"""
+
+    def __init__(self, queue: "JobQueue", job: Dict[str, Any]):
+        self.queue = queue
+        self.job_id = job["job_id"]
+        self.kind = job["kind"]
+        self.params = job["params"]
+        self.attempt = job["attempts"]
+        self.checkpoint: Dict[str, Any] = dict(job["checkpoint"])
+
+    def update(self, percent: Optional[float] = None, message: Optional[str] = None, **counters):
+        """
+        Record progress (percent 0-100, optional message and arbitrary counters)
+
+        Raises:
+            JobCancelled: if cancellation was requested for this job
+        """
+        progress: Dict[str, Any] = dict(counters)
+        if percent is not None:
+            progress["percent"] = max(0, min(100, int(percent)))
+        if message is not None:
+            progress["message"] = message
+        self.queue._update_progress(self.job_id, progress)
+        self.check_cancelled()
+
+    def save_checkpoint(self, **data):
+        """Persist resume state; a retried or restarted job receives it in ctx.checkpoint"""
+        self.checkpoint.update(data)
+        self.queue._save_checkpoint(self.job_id, self.checkpoint)
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self.queue._is_cancel_requested(self.job_id)
+
+    def check_cancelled(self):
+        if self.cancel_requested:
+            raise JobCancelled(self.job_id)
+
+
+class JobQueue:
+    """
+    Persistent job queue with a worker thread pool
+
+    Handlers are registered per job kind: handler(ctx, params) -> result dict.
+    Coroutine handlers are run with asyncio.run inside the worker thread.
+    """
+
+    def __init__(self, db_path: str, concurrency: Optional[int] = None):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.concurrency = max(1, concurrency or DEFAULT_CONCURRENCY)
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._handlers: Dict[str, Callable] = {}
+        self._finalizers: Dict[str, Callable] = {}
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "  job_id TEXT PRIMARY KEY,"
+            "  kind TEXT NOT NULL,"
+            "  status TEXT NOT NULL,"
+            "  params TEXT NOT NULL,"
+            "  progress TEXT NOT NULL DEFAULT '{}',"
+            "  checkpoint TEXT NOT NULL DEFAULT '{}',"
+            "  result TEXT,"
+            "  error TEXT,"
+            "  attempts INTEGER NOT NULL DEFAULT 0,"
+            "  max_attempts INTEGER NOT NULL,"
+            "  cancel_requested INTEGER NOT NULL DEFAULT 0,"
+            "  available_at REAL NOT NULL,"
+            "  created_at TEXT NOT NULL,"
+            "  started_at TEXT,"
+            "  completed_at TEXT,"
+            "  updated_at TEXT NOT NULL"
+            ")"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, available_at)")
+        self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Registration / lifecycle
+    # ------------------------------------------------------------------
+    def register_handler(self, kind: str, handler: Callable, on_finish: Optional[Callable] = None):
+        """
+        Args:
+            kind: Job kind name
+            handler: handler(ctx, params) -> result dict (sync or async)
+            on_finish: Optional callback(job) once the job is completed, failed or cancelled
+        """
+        self._handlers[kind] = handler
+        if on_finish:
+            self._finalizers[kind] = on_finish
+
+    def add_listener(self, callback: Callable[[Dict[str, Any]], None]):
+        """callback(job) is called from worker threads on every state or progress change"""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[Dict[str, Any]], None]):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def start(self):
+        """Re-queue jobs interrupted by a restart and start worker threads"""
+        with self._lock:
+            resumed = self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE status = ?",
+                (STATUS_QUEUED, _now(), STATUS_PROCESSING)
+            ).rowcount
+            self._conn.commit()
+        if resumed:
+            logger.info(f"Re-queued {resumed} interrupted job(s)")
+
+        self._stopping.clear()
+        for i in range(self.concurrency):
+            thread = threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Job queue started ({self.concurrency} workers, {self.db_path})")
+
+    def stop(self, timeout: float = 5.0):
+        """Stop workers; running jobs stay 'processing' and are re-queued on next start"""
+        self._stopping.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def submit(self, kind: str, params: Dict[str, Any], max_attempts: Optional[int] = None) -> str:
+        """Queue a job; params must be JSON serializable. Returns the job ID."""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        job_id = str(uuid.uuid4())
+        now = _now()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, kind, status, params, max_attempts, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job_id, kind, STATUS_QUEUED, json.dumps(params, ensure_ascii=False),
+                    max_attempts or DEFAULT_MAX_ATTEMPTS, time.time(), now, now
+                )
+            )
+            self._conn.commit()
+
+        self._notify(job_id)
+        with self._wakeup:
+            self._wakeup.notify()
+        logger.info(f"Job queued: {kind} {job_id}")
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return _row_to_job(row) if row else None
+
+    def list(self, kind: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent jobs first"""
+        query = "SELECT * FROM jobs"
+        params: tuple = ()
+        if kind:
+            query += " WHERE kind = ?"
+            params = (kind,)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(query, params + (limit,)).fetchall()
+        return [_row_to_job(row) for row in rows]
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a job: queued jobs stop immediately, processing jobs stop at their
+        next progress update. Returns False if the job does not exist or already finished.
+        """
+        now = _now()
+        with self._lock:
+            # Atomic against _claim_next: only a job still queued is cancelled outright
+            cancelled = self._conn.execute(
+                "UPDATE jobs SET status = ?, completed_at = ?, updated_at = ? WHERE job_id = ? AND status = ?",
+                (STATUS_CANCELLED, now, now, job_id, STATUS_QUEUED)
+            ).rowcount
+            requested = 0
+            if not cancelled:
+                # Already claimed by a worker: ask the handler to stop
+                requested = self._conn.execute(
+                    "UPDATE jobs SET cancel_requested = 1, updated_at = ? WHERE job_id = ? AND status = ?",
+                    (now, job_id, STATUS_PROCESSING)
+                ).rowcount
+            self._conn.commit()
+
+        if cancelled:
+            self._after_finish(job_id)
+        elif requested:
+            self._notify(job_id)
+        return bool(cancelled or requested)
+
+    def delete(self, job_id: str) -> bool:
+        """Delete a finished job from history (running jobs must be cancelled first)"""
+        job = self.get(job_id)
+        if not job or job["status"] not in TERMINAL_STATUSES:
+            return False
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+            self._conn.commit()
+        return True
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Await a job reaching a terminal state without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        done = asyncio.Event()
+
+        def listener(job: Dict[str, Any]):
+            if job["job_id"] == job_id and job["status"] in TERMINAL_STATUSES:
+                loop.call_soon_threadsafe(done.set)
+
+        self.add_listener(listener)
+        try:
+            job = self.get(job_id)
+            if job and job["status"] not in TERMINAL_STATUSES:
+                await asyncio.wait_for(done.wait(), timeout)
+        finally:
+            self.remove_listener(listener)
+        return self.get(job_id)
+
+    async def stream(self, job_id: Optional[str] = None,
+                     heartbeat: Optional[float] = None) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Yield job states as they change (push-based, no polling)
+
+        Updates are coalesced per job: a slow consumer receives the latest state of
+        each job rather than every intermediate progress update, and a terminal state
+        is never dropped. With job_id set, the current state is yielded first and the
+        stream ends once the job reaches a terminal state.
+
+        Args:
+            job_id: Follow one job (None: every job)
+            heartbeat: Yield None after this many idle seconds (keep-alive for the caller)
+        """
+        loop = asyncio.get_running_loop()
+        pending: Dict[str, Dict[str, Any]] = {}
+        changed = asyncio.Event()
+
+        def deliver(job: Dict[str, Any]):
+            pending[job["job_id"]] = job
+            changed.set()
+
+        def listener(job: Dict[str, Any]):
+            if job_id is None or job["job_id"] == job_id:
+                loop.call_soon_threadsafe(deliver, job)
+
+        self.add_listener(listener)
+        try:
+            if job_id is not None:
+                job = self.get(job_id)
+                if job is None:
+                    return
+                yield job
+                if job["status"] in TERMINAL_STATUSES:
+                    return
+
+            while True:
+                try:
+                    await asyncio.wait_for(changed.wait(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                changed.clear()
+                jobs = list(pending.values())
+                pending.clear()
+                for job in jobs:
+                    yield job
+                    if job_id is not None and job["status"] in TERMINAL_STATUSES:
+                        return
+        finally:
+            self.remove_listener(listener)
+
+    # ------------------------------------------------------------------
+    # Worker internals
+    # ------------------------------------------------------------------
+    def _worker_loop(self):
+        while not self._stopping.is_set():
+            job = self._claim_next()
+            if job is None:
+                with self._wakeup:
+                    self._wakeup.wait(POLL_INTERVAL_SECONDS)
+                continue
+            self._run(job)
+
+    def _claim_next(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT job_id FROM jobs WHERE status = ? AND available_at <= ? "
+                "ORDER BY created_at LIMIT 1",
+                (STATUS_QUEUED, time.time())
+            ).fetchone()
+            if row is None:
+                return None
+            now = _now()
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, error = NULL, "
+                "started_at = COALESCE(started_at, ?), updated_at = ? WHERE job_id = ?",
+                (STATUS_PROCESSING, now, now, row["job_id"])
+            )
+            self._conn.commit()
+            job_row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (row["job_id"],)).fetchone()
+
+        job = _row_to_job(job_row)
+        self._notify(job["job_id"])
+        return job
+
+    def _run(self, job: Dict[str, Any]):
+        job_id = job["job_id"]
+        handler = self._handlers.get(job["kind"])
+        if handler is None:
+            self._finish(job_id, STATUS_FAILED, error=f"No handler registered for {job['kind']}")
+            return
+
+        ctx = JobContext(self, job)
+        logger.info(f"Job started: {job['kind']} {job_id} (attempt {job['attempts']}/{job['max_attempts']})")
+        try:
+            ctx.check_cancelled()
+            if inspect.iscoroutinefunction(handler):
+                result = asyncio.run(handler(ctx, job["params"]))
+            else:
+                result = handler(ctx, job["params"])
+            self._finish(job_id, STATUS_COMPLETED, result=result or {})
+            logger.info(f"Job completed: {job['kind']} {job_id}")
+
+        except JobCancelled:
+            self._finish(job_id, STATUS_CANCELLED)
+            logger.info(f"Job cancelled: {job['kind']} {job_id}")
+
+        except Exception as e:
+            logger.error(f"Job {job_id} attempt {job['attempts']} failed: {e}", exc_info=True)
+            if ctx.cancel_requested:
+                self._finish(job_id, STATUS_CANCELLED, error=str(e))
+            elif job["attempts"] < job["max_attempts"]:
+                delay = RETRY_BACKOFF_SECONDS * (2 ** (job["attempts"] - 1))
+                with self._lock:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, error = ?, available_at = ?, updated_at = ? "
+                        "WHERE job_id = ? AND status = ?",
+                        (STATUS_QUEUED, str(e), time.time() + delay, _now(), job_id, STATUS_PROCESSING)
+                    )
+                    self._conn.commit()
+                self._notify(job_id)
+            else:
+                self._finish(job_id, STATUS_FAILED, error=str(e))
+
+    def _finish(self, job_id: str, status: str, result: Optional[Dict[str, Any]] = None,
+                error: Optional[str] = None):
+        now = _now()
+        with self._lock:
+            # A terminal status is never overwritten (e.g. a cancel that won the race)
+            updated = self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = COALESCE(?, error), "
+                "completed_at = ?, updated_at = ? WHERE job_id = ? AND status NOT IN (?, ?, ?)",
+                (
+                    status, json.dumps(result, ensure_ascii=False) if result is not None else None,
+                    error, now, now, job_id, *TERMINAL_STATUSES
+                )
+            ).rowcount
+            self._conn.commit()
+
+        if not updated:
+            logger.warning(f"Job {job_id} already finished; not marking it {status}")
+            return
+        self._after_finish(job_id)
+
+    def _after_finish(self, job_id: str):
+        """Run the kind's finalizer once the job reached a terminal status, then notify"""
+        job = self.get(job_id)
+        finalizer = self._finalizers.get(job["kind"]) if job else None
+        if finalizer:
+            try:
+                finalizer(job)
+            except Exception as e:
+                logger.warning(f"Job {job_id} finalizer failed: {e}")
+        self._notify(job_id)
+
+    def _update_progress(self, job_id: str, progress: Dict[str, Any]):
+        with self._lock:
+            row = self._conn.execute("SELECT progress FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            merged = json.loads(row["progress"]) if row else {}
+            merged.update(progress)
+            self._conn.execute(
+                "UPDATE jobs SET progress = ?, updated_at = ? WHERE job_id = ?",
+                (json.dumps(merged, ensure_ascii=False), _now(), job_id)
+            )
+            self._conn.commit()
+        self._notify(job_id)
+
+    def _save_checkpoint(self, job_id: str, checkpoint: Dict[str, Any]):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET checkpoint = ?, updated_at = ? WHERE job_id = ?",
+                (json.dumps(checkpoint, ensure_ascii=False), _now(), job_id)
+            )
+            self._conn.commit()
+
+    def _is_cancel_requested(self, job_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT cancel_requested FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def _notify(self, job_id: str):
+        if not self._listeners:
+            return
+        job = self.get(job_id)
+        if job is None:
+            return
+        for listener in list(self._listeners):
+            try:
+                listener(job)
+            except Exception as e:
+                logger.debug(f"Job listener failed: {e}")
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat()
+
+
+def _row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+    return {
+        "job_id": row["job_id"],
+        "kind": row["kind"],
+        "status": row["status"],
+        "params": json.loads(row["params"]),
+        "progress": json.loads(row["progress"]),
+        "checkpoint": json.loads(row["checkpoint"]),
+        "result": json.loads(row["result"]) if row["result"] else None,
+        "error": row["error"],
+        "attempts": row["attempts"],
+        "max_attempts": row["max_attempts"],
+        "cancel_requested": bool(row["cancel_requested"]),
+        "created_at": row["created_at"],
+        "started_at": row["started_at"],
+        "completed_at": row["completed_at"],
+        "updated_at": row["updated_at"]
+    }
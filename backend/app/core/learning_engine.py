@@ -130,20 +130,22 @@ class LearningEngine:
             Best matching pattern or None if no good match found
         """
         # Create embedding for the question
-        question_embedding = self.embedding_service.embed_text(question)
+        question_embedding = self.embedding_service.embed_query(question)
 
         # Search for similar patterns
         results = self.vector_store.search_similar_patterns(
             query_embedding=question_embedding,
             similarity_threshold=similarity_threshold,
-            n_results=5
+            n_results=5,
+            database_sid=database_sid,
+            schema_name=schema_name
         )
 
         if not results["ids"]:
             logger.info("No similar patterns found")
             return None
 
-        # Filter by database/schema and success rate
+        # Filter by success rate (database/schema already filtered in the query)
         best_match = None
         best_score = 0
 
@@ -151,11 +153,6 @@ class LearningEngine:
             metadata = results["metadatas"][i]
             similarity = results["similarities"][i]
 
-            # Check if same database and schema
-            if (metadata.get("database_sid") != database_sid or
-                metadata.get("schema_name") != schema_name):
-                continue
-
             # Calculate success rate
             use_count = metadata.get("use_count", 1)
             success_count = metadata.get("success_count", 0)
@@ -231,36 +228,14 @@ class LearningEngine:
         logger.info(f"Pattern deleted: {pattern_id}")
 
     def get_pattern_stats(self) -> Dict[str, Any]:
-        """Get learning statistics"""
-        patterns = self.vector_store.list_all_patterns()
-
-        if not patterns:
-            return {
-                "total_patterns": 0,
-                "avg_success_rate": 0,
-                "total_reuses": 0
-            }
-
-        total_reuses = 0
-        success_rates = []
-
-        for pattern in patterns:
-            metadata = pattern.get("metadata", {})
-            use_count = metadata.get("use_count", 0)
-            success_count = metadata.get("success_count", 0)
-
-            total_reuses += use_count
-
-            if use_count > 0:
-                success_rates.append(success_count / use_count)
-
-        avg_success_rate = sum(success_rates) / len(success_rates) if success_rates else 0
+        """Get learning statistics (over all patterns, from the pattern index)"""
+        summary = self.vector_store.pattern_index.summary()
 
         return {
-            "total_patterns": len(patterns),
-            "avg_success_rate": avg_success_rate,
-            "total_reuses": total_reuses,
-            "estimated_llm_calls_saved": total_reuses
+            "total_patterns": summary["total_patterns"],
+            "avg_success_rate": summary["avg_success_rate"],
+            "total_reuses": summary["total_reuses"],
+            "estimated_llm_calls_saved": summary["total_reuses"]
         }
 
     def _generate_pattern_id(
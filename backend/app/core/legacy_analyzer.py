@@ -4,12 +4,23 @@ Analyzes and stores knowledge extracted from legacy systems (PowerBuilder, etc.)
 """
 
 import logging
-from typing import List, Dict, Any
+import os
+from typing import List, Dict, Any, Callable, Optional
 from pathlib import Path
 import json
 
 logger = logging.getLogger(__name__)
 
+# Knowledge entries embedded and upserted per batch (progress is reported per batch)
+KNOWLEDGE_STORE_BATCH_SIZE = int(os.getenv("KNOWLEDGE_STORE_BATCH_SIZE", "256"))
+
+# Counter key in the summary for each knowledge entry type
+_ENTRY_TYPE_COUNTERS = {
+    "sql_query": "sql_queries_extracted",
+    "business_rule": "business_rules_extracted",
+    "table_relationship": "relationships_discovered",
+}
+
 
 class LegacyAnalyzer:
     """Analyzer for legacy system knowledge"""
@@ -31,7 +42,8 @@ class LegacyAnalyzer:
         self,
         file_paths: List[str],
         database_sid: str,
-        schema_name: str
+        schema_name: str,
+        progress_callback: Optional[Callable[[str, int, int], None]] = None
     ) -> Dict[str, Any]:
         """
         Process PowerBuilder files and store knowledge in Vector DB
@@ -40,74 +52,61 @@ class LegacyAnalyzer:
             file_paths: List of PowerBuilder file paths
             database_sid: Database SID
             schema_name: Schema name
+            progress_callback: Optional callback(phase, done, total); phase is "parse"
+                (files, reported as each file completes) or "store" (knowledge entries)
 
         Returns:
             Processing summary
         """
         logger.info(f"Processing {len(file_paths)} PowerBuilder files...")
 
-        # Parse all files
-        parsed_results = self.powerbuilder_parser.parse_multiple_files(file_paths)
+        # Parse files (process pool for large uploads) and fold each result into the
+        # knowledge base as it completes; only the deduplicated entries are kept
+        builder = self.powerbuilder_parser.knowledge_base_builder(database_sid, schema_name)
+        for done, (_, result) in enumerate(self.powerbuilder_parser.iter_parse_files(file_paths), 1):
+            builder.add_file_result(result)
+            if progress_callback:
+                progress_callback("parse", done, len(file_paths))
 
-        # Generate knowledge base entries
-        knowledge_entries = self.powerbuilder_parser.generate_knowledge_base(
-            parsed_results,
-            database_sid,
-            schema_name
-        )
+        knowledge_entries = builder.entries()
 
-        # Store in Vector DB
+        # Store in Vector DB: entries are already deduplicated with content-derived IDs,
+        # so each batch is embedded in one call and upserted in one call
+        counts = dict.fromkeys(_ENTRY_TYPE_COUNTERS.values(), 0)
         stored_count = 0
-        sql_query_count = 0
-        business_rule_count = 0
-        relationship_count = 0
+        total = len(knowledge_entries)
 
-        for entry in knowledge_entries:
+        for start in range(0, total, KNOWLEDGE_STORE_BATCH_SIZE):
+            batch = knowledge_entries[start:start + KNOWLEDGE_STORE_BATCH_SIZE]
             try:
-                # Create embedding
-                embedding = self.embedding_service.embed_text(entry["content"])
-
-                # Store based on type
-                entry_type = entry["type"]
-
-                if entry_type == "sql_query":
-                    # Store as business rule (SQL examples)
-                    self.vector_store.add_business_rule(
-                        rule_id=entry["id"],
-                        rule_text=entry["content"],
-                        embedding=embedding,
-                        metadata=entry["metadata"]
-                    )
-                    sql_query_count += 1
-
-                elif entry_type == "business_rule":
-                    self.vector_store.add_business_rule(
-                        rule_id=entry["id"],
-                        rule_text=entry["content"],
-                        embedding=embedding,
-                        metadata=entry["metadata"]
-                    )
-                    business_rule_count += 1
-
-                elif entry_type == "table_relationship":
-                    self.vector_store.add_business_rule(
-                        rule_id=entry["id"],
-                        rule_text=entry["content"],
-                        embedding=embedding,
-                        metadata=entry["metadata"]
-                    )
-                    relationship_count += 1
-
-                stored_count += 1
-
+                embeddings = self.embedding_service.embed_batch([entry["content"] for entry in batch])
+                self.vector_store.add_business_rules_batch(
+                    rule_ids=[entry["id"] for entry in batch],
+                    rule_texts=[entry["content"] for entry in batch],
+                    embeddings=embeddings,
+                    metadatas=[entry["metadata"] for entry in batch]
+                )
             except Exception as e:
-                logger.error(f"Error storing entry {entry['id']}: {e}")
+                logger.error(f"Error storing knowledge entries {start + 1}-{start + len(batch)}: {e}")
+            else:
+                for entry in batch:
+                    counts[_ENTRY_TYPE_COUNTERS[entry["type"]]] += 1
+                stored_count += len(batch)
+
+            if progress_callback:
+                progress_callback("store", start + len(batch), total)
+
+        sql_query_count = counts["sql_queries_extracted"]
+        business_rule_count = counts["business_rules_extracted"]
+        relationship_count = counts["relationships_discovered"]
+        sql_file_hits = builder.sql_file_hits
 
         summary = {
-            "files_processed": parsed_results["files_parsed"],
-            "tables_discovered": parsed_results["total_tables"],
-            "table_list": parsed_results["tables"],
+            "files_processed": builder.files_parsed,
+            "tables_discovered": len(builder.tables),
+            "table_list": sorted(builder.tables),
             "sql_queries_extracted": sql_query_count,
+            "sql_query_file_hits": sql_file_hits,
             "business_rules_extracted": business_rule_count,
             "relationships_discovered": relationship_count,
             "total_knowledge_entries": stored_count,
@@ -117,7 +116,8 @@ class LegacyAnalyzer:
         logger.info(
             f"PowerBuilder processing complete: "
             f"{stored_count} knowledge entries stored "
-            f"({sql_query_count} SQL, {business_rule_count} rules, {relationship_count} relationships)"
+            f"({sql_query_count} unique SQL found {sql_file_hits} times across files, "
+            f"{business_rule_count} rules, {relationship_count} relationships)"
         )
 
         return summary
@@ -0,0 +1,209 @@
+"""
+SQL Pattern Index
+Secondary indexes over the learned SQL patterns, maintained on write in a small
+SQLite file next to the Chroma data.
+
+PatternMatcher's lookups (by table, most used, recently used, lowest success
+rate) are answered from indexed SQLite queries over all patterns, instead of
+pulling patterns out of Chroma and filtering them in Python:
+
+- pattern_tables: table -> pattern inverted index
+- (SID, schema, use_count), (SID, schema, last_used_at) and
+  (SID, schema, success_rate) B-tree indexes on patterns
+
+VectorStore updates the index on every pattern write / delete and rebuilds it
+from the collection at startup when the row counts disagree.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_PATTERN_COLUMNS = (
+    "pattern_id, question, sql_query, tables_used, use_count, success_count, success_rate, "
+    "last_used_at, avg_execution_time_ms, avg_user_rating"
+)
+
+
+def _split_document(document: Optional[str]) -> Tuple[str, str]:
+    parts = (document or "").split("\n---\n")
+    return parts[0] if len(parts) > 0 else "", parts[1] if len(parts) > 1 else ""
+
+
+class PatternIndex:
+    """SQLite secondary indexes for SQL pattern lookups"""
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS patterns ("
+            "  pattern_id TEXT PRIMARY KEY,"
+            "  database_sid TEXT NOT NULL,"
+            "  schema_name TEXT NOT NULL,"
+            "  question TEXT NOT NULL,"
+            "  sql_query TEXT NOT NULL,"
+            "  tables_used TEXT NOT NULL,"
+            "  use_count INTEGER NOT NULL,"
+            "  success_count INTEGER NOT NULL,"
+            "  success_rate REAL NOT NULL,"
+            "  last_used_at TEXT,"
+            "  avg_execution_time_ms REAL,"
+            "  avg_user_rating REAL"
+            ")"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pattern_tables ("
+            "  table_name TEXT NOT NULL,"
+            "  pattern_id TEXT NOT NULL,"
+            "  PRIMARY KEY (table_name, pattern_id)"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pattern_tables_pattern ON pattern_tables (pattern_id)")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_patterns_use_count ON patterns (database_sid, schema_name, use_count)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_patterns_last_used ON patterns (database_sid, schema_name, last_used_at)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_patterns_success_rate ON patterns (database_sid, schema_name, success_rate)"
+        )
+        self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+    def upsert(self, pattern_id: str, metadata: Dict[str, Any], document: str):
+        """Index (or re-index) one pattern from its Chroma metadata and document"""
+        with self._lock:
+            self._upsert(pattern_id, metadata, document)
+            self._conn.commit()
+
+    def delete(self, pattern_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM pattern_tables WHERE pattern_id = ?", (pattern_id,))
+            self._conn.execute("DELETE FROM patterns WHERE pattern_id = ?", (pattern_id,))
+            self._conn.commit()
+
+    def rebuild(self, patterns: Iterable[Tuple[str, Dict[str, Any], str]]):
+        """Replace the index with (pattern_id, metadata, document) from a full collection scan"""
+        with self._lock:
+            self._conn.execute("DELETE FROM pattern_tables")
+            self._conn.execute("DELETE FROM patterns")
+            for pattern_id, metadata, document in patterns:
+                self._upsert(pattern_id, metadata or {}, document)
+            self._conn.commit()
+
+    def clear(self):
+        self.rebuild([])
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM patterns").fetchone()[0]
+
+    def _upsert(self, pattern_id: str, metadata: Dict[str, Any], document: str):
+        question, sql_query = _split_document(document)
+        try:
+            tables_used = json.loads(metadata.get("tables_used", "[]"))
+        except (TypeError, ValueError):
+            tables_used = []
+        use_count = metadata.get("use_count", 0)
+        success_count = metadata.get("success_count", 0)
+
+        self._conn.execute(
+            "INSERT OR REPLACE INTO patterns (pattern_id, database_sid, schema_name, question, sql_query, "
+            "tables_used, use_count, success_count, success_rate, last_used_at, avg_execution_time_ms, avg_user_rating) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                pattern_id,
+                metadata.get("database_sid", ""),
+                metadata.get("schema_name", ""),
+                question or metadata.get("question", ""),
+                sql_query or metadata.get("sql", ""),
+                json.dumps(tables_used),
+                use_count,
+                success_count,
+                success_count / use_count if use_count > 0 else 0,
+                metadata.get("last_used_at"),
+                metadata.get("avg_execution_time_ms"),
+                metadata.get("avg_user_rating")
+            )
+        )
+        self._conn.execute("DELETE FROM pattern_tables WHERE pattern_id = ?", (pattern_id,))
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO pattern_tables (table_name, pattern_id) VALUES (?, ?)",
+            [(table, pattern_id) for table in tables_used]
+        )
+
+    # ------------------------------------------------------------------
+    # Lookups (all exact over every pattern of the SID/schema)
+    # ------------------------------------------------------------------
+    def find_by_tables(self, database_sid: str, schema_name: str, tables: List[str]) -> List[Dict[str, Any]]:
+        """Patterns using any of the tables, most used first"""
+        if not tables:
+            return []
+        placeholders = ", ".join("?" * len(tables))
+        return self._query(
+            f"SELECT {_PATTERN_COLUMNS} FROM patterns "
+            f"WHERE database_sid = ? AND schema_name = ? AND pattern_id IN "
+            f"(SELECT pattern_id FROM pattern_tables WHERE table_name IN ({placeholders})) "
+            f"ORDER BY use_count DESC",
+            (database_sid, schema_name, *tables)
+        )
+
+    def most_used(self, database_sid: str, schema_name: str, min_use_count: int, limit: int) -> List[Dict[str, Any]]:
+        return self._query(
+            f"SELECT {_PATTERN_COLUMNS} FROM patterns "
+            f"WHERE database_sid = ? AND schema_name = ? AND use_count >= ? "
+            f"ORDER BY use_count DESC LIMIT ?",
+            (database_sid, schema_name, min_use_count, limit)
+        )
+
+    def used_since(self, database_sid: str, schema_name: str, since: str, limit: int) -> List[Dict[str, Any]]:
+        """Patterns with last_used_at >= since (ISO timestamp), most recent first"""
+        return self._query(
+            f"SELECT {_PATTERN_COLUMNS} FROM patterns "
+            f"WHERE database_sid = ? AND schema_name = ? AND last_used_at >= ? "
+            f"ORDER BY last_used_at DESC LIMIT ?",
+            (database_sid, schema_name, since, limit)
+        )
+
+    def success_rate_at_most(self, database_sid: str, schema_name: str, max_success_rate: float) -> List[Dict[str, Any]]:
+        """Patterns with success_rate <= max_success_rate, worst first"""
+        return self._query(
+            f"SELECT {_PATTERN_COLUMNS} FROM patterns "
+            f"WHERE database_sid = ? AND schema_name = ? AND success_rate <= ? "
+            f"ORDER BY success_rate",
+            (database_sid, schema_name, max_success_rate)
+        )
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals over all patterns: count, reuses, average success rate of used patterns"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*), IFNULL(SUM(use_count), 0), "
+                "       IFNULL(AVG(CASE WHEN use_count > 0 THEN success_rate END), 0) "
+                "FROM patterns"
+            ).fetchone()
+        return {"total_patterns": row[0], "total_reuses": row[1], "avg_success_rate": row[2]}
+
+    def _query(self, sql: str, params: tuple) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        patterns = []
+        for row in rows:
+            pattern = dict(row)
+            pattern["tables_used"] = json.loads(pattern["tables_used"])
+            patterns.append(pattern)
+        return patterns
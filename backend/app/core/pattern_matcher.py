@@ -24,6 +24,11 @@ class PatternMatcher:
         self.learning_engine = learning_engine
         self.embedding_service = embedding_service
 
+    @property
+    def pattern_index(self):
+        """Secondary indexes over all SQL patterns (maintained by VectorStore on write)"""
+        return self.learning_engine.vector_store.pattern_index
+
     def suggest_alternative_questions(
         self,
         question: str,
@@ -44,11 +49,13 @@ class PatternMatcher:
             List of alternative questions with their SQL queries
         """
         # Get similar patterns
-        question_embedding = self.embedding_service.embed_text(question)
+        question_embedding = self.embedding_service.embed_query(question)
         results = self.learning_engine.vector_store.search_similar_patterns(
             query_embedding=question_embedding,
             similarity_threshold=0.70,  # Lower threshold for suggestions
-            n_results=n_suggestions * 2  # Get more, then filter
+            n_results=n_suggestions * 2,  # Get more, then filter
+            database_sid=database_sid,
+            schema_name=schema_name
         )
 
         suggestions = []
@@ -57,11 +64,6 @@ class PatternMatcher:
         for i, pattern_id in enumerate(results.get("ids", [])):
             metadata = results["metadatas"][i]
 
-            # Filter by database/schema
-            if (metadata.get("database_sid") != database_sid or
-                metadata.get("schema_name") != schema_name):
-                continue
-
             # Extract question
             document = results["documents"][i]
             parts = document.split("\n---\n")
@@ -107,48 +109,21 @@ class PatternMatcher:
             schema_name: Schema name
 
         Returns:
-            List of patterns using those tables
+            List of patterns using those tables (table -> pattern index, most popular first)
         """
-        all_patterns = self.learning_engine.vector_store.list_all_patterns()
-        matching_patterns = []
-
-        for pattern in all_patterns:
-            metadata = pattern.get("metadata", {})
-
-            # Filter by database/schema
-            if (metadata.get("database_sid") != database_sid or
-                metadata.get("schema_name") != schema_name):
-                continue
-
-            # Check if any of the tables are used
-            import json
-            tables_used = json.loads(metadata.get("tables_used", "[]"))
-
-            if any(table in tables_used for table in tables):
-                # Extract question and SQL
-                document = pattern.get("document", "")
-                parts = document.split("\n---\n")
-                question = parts[0] if len(parts) > 0 else ""
-                sql_query = parts[1] if len(parts) > 1 else ""
-
-                # Calculate success rate
-                use_count = metadata.get("use_count", 1)
-                success_count = metadata.get("success_count", 0)
-                success_rate = success_count / use_count if use_count > 0 else 0
-
-                matching_patterns.append({
-                    "pattern_id": pattern["id"],
-                    "question": question,
-                    "sql_query": sql_query,
-                    "tables_used": tables_used,
-                    "success_rate": success_rate,
-                    "use_count": use_count
-                })
-
-        # Sort by use count (most popular first)
-        matching_patterns.sort(key=lambda x: x["use_count"], reverse=True)
-
-        return matching_patterns
+        patterns = self.pattern_index.find_by_tables(database_sid, schema_name, tables)
+
+        return [
+            {
+                "pattern_id": pattern["pattern_id"],
+                "question": pattern["question"],
+                "sql_query": pattern["sql_query"],
+                "tables_used": pattern["tables_used"],
+                "success_rate": pattern["success_rate"],
+                "use_count": pattern["use_count"]
+            }
+            for pattern in patterns
+        ]
 
     def find_popular_patterns(
         self,
@@ -167,47 +142,22 @@ class PatternMatcher:
             min_use_count: Minimum use count
 
         Returns:
-            List of popular patterns
+            List of popular patterns (use count index, most used first)
         """
-        all_patterns = self.learning_engine.vector_store.list_all_patterns()
-        popular_patterns = []
-
-        for pattern in all_patterns:
-            metadata = pattern.get("metadata", {})
-
-            # Filter by database/schema
-            if (metadata.get("database_sid") != database_sid or
-                metadata.get("schema_name") != schema_name):
-                continue
-
-            use_count = metadata.get("use_count", 0)
-            if use_count < min_use_count:
-                continue
-
-            # Extract question and SQL
-            document = pattern.get("document", "")
-            parts = document.split("\n---\n")
-            question = parts[0] if len(parts) > 0 else ""
-            sql_query = parts[1] if len(parts) > 1 else ""
-
-            # Calculate success rate
-            success_count = metadata.get("success_count", 0)
-            success_rate = success_count / use_count if use_count > 0 else 0
-
-            popular_patterns.append({
-                "pattern_id": pattern["id"],
-                "question": question,
-                "sql_query": sql_query,
-                "use_count": use_count,
-                "success_rate": success_rate,
-                "avg_execution_time_ms": metadata.get("avg_execution_time_ms"),
-                "avg_user_rating": metadata.get("avg_user_rating")
-            })
-
-        # Sort by use count
-        popular_patterns.sort(key=lambda x: x["use_count"], reverse=True)
-
-        return popular_patterns[:limit]
+        patterns = self.pattern_index.most_used(database_sid, schema_name, min_use_count, limit)
+
+        return [
+            {
+                "pattern_id": pattern["pattern_id"],
+                "question": pattern["question"],
+                "sql_query": pattern["sql_query"],
+                "use_count": pattern["use_count"],
+                "success_rate": pattern["success_rate"],
+                "avg_execution_time_ms": pattern["avg_execution_time_ms"],
+                "avg_user_rating": pattern["avg_user_rating"]
+            }
+            for pattern in patterns
+        ]
 
     def find_recently_used_patterns(
         self,
@@ -226,53 +176,22 @@ class PatternMatcher:
             limit: Maximum number of patterns
 
         Returns:
-            List of recently used patterns
+            List of recently used patterns (last-used index, most recent first)
         """
-        cutoff_date = datetime.utcnow() - timedelta(days=days)
-        all_patterns = self.learning_engine.vector_store.list_all_patterns()
-        recent_patterns = []
-
-        for pattern in all_patterns:
-            metadata = pattern.get("metadata", {})
-
-            # Filter by database/schema
-            if (metadata.get("database_sid") != database_sid or
-                metadata.get("schema_name") != schema_name):
-                continue
-
-            # Check last used date
-            last_used_str = metadata.get("last_used_at")
-            if not last_used_str:
-                continue
-
-            try:
-                last_used = datetime.fromisoformat(last_used_str)
-                if last_used < cutoff_date:
-                    continue
-            except:
-                continue
-
-            # Extract question and SQL
-            document = pattern.get("document", "")
-            parts = document.split("\n---\n")
-            question = parts[0] if len(parts) > 0 else ""
-            sql_query = parts[1] if len(parts) > 1 else ""
-
-            recent_patterns.append({
-                "pattern_id": pattern["id"],
-                "question": question,
-                "sql_query": sql_query,
-                "last_used_at": last_used_str,
-                "use_count": metadata.get("use_count", 0)
-            })
-
-        # Sort by last used date (most recent first)
-        recent_patterns.sort(
-            key=lambda x: x["last_used_at"],
-            reverse=True
-        )
-
-        return recent_patterns[:limit]
+        # last_used_at is a UTC ISO timestamp, so string order is time order
+        cutoff_date = (datetime.utcnow() - timedelta(days=days)).isoformat()
+        patterns = self.pattern_index.used_since(database_sid, schema_name, cutoff_date, limit)
+
+        return [
+            {
+                "pattern_id": pattern["pattern_id"],
+                "question": pattern["question"],
+                "sql_query": pattern["sql_query"],
+                "last_used_at": pattern["last_used_at"],
+                "use_count": pattern["use_count"]
+            }
+            for pattern in patterns
+        ]
 
     def identify_failing_patterns(
         self,
@@ -289,43 +208,18 @@ class PatternMatcher:
             max_success_rate: Maximum success rate to include (default: 0.5)
 
         Returns:
-            List of failing patterns
+            List of failing patterns (success rate index, worst first)
         """
-        all_patterns = self.learning_engine.vector_store.list_all_patterns()
-        failing_patterns = []
-
-        for pattern in all_patterns:
-            metadata = pattern.get("metadata", {})
-
-            # Filter by database/schema
-            if (metadata.get("database_sid") != database_sid or
-                metadata.get("schema_name") != schema_name):
-                continue
-
-            # Calculate success rate
-            use_count = metadata.get("use_count", 1)
-            success_count = metadata.get("success_count", 0)
-            success_rate = success_count / use_count if use_count > 0 else 0
-
-            if success_rate > max_success_rate:
-                continue
-
-            # Extract question and SQL
-            document = pattern.get("document", "")
-            parts = document.split("\n---\n")
-            question = parts[0] if len(parts) > 0 else ""
-            sql_query = parts[1] if len(parts) > 1 else ""
-
-            failing_patterns.append({
-                "pattern_id": pattern["id"],
-                "question": question,
-                "sql_query": sql_query,
-                "success_rate": success_rate,
-                "use_count": use_count,
+        patterns = self.pattern_index.success_rate_at_most(database_sid, schema_name, max_success_rate)
+
+        return [
+            {
+                "pattern_id": pattern["pattern_id"],
+                "question": pattern["question"],
+                "sql_query": pattern["sql_query"],
+                "success_rate": pattern["success_rate"],
+                "use_count": pattern["use_count"],
                 "recommendation": "Consider deleting or reviewing this pattern"
-            })
-
-        # Sort by success rate (worst first)
-        failing_patterns.sort(key=lambda x: x["success_rate"])
-
-        return failing_patterns
+            }
+            for pattern in patterns
+        ]
@@ -0,0 +1,204 @@
+"""
+PowerBuilder Library Reader
+Reads object sources directly from binary .pbl libraries
+
+A PBL is a sequence of 512-byte blocks: a header ("HDR*"), free-space bitmaps
+("FRE*"), directory nodes ("NOD*", 3072 bytes) holding object entries ("ENT*"),
+and chained data blocks ("DAT*"). An object's chain holds its entry comment
+followed by the object itself; the entry size counts only the object. The library is memory-mapped and only the
+directory and the data blocks of source objects are touched; compiled objects
+(.win, .dwo, ...) are skipped and each source is decoded once.
+"""
+
+import codecs
+import logging
+import mmap
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BLOCK_SIZE = 512
+NODE_SIZE = 3072
+
+# Entry / data block layouts
+_ENTRY_HEADER = struct.Struct("<4s4sIIIHH")   # ENT*, version, first data block, size, time, comment len, name len
+_NODE_HEADER = struct.Struct("<4sIIIIHHHH")   # NOD*, ?, left, parent, right, free space, first, count, last
+_DATA_HEADER = struct.Struct("<4sIH")         # DAT*, next block, data length
+_DATA_PAYLOAD = BLOCK_SIZE - _DATA_HEADER.size
+
+# Object source entries (compiled objects use other extensions)
+SOURCE_EXTENSIONS = {
+    ".sra", ".srw", ".srd", ".srm", ".srf", ".srs", ".sru", ".srj", ".srq", ".srp", ".srx", ".sry"
+}
+
+# Node blocks searched after the header for the first directory node
+_FIRST_NODE_SEARCH_BLOCKS = 64
+
+# Tried in order for non-Unicode sources (Korean legacy apps use cp949); latin-1 never fails
+ANSI_ENCODINGS = ("utf-8", "cp949")
+
+
+def decode_source(data: bytes, unicode_hint: bool = False) -> str:
+    """
+    Decode PowerBuilder source bytes once
+
+    BOM first (PB10+ exports are UTF-16LE with BOM), then UTF-16LE when the
+    library is Unicode, then ANSI_ENCODINGS, then latin-1.
+    """
+    if data.startswith(codecs.BOM_UTF8):
+        return data[len(codecs.BOM_UTF8):].decode("utf-8", errors="replace")
+    if data.startswith(codecs.BOM_UTF16_LE) or data.startswith(codecs.BOM_UTF16_BE):
+        return data.decode("utf-16", errors="replace")
+    if unicode_hint:
+        return data.decode("utf-16-le", errors="replace")
+
+    for encoding in ANSI_ENCODINGS:
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return data.decode("latin-1")
+
+
+class PBLReader:
+    """Memory-mapped reader for a PowerBuilder library (.pbl)"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file cannot be mapped
+            self._file.close()
+            raise ValueError(f"Not a PowerBuilder library (empty file): {self.path}")
+
+        if self._map[:4] != b"HDR*":
+            self.close()
+            raise ValueError(f"Not a PowerBuilder library: {self.path}")
+
+        # PB10+ (Unicode) libraries store "PowerBuilder" as UTF-16LE in the header
+        self.unicode = self._map[4:28] == "PowerBuilder".encode("utf-16-le")
+
+    def __enter__(self) -> "PBLReader":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """
+        Object entries from the directory nodes
+
+        Returns:
+            [{"name", "offset" (first data block), "size" (object bytes, without comment),
+              "comment_length", "modified" (unix time)}]
+        """
+        first = self._find_first_node()
+        if first is None:
+            logger.warning(f"No directory node found in {self.path.name}")
+            return []
+
+        entries = []
+        visited = set()
+        pending = [first]
+        size = len(self._map)
+
+        # Nodes link to left / parent / right nodes; visit every reachable one once
+        while pending:
+            node = pending.pop()
+            if node in visited or node <= 0 or node + NODE_SIZE > size:
+                continue
+            visited.add(node)
+            signature, _, left, parent, right, _, _, count, _ = _NODE_HEADER.unpack_from(self._map, node)
+            if signature != b"NOD*":
+                continue
+            entries.extend(self._read_node_entries(node, count))
+            pending.extend((left, parent, right))
+
+        return entries
+
+    def read_object(self, entry: Dict[str, Any]) -> bytes:
+        """Raw object bytes, following the DAT* block chain past the entry comment"""
+        chunks = []
+        skip = entry.get("comment_length", 0)
+        remaining = entry["size"]
+        block = entry["offset"]
+        size = len(self._map)
+        seen = set()
+
+        while block and remaining > 0 and block not in seen and block + BLOCK_SIZE <= size:
+            seen.add(block)
+            signature, next_block, length = _DATA_HEADER.unpack_from(self._map, block)
+            if signature != b"DAT*":
+                logger.warning(f"Broken data chain for {entry['name']} in {self.path.name}")
+                break
+            length = min(length, _DATA_PAYLOAD)
+            start = block + _DATA_HEADER.size
+
+            # The comment comes first and may span several blocks
+            skipped = min(skip, length)
+            skip -= skipped
+            start += skipped
+            length = min(length - skipped, remaining)
+
+            chunks.append(self._map[start:start + length])
+            remaining -= length
+            block = next_block
+
+        return b"".join(chunks)
+
+    def iter_sources(self) -> Iterator[Tuple[str, str]]:
+        """
+        Yield (object name, decoded source) for each source object, one at a time
+
+        Objects are read lazily, so only one object's source is held at once.
+        """
+        for entry in self.entries():
+            if Path(entry["name"]).suffix.lower() not in SOURCE_EXTENSIONS:
+                continue
+            data = self.read_object(entry)
+            if data:
+                yield entry["name"], decode_source(data, self.unicode)
+
+    def _find_first_node(self) -> Optional[int]:
+        size = len(self._map)
+        for index in range(1, _FIRST_NODE_SEARCH_BLOCKS):
+            offset = index * BLOCK_SIZE
+            if offset + 4 > size:
+                break
+            if self._map[offset:offset + 4] == b"NOD*":
+                return offset
+        return None
+
+    def _read_node_entries(self, node: int, count: int) -> List[Dict[str, Any]]:
+        entries = []
+        pos = node + _NODE_HEADER.size + 4   # entries start 32 bytes into the node
+        end = node + NODE_SIZE
+
+        for _ in range(count):
+            pos = self._map.find(b"ENT*", pos, end)
+            if pos == -1 or pos + _ENTRY_HEADER.size > end:
+                break
+            _, _, offset, size, modified, comment_length, name_length = _ENTRY_HEADER.unpack_from(self._map, pos)
+            name_start = pos + _ENTRY_HEADER.size
+            raw_name = self._map[name_start:min(name_start + name_length, end)]
+            name = raw_name.decode("utf-16-le" if self.unicode else "latin-1", errors="replace").rstrip("\x00")
+            if name:
+                entries.append({
+                    "name": name,
+                    "offset": offset,
+                    "size": size,
+                    "comment_length": comment_length,
+                    "modified": modified
+                })
+            pos = name_start + name_length
+
+        return entries
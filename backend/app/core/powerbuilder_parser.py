@@ -4,13 +4,60 @@ Extracts SQL queries, table relationships, and business logic from PowerBuilder
 """
 
 import re
+import os
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional, Set
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional, Set, Iterator, Tuple, Callable
 from pathlib import Path
 import json
 
+from app.core.powerscript_scanner import scan_powerscript
+from app.core.pbl_reader import PBLReader, decode_source
+
 logger = logging.getLogger(__name__)
 
+# Worker processes for parsing many files (POWERBUILDER_PARSE_WORKERS env var, 0 = CPU count)
+PARSE_WORKERS = int(os.getenv("POWERBUILDER_PARSE_WORKERS", "0")) or os.cpu_count() or 1
+
+# Below this many files, parsing stays in-process (pool start-up costs more than it saves)
+PARALLEL_PARSE_THRESHOLD = 8
+
+# Parser instance of each pool worker process (created once by _init_parse_worker)
+_worker_parser = None
+
+
+_SQL_WHITESPACE = re.compile(r'\s+')
+_SQL_PUNCT_SPACING = re.compile(r'\s*([,()=<>])\s*')
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Normalize a SQL statement for fingerprinting
+
+    Case, whitespace, spacing around punctuation and a trailing semicolon do not
+    change the fingerprint, so the same statement copied across windows collapses
+    to one knowledge entry.
+    """
+    sql = _SQL_WHITESPACE.sub(' ', sql).strip().rstrip(';').strip()
+    return _SQL_PUNCT_SPACING.sub(r'\1', sql).lower()
+
+
+def content_id(database_sid: str, schema_name: str, kind: str, content: str) -> str:
+    """Stable knowledge entry ID derived from SID/schema and content (same content -> same ID)"""
+    digest = hashlib.sha1(f"{database_sid}:{schema_name}:{content}".encode("utf-8")).hexdigest()[:16]
+    return f"{database_sid}_{schema_name}_{kind}_{digest}"
+
+
+def _init_parse_worker():
+    global _worker_parser
+    _worker_parser = PowerBuilderParser()
+
+
+def _parse_file_in_worker(file_path: str) -> Dict[str, Any]:
+    return _worker_parser.parse_file(file_path)
+
 
 class PowerBuilderParser:
     """Parser for PowerBuilder .srw, .srd, .pbl files"""
@@ -49,7 +96,7 @@ class PowerBuilderParser:
             file_path: Path to .srw, .srd, or .pbl file
 
         Returns:
-            Dict with extracted information
+            Dict with extracted information (for a .pbl, merged over its source objects)
         """
         file_path_obj = Path(file_path)
 
@@ -58,30 +105,20 @@ class PowerBuilderParser:
             return self._empty_result()
 
         try:
-            # Try multiple encodings (PowerBuilder files can use various encodings)
-            content = None
-            for encoding in ['utf-8', 'latin-1', 'cp1252', 'utf-16']:
-                try:
-                    with open(file_path, 'r', encoding=encoding) as f:
-                        content = f.read()
-                    logger.debug(f"Successfully read file with encoding: {encoding}")
-                    break
-                except UnicodeDecodeError:
-                    continue
-
-            if content is None:
-                logger.error(f"Could not read file with any encoding: {file_path}")
-                return self._empty_result()
-
-            # Parse content
+            if file_path_obj.suffix.lower() == ".pbl":
+                # Binary library: read object sources from the entry directory
+                with PBLReader(file_path) as library:
+                    parsed = self._parse_sources(library.iter_sources())
+            else:
+                # Exported source: read once, decode once (BOM / UTF-8 / cp949 / latin-1)
+                with open(file_path, "rb") as f:
+                    parsed = self._parse_sources([(file_path_obj.name, decode_source(f.read()))])
+
             result = {
                 "file_name": file_path_obj.name,
                 "file_path": str(file_path_obj.absolute()),
                 "file_type": file_path_obj.suffix.lower(),
-                "sql_queries": self.extract_sql_queries(content),
-                "tables_referenced": self.extract_table_references(content),
-                "business_rules": self.extract_business_rules(content),
-                "comments": self.extract_comments(content),
+                **parsed,
                 "success": True
             }
 
@@ -97,6 +134,43 @@ class PowerBuilderParser:
             logger.error(f"Error parsing file {file_path}: {e}")
             return self._empty_result()
 
+    def _parse_sources(self, sources) -> Dict[str, Any]:
+        """
+        Scan object sources (single pass each) and merge the results
+
+        Args:
+            sources: Iterable of (object name, source text); consumed lazily
+
+        Returns:
+            sql_queries, tables_referenced, business_rules, comments, objects_parsed
+        """
+        queries = []
+        tables = set()
+        comments = []
+        if_then_rules = []
+        objects_parsed = 0
+
+        for _, content in sources:
+            scanned = scan_powerscript(content)
+            queries.extend(scanned["sql_queries"])
+            tables.update(scanned["tables"])
+            comments.extend(scanned["comments"])
+            if_then_rules.extend({"type": "if_then_logic", **rule} for rule in scanned["if_then_rules"])
+            objects_parsed += 1
+
+        return {
+            "sql_queries": self._dedupe_queries(queries),
+            "tables_referenced": sorted(tables),
+            "business_rules": self._comment_rules(comments) + if_then_rules,
+            "comments": comments,
+            "objects_parsed": objects_parsed
+        }
+
+    # ------------------------------------------------------------------
+    # Regex extractors (one pass per feature). parse_file uses the single-pass
+    # scanner (app/core/powerscript_scanner.py); these remain for callers that
+    # need one feature and for benchmark_powerbuilder_scanner.py.
+    # ------------------------------------------------------------------
     def extract_sql_queries(self, content: str) -> List[Dict[str, str]]:
         """
         Extract SQL queries from PowerBuilder source
@@ -125,7 +199,10 @@ class PowerBuilderParser:
                     "tables": self._extract_tables_from_sql(sql)
                 })
 
-        # Remove duplicates
+        return self._dedupe_queries(queries)
+
+    def _dedupe_queries(self, queries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Remove duplicate queries (case-insensitive SQL text), keeping the first"""
         unique_queries = []
         seen_sqls = set()
 
@@ -168,23 +245,7 @@ class PowerBuilderParser:
         Returns:
             List of business rules
         """
-        rules = []
-
-        # Extract meaningful comments (longer than 20 chars)
-        comments = self.extract_comments(content)
-
-        for comment in comments:
-            comment_text = comment["text"].strip()
-
-            # Look for business rule indicators
-            indicators = ['rule:', 'business:', 'logic:', 'validation:', 'must', 'should', 'if']
-
-            if len(comment_text) > 20 and any(ind in comment_text.lower() for ind in indicators):
-                rules.append({
-                    "type": "comment",
-                    "text": comment_text,
-                    "context": comment.get("context", "")
-                })
+        rules = self._comment_rules(self.extract_comments(content))
 
         # Look for IF-THEN patterns (common in business logic)
         if_then_pattern = re.compile(
@@ -202,6 +263,23 @@ class PowerBuilderParser:
 
         return rules
 
+    def _comment_rules(self, comments: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Meaningful comments (longer than 20 chars) with business rule indicators"""
+        rules = []
+        indicators = ['rule:', 'business:', 'logic:', 'validation:', 'must', 'should', 'if']
+
+        for comment in comments:
+            comment_text = comment["text"].strip()
+
+            if len(comment_text) > 20 and any(ind in comment_text.lower() for ind in indicators):
+                rules.append({
+                    "type": "comment",
+                    "text": comment_text,
+                    "context": comment.get("context", "")
+                })
+
+        return rules
+
     def extract_comments(self, content: str) -> List[Dict[str, str]]:
         """
         Extract comments from PowerBuilder source
@@ -236,24 +314,80 @@ class PowerBuilderParser:
 
         return comments
 
-    def parse_multiple_files(self, file_paths: List[str]) -> Dict[str, Any]:
+    def iter_parse_files(
+        self,
+        file_paths: List[str],
+        max_workers: Optional[int] = None
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Parse files and yield each result as soon as it is ready
+
+        Large batches are fanned out over a process pool (regex parsing is CPU-bound,
+        so threads would serialize on the GIL); results arrive in completion order.
+
+        Args:
+            file_paths: List of file paths
+            max_workers: Worker processes (default: PARSE_WORKERS)
+
+        Yields:
+            (index in file_paths, parse_file result)
+        """
+        workers = min(max_workers or PARSE_WORKERS, len(file_paths))
+
+        if workers <= 1 or len(file_paths) < PARALLEL_PARSE_THRESHOLD:
+            for index, file_path in enumerate(file_paths):
+                yield index, self.parse_file(file_path)
+            return
+
+        logger.info(f"Parsing {len(file_paths)} PowerBuilder files with {workers} worker processes")
+        # spawn: the backend process runs threads (job workers, model inference), fork is unsafe
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_parse_worker
+        ) as executor:
+            futures = {
+                executor.submit(_parse_file_in_worker, file_path): index
+                for index, file_path in enumerate(file_paths)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Error parsing file {file_paths[index]}: {e}")
+                    result = self._empty_result()
+                yield index, result
+
+    def parse_multiple_files(
+        self,
+        file_paths: List[str],
+        max_workers: Optional[int] = None,
+        on_file_parsed: Optional[Callable[[int, int], None]] = None
+    ) -> Dict[str, Any]:
         """
         Parse multiple PowerBuilder files
 
         Args:
             file_paths: List of file paths
+            max_workers: Worker processes (default: PARSE_WORKERS)
+            on_file_parsed: Optional callback(files_done, files_total) as each file completes
 
         Returns:
-            Aggregated results
+            Aggregated results (in file_paths order, independent of completion order)
         """
+        ordered: List[Optional[Dict[str, Any]]] = [None] * len(file_paths)
+        for done, (index, result) in enumerate(self.iter_parse_files(file_paths, max_workers), 1):
+            ordered[index] = result
+            if on_file_parsed:
+                on_file_parsed(done, len(file_paths))
+
         all_results = []
         all_tables = set()
         all_sql_queries = []
         all_business_rules = []
 
-        for file_path in file_paths:
-            result = self.parse_file(file_path)
-
+        for result in ordered:
             if result["success"]:
                 all_results.append(result)
                 all_tables.update(result["tables_referenced"])
@@ -286,64 +420,17 @@ class PowerBuilderParser:
             schema_name: Schema name
 
         Returns:
-            List of knowledge entries ready for embedding
+            List of knowledge entries ready for embedding (duplicates collapsed,
+            IDs derived from content so re-uploads overwrite instead of piling up)
         """
-        knowledge_entries = []
-
-        # Entry 1: SQL queries
-        for i, query in enumerate(parsed_results.get("sql_queries", [])):
-            knowledge_entries.append({
-                "id": f"{database_sid}_{schema_name}_sql_{i}",
-                "type": "sql_query",
-                "content": query["sql"],
-                "metadata": {
-                    "database_sid": database_sid,
-                    "schema_name": schema_name,
-                    "query_type": query["type"],
-                    "tables": query.get("tables", []),
-                    "source": "powerbuilder"
-                }
-            })
-
-        # Entry 2: Business rules
-        for i, rule in enumerate(parsed_results.get("business_rules", [])):
-            content = rule.get("text", "")
-            if rule.get("condition"):
-                content = f"Condition: {rule['condition']}\nAction: {rule.get('action', '')}"
-
-            knowledge_entries.append({
-                "id": f"{database_sid}_{schema_name}_rule_{i}",
-                "type": "business_rule",
-                "content": content,
-                "metadata": {
-                    "database_sid": database_sid,
-                    "schema_name": schema_name,
-                    "rule_type": rule.get("type", "unknown"),
-                    "source": "powerbuilder"
-                }
-            })
+        builder = self.knowledge_base_builder(database_sid, schema_name)
+        builder.add_sql_queries(parsed_results.get("sql_queries", []))
+        builder.add_business_rules(parsed_results.get("business_rules", []))
+        return builder.entries()
 
-        # Entry 3: Table relationships (from SQL analysis)
-        table_relationships = self._analyze_table_relationships(
-            parsed_results.get("sql_queries", [])
-        )
-
-        for i, relationship in enumerate(table_relationships):
-            knowledge_entries.append({
-                "id": f"{database_sid}_{schema_name}_rel_{i}",
-                "type": "table_relationship",
-                "content": f"Tables {relationship['table1']} and {relationship['table2']} are related through {relationship['relationship_type']}",
-                "metadata": {
-                    "database_sid": database_sid,
-                    "schema_name": schema_name,
-                    "table1": relationship["table1"],
-                    "table2": relationship["table2"],
-                    "relationship_type": relationship["relationship_type"],
-                    "source": "powerbuilder"
-                }
-            })
-
-        return knowledge_entries
+    def knowledge_base_builder(self, database_sid: str, schema_name: str) -> "KnowledgeBaseBuilder":
+        """Incremental knowledge base builder (feed parse_file results as they complete)"""
+        return KnowledgeBaseBuilder(self, database_sid, schema_name)
 
     def _determine_query_type(self, sql: str) -> str:
         """Determine the type of SQL query"""
@@ -369,7 +456,8 @@ class PowerBuilderParser:
             if match.upper() not in ['SELECT', 'FROM', 'WHERE', 'AND', 'OR', 'ORDER', 'GROUP']:
                 tables.append(match.upper())
 
-        return list(set(tables))
+        # sorted: set order differs between worker processes (string hash randomization)
+        return sorted(set(tables))
 
     def _analyze_table_relationships(self, sql_queries: List[Dict[str, str]]) -> List[Dict[str, str]]:
         """Analyze table relationships from SQL JOINs"""
@@ -414,5 +502,125 @@ class PowerBuilderParser:
             "tables_referenced": [],
             "business_rules": [],
             "comments": [],
+            "objects_parsed": 0,
             "success": False
         }
+
+
+class KnowledgeBaseBuilder:
+    """
+    Folds parse_file results into knowledge base entries one file at a time
+
+    Only the deduplicated entries are kept, not every file's full result, so a
+    large upload can be consumed straight from iter_parse_files. Entry IDs are
+    content-derived, so completion order does not change what gets stored.
+    """
+
+    def __init__(self, parser: PowerBuilderParser, database_sid: str, schema_name: str):
+        self.parser = parser
+        self.database_sid = database_sid
+        self.schema_name = schema_name
+
+        self.files_parsed = 0
+        self.tables: Set[str] = set()
+        # (file, statement) pairs: parse_file already dedupes SQL within a file
+        self.sql_file_hits = 0
+
+        self._sql_entries: Dict[str, Dict[str, Any]] = {}
+        self._unique_queries: List[Dict[str, Any]] = []
+        self._rule_entries: Dict[str, Dict[str, Any]] = {}
+
+    def add_file_result(self, result: Dict[str, Any]):
+        """Merge one parse_file result (failed files are skipped)"""
+        if not result["success"]:
+            return
+        self.files_parsed += 1
+        self.tables.update(result["tables_referenced"])
+        self.add_sql_queries(result["sql_queries"])
+        self.add_business_rules(result["business_rules"])
+
+    def add_sql_queries(self, queries: List[Dict[str, Any]]):
+        """
+        SQL queries, one entry per normalized-SQL fingerprint
+
+        The same statement in hundreds of windows is embedded and stored once; the
+        count is the number of files of this upload containing the statement, and a
+        re-upload replaces it.
+        """
+        for query in queries:
+            self.sql_file_hits += 1
+            fingerprint = normalize_sql(query["sql"])
+            if not fingerprint:
+                continue
+            entry = self._sql_entries.get(fingerprint)
+            if entry:
+                entry["metadata"]["files_in_upload"] += 1
+                continue
+            self._unique_queries.append(query)
+            self._sql_entries[fingerprint] = {
+                "id": content_id(self.database_sid, self.schema_name, "sql", fingerprint),
+                "type": "sql_query",
+                "content": query["sql"],
+                "metadata": {
+                    "database_sid": self.database_sid,
+                    "schema_name": self.schema_name,
+                    "query_type": query["type"],
+                    # Chroma metadata values must be scalars
+                    "tables": ",".join(query.get("tables", [])),
+                    "files_in_upload": 1,
+                    "source": "powerbuilder"
+                }
+            }
+
+    def add_business_rules(self, rules: List[Dict[str, Any]]):
+        """
+        Business rules (identical rule texts collapse to one entry, counting their
+        occurrences in this upload; a re-upload replaces the count)
+        """
+        for rule in rules:
+            content = rule.get("text", "")
+            if rule.get("condition"):
+                content = f"Condition: {rule['condition']}\nAction: {rule.get('action', '')}"
+            if not content.strip():
+                continue
+
+            entry = self._rule_entries.get(content)
+            if entry:
+                entry["metadata"]["occurrences_in_upload"] += 1
+                continue
+            self._rule_entries[content] = {
+                "id": content_id(self.database_sid, self.schema_name, "rule", content),
+                "type": "business_rule",
+                "content": content,
+                "metadata": {
+                    "database_sid": self.database_sid,
+                    "schema_name": self.schema_name,
+                    "rule_type": rule.get("type", "unknown"),
+                    "occurrences_in_upload": 1,
+                    "source": "powerbuilder"
+                }
+            }
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Knowledge entries: SQL, business rules, then table relationships"""
+        knowledge_entries = list(self._sql_entries.values())
+        knowledge_entries.extend(self._rule_entries.values())
+
+        # Table relationships (from SQL analysis, already unique per table pair)
+        for relationship in self.parser._analyze_table_relationships(self._unique_queries):
+            pair = f"{relationship['table1']}:{relationship['table2']}:{relationship['relationship_type']}"
+            knowledge_entries.append({
+                "id": content_id(self.database_sid, self.schema_name, "rel", pair),
+                "type": "table_relationship",
+                "content": f"Tables {relationship['table1']} and {relationship['table2']} are related through {relationship['relationship_type']}",
+                "metadata": {
+                    "database_sid": self.database_sid,
+                    "schema_name": self.schema_name,
+                    "table1": relationship["table1"],
+                    "table2": relationship["table2"],
+                    "relationship_type": relationship["relationship_type"],
+                    "source": "powerbuilder"
+                }
+            })
+
+        return knowledge_entries
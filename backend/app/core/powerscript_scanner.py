@@ -0,0 +1,432 @@
+"""
+PowerScript Source Scanner
+Single-pass tokenizer for PowerBuilder sources (.srw, .srd, .sra, ...)
+
+One scan of the file emits embedded SQL statements (PowerScript embedded SQL,
+SQL in string literals and DataWindow `retrieve=` definitions, including PBSELECT),
+the tables they reference, comments and IF/THEN blocks. Strings and comments are
+recognized as tokens, so SQL keywords inside comments or prose are not mistaken for
+statements, and no pattern spans the file with lazy `.+?` groups.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Statement keywords recognized as SQL (the statement type)
+SQL_START_KEYWORDS = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+
+# A candidate statement must contain this keyword to count as SQL
+# (filters PowerScript identifiers / prose such as "Update failed")
+REQUIRED_KEYWORDS = {"SELECT": "FROM", "INSERT": "INTO", "UPDATE": "SET", "DELETE": "FROM"}
+
+# Embedded SQL without a terminating ';' is dropped past this length
+MAX_STATEMENT_CHARS = 20000
+
+# Pending IF conditions without THEN are dropped past this length
+MAX_CONDITION_CHARS = 2000
+
+# Business-rule condition / action text limit
+RULE_TEXT_LIMIT = 200
+
+# Keywords after which the next identifier is a table name
+_TABLE_KEYWORDS = {"FROM", "JOIN", "INTO", "UPDATE"}
+
+# Keywords that end a FROM list (a comma no longer introduces a table)
+_FROM_LIST_END = {
+    "WHERE", "GROUP", "ORDER", "HAVING", "CONNECT", "START", "UNION", "MINUS",
+    "INTERSECT", "SET", "VALUES", "ON", "USING", "SELECT", "FOR", "RETURNING"
+}
+
+# Identifiers never reported as tables
+_NOT_TABLES = {"DUAL", "SELECT", "WHERE", "AND", "OR", "ORDER", "GROUP", "TABLE", "LATERAL", "ONLY"}
+
+# PowerScript tokens; leading blanks (not newlines) are skipped as part of each match.
+# Strings use PowerScript '~' escapes and may span lines (DataWindow retrieve text).
+_PS_TOKEN = re.compile(r"""
+    [ \t\r\f\v]*+
+    (?:
+        (?P<newline>\n)
+      | (?P<line_comment>//[^\n]*+)
+      | (?P<block_comment>/\*)
+      | (?P<dstring>"(?:[^"~]++|~.)*+")
+      | (?P<sstring>'(?:[^'~]++|~.)*+')
+      | (?P<ident>[A-Za-z_][A-Za-z0-9_$#%]*+)
+      | (?P<punct>.)
+    )
+""", re.VERBOSE | re.DOTALL)
+
+# SQL tokens (inside string literals): "quoted identifiers", '' escapes, -- comments
+_SQL_TOKEN = re.compile(r"""
+    \s*+
+    (?:
+        (?P<line_comment>--[^\n]*+)
+      | (?P<block_comment>/\*(?:[^*]++|\*(?!/))*+\*/)
+      | (?P<dstring>"[^"]*+")
+      | (?P<sstring>'(?:[^']++|'')*+')
+      | (?P<ident>[A-Za-z_][A-Za-z0-9_$#]*+)
+      | (?P<punct>.)
+    )
+""", re.VERBOSE | re.DOTALL)
+
+# String literal that starts with a statement (checked before tokenizing the string)
+_SQL_PREFIX = re.compile(r'\s*(?:SELECT|INSERT|UPDATE|DELETE|PBSELECT)\b', re.IGNORECASE)
+
+# A call such as Update( ... ) is PowerScript, not embedded SQL
+_CALL_PAREN = re.compile(r'[ \t]*\(')
+
+_ESCAPE = re.compile(r'~(.)', re.DOTALL)
+_ESCAPES = {"n": "\n", "r": "\r", "t": "\t"}
+
+# DataWindow PBSELECT syntax
+_PB_TABLE = re.compile(r'TABLE\s*\(\s*NAME\s*=\s*"([^"]+)"', re.IGNORECASE)
+_PB_COLUMN = re.compile(r'COLUMN\s*\(\s*NAME\s*=\s*"([^"]+)"', re.IGNORECASE)
+_PB_JOIN = re.compile(
+    r'JOIN\s*\(\s*LEFT\s*=\s*"([^"]+)"\s*OP\s*=\s*"([^"]+)"\s*RIGHT\s*=\s*"([^"]+)"',
+    re.IGNORECASE
+)
+_PB_WHERE = re.compile(
+    r'WHERE\s*\(\s*EXP1\s*=\s*"([^"]*)"\s*OP\s*=\s*"([^"]*)"\s*EXP2\s*=\s*"([^"]*)"'
+    r'(?:\s*LOGIC\s*=\s*"([^"]*)")?',
+    re.IGNORECASE
+)
+
+Token = Tuple[str, str]
+
+
+def scan_powerscript(text: str) -> Dict[str, Any]:
+    """
+    Scan PowerBuilder source once
+
+    Args:
+        text: File content
+
+    Returns:
+        Dict with:
+            sql_queries: [{"sql", "type", "tables"}] in source order (not deduplicated)
+            tables: Sorted unique table names referenced by the SQL statements
+            comments: [{"type": "single_line" | "multi_line", "text"}]
+            if_then_rules: [{"condition", "action"}]
+    """
+    queries: List[Dict[str, Any]] = []
+    line_comments: List[Dict[str, str]] = []
+    block_comments: List[Dict[str, str]] = []
+    rules: List[Dict[str, str]] = []
+
+    # Open embedded SQL statement
+    stmt_start = -1
+    stmt_tokens: Optional[List[Token]] = None
+
+    # IF/THEN tracking: start of a pending condition, and open IF blocks as
+    # [condition, action_start, single_line (None until the token after THEN), closed]
+    pending_if = -1
+    pending_elseif = False
+    frames: List[list] = []
+
+    prev_kind = ""
+    prev_value = ""
+    prev_start = 0
+    pos = 0
+    length = len(text)
+    match = _PS_TOKEN.match
+
+    def close_statement(end: int):
+        query = _build_query(text[stmt_start:end], stmt_tokens)
+        if query:
+            queries.append(query)
+
+    def close_rule(frame: list, end: int):
+        if frame[3]:
+            return
+        frame[3] = True
+        action = _clip(text, frame[1], end)
+        if frame[0] and action:
+            rules.append({"condition": frame[0], "action": action})
+
+    while pos < length:
+        m = match(text, pos)
+        if m is None:
+            break
+        kind = m.lastgroup
+        start = m.start(kind)
+        pos = m.end()
+
+        if kind == "newline":
+            # A blank line ends embedded SQL that has no ';'
+            if stmt_tokens is not None and prev_kind == "newline":
+                close_statement(start)
+                stmt_tokens = None
+            while frames and frames[-1][2] is not False:
+                if frames[-1][2] is None:
+                    # THEN at end of line: block IF
+                    frames[-1][2] = False
+                    break
+                close_rule(frames.pop(), start)
+            prev_kind = "newline"
+            continue
+
+        if kind == "line_comment":
+            comment = text[start + 2:pos].strip()
+            if comment:
+                line_comments.append({"type": "single_line", "text": comment})
+            if frames and frames[-1][2] is None:
+                frames[-1][2] = False
+            prev_kind = "comment"
+            continue
+
+        if kind == "block_comment":
+            end = _block_comment_end(text, pos)
+            comment = text[pos:end - 2 if text.endswith("*/", 0, end) else end].strip()
+            if comment:
+                block_comments.append({"type": "multi_line", "text": comment})
+            pos = end
+            prev_kind = "comment"
+            continue
+
+        value = m.group(kind)
+        if frames and frames[-1][2] is None:
+            # Statement on the same line as THEN: single-line IF
+            frames[-1][2] = True
+
+        if stmt_tokens is not None:
+            if kind == "punct" and value == ";":
+                close_statement(start)
+                stmt_tokens = None
+            elif pos - stmt_start > MAX_STATEMENT_CHARS:
+                stmt_tokens = None
+            else:
+                stmt_tokens.append(_sql_token(kind, value))
+            prev_kind, prev_value, prev_start = kind, value, start
+            continue
+
+        if kind == "ident":
+            upper = value.upper()
+            if upper in SQL_START_KEYWORDS and prev_value != "." and not _CALL_PAREN.match(text, pos):
+                stmt_start = start
+                stmt_tokens = [("ident", upper)]
+            elif upper == "IF" and prev_kind == "ident" and prev_value.upper() == "END":
+                if frames:
+                    close_rule(frames.pop(), prev_start)
+            elif upper in ("IF", "ELSEIF"):
+                if upper == "ELSEIF" and frames:
+                    close_rule(frames[-1], start)
+                pending_if = pos
+                pending_elseif = upper == "ELSEIF" and bool(frames)
+            elif upper == "THEN" and pending_if >= 0:
+                frame = [_clip(text, pending_if, start), pos, None, False]
+                if pending_elseif:
+                    frames[-1] = frame
+                else:
+                    frames.append(frame)
+                pending_if = -1
+            elif upper == "ELSE" and frames:
+                close_rule(frames[-1], start)
+
+        elif kind == "dstring" or kind == "sstring":
+            body = value[1:-1]
+            if _SQL_PREFIX.match(body):
+                query = _string_query(_unescape(body))
+                if query:
+                    queries.append(query)
+
+        if pending_if >= 0 and pos - pending_if > MAX_CONDITION_CHARS:
+            pending_if = -1
+        prev_kind, prev_value, prev_start = kind, value, start
+
+    if stmt_tokens is not None:
+        close_statement(length)
+    while frames and frames[-1][2]:
+        close_rule(frames.pop(), length)
+
+    tables = set()
+    for query in queries:
+        tables.update(query["tables"])
+
+    return {
+        "sql_queries": queries,
+        "tables": sorted(tables),
+        "comments": line_comments + block_comments,
+        "if_then_rules": rules
+    }
+
+
+def _sql_token(kind: str, value: str) -> Token:
+    if kind == "dstring":
+        return ("qident", value[1:-1])
+    if kind == "sstring":
+        return ("literal", value)
+    return (kind, value)
+
+
+def _sql_tokens(sql: str) -> List[Token]:
+    """Tokenize SQL text (string-literal SQL); comments are skipped"""
+    tokens: List[Token] = []
+    pos = 0
+    match = _SQL_TOKEN.match
+    while pos < len(sql):
+        m = match(sql, pos)
+        if m is None:
+            break
+        pos = m.end()
+        kind = m.lastgroup
+        if kind not in ("line_comment", "block_comment"):
+            tokens.append(_sql_token(kind, m.group(kind)))
+    return tokens
+
+
+def _build_query(sql: str, tokens: List[Token]) -> Optional[Dict[str, Any]]:
+    """Validate a candidate statement and build its query entry"""
+    if not tokens or tokens[0][0] != "ident":
+        return None
+    statement_type = tokens[0][1].upper()
+    required = REQUIRED_KEYWORDS.get(statement_type)
+    if required is None:
+        return None
+    if not any(kind == "ident" and value.upper() == required for kind, value in tokens):
+        return None
+
+    return {
+        "sql": " ".join(sql.split()),
+        "type": statement_type,
+        "tables": extract_tables(tokens)
+    }
+
+
+def _string_query(body: str) -> Optional[Dict[str, Any]]:
+    """SQL held in a string literal (dynamic SQL, DataWindow retrieve=)"""
+    if body.lstrip()[:8].upper() == "PBSELECT":
+        body = pbselect_to_sql(body)
+        if body is None:
+            return None
+    return _build_query(body, _sql_tokens(body))
+
+
+def extract_tables(tokens: List[Token]) -> List[str]:
+    """
+    Table names referenced by one SQL statement
+
+    Identifiers after FROM / JOIN / INTO / UPDATE, and after commas of a FROM list
+    at the same parenthesis depth. Schema-qualified names keep the last segment;
+    host variables (:var) and subqueries are skipped.
+    """
+    tables = set()
+    expect = False
+    depth = 0
+    from_list = {}
+    i = 0
+    count = len(tokens)
+
+    while i < count:
+        kind, value = tokens[i]
+
+        if kind == "punct":
+            if value == "(":
+                depth += 1
+            elif value == ")":
+                from_list.pop(depth, None)
+                depth -= 1
+            elif value == "," and from_list.get(depth):
+                expect = True
+                i += 1
+                continue
+            expect = False
+
+        elif kind == "ident" or kind == "qident":
+            upper = value.upper()
+            is_keyword = kind == "ident" and (upper in _TABLE_KEYWORDS or upper in _FROM_LIST_END)
+            if expect and not is_keyword and not (kind == "ident" and upper in _NOT_TABLES):
+                while i + 2 < count and tokens[i + 1] == ("punct", ".") and tokens[i + 2][0] in ("ident", "qident"):
+                    i += 2
+                    value = tokens[i][1]
+                tables.add(value.upper())
+                expect = False
+            elif kind == "ident" and upper in _TABLE_KEYWORDS:
+                expect = True
+                from_list[depth] = upper in ("FROM", "JOIN")
+            else:
+                expect = False
+                if kind == "ident" and upper in _FROM_LIST_END:
+                    from_list[depth] = False
+
+        else:
+            expect = False
+        i += 1
+
+    return sorted(tables)
+
+
+def pbselect_to_sql(body: str) -> Optional[str]:
+    """
+    Convert DataWindow PBSELECT syntax into an equivalent SELECT statement
+
+    PBSELECT( VERSION(400) TABLE(NAME="EMP") COLUMN(NAME="EMP.ID")
+              JOIN(LEFT="EMP.DEPT_ID" OP="=" RIGHT="DEPT.ID") WHERE(EXP1="EMP.ID" OP="=" EXP2=":id") )
+    """
+    tables = list(dict.fromkeys(_PB_TABLE.findall(body)))
+    if not tables:
+        return None
+    columns = _PB_COLUMN.findall(body) or ["*"]
+
+    # Each join brings in one new table; joins between tables already present become conditions
+    joined = {tables[0].upper()}
+    join_clauses = []
+    join_conditions = []
+    for left, op, right in _PB_JOIN.findall(body):
+        other = right.split(".")[0]
+        if other.upper() in joined:
+            other = left.split(".")[0]
+        if other.upper() in joined:
+            join_conditions.append(f"{left} {op} {right}")
+        else:
+            joined.add(other.upper())
+            join_clauses.append(f"JOIN {other} ON {left} {op} {right}")
+
+    from_tables = [tables[0]] + [t for t in tables[1:] if t.upper() not in joined]
+    sql = f"SELECT {', '.join(columns)} FROM {', '.join(from_tables)}"
+    if join_clauses:
+        sql += " " + " ".join(join_clauses)
+
+    # WHERE(...) entries are chained by their LOGIC value (and / or)
+    filters = ""
+    for exp1, op, exp2, logic in _PB_WHERE.findall(body):
+        filters += f"{exp1} {op} {exp2} {logic.upper()} "
+    filters = re.sub(r'\s+(?:AND|OR)?\s*$', "", filters)
+
+    where = " AND ".join(join_conditions)
+    if filters:
+        where = f"{where} AND ({filters})" if where else filters
+    if where:
+        sql += f" WHERE {where}"
+    return sql
+
+
+def _unescape(body: str) -> str:
+    """Resolve PowerScript string escapes (~" ~' ~~ ~r ~n ~t)"""
+    if "~" not in body:
+        return body
+    return _ESCAPE.sub(lambda m: _ESCAPES.get(m.group(1), m.group(1)), body)
+
+
+def _block_comment_end(text: str, pos: int) -> int:
+    """Offset just past the comment that opened before pos (PowerScript block comments nest)"""
+    depth = 1
+    next_open = text.find("/*", pos)
+    while True:
+        close = text.find("*/", pos)
+        if close == -1:
+            return len(text)
+        if next_open != -1 and next_open < close:
+            depth += 1
+            pos = next_open + 2
+            next_open = text.find("/*", pos)
+        else:
+            depth -= 1
+            pos = close + 2
+            if depth == 0:
+                return pos
+
+
+def _clip(text: str, start: int, end: int, limit: int = RULE_TEXT_LIMIT) -> str:
+    """text[start:end].strip()[:limit] without copying long spans"""
+    while start < end and text[start].isspace():
+        start += 1
+    return text[start:min(end, start + limit)].rstrip()
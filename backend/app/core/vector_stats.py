@@ -0,0 +1,208 @@
+"""
+Vector DB Aggregate Statistics
+Per SID/schema table counts and per-source business rule counts, maintained on
+write in a small SQLite file next to the Chroma data.
+
+Dashboards read O(#schemas + #sources) rows from here instead of pulling every
+metadata record out of Chroma. VectorStore applies a delta on each write
+(rows replaced by an upsert are subtracted first) and rebuilds the counters
+from a full scan only when they no longer add up to the collection counts
+(first run, or writes made by another process such as the vectorize scripts).
+"""
+
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _metadata_updated_at(metadata: Dict[str, Any]) -> Optional[str]:
+    """Timestamp a table row contributes to last_updated (same rule on write and on rebuild)"""
+    return metadata.get("updated_at")
+
+
+def _newer(current: Optional[str], candidate: Optional[str]) -> Optional[str]:
+    if candidate and (not current or candidate > current):
+        return candidate
+    return current
+
+
+class VectorStats:
+    """SQLite-backed aggregate counters for the metadata and business rule collections"""
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS schema_stats ("
+            "  database_sid TEXT NOT NULL,"
+            "  schema_name TEXT NOT NULL,"
+            "  table_count INTEGER NOT NULL,"
+            "  last_updated TEXT,"
+            "  PRIMARY KEY (database_sid, schema_name)"
+            ")"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rule_source_stats ("
+            "  source TEXT PRIMARY KEY,"
+            "  source_type TEXT NOT NULL,"
+            "  rule_count INTEGER NOT NULL,"
+            "  last_updated TEXT"
+            ")"
+        )
+        self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Table metadata (oracle_metadata)
+    # ------------------------------------------------------------------
+    def apply_metadata_changes(
+        self,
+        added: Iterable[Dict[str, Any]],
+        removed: Iterable[Dict[str, Any]] = ()
+    ):
+        """
+        Apply a write to the per-schema counters
+
+        Args:
+            added: Metadata of the rows written (last_updated: their newest updated_at)
+            removed: Metadata of the rows they replaced (existing IDs of an upsert) or deleted
+        """
+        deltas: Dict[Tuple[str, str], List] = {}
+        for metadata in added:
+            delta = deltas.setdefault(self._schema_key(metadata), [0, None])
+            delta[0] += 1
+            delta[1] = _newer(delta[1], _metadata_updated_at(metadata))
+        for metadata in removed:
+            deltas.setdefault(self._schema_key(metadata), [0, None])[0] -= 1
+
+        with self._lock:
+            for (database_sid, schema_name), (count, last_updated) in deltas.items():
+                self._conn.execute(
+                    "INSERT INTO schema_stats (database_sid, schema_name, table_count, last_updated) "
+                    "VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (database_sid, schema_name) DO UPDATE SET "
+                    "  table_count = table_count + excluded.table_count,"
+                    "  last_updated = CASE WHEN excluded.last_updated > IFNULL(last_updated, '') "
+                    "                      THEN excluded.last_updated ELSE last_updated END",
+                    (database_sid, schema_name, count, last_updated)
+                )
+            self._conn.execute("DELETE FROM schema_stats WHERE table_count <= 0")
+            self._conn.commit()
+
+    def drop_schema(self, database_sid: str, schema_name: str):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM schema_stats WHERE database_sid = ? AND schema_name = ?",
+                (database_sid, schema_name)
+            )
+            self._conn.commit()
+
+    def rebuild_metadata(self, metadatas: Iterable[Dict[str, Any]]):
+        """Replace the per-schema counters with a full scan of the collection"""
+        counters: Dict[Tuple[str, str], List] = {}
+        for metadata in metadatas:
+            counter = counters.setdefault(self._schema_key(metadata), [0, None])
+            counter[0] += 1
+            counter[1] = _newer(counter[1], _metadata_updated_at(metadata))
+
+        with self._lock:
+            self._conn.execute("DELETE FROM schema_stats")
+            self._conn.executemany(
+                "INSERT INTO schema_stats (database_sid, schema_name, table_count, last_updated) VALUES (?, ?, ?, ?)",
+                [(sid, schema, count, last_updated) for (sid, schema), (count, last_updated) in counters.items()]
+            )
+            self._conn.commit()
+
+    def list_schemas(self) -> List[Dict[str, Any]]:
+        """[{"database_sid", "schema_name", "table_count", "last_updated"}]"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT database_sid, schema_name, table_count, last_updated FROM schema_stats "
+                "ORDER BY database_sid, schema_name"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def metadata_total(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT IFNULL(SUM(table_count), 0) FROM schema_stats").fetchone()[0]
+
+    @staticmethod
+    def _schema_key(metadata: Dict[str, Any]) -> Tuple[str, str]:
+        return metadata.get("database_sid", "unknown"), metadata.get("schema_name", "unknown")
+
+    # ------------------------------------------------------------------
+    # Business rules (business_rules)
+    # ------------------------------------------------------------------
+    def apply_rule_changes(
+        self,
+        added: Iterable[Dict[str, Any]],
+        removed: Iterable[Dict[str, Any]] = ()
+    ):
+        """Apply a write to the per-source rule counters (same contract as apply_metadata_changes)"""
+        deltas: Dict[str, List] = {}
+        for metadata in added:
+            delta = deltas.setdefault(metadata.get("source", "unknown"), [0, metadata.get("source_type", "unknown"), None])
+            delta[0] += 1
+            delta[2] = _newer(delta[2], metadata.get("uploaded_at"))
+        for metadata in removed:
+            deltas.setdefault(metadata.get("source", "unknown"), [0, metadata.get("source_type", "unknown"), None])[0] -= 1
+
+        with self._lock:
+            for source, (count, source_type, last_updated) in deltas.items():
+                self._conn.execute(
+                    "INSERT INTO rule_source_stats (source, source_type, rule_count, last_updated) "
+                    "VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (source) DO UPDATE SET "
+                    "  rule_count = rule_count + excluded.rule_count,"
+                    "  last_updated = CASE WHEN excluded.last_updated > IFNULL(last_updated, '') "
+                    "                      THEN excluded.last_updated ELSE last_updated END",
+                    (source, source_type, count, last_updated)
+                )
+            self._conn.execute("DELETE FROM rule_source_stats WHERE rule_count <= 0")
+            self._conn.commit()
+
+    def rebuild_rules(self, metadatas: Iterable[Dict[str, Any]]):
+        """Replace the per-source counters with a full scan of the collection"""
+        counters: Dict[str, List] = {}
+        for metadata in metadatas:
+            # First metadata seen per source sets source_type / last_updated (as the full-scan summary did)
+            counter = counters.setdefault(
+                metadata.get("source", "unknown"),
+                [0, metadata.get("source_type", "unknown"), metadata.get("uploaded_at")]
+            )
+            counter[0] += 1
+
+        with self._lock:
+            self._conn.execute("DELETE FROM rule_source_stats")
+            self._conn.executemany(
+                "INSERT INTO rule_source_stats (source, source_type, rule_count, last_updated) VALUES (?, ?, ?, ?)",
+                [(source, source_type, count, last_updated) for source, (count, source_type, last_updated) in counters.items()]
+            )
+            self._conn.commit()
+
+    def list_rule_sources(self) -> List[Dict[str, Any]]:
+        """[{"source", "source_type", "rule_count", "last_updated"}]"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source, source_type, rule_count, last_updated FROM rule_source_stats ORDER BY source"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def rules_total(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT IFNULL(SUM(rule_count), 0) FROM rule_source_stats").fetchone()[0]
+
+    # ------------------------------------------------------------------
+    def clear_metadata(self):
+        self.rebuild_metadata([])
+
+    def clear_rules(self):
+        self.rebuild_rules([])
@@ -8,30 +8,49 @@ from chromadb.config import Settings
 from typing import List, Dict, Any, Optional
 import logging
 from pathlib import Path
+import importlib.util
 import os
 
+from app.core.vector_stats import VectorStats
+from app.core.pattern_index import PatternIndex
+
 logger = logging.getLogger(__name__)
 
+# Collection layout router shared with the MCP server (mcp/collection_router.py)
+project_root = Path(__file__).parent.parent.parent.parent
+_collection_router_spec = importlib.util.spec_from_file_location(
+    "collection_router",
+    project_root / "mcp" / "collection_router.py"
+)
+_collection_router_module = importlib.util.module_from_spec(_collection_router_spec)
+_collection_router_spec.loader.exec_module(_collection_router_module)
+CollectionRouter = _collection_router_module.CollectionRouter
+
 # ChromaDB telemetry 오류 필터링
 logging.getLogger("chromadb.telemetry.product.posthog").setLevel(logging.CRITICAL)
 
 # ChromaDB telemetry 완전 비활성화 (환경 변수)
 os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
 
+# Rows per upsert call in add_metadata_batch (keeps each call under Chroma's max batch size)
+METADATA_UPSERT_BATCH_SIZE = int(os.getenv("METADATA_UPSERT_BATCH_SIZE", "500"))
+
 
 class VectorStore:
     """ChromaDB Vector Store for semantic search"""
 
-    def __init__(self, persist_directory: Optional[str] = None):
+    def __init__(self, persist_directory: Optional[str] = None, collection_layout: Optional[str] = None):
         """
         Initialize ChromaDB client
 
         Args:
             persist_directory: Path to persist ChromaDB data (default: ../vector_db)
+            collection_layout: "shared" (one oracle_metadata collection + where filter) or
+                               "partitioned" (one collection per SID/schema).
+                               Default: VECTOR_COLLECTION_LAYOUT env var, else "shared"
         """
         if persist_directory is None:
             # Default to data/vector_db directory in project root
-            project_root = Path(__file__).parent.parent.parent.parent
             persist_directory = str(project_root / "data" / "vector_db")
 
         os.makedirs(persist_directory, exist_ok=True)
@@ -44,6 +63,15 @@ class VectorStore:
             )
         )
 
+        # Table metadata collection layout (shared / partitioned per SID/schema)
+        self.router = CollectionRouter(self.client, collection_layout)
+
+        # Per SID/schema table counts and per-source rule counts, maintained on write
+        self.stats = VectorStats(str(Path(persist_directory) / "vector_stats.sqlite3"))
+
+        # Secondary indexes over SQL patterns (by table, use count, last use, success rate)
+        self.pattern_index = PatternIndex(str(Path(persist_directory) / "pattern_index.sqlite3"))
+
         # Collection names
         self.METADATA_COLLECTION = "oracle_metadata"
         self.PATTERNS_COLLECTION = "sql_patterns"
@@ -59,10 +87,13 @@ class VectorStore:
     async def initialize(self):
         """Initialize collections (async for consistency with FastAPI)"""
         # Metadata collection: table summaries for Stage 1
-        self.metadata_collection = self.client.get_or_create_collection(
-            name=self.METADATA_COLLECTION,
-            metadata={"description": "Database table metadata for semantic search"}
-        )
+        # (partitioned layout: per SID/schema collections are created on first write)
+        if not self.router.is_partitioned:
+            self.metadata_collection = self.router.get_collection(
+                self.METADATA_COLLECTION,
+                create=True,
+                metadata={"description": "Database table metadata for semantic search"}
+            )
 
         # SQL patterns collection: learned successful queries
         self.patterns_collection = self.client.get_or_create_collection(
@@ -76,8 +107,11 @@ class VectorStore:
             metadata={"description": "Business rules and domain knowledge"}
         )
 
-        logger.info(f"Collections initialized:")
-        logger.info(f"  - {self.METADATA_COLLECTION}: {self.metadata_collection.count()} items")
+        if self.pattern_index.count() != self.patterns_collection.count():
+            self.rebuild_pattern_index()
+
+        logger.info(f"Collections initialized (layout: {self.router.layout}):")
+        logger.info(f"  - {self.METADATA_COLLECTION}: {self.router.count(self.METADATA_COLLECTION)} items")
         logger.info(f"  - {self.PATTERNS_COLLECTION}: {self.patterns_collection.count()} items")
         logger.info(f"  - {self.BUSINESS_RULES_COLLECTION}: {self.business_rules_collection.count()} items")
 
@@ -89,7 +123,9 @@ class VectorStore:
         metadata: Dict[str, Any]
     ):
         """
-        Add table metadata to vector store
+        Add (or replace) table metadata in vector store
+
+        Uses upsert so re-ingesting the same table is idempotent.
 
         Args:
             table_id: Unique ID (e.g., "SCHEMA.TABLE_NAME")
@@ -97,29 +133,86 @@ class VectorStore:
             embedding: Vector embedding of the summary
             metadata: Additional metadata (columns, descriptions, etc.)
         """
-        self.metadata_collection.add(
+        collection = self._metadata_collection_for(
+            metadata.get("database_sid"), metadata.get("schema_name"), create=True
+        )
+        replaced = self._existing_metadatas(collection, [table_id])
+        collection.upsert(
             ids=[table_id],
             embeddings=[embedding],
             documents=[summary_text],
             metadatas=[metadata]
         )
-        logger.debug(f"Added metadata for: {table_id}")
+        self.stats.apply_metadata_changes([metadata], replaced)
+        logger.debug(f"Upserted metadata for: {table_id}")
+
+    def _metadata_collection_for(
+        self,
+        database_sid: Optional[str],
+        schema_name: Optional[str],
+        create: bool = False
+    ):
+        """Table metadata collection for a SID/schema (shared collection unless partitioned)"""
+        if not self.router.is_partitioned:
+            return self.metadata_collection
+        return self.router.get_collection(
+            self.METADATA_COLLECTION,
+            database_sid,
+            schema_name,
+            create=create,
+            metadata={"description": f"Table metadata for {database_sid}.{schema_name}"}
+        )
 
     def add_metadata_batch(
         self,
         table_ids: List[str],
         summary_texts: List[str],
         embeddings: List[List[float]],
-        metadatas: List[Dict[str, Any]]
+        metadatas: List[Dict[str, Any]],
+        batch_size: Optional[int] = None
     ):
-        """Batch add metadata for better performance"""
-        self.metadata_collection.add(
-            ids=table_ids,
-            embeddings=embeddings,
-            documents=summary_texts,
-            metadatas=metadatas
-        )
-        logger.info(f"Batch added {len(table_ids)} metadata entries")
+        """
+        Batch upsert metadata for better performance
+
+        Rows are written in chunks of batch_size (default METADATA_UPSERT_BATCH_SIZE).
+        Existing IDs are replaced, so re-ingestion does not fail on duplicates.
+        """
+        batch_size = batch_size or METADATA_UPSERT_BATCH_SIZE
+
+        # Group rows by SID/schema so each partition gets its own upsert calls
+        # (shared layout: a single group for the shared collection)
+        groups: Dict[tuple, List[int]] = {}
+        for i, metadata in enumerate(metadatas):
+            key = (
+                (metadata.get("database_sid"), metadata.get("schema_name"))
+                if self.router.is_partitioned else None
+            )
+            groups.setdefault(key, []).append(i)
+
+        for key, indexes in groups.items():
+            collection = (
+                self._metadata_collection_for(key[0], key[1], create=True)
+                if key else self.metadata_collection
+            )
+            for start in range(0, len(indexes), batch_size):
+                chunk = indexes[start:start + batch_size]
+                chunk_ids = [table_ids[i] for i in chunk]
+                chunk_metadatas = [metadatas[i] for i in chunk]
+                replaced = self._existing_metadatas(collection, chunk_ids)
+                collection.upsert(
+                    ids=chunk_ids,
+                    embeddings=[embeddings[i] for i in chunk],
+                    documents=[summary_texts[i] for i in chunk],
+                    metadatas=chunk_metadatas
+                )
+                self.stats.apply_metadata_changes(chunk_metadatas, replaced)
+        logger.info(f"Batch upserted {len(table_ids)} metadata entries")
+
+    @staticmethod
+    def _existing_metadatas(collection, ids: List[str]) -> List[Dict[str, Any]]:
+        """Metadata of the IDs that already exist (rows an upsert is about to replace)"""
+        result = collection.get(ids=ids, include=["metadatas"])
+        return [metadata or {} for metadata in (result["metadatas"] or [])]
 
     def search_metadata(
         self,
@@ -165,11 +258,23 @@ class VectorStore:
                 ]
             }
 
-        results = self.metadata_collection.query(
-            query_embeddings=[query_embedding],
-            n_results=n_results,
-            where=where_filter
-        )
+        if self.router.is_partitioned:
+            if database_sid and schema_name:
+                collection = self._metadata_collection_for(database_sid, schema_name)
+                if collection is None:
+                    return {"ids": [], "documents": [], "metadatas": [], "distances": []}
+                results = collection.query(
+                    query_embeddings=[query_embedding],
+                    n_results=n_results
+                )
+            else:
+                results = self._search_all_partitions(query_embedding, n_results, where_filter)
+        else:
+            results = self.metadata_collection.query(
+                query_embeddings=[query_embedding],
+                n_results=n_results,
+                where=where_filter
+            )
 
         return {
             "ids": results["ids"][0] if results["ids"] else [],
@@ -178,6 +283,38 @@ class VectorStore:
             "distances": results["distances"][0] if results["distances"] else []
         }
 
+    def _search_all_partitions(
+        self,
+        query_embedding: List[float],
+        n_results: int,
+        where_filter: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Query every metadata partition and merge by distance (unfiltered search, partitioned layout)"""
+        hits = []
+        for _, collection in self.router.iter_collections(self.METADATA_COLLECTION):
+            result = collection.query(
+                query_embeddings=[query_embedding],
+                n_results=n_results,
+                where=where_filter
+            )
+            if result["ids"] and result["ids"][0]:
+                for i, item_id in enumerate(result["ids"][0]):
+                    hits.append((
+                        result["distances"][0][i],
+                        item_id,
+                        result["documents"][0][i] if result["documents"] else None,
+                        result["metadatas"][0][i] if result["metadatas"] else None
+                    ))
+
+        hits.sort(key=lambda hit: hit[0])
+        hits = hits[:n_results]
+        return {
+            "ids": [[hit[1] for hit in hits]],
+            "documents": [[hit[2] for hit in hits]],
+            "metadatas": [[hit[3] for hit in hits]],
+            "distances": [[hit[0] for hit in hits]]
+        }
+
     def add_sql_pattern(
         self,
         pattern_id: str,
@@ -187,7 +324,7 @@ class VectorStore:
         metadata: Dict[str, Any]
     ):
         """
-        Add learned SQL pattern
+        Add (or update) learned SQL pattern
 
         Args:
             pattern_id: Unique ID for the pattern
@@ -198,19 +335,34 @@ class VectorStore:
         """
         document = f"{question}\n---\n{sql_query}"
 
-        self.patterns_collection.add(
+        metadata = {**metadata, "question": question, "sql": sql_query}
+        # Upsert: LearningEngine re-writes existing patterns to update their statistics
+        self.patterns_collection.upsert(
             ids=[pattern_id],
             embeddings=[embedding],
             documents=[document],
-            metadatas=[{**metadata, "question": question, "sql": sql_query}]
+            metadatas=[metadata]
         )
+        self.pattern_index.upsert(pattern_id, metadata, document)
         logger.debug(f"Added SQL pattern: {pattern_id}")
 
+    def rebuild_pattern_index(self):
+        """Re-index all SQL patterns from the collection"""
+        result = self.patterns_collection.get(include=["metadatas", "documents"])
+        ids = result["ids"] or []
+        self.pattern_index.rebuild(
+            (pattern_id, result["metadatas"][i], result["documents"][i] if result["documents"] else "")
+            for i, pattern_id in enumerate(ids)
+        )
+        logger.info(f"Rebuilt SQL pattern index ({len(ids)} patterns)")
+
     def search_similar_patterns(
         self,
         query_embedding: List[float],
         similarity_threshold: float = 0.85,
-        n_results: int = 3
+        n_results: int = 3,
+        database_sid: Optional[str] = None,
+        schema_name: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Search for similar SQL patterns (for reuse)
@@ -219,13 +371,26 @@ class VectorStore:
             query_embedding: Embedding of the new question
             similarity_threshold: Minimum similarity (0-1, higher = more similar)
             n_results: Max number of results
+            database_sid: Only search patterns of this database (with schema_name)
+            schema_name: Only search patterns of this schema (with database_sid)
 
         Returns:
             Dict with similar patterns
         """
+        # Filter inside the query so the top n_results all belong to the SID/schema
+        where_filter = None
+        if database_sid and schema_name:
+            where_filter = {
+                "$and": [
+                    {"database_sid": database_sid},
+                    {"schema_name": schema_name}
+                ]
+            }
+
         results = self.patterns_collection.query(
             query_embeddings=[query_embedding],
-            n_results=n_results
+            n_results=n_results,
+            where=where_filter
         )
 
         # Filter by similarity threshold
@@ -274,8 +439,37 @@ class VectorStore:
             documents=[rule_text],
             metadatas=[metadata]
         )
+        self.stats.apply_rule_changes([metadata])
         logger.debug(f"Added business rule: {rule_id}")
 
+    def add_business_rules_batch(
+        self,
+        rule_ids: List[str],
+        rule_texts: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]],
+        batch_size: Optional[int] = None
+    ):
+        """
+        Batch upsert business rules (PowerBuilder knowledge ingestion)
+
+        Rows are written in chunks of batch_size (default METADATA_UPSERT_BATCH_SIZE).
+        Existing IDs are replaced, so re-uploading the same sources is idempotent.
+        """
+        batch_size = batch_size or METADATA_UPSERT_BATCH_SIZE
+
+        for start in range(0, len(rule_ids), batch_size):
+            end = start + batch_size
+            replaced = self._existing_metadatas(self.business_rules_collection, rule_ids[start:end])
+            self.business_rules_collection.upsert(
+                ids=rule_ids[start:end],
+                embeddings=embeddings[start:end],
+                documents=rule_texts[start:end],
+                metadatas=metadatas[start:end]
+            )
+            self.stats.apply_rule_changes(metadatas[start:end], replaced)
+        logger.info(f"Batch upserted {len(rule_ids)} business rules")
+
     def search_business_rules(
         self,
         query_embedding: List[float],
@@ -296,6 +490,7 @@ class VectorStore:
     def delete_pattern(self, pattern_id: str):
         """Delete a SQL pattern"""
         self.patterns_collection.delete(ids=[pattern_id])
+        self.pattern_index.delete(pattern_id)
         logger.info(f"Deleted pattern: {pattern_id}")
 
     def get_pattern_by_id(self, pattern_id: str) -> Optional[Dict[str, Any]]:
@@ -328,39 +523,42 @@ class VectorStore:
     def get_stats(self) -> Dict[str, int]:
         """Get collection statistics"""
         return {
-            "metadata_count": self.metadata_collection.count(),
+            "metadata_count": self.router.count(self.METADATA_COLLECTION),
             "patterns_count": self.patterns_collection.count(),
             "business_rules_count": self.business_rules_collection.count()
         }
 
     def get_all_databases(self) -> List[Dict[str, Any]]:
-        """Get all registered databases from metadata collection"""
-        result = self.metadata_collection.get()
-
-        databases = {}
-        if result["metadatas"]:
-            for metadata in result["metadatas"]:
-                db_sid = metadata.get("database_sid", "unknown")
-                schema_name = metadata.get("schema_name", "unknown")
-                db_key = f"{db_sid}.{schema_name}"
-
-                if db_key not in databases:
-                    databases[db_key] = {
-                        "database_sid": db_sid,
-                        "schema_name": schema_name,
-                        "table_count": 0,
-                        "last_updated": metadata.get("updated_at")
-                    }
-
-                databases[db_key]["table_count"] += 1
-
-                # Keep most recent update timestamp
-                existing_update = databases[db_key].get("last_updated")
-                new_update = metadata.get("updated_at")
-                if new_update and (not existing_update or new_update > existing_update):
-                    databases[db_key]["last_updated"] = new_update
-
-        return list(databases.values())
+        """
+        Get all registered databases (SID/schema) with table counts
+
+        Served from the aggregate counters; the collections are only scanned to
+        rebuild them when they no longer match the collection counts.
+        """
+        if self.stats.metadata_total() != self.router.count(self.METADATA_COLLECTION):
+            self.rebuild_stats(rules=False)
+        return self.stats.list_schemas()
+
+    def rebuild_stats(self, metadata: bool = True, rules: bool = True):
+        """
+        Recount the aggregate statistics with a full scan of the collections
+
+        Needed only when another process (vectorize scripts, MCP server) has written
+        to the collections; VectorStore's own writes keep the counters current.
+        """
+        if metadata:
+            all_metadatas = []
+            for _, collection in self.router.iter_collections(self.METADATA_COLLECTION):
+                result = collection.get(include=["metadatas"])
+                all_metadatas.extend(metadata or {} for metadata in (result["metadatas"] or []))
+            self.stats.rebuild_metadata(all_metadatas)
+            logger.info(f"Rebuilt metadata stats from {len(all_metadatas)} entries")
+
+        if rules:
+            result = self.business_rules_collection.get(include=["metadatas"])
+            rule_metadatas = [metadata or {} for metadata in (result["metadatas"] or [])]
+            self.stats.rebuild_rules(rule_metadatas)
+            logger.info(f"Rebuilt business rule stats from {len(rule_metadatas)} entries")
 
     def get_recent_patterns(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get recent SQL patterns sorted by learned_at timestamp"""
@@ -385,26 +583,10 @@ class VectorStore:
         return patterns[:limit]
 
     def get_business_rules_summary(self) -> List[Dict[str, Any]]:
-        """Get business rules summary grouped by source"""
-        result = self.business_rules_collection.get()
-
-        rules_by_source = {}
-        if result["metadatas"]:
-            for metadata in result["metadatas"]:
-                source = metadata.get("source", "unknown")
-                source_type = metadata.get("source_type", "unknown")
-
-                if source not in rules_by_source:
-                    rules_by_source[source] = {
-                        "source": source,
-                        "source_type": source_type,
-                        "rule_count": 0,
-                        "last_updated": metadata.get("uploaded_at")
-                    }
-
-                rules_by_source[source]["rule_count"] += 1
-
-        return list(rules_by_source.values())
+        """Get business rules summary grouped by source (from the aggregate counters)"""
+        if self.stats.rules_total() != self.business_rules_collection.count():
+            self.rebuild_stats(metadata=False)
+        return self.stats.list_rule_sources()
 
     def list_all_metadata(
         self,
@@ -439,13 +621,23 @@ class VectorStore:
             where_filter = {"schema_name": schema_name}
 
         # Get metadata
-        result = self.metadata_collection.get(
-            where=where_filter,
-            limit=limit
-        )
+        if self.router.is_partitioned and database_sid and schema_name:
+            collection = self._metadata_collection_for(database_sid, schema_name)
+            collections = [collection] if collection is not None else []
+            where_filter = None
+        else:
+            collections = [c for _, c in self.router.iter_collections(self.METADATA_COLLECTION)]
 
         metadata_list = []
-        if result["ids"]:
+        for collection in collections:
+            if len(metadata_list) >= limit:
+                break
+            result = collection.get(
+                where=where_filter,
+                limit=limit - len(metadata_list)
+            )
+            if not result["ids"]:
+                continue
             for i, metadata_id in enumerate(result["ids"]):
                 metadata = result["metadatas"][i] if result["metadatas"] else {}
                 metadata_list.append({
@@ -460,19 +652,39 @@ class VectorStore:
 
         return metadata_list
 
+    def delete_schema_metadata(self, database_sid: str, schema_name: str):
+        """
+        Delete all table metadata of one SID/schema
+
+        Partitioned layout drops the schema's own collection, leaving other schemas' indexes untouched.
+        """
+        self.router.delete_partition(self.METADATA_COLLECTION, database_sid, schema_name)
+        self.stats.drop_schema(database_sid, schema_name)
+        logger.info(f"Deleted metadata for: {database_sid}.{schema_name}")
+
     def reset_collection(self, collection_name: str):
         """Reset a collection (delete all data) - USE WITH CAUTION"""
         if collection_name == self.METADATA_COLLECTION:
-            self.client.delete_collection(self.METADATA_COLLECTION)
-            self.metadata_collection = self.client.create_collection(self.METADATA_COLLECTION)
+            if self.router.is_partitioned:
+                for partition in self.router.list_partitions(self.METADATA_COLLECTION):
+                    self.router.delete_partition(
+                        self.METADATA_COLLECTION, partition["database_sid"], partition["schema_name"]
+                    )
+            else:
+                self.client.delete_collection(self.METADATA_COLLECTION)
+                self.metadata_collection = self.client.create_collection(self.METADATA_COLLECTION)
+                self.router.clear_cache()
+            self.stats.clear_metadata()
             logger.warning(f"Reset collection: {collection_name}")
         elif collection_name == self.PATTERNS_COLLECTION:
             self.client.delete_collection(self.PATTERNS_COLLECTION)
             self.patterns_collection = self.client.create_collection(self.PATTERNS_COLLECTION)
+            self.pattern_index.clear()
             logger.warning(f"Reset collection: {collection_name}")
         elif collection_name == self.BUSINESS_RULES_COLLECTION:
             self.client.delete_collection(self.BUSINESS_RULES_COLLECTION)
             self.business_rules_collection = self.client.create_collection(self.BUSINESS_RULES_COLLECTION)
+            self.stats.clear_rules()
             logger.warning(f"Reset collection: {collection_name}")
         else:
             raise ValueError(f"Unknown collection: {collection_name}")
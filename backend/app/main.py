@@ -46,12 +46,41 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"✗ Embedding service initialization failed: {e}")
 
+    # Initialize Job Queue (metadata processing, PowerBuilder parsing, re-vectorization)
+    try:
+        from app.core.job_queue import JobQueue
+        from app.core.job_handlers import register_job_handlers
+        project_root = Path(__file__).parent.parent.parent
+        job_queue = JobQueue(db_path=str(project_root / "data" / "jobs" / "jobs.sqlite3"))
+        register_job_handlers(job_queue, app.state)
+        job_queue.start()
+        app.state.job_queue = job_queue
+        logger.info("✓ Job queue started")
+    except Exception as e:
+        logger.error(f"✗ Job queue initialization failed: {e}")
+
+    # Initialize DB health monitor (cached connection status for dashboard / database list)
+    try:
+        from app.core.db_health import create_db_health_monitor
+        db_health_monitor = create_db_health_monitor()
+        db_health_monitor.start()
+        app.state.db_health_monitor = db_health_monitor
+        logger.info("✓ DB health monitor started")
+    except Exception as e:
+        logger.error(f"✗ DB health monitor initialization failed: {e}")
+
     logger.info("Backend startup complete")
 
     yield
 
     # Shutdown
     logger.info("Shutting down Oracle NL-SQL Management Backend...")
+    if hasattr(app.state, 'job_queue'):
+        app.state.job_queue.stop()
+    if hasattr(app.state, 'db_health_monitor'):
+        app.state.db_health_monitor.stop()
+    if hasattr(app.state, 'embedding_service'):
+        app.state.embedding_service.query_cache.flush()
 
 
 # Initialize FastAPI app with lifespan
@@ -112,7 +141,7 @@ async def health_check():
 
 
 # Import and include API routers
-from app.api import metadata, patterns, powerbuilder, dashboard, tnsnames, databases, sql_rules
+from app.api import metadata, patterns, powerbuilder, dashboard, tnsnames, databases, sql_rules, jobs
 
 app.include_router(dashboard.router, prefix="/api/v1/dashboard", tags=["dashboard"])
 app.include_router(metadata.router, prefix="/api/v1/metadata", tags=["metadata"])
@@ -121,6 +150,7 @@ app.include_router(powerbuilder.router, prefix="/api/v1/powerbuilder", tags=["po
 app.include_router(tnsnames.router, prefix="/api/v1/tnsnames", tags=["tnsnames"])
 app.include_router(databases.router, prefix="/api/v1/databases", tags=["databases"])
 app.include_router(sql_rules.router, prefix="/api/v1/sql-rules", tags=["sql-rules"])
+app.include_router(jobs.router, prefix="/api/v1/jobs", tags=["jobs"])
 
 
 if __name__ == "__main__":
@@ -18,7 +18,10 @@ class DatabaseInfo(BaseModel):
     schema_name: str = Field(..., description="Schema name")
     table_count: int = Field(..., description="Number of tables in metadata")
     last_updated: Optional[str] = Field(None, description="Last metadata update timestamp")
-    connection_status: str = Field("unknown", description="Connection status: active/inactive/unknown")
+    connection_status: str = Field("unknown", description="Connection status: connected/disconnected/unknown")
+    latency_ms: Optional[float] = Field(None, description="Connect latency of the last successful health check")
+    last_error: Optional[str] = Field(None, description="Error of the last failed health check")
+    checked_at: Optional[str] = Field(None, description="Timestamp of the last health check")
 
 
 class UploadedFile(BaseModel):
@@ -36,6 +36,7 @@ class MigrationRequest(BaseModel):
     metadata_dir: str = Field(..., description="Path to metadata directory")
     database_sid: str = Field(..., description="Database SID")
     schema_name: str = Field(..., description="Schema name")
+    wait: bool = Field(True, description="Wait for the migration job to finish")
 
 
 class MigrationResponse(BaseModel):
@@ -45,3 +46,4 @@ class MigrationResponse(BaseModel):
     database_sid: str
     schema_name: str
     error: Optional[str] = None
+    job_id: Optional[str] = None
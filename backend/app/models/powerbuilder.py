@@ -14,7 +14,7 @@ class PowerBuilderUploadRequest(BaseModel):
 class PowerBuilderProcessResponse(BaseModel):
     """Response for PowerBuilder processing"""
     job_id: str
-    status: str  # "queued", "processing", "completed", "failed"
+    status: str  # "queued", "processing", "completed", "failed", "cancelled"
     message: str
 
 
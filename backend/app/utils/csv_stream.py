@@ -0,0 +1,125 @@
+"""
+CSV Upload Streaming
+Spools uploaded CSV files to disk in chunks and parses them row by row,
+so large column-definition CSVs never have to be held in memory as a whole.
+spool_upload is also used for other uploads (PowerBuilder sources).
+"""
+
+import codecs
+import csv
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterator
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from the upload per chunk while spooling
+SPOOL_CHUNK_SIZE = 1024 * 1024
+
+# Bytes read per chunk while validating the file encoding
+ENCODING_SNIFF_CHUNK_SIZE = 1024 * 1024
+
+# Tried in order against the whole file; the first that decodes every byte wins.
+# cp949 is a superset of euc-kr, so euc-kr only serves as the lossy last resort
+CANDIDATE_ENCODINGS = ("utf-8", "cp949")
+FALLBACK_ENCODING = "euc-kr"
+
+
+async def spool_upload(upload, destination: Path, chunk_size: int = SPOOL_CHUNK_SIZE) -> Path:
+    """
+    Write an UploadFile to disk chunk by chunk
+
+    The file is written to a temporary name and moved into place when complete,
+    so an interrupted upload never leaves a truncated CSV behind.
+
+    Args:
+        upload: FastAPI UploadFile
+        destination: Final file path
+
+    Returns:
+        destination
+    """
+    destination = Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = destination.with_name(destination.name + ".part")
+
+    await upload.seek(0)
+    size = 0
+    try:
+        with open(tmp_path, "wb") as f:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                f.write(chunk)
+                size += len(chunk)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    os.replace(tmp_path, destination)
+    logger.info(f"Spooled upload {upload.filename} -> {destination} ({size:,} bytes)")
+    return destination
+
+
+def sniff_encoding(path: Path, chunk_size: int = ENCODING_SNIFF_CHUNK_SIZE) -> str:
+    """
+    Detect the text encoding of a CSV file
+
+    The whole file is validated in a single streaming pass with one incremental
+    decoder per candidate, so a file whose first megabytes are plain ASCII is not
+    mistaken for UTF-8 when Korean cp949 text appears further down.
+
+    Returns:
+        "utf-8-sig" for a UTF-8 BOM, otherwise the first of CANDIDATE_ENCODINGS that
+        decodes the entire file, else FALLBACK_ENCODING
+    """
+    decoders = {encoding: codecs.getincrementaldecoder(encoding)() for encoding in CANDIDATE_ENCODINGS}
+
+    with open(path, "rb") as f:
+        first = True
+        while decoders:
+            chunk = f.read(chunk_size)
+            if first:
+                if chunk.startswith(codecs.BOM_UTF8):
+                    return "utf-8-sig"
+                first = False
+
+            final = not chunk
+            for encoding, decoder in list(decoders.items()):
+                try:
+                    decoder.decode(chunk, final=final)
+                except UnicodeDecodeError:
+                    del decoders[encoding]
+            if final:
+                break
+
+    for encoding in CANDIDATE_ENCODINGS:
+        if encoding in decoders:
+            return encoding
+
+    logger.warning(f"No candidate encoding decodes {path}; falling back to lossy {FALLBACK_ENCODING}")
+    return FALLBACK_ENCODING
+
+
+def iter_csv_rows(path: Path, encoding: str = None) -> Iterator[Dict[str, str]]:
+    """
+    Parse a CSV file incrementally
+
+    Args:
+        path: CSV file path
+        encoding: Text encoding (default: sniff_encoding)
+
+    Yields:
+        One dict per row (csv.DictReader)
+    """
+    sniffed = encoding is None
+    encoding = encoding or sniff_encoding(path)
+
+    # A sniffed candidate decodes the whole file, so decode strictly; only the
+    # fallback (no candidate decoded cleanly) replaces malformed bytes
+    errors = "replace" if sniffed and encoding == FALLBACK_ENCODING else "strict"
+    with open(path, "r", encoding=encoding, errors=errors, newline="") as f:
+        for row in csv.DictReader(f):
+            yield row
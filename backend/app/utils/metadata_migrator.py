@@ -5,12 +5,60 @@ Migrates existing JSON metadata files to ChromaDB Vector Store
 
 import json
 import logging
+import os
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Optional
 import asyncio
 
 logger = logging.getLogger(__name__)
 
+# Tables per embed + upsert stage in upsert_metadata_entries
+METADATA_INGEST_CHUNK_SIZE = int(os.getenv("METADATA_INGEST_CHUNK_SIZE", "500"))
+
+
+def upsert_metadata_entries(
+    vector_store,
+    embedding_service,
+    table_ids: List[str],
+    summary_texts: List[str],
+    metadatas: List[Dict[str, Any]],
+    chunk_size: Optional[int] = None,
+    progress_callback: Optional[Callable[[int, int], None]] = None
+) -> int:
+    """
+    Batched embed → chunked bulk upsert for prepared table metadata
+
+    Texts are embedded with embedding_service.embed_batch (on-disk document cache,
+    EMBEDDING_BATCH_SIZE) and written with vector_store.add_metadata_batch (upsert),
+    one chunk at a time so memory stays bounded for large schemas.
+
+    Args:
+        table_ids / summary_texts / metadatas: Aligned lists built by the caller
+        chunk_size: Tables per chunk (default: METADATA_INGEST_CHUNK_SIZE env var, else 500)
+        progress_callback: Optional callback(written, total) after each chunk
+
+    Returns:
+        Number of tables written
+    """
+    chunk_size = chunk_size or METADATA_INGEST_CHUNK_SIZE
+    written = 0
+
+    for start in range(0, len(table_ids), chunk_size):
+        end = start + chunk_size
+        embeddings = embedding_service.embed_batch(summary_texts[start:end])
+        vector_store.add_metadata_batch(
+            table_ids=table_ids[start:end],
+            summary_texts=summary_texts[start:end],
+            embeddings=embeddings,
+            metadatas=metadatas[start:end]
+        )
+        written += len(embeddings)
+        logger.info(f"Upserted {written}/{len(table_ids)} tables")
+        if progress_callback:
+            progress_callback(written, len(table_ids))
+
+    return written
+
 
 class MetadataMigrator:
     """Migrate JSON metadata to Vector DB"""
@@ -66,10 +114,9 @@ class MetadataMigrator:
 
         logger.info(f"Found {len(json_files)} JSON metadata files")
 
-        # Prepare batch data
+        # Prepare batch data (texts first, embeddings are created in batches below)
         table_ids = []
         summary_texts = []
-        embeddings = []
         metadatas = []
 
         for json_file in json_files:
@@ -84,9 +131,6 @@ class MetadataMigrator:
                 # Create summary text for embedding
                 summary_text = self._create_table_summary(metadata)
 
-                # Create embedding
-                embedding = self.embedding_service.embed_text(summary_text)
-
                 # Prepare metadata
                 table_metadata = {
                     "database_sid": database_sid,
@@ -101,7 +145,6 @@ class MetadataMigrator:
 
                 table_ids.append(table_id)
                 summary_texts.append(summary_text)
-                embeddings.append(embedding)
                 metadatas.append(table_metadata)
 
                 logger.debug(f"Prepared: {table_id}")
@@ -110,14 +153,15 @@ class MetadataMigrator:
                 logger.error(f"Error processing {json_file}: {e}")
                 continue
 
-        # Batch add to Vector DB
+        # Batched embed + chunked upsert to Vector DB
         if table_ids:
             try:
-                self.vector_store.add_metadata_batch(
-                    table_ids=table_ids,
-                    summary_texts=summary_texts,
-                    embeddings=embeddings,
-                    metadatas=metadatas
+                upsert_metadata_entries(
+                    self.vector_store,
+                    self.embedding_service,
+                    table_ids,
+                    summary_texts,
+                    metadatas
                 )
 
                 logger.info(f"✓ Migrated {len(table_ids)} tables to Vector DB")
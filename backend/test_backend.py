@@ -4,7 +4,9 @@ Run this to verify the backend is working correctly
 """
 
 import asyncio
+import struct
 import sys
+import tempfile
 from pathlib import Path
 
 # Add parent directory to path
@@ -13,6 +15,9 @@ sys.path.insert(0, str(Path(__file__).parent))
 from app.core.vector_store import VectorStore
 from app.core.embedding_service import EmbeddingService
 from app.core.learning_engine import LearningEngine
+from app.core.job_handlers import merge_db_columns
+from app.core.pbl_reader import BLOCK_SIZE, NODE_SIZE, PBLReader
+from app.utils.enhanced_metadata_builder import EnhancedMetadataBuilder
 
 
 async def test_vector_store():
@@ -167,6 +172,99 @@ async def test_metadata_search(vector_store, embedding_service):
         print(f"✗ Metadata search failed: {e}")
 
 
+async def test_metadata_summary_from_bulk_rows():
+    """Test table summaries built from Oracle dictionary rows (extract_columns_bulk)"""
+    print("\n=== Testing Metadata Summary (bulk rows) ===")
+    try:
+        db_columns = [
+            {"TABLE_NAME": "ITEM_MASTER", "COLUMN_NAME": "ITEM_CODE", "DATA_TYPE": "VARCHAR2",
+             "NULLABLE": "N", "COMMENTS": "품목 코드"},
+            {"TABLE_NAME": "ITEM_MASTER", "COLUMN_NAME": "ITEM_QTY", "DATA_TYPE": "NUMBER",
+             "NULLABLE": "Y", "COMMENTS": None}
+        ]
+        col_def_map = {"ITEM_QTY": {"column_name": "ITEM_QTY", "korean_name": "수량", "description": ""}}
+
+        # No primary key: the summary lists the first columns
+        columns = merge_db_columns(db_columns, [], col_def_map)
+        summary_text = EnhancedMetadataBuilder.create_summary_text(
+            database_sid="TEST_DB",
+            schema_name="TEST_SCHEMA",
+            table_name="ITEM_MASTER",
+            columns=columns
+        )
+
+        assert "- ITEM_CODE: 품목 코드" in summary_text, summary_text
+        assert "- ITEM_QTY (수량) [NUMBER]" in summary_text, summary_text
+        assert columns[0]["nullable"] is False and columns[1]["nullable"] is True
+
+        pk_columns = merge_db_columns(db_columns, ["ITEM_CODE"], col_def_map)
+        assert pk_columns[0]["is_pk"] is True and pk_columns[1]["is_pk"] is False
+        print("✓ Summary contains column names, types and comments")
+    except AssertionError as e:
+        print(f"✗ Metadata summary check failed:\n{e}")
+
+
+def build_test_pbl(path: Path, objects: list):
+    """
+    Write a minimal ANSI PBL: HDR* block, one NOD* node with an ENT* per object,
+    then each object's DAT* chain (comment bytes followed by object bytes)
+
+    Args:
+        objects: [(name, comment bytes, object bytes)]
+    """
+    payload = BLOCK_SIZE - struct.calcsize("<4sIH")
+    header = b"HDR*" + b"PowerBuilder\x00"
+    blocks = bytearray(header.ljust(BLOCK_SIZE, b"\x00"))
+    node_offset = len(blocks)
+    data_offset = node_offset + NODE_SIZE
+
+    entries = b""
+    data = bytearray()
+    for name, comment, body in objects:
+        first_block = data_offset + len(data)
+        chain = comment + body
+        chunks = [chain[i:i + payload] for i in range(0, len(chain), payload)]
+        for index, chunk in enumerate(chunks):
+            next_block = first_block + (index + 1) * BLOCK_SIZE if index + 1 < len(chunks) else 0
+            data += (struct.pack("<4sIH", b"DAT*", next_block, len(chunk)) + chunk).ljust(BLOCK_SIZE, b"\x00")
+        raw_name = name.encode("latin-1") + b"\x00"
+        entries += struct.pack(
+            "<4s4sIIIHH", b"ENT*", b"0600", first_block, len(body), 0, len(comment), len(raw_name)
+        ) + raw_name
+
+    node = struct.pack("<4sIIIIHHHH", b"NOD*", 0, 0, 0, 0, 0, 0, len(objects), 0) + b"\x00" * 4 + entries
+    blocks += node.ljust(NODE_SIZE, b"\x00") + data
+    path.write_bytes(bytes(blocks))
+
+
+async def test_pbl_reader():
+    """Test PBL source extraction from a synthetic library (comment precedes source in DAT*)"""
+    print("\n=== Testing PBL Reader ===")
+    source = "forward\nglobal type w_main from window\nend type\n" + "// 재고 조회\n" * 60
+    source_bytes = source.encode("cp949")
+    comment = "Main window comment".encode("cp949")
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            pbl_path = Path(tmp_dir) / "test.pbl"
+            build_test_pbl(pbl_path, [
+                ("w_main.srw", comment, source_bytes),
+                ("w_main.win", b"", b"\x01\x02compiled"),
+            ])
+
+            with PBLReader(str(pbl_path)) as library:
+                names = [entry["name"] for entry in library.entries()]
+                sources = dict(library.iter_sources())
+
+        assert len(source_bytes) > BLOCK_SIZE, "source must span several DAT* blocks"
+        assert names == ["w_main.srw", "w_main.win"], names
+        assert list(sources) == ["w_main.srw"], list(sources)
+        assert sources["w_main.srw"] == source, sources["w_main.srw"][:80]
+        print("✓ Source extracted without comment bytes across the DAT* chain")
+    except AssertionError as e:
+        print(f"✗ PBL reader check failed:\n{e}")
+
+
 async def main():
     """Run all tests"""
     print("\n" + "="*60)
@@ -174,6 +272,9 @@ async def main():
     print("="*60)
 
     # Test components
+    await test_metadata_summary_from_bulk_rows()
+    await test_pbl_reader()
+
     vector_store = await test_vector_store()
     embedding_service = await test_embedding_service()
 
@@ -0,0 +1,116 @@
+"""
+@file benchmark_partition_search.py
+@description
+ChromaDB 필터 검색(HNSW)과 NumPy 파티션 정확 검색(mcp/partition_index.py)의
+지연 시간과 recall@k 를 비교합니다.
+
+NumPy 결과가 정확(brute-force) top-k 이므로 이를 정답으로 보고 Chroma 결과의 recall 을 계산합니다.
+
+사용법:
+    python benchmark_partition_search.py                       # 기본 SID/스키마, 컬럼 컬렉션
+    python benchmark_partition_search.py SMVNPDBext INFINITY21_JSMES oracle_metadata
+"""
+
+import sys
+import time
+import logging
+import statistics
+from pathlib import Path
+
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root / "mcp"))
+
+from vector_db_client import VectorDBClient
+from partition_index import PartitionIndex
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+
+QUERIES = [
+    "라인", "일자", "수량", "모델명", "생산계획", "불량 유형", "작업자",
+    "설비 가동 시간", "입고 일자", "출하 수량", "품목 코드", "공정 순서",
+    "검사 결과", "작업 지시 번호", "재고 수량", "거래처", "단가", "납기일",
+    "production plan", "defect count"
+]
+TOP_K = 10
+REPEAT = 5
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def main():
+    database_sid = sys.argv[1] if len(sys.argv) > 1 else "SMVNPDBext"
+    schema_name = sys.argv[2] if len(sys.argv) > 2 else "INFINITY21_JSMES"
+    collection_name = sys.argv[3] if len(sys.argv) > 3 else "oracle_columns"
+
+    vector_db_path = project_root / "data" / "vector_db"
+    client = VectorDBClient(vector_db_path=str(vector_db_path))
+    collection = client.router.get_collection(collection_name, database_sid, schema_name)
+    where = client.router.where_filter(database_sid, schema_name)
+    if collection is None:
+        print(f"⚠️ 컬렉션이 없습니다: {collection_name} ({database_sid}.{schema_name})")
+        return
+
+    index = PartitionIndex(
+        index_dir=str(project_root / "data" / "partition_index"),
+        vector_db_path=str(vector_db_path)
+    )
+
+    print("=" * 70)
+    print(f"📊 파티션 검색 벤치마크: {collection_name} / {database_sid}.{schema_name}")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    partition = index.get_partition(collection, database_sid, schema_name)
+    print(f"파티션 로드/생성: {len(partition.ids)}개 행, {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    if not partition.ids:
+        print("⚠️ 파티션이 비어 있습니다. SID/스키마/컬렉션 이름을 확인하세요.")
+        return
+
+    embeddings = client.encode_queries(QUERIES)
+
+    chroma_times, numpy_times, recalls = [], [], []
+    for _ in range(REPEAT):
+        for embedding in embeddings:
+            t0 = time.perf_counter()
+            chroma = collection.query(query_embeddings=[embedding], n_results=TOP_K, where=where)
+            chroma_times.append((time.perf_counter() - t0) * 1000)
+
+            t0 = time.perf_counter()
+            exact = index.query(collection, [embedding], database_sid, schema_name, TOP_K)
+            numpy_times.append((time.perf_counter() - t0) * 1000)
+
+            expected = set(exact["ids"][0])
+            if expected:
+                recalls.append(len(expected & set(chroma["ids"][0])) / len(expected))
+
+    # 배치 질의 (질문 전체를 한 번에)
+    t0 = time.perf_counter()
+    collection.query(query_embeddings=embeddings, n_results=TOP_K, where=where)
+    chroma_batch = (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    index.query(collection, embeddings, database_sid, schema_name, TOP_K)
+    numpy_batch = (time.perf_counter() - t0) * 1000
+
+    print(f"\n단일 질의 {len(chroma_times)}회 (top-{TOP_K}):")
+    print(f"{'':10s} {'평균(ms)':>10s} {'p50(ms)':>10s} {'p95(ms)':>10s}")
+    for label, times in (("Chroma", chroma_times), ("NumPy", numpy_times)):
+        print(
+            f"{label:10s} {statistics.mean(times):10.2f} "
+            f"{_percentile(times, 0.5):10.2f} {_percentile(times, 0.95):10.2f}"
+        )
+
+    print(f"\n배치 질의 ({len(embeddings)}개 한 번에):")
+    print(f"Chroma     {chroma_batch:10.2f} ms")
+    print(f"NumPy      {numpy_batch:10.2f} ms")
+
+    print(f"\nChroma recall@{TOP_K} (NumPy 정확 검색 기준): {statistics.mean(recalls):.4f}")
+    print(f"속도 향상 (평균): {statistics.mean(chroma_times) / max(statistics.mean(numpy_times), 1e-9):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+@file benchmark_powerbuilder_scanner.py
+@description
+PowerBuilder 소스 파싱 방식을 합성 코퍼스로 비교합니다.
+
+- regex  : 기존 추출기 4종 (extract_sql_queries / extract_table_references /
+           extract_business_rules / extract_comments) 을 파일마다 각각 실행
+- scanner: 단일 패스 토크나이저 (backend/app/core/powerscript_scanner.py)
+
+코퍼스는 윈도우 스크립트(.srw), DataWindow export(.srd, retrieve= / PBSELECT),
+그리고 주석·텍스트에 SQL/IF 단어가 많은 대형 DataWindow 로 구성됩니다.
+마지막 표는 파일 크기를 두 배씩 키울 때 처리 시간이 어떻게 늘어나는지 보여줍니다
+(regex 는 lazy `.+?` 구간 때문에 크기에 비해 더 빠르게 느려집니다).
+
+사용법:
+    python benchmark_powerbuilder_scanner.py          # 기본 규모
+    python benchmark_powerbuilder_scanner.py 4        # 코퍼스 4배
+"""
+
+import sys
+import time
+import random
+import logging
+from pathlib import Path
+
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root / "backend"))
+
+from app.core.powerbuilder_parser import PowerBuilderParser
+from app.core.powerscript_scanner import scan_powerscript
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+
+random.seed(42)
+
+TABLES = [f"TB_{name}" for name in (
+    "ITEM", "STOCK", "ORDER", "ORDER_LINE", "CUSTOMER", "PLAN", "LOT", "DEFECT",
+    "WORKER", "EQUIP", "ROUTING", "BOM", "SHIPMENT", "INVOICE", "PRICE", "CODE"
+)]
+
+PROSE = [
+    "select the row if the user changed the quantity",
+    "update the header after the detail rows are saved, if any",
+    "규칙: 출하 수량은 재고 수량보다 클 수 없음 (validation: must check stock)",
+    "delete from the buffer only if the status is 'N'",
+    "business: if the lot is closed the plan should not change",
+]
+
+
+def _sql(i: int) -> str:
+    a, b, c = random.sample(TABLES, 3)
+    return (
+        f"SELECT a.col_{i}, b.qty, c.name INTO :ls_a, :ll_qty, :ls_name\n"
+        f"      FROM {a} a, {b} b\n"
+        f"      JOIN {c} c ON c.id = b.id\n"
+        f"     WHERE a.id = b.id AND a.flag = 'Y'\n"
+        f"       AND b.lot_no IN (SELECT lot_no FROM {random.choice(TABLES)} WHERE use_yn = 'Y')\n"
+        f"     USING SQLCA;\n"
+    )
+
+
+def make_window(events: int) -> str:
+    """윈도우 스크립트 (.srw): 이벤트마다 임베디드 SQL, IF 블록, 주석"""
+    parts = ["forward\nglobal type w_main from window\nend type\nend forward\n"]
+    for i in range(events):
+        parts.append(f"event ue_process_{i};\n")
+        parts.append(f"// {random.choice(PROSE)}\n")
+        parts.append(f"/* {random.choice(PROSE)}\n   {random.choice(PROSE)} */\n")
+        parts.append("long ll_qty, ll_row\nstring ls_a, ls_name\n")
+        parts.append(f"IF ll_qty > {i} THEN\n")
+        parts.append("    " + _sql(i).replace("\n", "\n    ") + "\n")
+        parts.append(f"    IF SQLCA.SQLCode <> 0 THEN MessageBox(\"Update failed\", SQLCA.SQLErrText)\n")
+        parts.append("ELSE\n")
+        t = random.choice(TABLES)
+        parts.append(f"    UPDATE {t} SET qty = :ll_qty WHERE id = :ls_a;\n")
+        parts.append("    dw_1.Update()\nEND IF\n")
+        parts.append(f"ls_sql = \"SELECT ~\"COL_{i}~\" FROM ~\"{random.choice(TABLES)}~\" WHERE id = \" + ls_a\n")
+        parts.append("end event\n\n")
+    return "".join(parts)
+
+
+def make_datawindow(columns: int, pbselect: bool) -> str:
+    """DataWindow export (.srd): 컬럼/텍스트 정의 + retrieve="..." (일반 SQL 또는 PBSELECT)"""
+    table = random.choice(TABLES)
+    other = random.choice([t for t in TABLES if t != table])
+    parts = ["release 12;\ndatawindow(units=0 timer_interval=0 color=1073741824 processing=0 )\n"]
+    parts.append("header(height=88 color=\"536870912\" )\ndetail(height=84 color=\"536870912\" )\n")
+    parts.append("table(")
+    for i in range(columns):
+        parts.append(f"column=(type=char(20) updatewhereclause=yes name=col_{i} dbname=\"{table}.COL_{i}\" )\n ")
+    if pbselect:
+        cols = " ".join(f"COLUMN(NAME=~\"{table}.COL_{i}~\")" for i in range(columns))
+        parts.append(
+            f"retrieve=\"PBSELECT( VERSION(400) TABLE(NAME=~\"{table}~\" ) TABLE(NAME=~\"{other}~\" ) {cols} "
+            f"JOIN (LEFT=~\"{table}.ID~\" OP =~\"=~\"RIGHT=~\"{other}.ID~\" ) "
+            f"WHERE( EXP1 =~\"{table}.LOT_NO~\" OP =~\"=~\" EXP2 =~\":as_lot~\" ) ) "
+            f"ARG(NAME = ~\"as_lot~\" TYPE = string) \" arguments=((\"as_lot\", string)) )\n"
+        )
+    else:
+        cols = ", ".join(f"~\"{table}~\".~\"COL_{i}~\"" for i in range(columns))
+        parts.append(
+            f"retrieve=\"  SELECT {cols}~r~n    FROM ~\"{table}~\", ~\"{other}~\"~r~n"
+            f"   WHERE ( ~\"{table}~\".~\"ID~\" = ~\"{other}~\".~\"ID~\" ) and ( ~\"{table}~\".~\"LOT_NO~\" = :as_lot )\" "
+            f"update=\"{table}\" updatewhere=1 updatekeyinplace=no arguments=((\"as_lot\", string)) )\n"
+        )
+    for i in range(columns):
+        parts.append(
+            f"text(band=header alignment=\"2\" text=\"{random.choice(PROSE)}\" border=\"0\" "
+            f"color=\"33554432\" x=\"{i * 300}\" y=\"8\" height=\"64\" width=\"290\" name=t_{i} )\n"
+        )
+        parts.append(
+            f"column(band=detail id={i + 1} alignment=\"0\" tabsequence={i * 10} border=\"0\" "
+            f"color=\"33554432\" x=\"{i * 300}\" y=\"8\" height=\"76\" width=\"290\" name=col_{i} "
+            f"edit.limit=20 edit.case=any edit.autoselect=yes )\n"
+        )
+    return "".join(parts)
+
+
+def run_regex(parser: PowerBuilderParser, content: str) -> dict:
+    return {
+        "sql_queries": parser.extract_sql_queries(content),
+        "tables": parser.extract_table_references(content),
+        "business_rules": parser.extract_business_rules(content),
+        "comments": parser.extract_comments(content),
+    }
+
+
+def run_scanner(parser: PowerBuilderParser, content: str) -> dict:
+    scanned = scan_powerscript(content)
+    return {
+        "sql_queries": parser._dedupe_queries(scanned["sql_queries"]),
+        "tables": scanned["tables"],
+        "business_rules": parser._comment_rules(scanned["comments"]) + scanned["if_then_rules"],
+        "comments": scanned["comments"],
+    }
+
+
+def _time(fn, parser, corpus):
+    start = time.perf_counter()
+    results = [fn(parser, content) for content in corpus]
+    return time.perf_counter() - start, results
+
+
+def main():
+    scale = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    parser = PowerBuilderParser()
+
+    corpus = (
+        [make_window(int(40 * scale)) for _ in range(20)]
+        + [make_datawindow(int(30 * scale), pbselect=False) for _ in range(20)]
+        + [make_datawindow(int(30 * scale), pbselect=True) for _ in range(20)]
+    )
+    total_mb = sum(len(c) for c in corpus) / 1024 / 1024
+
+    regex_time, regex_results = _time(run_regex, parser, corpus)
+    scan_time, scan_results = _time(run_scanner, parser, corpus)
+
+    def totals(results, key):
+        return sum(len(r[key]) for r in results)
+
+    print("=" * 78)
+    print(f"📊 PowerBuilder 소스 파싱 벤치마크: {len(corpus)}개 파일, {total_mb:.2f} MB")
+    print("=" * 78)
+    print(f"{'방식':10s} {'시간(s)':>9s} {'MB/s':>8s} {'SQL':>7s} {'테이블':>7s} {'규칙':>7s} {'주석':>7s}")
+    for name, seconds, results in (("regex", regex_time, regex_results), ("scanner", scan_time, scan_results)):
+        print(
+            f"{name:10s} {seconds:9.3f} {total_mb / max(seconds, 1e-9):8.2f} "
+            f"{totals(results, 'sql_queries'):7d} {totals(results, 'tables'):7d} "
+            f"{totals(results, 'business_rules'):7d} {totals(results, 'comments'):7d}"
+        )
+    print(f"\n속도 향상: {regex_time / max(scan_time, 1e-9):.1f}x")
+
+    # regex 는 WHERE 에서 SELECT 를 자르고 주석/텍스트 속 단어도 SQL·테이블로 잡습니다
+    sample = make_window(1)
+    print("\n예시 (.srw 이벤트 1개)")
+    print(f"  regex   SQL: {[q['sql'][:70] for q in run_regex(parser, sample)['sql_queries']]}")
+    print(f"  scanner SQL: {[q['sql'][:70] for q in run_scanner(parser, sample)['sql_queries']]}")
+
+    print("\n대형 DataWindow 크기별 처리 시간 (크기 2배 → 시간 2배면 선형)")
+    print(f"{'크기(KB)':>9s} {'regex(s)':>10s} {'scanner(s)':>11s}")
+    for columns in (50, 100, 200, 400):
+        content = make_datawindow(int(columns * scale), pbselect=False)
+        regex_seconds, _ = _time(run_regex, parser, [content])
+        scan_seconds, _ = _time(run_scanner, parser, [content])
+        print(f"{len(content) / 1024:9.0f} {regex_seconds:10.3f} {scan_seconds:11.3f}")
+
+
+if __name__ == "__main__":
+    main()
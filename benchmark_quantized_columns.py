@@ -0,0 +1,108 @@
+"""
+@file benchmark_quantized_columns.py
+@description
+컬럼 인덱스 양자화(int8 / binary) 모드의 recall@k, 지연 시간, 메모리 사용량을
+양자화하지 않은 정확 검색(float32)과 비교합니다 (mcp/partition_index.py).
+
+COLUMN_INDEX_QUANTIZATION / COLUMN_INDEX_RERANK_FACTOR 값을 정할 때 참고하세요.
+
+사용법:
+    python benchmark_quantized_columns.py                       # 기본 SID/스키마
+    python benchmark_quantized_columns.py SMVNPDBext INFINITY21_JSMES
+"""
+
+import sys
+import time
+import logging
+import statistics
+from pathlib import Path
+
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root / "mcp"))
+
+from vector_db_client import VectorDBClient
+from partition_index import PartitionIndex, QUANTIZATION_INT8, QUANTIZATION_BINARY
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+
+QUERIES = [
+    "라인", "일자", "수량", "모델명", "생산계획", "불량 유형", "작업자",
+    "설비 가동 시간", "입고 일자", "출하 수량", "품목 코드", "공정 순서",
+    "검사 결과", "작업 지시 번호", "재고 수량", "거래처", "단가", "납기일",
+    "production plan", "defect count"
+]
+TOP_K = 10
+RERANK_FACTORS = [2, 4, 10, 20]
+
+
+def _measure(index, collection, embeddings, database_sid, schema_name, exact_ids):
+    times, recalls = [], []
+    for embedding, expected in zip(embeddings, exact_ids):
+        t0 = time.perf_counter()
+        result = index.query(collection, [embedding], database_sid, schema_name, TOP_K)
+        times.append((time.perf_counter() - t0) * 1000)
+        if expected:
+            recalls.append(len(set(expected) & set(result["ids"][0])) / len(expected))
+    return statistics.mean(times), statistics.mean(recalls) if recalls else 0.0
+
+
+def main():
+    database_sid = sys.argv[1] if len(sys.argv) > 1 else "SMVNPDBext"
+    schema_name = sys.argv[2] if len(sys.argv) > 2 else "INFINITY21_JSMES"
+
+    vector_db_path = project_root / "data" / "vector_db"
+    index_dir = project_root / "data" / "partition_index"
+
+    client = VectorDBClient(vector_db_path=str(vector_db_path))
+    collection = client.router.get_collection("oracle_columns", database_sid, schema_name)
+    if collection is None:
+        print(f"⚠️ 컬럼 컬렉션이 없습니다: {database_sid}.{schema_name}")
+        return
+
+    embeddings = client.encode_queries(QUERIES)
+
+    # 기준선: float32 정확 검색
+    baseline = PartitionIndex(index_dir=str(index_dir), vector_db_path=str(vector_db_path))
+    partition = baseline.get_partition(collection, database_sid, schema_name)
+    if not partition.ids:
+        print("⚠️ 파티션이 비어 있습니다. SID/스키마를 확인하세요.")
+        return
+
+    exact_ids = []
+    exact_times = []
+    for embedding in embeddings:
+        t0 = time.perf_counter()
+        result = baseline.query(collection, [embedding], database_sid, schema_name, TOP_K)
+        exact_times.append((time.perf_counter() - t0) * 1000)
+        exact_ids.append(result["ids"][0])
+
+    float_bytes = partition.memory_bytes()["float32"]
+
+    print("=" * 78)
+    print(f"📊 컬럼 인덱스 양자화 벤치마크: {database_sid}.{schema_name} ({len(partition.ids):,}개 컬럼)")
+    print("=" * 78)
+    print(f"{'모드':10s} {'후보배수':>8s} {f'recall@{TOP_K}':>10s} {'평균(ms)':>10s} {'상주 메모리':>14s} {'압축률':>8s}")
+    print(f"{'float32':10s} {'-':>8s} {1.0:10.4f} {statistics.mean(exact_times):10.2f} "
+          f"{float_bytes / 1024 / 1024:11.2f} MB {1.0:7.1f}x")
+
+    for mode in (QUANTIZATION_INT8, QUANTIZATION_BINARY):
+        for factor in RERANK_FACTORS:
+            index = PartitionIndex(
+                index_dir=str(index_dir),
+                vector_db_path=str(vector_db_path),
+                quantization=mode,
+                rerank_factor=factor
+            )
+            quantized = index.get_partition(collection, database_sid, schema_name)
+            avg_ms, recall = _measure(index, collection, embeddings, database_sid, schema_name, exact_ids)
+            quantized_bytes = quantized.memory_bytes()["quantized"]
+            print(
+                f"{mode:10s} {factor:8d} {recall:10.4f} {avg_ms:10.2f} "
+                f"{quantized_bytes / 1024 / 1024:11.2f} MB {float_bytes / max(quantized_bytes, 1):7.1f}x"
+            )
+
+    print("\n* 양자화 모드의 float32 행렬은 mmap 으로 열려 재정렬 후보 행만 읽습니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+@file check_embedding_backend.py
+@description
+임베딩 추론 백엔드(torch / ONNX fp32 / ONNX int8)의 호환성과 속도를 확인합니다.
+
+1. 코사인 일치도: Vector DB(data/vector_db)의 oracle_metadata / oracle_columns 에서 문서와
+   저장된 임베딩을 표본으로 읽어, 각 백엔드로 같은 문서를 다시 임베딩한 결과와 비교합니다
+   (torch / fp32 ≥ 0.999, int8 ≥ 0.99). 하나라도 미달이면 종료 코드 1.
+   Vector DB 가 없거나 비어 있으면 새로 계산한 PyTorch 임베딩을 기준으로 비교하고 그 사실을 출력합니다.
+2. 속도: 단일 질의 지연 시간과 대량 벡터화 처리량(texts/sec)을 비교합니다.
+
+사용법:
+    python check_embedding_backend.py              # 스레드 수 기본값
+    python check_embedding_backend.py 4            # intra-op 스레드 4개
+"""
+
+import sys
+import time
+import logging
+import statistics
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root / "mcp"))
+
+from embedding_backend import (
+    load_embedding_model, check_agreement, AGREEMENT_THRESHOLD,
+    BACKEND_TORCH, BACKEND_ONNX, OnnxEmbeddingModel
+)
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+# 컬렉션당 비교할 저장 벡터 수
+STORED_SAMPLE_SIZE = 200
+
+QUERIES = [
+    "라인", "일자", "수량", "모델명", "당일 생산계획조회", "불량 유형별 검사 결과",
+    "설비 가동 시간", "최근 7일 출하 실적", "production plan by line", "defect count per model"
+]
+
+
+def _bulk_texts(count: int = 2000):
+    """컬럼 벡터화 텍스트와 비슷한 형태의 대량 텍스트"""
+    words = ["LINE", "CODE", "DATE", "QTY", "MODEL", "LOT", "STATUS", "ITEM", "WORK", "PROCESS"]
+    texts = []
+    for i in range(count):
+        column = f"{words[i % 10]}_{words[(i // 10) % 10]}"
+        texts.append(
+            f"[SMVNPDBext.INFINITY21_JSMES]\n테이블: TB_{i % 300:03d}\n테이블설명: 생산 실적 {i % 300}\n\n"
+            f"컬럼명: {column}\n데이터타입: VARCHAR2\n한글명: {column} 항목 {i}\n검색키워드: {column}"
+        )
+    return texts
+
+
+def _load_stored_samples(sample_size: int = STORED_SAMPLE_SIZE):
+    """Vector DB 에 저장된 (문서 목록, 임베딩 배열) 표본, 없으면 ([], None)"""
+    try:
+        import chromadb
+        from chromadb.config import Settings
+        from collection_router import CollectionRouter
+
+        vector_db_path = project_root / "data" / "vector_db"
+        if not vector_db_path.exists():
+            return [], None
+        client = chromadb.PersistentClient(path=str(vector_db_path), settings=Settings(anonymized_telemetry=False))
+        router = CollectionRouter(client)
+    except Exception as e:
+        print(f"⚠️ Vector DB 를 열 수 없습니다: {e}")
+        return [], None
+
+    documents, embeddings = [], []
+    for base_name in ("oracle_metadata", "oracle_columns"):
+        remaining = sample_size
+        for _, collection in router.iter_collections(base_name):
+            if remaining <= 0:
+                break
+            result = collection.get(limit=remaining, include=["documents", "embeddings"])
+            for document, embedding in zip(result["documents"], result["embeddings"]):
+                if document:
+                    documents.append(document)
+                    embeddings.append(embedding)
+                    remaining -= 1
+
+    if not documents:
+        return [], None
+    return documents, np.asarray(embeddings, dtype=np.float32)
+
+
+def _stored_agreement(model, documents, stored):
+    """저장된 임베딩과 model 로 다시 계산한 임베딩의 코사인 유사도 (min, mean)"""
+    encoded = np.asarray(model.encode(documents, batch_size=64, show_progress_bar=False), dtype=np.float32)
+    cosine = (stored * encoded).sum(axis=1) / (
+        np.linalg.norm(stored, axis=1) * np.linalg.norm(encoded, axis=1) + 1e-12
+    )
+    return float(cosine.min()), float(cosine.mean())
+
+
+def _measure(model, bulk_texts):
+    model.encode(QUERIES[:2], show_progress_bar=False)  # warm-up
+
+    single = []
+    for query in QUERIES * 3:
+        t0 = time.perf_counter()
+        model.encode(query, show_progress_bar=False)
+        single.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    model.encode(bulk_texts, batch_size=64, show_progress_bar=False)
+    throughput = len(bulk_texts) / (time.perf_counter() - t0)
+
+    return statistics.median(single), throughput
+
+
+def main():
+    num_threads = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    bulk_texts = _bulk_texts()
+
+    reference = load_embedding_model(MODEL_NAME, project_root, backend=BACKEND_TORCH, num_threads=num_threads)
+    candidates = [("torch", reference, None)]
+    for quantize in (False, True):
+        model = load_embedding_model(
+            MODEL_NAME, project_root, backend=BACKEND_ONNX, quantize=quantize, num_threads=num_threads
+        )
+        if not isinstance(model, OnnxEmbeddingModel):
+            print(f"⚠️ ONNX {'int8' if quantize else 'fp32'} 백엔드를 불러오지 못했습니다 (onnxruntime 설치 확인).")
+            continue
+        candidates.append((f"onnx-{'int8' if quantize else 'fp32'}", model, quantize))
+
+    documents, stored = _load_stored_samples()
+
+    print("=" * 78)
+    print(f"📊 임베딩 백엔드 비교: {MODEL_NAME} (threads={num_threads or 'auto'})")
+    if stored is not None:
+        print(f"   기준: Vector DB 에 저장된 임베딩 {len(documents)}개 (oracle_metadata / oracle_columns 표본)")
+    else:
+        print("   기준: ⚠️ 저장된 벡터가 없어 새로 계산한 PyTorch 임베딩과 비교합니다")
+    print("=" * 78)
+    print(f"{'백엔드':12s} {'최소 cos':>10s} {'평균 cos':>10s} {'판정':>6s} {'단일(ms)':>10s} {'대량(texts/s)':>14s}")
+
+    failed = False
+    for label, model, quantize in candidates:
+        threshold = AGREEMENT_THRESHOLD[bool(quantize)]
+        if stored is not None:
+            min_cos, mean_cos = _stored_agreement(model, documents, stored)
+        elif quantize is None:
+            min_cos, mean_cos = 1.0, 1.0
+        else:
+            agreement = check_agreement(reference, model, QUERIES + bulk_texts[:200])
+            min_cos, mean_cos = agreement["min_cosine"], agreement["mean_cosine"]
+
+        ok = min_cos >= threshold
+        verdict = "OK" if ok else "FAIL"
+        if stored is None and quantize is None:
+            verdict = "기준"
+        failed = failed or not ok
+
+        single_ms, throughput = _measure(model, bulk_texts)
+        print(f"{label:12s} {min_cos:10.5f} {mean_cos:10.5f} {verdict:>6s} {single_ms:10.2f} {throughput:14.1f}")
+
+    if failed:
+        print("\n❌ 기존 벡터와 호환되지 않는 백엔드가 있습니다. 해당 백엔드를 사용하지 마세요.")
+        sys.exit(1)
+    print("\n✅ 모든 백엔드가 기존 벡터와 호환됩니다.")
+
+
+if __name__ == "__main__":
+    main()
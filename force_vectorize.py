@@ -98,6 +98,12 @@ async def run_vectorization():
         return
     
     try:
+        # Fetch columns and PKs for all tables in bulk (a few round trips instead of two per table)
+        target_tables = [row.get('table_name', '').strip().upper() for row in table_info_data]
+        target_tables = [name for name in target_tables if name]
+        columns_by_table = oracle.extract_columns_bulk(schema_name, target_tables)
+        pks_by_table = oracle.extract_primary_keys_bulk(schema_name, target_tables)
+
         processed_count = 0
         for table_row in table_info_data:
             table_name = table_row.get('table_name', '').strip().upper()
@@ -105,13 +111,13 @@ async def run_vectorization():
             
             logger.info(f"Processing table: {table_name}")
             try:
-                # Get columns and PKs from DB
-                columns = oracle.extract_table_columns(schema_name, table_name)
+                # Get columns and PKs from the bulk result
+                columns = columns_by_table.get(table_name, [])
                 if not columns:
                     logger.warning(f"No columns found for {table_name}, skipping.")
                     continue
                     
-                pks = oracle.extract_primary_keys(schema_name, table_name)
+                pks = pks_by_table.get(table_name, [])
                 
                 # Combine metadata (simplified)
                 full_metadata = {
@@ -127,7 +133,7 @@ async def run_vectorization():
                 
                 # Generate text and embed
                 doc_text = generate_document_text(table_row, columns, pks)
-                embedding = embedding_service.embed_text(doc_text)
+                embedding = embedding_service.embed_document(doc_text)
                 
                 # Add to Vector DB
                 # Note: VectorStore.add_metadata expects (table_id, summary_text, embedding, metadata)
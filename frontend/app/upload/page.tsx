@@ -13,6 +13,8 @@
  * 유지보수 팁:
  * - 처리 단계 추가/변경: `processingSteps` 상태값과 `handleProcess` 함수 내 로직을 수정하세요.
  * - API 연동: `api.metadata.process` 호출 부분을 확인하세요.
+ * - 진행 상태: 처리는 백엔드 작업 큐에서 실행되며, `api.jobs.follow` (SSE) 로 받은
+ *   진행률/단계 메시지를 `applyJobProgress` 에서 카드 상태로 변환합니다.
  */
 "use client";
 
@@ -44,7 +46,10 @@ import {
 } from "lucide-react";
 import { Header } from "@/components/layout/Header";
 import api from "@/lib/api";
-import { RegisteredDatabase as ApiRegisteredDatabase } from "@/lib/types";
+import {
+  RegisteredDatabase as ApiRegisteredDatabase,
+  BackgroundJob,
+} from "@/lib/types";
 
 // RegisteredDatabase interface is now imported from lib/types
 
@@ -157,6 +162,43 @@ export default function UploadPage() {
     );
   };
 
+  // 작업 진행률(백엔드 metadata_process 단계 구간) → 단계 카드 상태
+  // 0~5: CSV 파싱, 5~20: DB 스키마 조회, 20~30: 메타정보 통합, 30~100: 임베딩 + Vector DB 저장
+  const applyJobProgress = (job: BackgroundJob): string => {
+    const percent = job.status === "completed" ? 100 : job.progress.percent ?? 0;
+    setProgress(Math.max(20, percent));
+
+    if (percent < 20) {
+      updateStep("schema", "in_progress", job.status === "queued" ? "대기 중..." : undefined);
+      return "schema";
+    }
+    updateStep("schema", "completed", `${job.progress.tables_total ?? 0}개 테이블 조회 완료`);
+
+    if (percent < 30) {
+      updateStep("integration", "in_progress");
+      return "integration";
+    }
+    updateStep(
+      "integration",
+      "completed",
+      `${job.progress.tables_matched ?? 0}개 테이블 메타정보 통합 완료`
+    );
+
+    const processed = job.progress.tables_processed ?? 0;
+    const rate = job.progress.tables_per_second;
+    const detail = `${processed}/${job.progress.tables_matched ?? 0}개${
+      rate ? ` (${rate} 테이블/초)` : ""
+    }`;
+    if (job.status !== "completed") {
+      updateStep("embedding", "in_progress", detail);
+      updateStep("vectordb", "in_progress", detail);
+      return "embedding";
+    }
+    updateStep("embedding", "completed", `${processed}개 임베딩 생성 완료`);
+    updateStep("vectordb", "completed", "Vector DB 저장 완료");
+    return "vectordb";
+  };
+
   // CSV 업로드 및 처리
   const handleProcess = async () => {
     // 검증
@@ -191,6 +233,8 @@ export default function UploadPage() {
       return;
     }
 
+    let activeStep: string | null = "validation";
+
     try {
       // Step 1: CSV 파일 검증
       updateStep("validation", "in_progress");
@@ -206,44 +250,28 @@ export default function UploadPage() {
       updateStep("validation", "completed", "CSV 파일 형식 확인 완료");
       setProgress(20);
 
-      // Step 2: DB 스키마 조회
+      // Step 2~5: 작업 등록 후 SSE 로 진행 상황 수신 (폴링 없음)
+      formData.append("wait", "false");
+      activeStep = "schema";
       updateStep("schema", "in_progress");
-      setProgress(30);
 
-      // Step 3~5: Backend API 호출 (통합 처리)
       console.log("📤 Sending request to backend...");
-      const response = await api.metadata.process(formData);
-      console.log("📥 Backend response:", response);
-
-      if (response.success) {
-        updateStep(
-          "schema",
-          "completed",
-          `${response.tables_processed || 0}개 테이블 조회 완료`
-        );
-        setProgress(50);
-
-        updateStep("integration", "in_progress");
-        setProgress(60);
-        await new Promise((resolve) => setTimeout(resolve, 500)); // 시뮬레이션
-        updateStep("integration", "completed", "메타정보 통합 완료");
-        setProgress(70);
-
-        updateStep("embedding", "in_progress");
-        setProgress(80);
-        await new Promise((resolve) => setTimeout(resolve, 500)); // 시뮬레이션
-        updateStep(
-          "embedding",
-          "completed",
-          `${response.tables_processed || 0}개 임베딩 생성 완료`
-        );
-        setProgress(90);
+      const submitted = await api.metadata.process(formData);
+      console.log("📥 Backend response:", submitted);
+      if (!submitted.success || !submitted.job_id) {
+        throw new Error(submitted.error || "처리 중 오류가 발생했습니다.");
+      }
 
-        updateStep("vectordb", "in_progress");
-        setProgress(95);
-        await new Promise((resolve) => setTimeout(resolve, 500)); // 시뮬레이션
-        updateStep("vectordb", "completed", "Vector DB 저장 완료");
-        setProgress(100);
+      const job = await api.jobs.follow(submitted.job_id, (update) => {
+        activeStep = applyJobProgress(update);
+      });
+      const response = {
+        tables_processed: 0,
+        ...(job.result ?? {}),
+      } as { tables_processed: number };
+
+      if (job.status === "completed") {
+        applyJobProgress(job);
 
         setSuccessMessage(
           `메타데이터 처리가 완료되었습니다. ${
@@ -265,16 +293,13 @@ export default function UploadPage() {
           },
         });
       } else {
-        throw new Error(response.error || "처리 중 오류가 발생했습니다.");
+        throw new Error(job.error || `작업이 종료되었습니다 (${job.status})`);
       }
     } catch (error: unknown) {
       const errorMessage = error instanceof Error ? error.message : "오류 발생";
       console.error("Processing error:", error);
-      const currentStep = processingSteps.find(
-        (s) => s.status === "in_progress"
-      );
-      if (currentStep) {
-        updateStep(currentStep.id, "error", errorMessage);
+      if (activeStep) {
+        updateStep(activeStep, "error", errorMessage);
       }
       setErrorMessage(
         errorMessage || "메타데이터 처리 중 오류가 발생했습니다."
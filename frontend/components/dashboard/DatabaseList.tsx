@@ -196,7 +196,10 @@ export function DatabaseList({ databases, loading, onRefresh }: DatabaseListProp
                   {db.last_updated ? new Date(db.last_updated).toLocaleString("ko-KR") : "N/A"}
                 </TableCell>
                 <TableCell>
-                  <Badge variant={db.connection_status === "active" ? "success" : "outline"}>
+                  <Badge
+                    variant={db.connection_status === "connected" ? "success" : "outline"}
+                    title={db.last_error ?? (db.latency_ms != null ? `${db.latency_ms}ms` : undefined)}
+                  >
                     {db.connection_status}
                   </Badge>
                 </TableCell>
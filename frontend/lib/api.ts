@@ -12,7 +12,9 @@ import type {
   RegisteredDatabaseListResponse,
   DatabaseCredentials,
   ListPatternsResponse,
-  PatternStatsResponse
+  PatternStatsResponse,
+  BackgroundJob,
+  JobStatus
 } from "./types"
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000"
@@ -65,12 +67,15 @@ export const api = {
   metadata: {
     /**
      * Upload and process CSV files to create metadata
+     * (formData "wait"=false: returns job_id immediately, follow it with api.jobs.follow)
      */
     async process(formData: FormData): Promise<{
       success: boolean
-      tables_processed: number
+      tables_processed?: number
       database_sid: string
       schema_name: string
+      job_id?: string
+      status?: string
       error?: string
     }> {
       const response = await axios.post(`${API_BASE_URL}/api/v1/metadata/process`, formData, {
@@ -243,6 +248,82 @@ export const api = {
       return response.data
     },
   },
+
+  /**
+   * Background job endpoints
+   */
+  jobs: {
+    /**
+     * Get job status, progress and result
+     */
+    async get<TResult = Record<string, unknown>>(jobId: string): Promise<BackgroundJob<TResult>> {
+      const response = await apiClient.get<BackgroundJob<TResult>>(`/api/v1/jobs/${jobId}`)
+      return response.data
+    },
+
+    /**
+     * Cancel a queued or running job
+     */
+    async cancel(jobId: string): Promise<{ success: boolean; message: string }> {
+      const response = await apiClient.post(`/api/v1/jobs/${jobId}/cancel`)
+      return response.data
+    },
+
+    /**
+     * Follow a job over Server-Sent Events (no polling)
+     * onUpdate is called on every state / progress change; resolves with the final job state.
+     * If the stream cannot be re-established, falls back to polling until the job finishes.
+     */
+    follow<TResult = Record<string, unknown>>(
+      jobId: string,
+      onUpdate?: (job: BackgroundJob<TResult>) => void
+    ): Promise<BackgroundJob<TResult>> {
+      return new Promise((resolve, reject) => {
+        const source = new EventSource(`${API_BASE_URL}/api/v1/jobs/${jobId}/events`)
+
+        source.addEventListener("job", (event) => {
+          const job = JSON.parse((event as MessageEvent).data) as BackgroundJob<TResult>
+          onUpdate?.(job)
+          if (isTerminalJobStatus(job.status)) {
+            source.close()
+            resolve(job)
+          }
+        })
+
+        // EventSource reconnects on its own; once it gives up, poll until a terminal state
+        source.onerror = () => {
+          if (source.readyState !== EventSource.CLOSED) return
+          pollJob<TResult>(jobId, onUpdate).then(resolve, reject)
+        }
+      })
+    },
+  },
+}
+
+/** Poll interval / consecutive request failures tolerated when the job event stream is gone */
+const JOB_POLL_INTERVAL_MS = 2000
+const JOB_POLL_MAX_ERRORS = 5
+
+function isTerminalJobStatus(status: JobStatus): boolean {
+  return status === "completed" || status === "failed" || status === "cancelled"
+}
+
+async function pollJob<TResult>(
+  jobId: string,
+  onUpdate?: (job: BackgroundJob<TResult>) => void
+): Promise<BackgroundJob<TResult>> {
+  let errors = 0
+  for (;;) {
+    try {
+      const job = await api.jobs.get<TResult>(jobId)
+      errors = 0
+      onUpdate?.(job)
+      if (isTerminalJobStatus(job.status)) return job
+    } catch (error) {
+      if (++errors >= JOB_POLL_MAX_ERRORS) throw error
+    }
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS))
+  }
 }
 
 export default api
@@ -23,6 +23,9 @@ export interface DatabaseInfo {
   table_count: number;
   last_updated: string | null;
   connection_status: string;
+  latency_ms?: number | null;
+  last_error?: string | null;
+  checked_at?: string | null;
 }
 
 // Uploaded file information
@@ -90,6 +93,10 @@ export interface RegisteredDatabase {
   service_name: string;
   user: string;
   is_connected: boolean;
+  connection_status?: string;
+  latency_ms?: number | null;
+  last_error?: string | null;
+  checked_at?: string | null;
   table_count: number;
   last_updated?: string | null;
 }
@@ -135,3 +142,29 @@ export interface PatternStatsResponse {
   total_reuses: number;
   estimated_llm_calls_saved: number;
 }
+
+// Background job types (matching backend job queue records)
+export type JobStatus = "queued" | "processing" | "completed" | "failed" | "cancelled";
+
+export interface JobProgress {
+  percent?: number;
+  message?: string;
+  [counter: string]: number | string | null | undefined;
+}
+
+export interface BackgroundJob<TResult = Record<string, unknown>> {
+  job_id: string;
+  kind: string;
+  status: JobStatus;
+  params: Record<string, unknown>;
+  progress: JobProgress;
+  result: TResult | null;
+  error: string | null;
+  attempts: number;
+  max_attempts: number;
+  cancel_requested: boolean;
+  created_at: string;
+  started_at: string | null;
+  completed_at: string | null;
+  updated_at: string;
+}
@@ -0,0 +1,306 @@
+"""
+* @file mcp/collection_router.py
+* @description
+* Vector DB 컬렉션 배치 방식(레이아웃)을 결정하는 라우터입니다.
+*
+* - shared (기본): 모든 DB/스키마가 하나의 컬렉션(oracle_metadata, oracle_columns)을 공유하고
+*   검색 때마다 database_sid / schema_name where 필터를 사용합니다.
+* - partitioned: (컬렉션 종류, SID, 스키마)마다 물리적으로 별도 컬렉션을 사용합니다.
+*   검색은 해당 스키마의 인덱스만 조회하고, 한 스키마를 삭제/재생성해도 다른 스키마에 영향이 없습니다.
+*
+* 초보자 가이드:
+* 1. **get_collection**: 레이아웃에 맞는 컬렉션을 반환합니다 (shared면 공용 컬렉션).
+* 2. **where_filter**: 레이아웃에 맞는 where 조건을 반환합니다 (partitioned면 SID/스키마 조건 불필요).
+* 3. **레지스트리**: partitioned 컬렉션 목록은 `collection_registry` 컬렉션에 기록됩니다.
+* 4. **split_shared_collection**: 기존 공용 컬렉션의 데이터를 파티션 컬렉션으로 복사합니다.
+*
+* 유지보수 팁:
+* - MCP 서버(VectorDBClient), Backend(VectorStore), vectorize_columns.py 가 같은 클래스를 사용합니다.
+*   Backend는 importlib으로 이 파일을 로드합니다.
+* - 레이아웃은 VECTOR_COLLECTION_LAYOUT 환경 변수(shared | partitioned)로 선택합니다.
+"""
+
+import hashlib
+import logging
+import os
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LAYOUT_SHARED = "shared"
+LAYOUT_PARTITIONED = "partitioned"
+
+REGISTRY_COLLECTION = "collection_registry"
+
+# ChromaDB 컬렉션 이름 규칙: 3~63자, [a-zA-Z0-9._-], 영숫자로 시작/끝
+_MAX_NAME_LENGTH = 63
+_INVALID_NAME_CHARS = re.compile(r"[^A-Za-z0-9_-]")
+
+# 공용 → 파티션 복사 시 페이지 크기
+_COPY_PAGE_SIZE = 1000
+
+
+def get_layout_from_env() -> str:
+    layout = os.getenv("VECTOR_COLLECTION_LAYOUT", LAYOUT_SHARED).lower()
+    return layout if layout in (LAYOUT_SHARED, LAYOUT_PARTITIONED) else LAYOUT_SHARED
+
+
+def partition_collection_name(base_name: str, database_sid: str, schema_name: str) -> str:
+    """
+    파티션 컬렉션 이름 생성
+
+    예: ("oracle_columns", "SMVNPDBext", "INFINITY21_JSMES") → "oracle_columns__SMVNPDBext__INFINITY21_JSMES"
+    규칙에 맞지 않는 문자가 있거나 너무 길면 원본 이름의 해시를 붙여 충돌을 피합니다.
+    """
+    raw = f"{base_name}__{database_sid}__{schema_name}"
+    name = _INVALID_NAME_CHARS.sub("_", raw)
+
+    if name != raw or len(name) > _MAX_NAME_LENGTH:
+        digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()[:8]
+        name = f"{name[:_MAX_NAME_LENGTH - 9]}_{digest}"
+
+    return name
+
+
+class CollectionRouter:
+    """레이아웃(shared / partitioned)에 따라 컬렉션과 where 필터를 결정"""
+
+    def __init__(self, client, layout: Optional[str] = None):
+        """
+        Args:
+            client: chromadb PersistentClient
+            layout: "shared" | "partitioned" (None이면 VECTOR_COLLECTION_LAYOUT 환경 변수)
+        """
+        self.client = client
+        self.layout = layout or get_layout_from_env()
+        self._collections: Dict[str, Any] = {}
+        self._registry = None
+
+    @property
+    def is_partitioned(self) -> bool:
+        return self.layout == LAYOUT_PARTITIONED
+
+    # ------------------------------------------------------------------
+    # 레지스트리
+    # ------------------------------------------------------------------
+    def _get_registry(self):
+        if self._registry is None:
+            self._registry = self.client.get_or_create_collection(
+                name=REGISTRY_COLLECTION,
+                metadata={"description": "Per SID/schema partition collection registry"}
+            )
+        return self._registry
+
+    def _register(self, collection_name: str, base_name: str, database_sid: str, schema_name: str):
+        # 레지스트리는 조회 전용이므로 임베딩은 자리표시 값만 저장합니다.
+        self._get_registry().upsert(
+            ids=[collection_name],
+            embeddings=[[1.0]],
+            documents=[f"{base_name} {database_sid}.{schema_name}"],
+            metadatas=[{
+                "base_name": base_name,
+                "database_sid": database_sid,
+                "schema_name": schema_name,
+                "registered_at": datetime.now().isoformat()
+            }]
+        )
+
+    def list_partitions(self, base_name: Optional[str] = None) -> List[Dict[str, str]]:
+        """
+        등록된 파티션 컬렉션 목록
+
+        Returns:
+            [{"collection_name", "base_name", "database_sid", "schema_name"}, ...]
+        """
+        registry = self._get_registry()
+        result = registry.get(where={"base_name": base_name} if base_name else None)
+
+        partitions = []
+        for collection_name, metadata in zip(result.get("ids", []), result.get("metadatas", []) or []):
+            partitions.append({
+                "collection_name": collection_name,
+                "base_name": metadata.get("base_name", ""),
+                "database_sid": metadata.get("database_sid", ""),
+                "schema_name": metadata.get("schema_name", "")
+            })
+        return partitions
+
+    # ------------------------------------------------------------------
+    # 컬렉션 선택
+    # ------------------------------------------------------------------
+    def get_collection(
+        self,
+        base_name: str,
+        database_sid: Optional[str] = None,
+        schema_name: Optional[str] = None,
+        create: bool = False,
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        """
+        레이아웃에 맞는 컬렉션 반환
+
+        Args:
+            base_name: 기본 컬렉션 이름 (oracle_metadata, oracle_columns)
+            create: True면 없을 때 생성 (partitioned면 레지스트리에도 등록)
+            metadata: 생성 시 컬렉션 메타데이터 (hnsw:space 등)
+
+        Returns:
+            컬렉션 (create=False 이고 없으면 None)
+        """
+        if self.is_partitioned:
+            if not database_sid or not schema_name:
+                raise ValueError("partitioned 레이아웃에서는 database_sid와 schema_name이 필요합니다.")
+            name = partition_collection_name(base_name, database_sid, schema_name)
+        else:
+            name = base_name
+
+        collection = self._collections.get(name)
+        if collection is not None:
+            return collection
+
+        try:
+            if create:
+                collection = self.client.get_or_create_collection(name=name, metadata=metadata)
+                if self.is_partitioned:
+                    self._register(name, base_name, database_sid, schema_name)
+            else:
+                collection = self.client.get_collection(name)
+        except Exception as e:
+            if create:
+                raise
+            logger.debug(f"컬렉션 없음: {name} ({e})")
+            return None
+
+        self._collections[name] = collection
+        return collection
+
+    def iter_collections(self, base_name: str) -> List[Tuple[Optional[Dict[str, str]], Any]]:
+        """
+        base_name 에 해당하는 모든 물리 컬렉션
+
+        Returns:
+            [(파티션 정보 또는 None, 컬렉션), ...]  (shared면 공용 컬렉션 하나)
+        """
+        if not self.is_partitioned:
+            collection = self.get_collection(base_name)
+            return [(None, collection)] if collection is not None else []
+
+        collections = []
+        for partition in self.list_partitions(base_name):
+            collection = self.get_collection(
+                base_name, partition["database_sid"], partition["schema_name"]
+            )
+            if collection is not None:
+                collections.append((partition, collection))
+        return collections
+
+    def clear_cache(self):
+        """컬렉션 핸들 캐시 초기화 (외부에서 컬렉션을 삭제/재생성한 뒤 호출)"""
+        self._collections.clear()
+
+    def count(self, base_name: str) -> int:
+        return sum(collection.count() for _, collection in self.iter_collections(base_name))
+
+    def where_filter(
+        self,
+        database_sid: str,
+        schema_name: str,
+        table_name: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        검색용 where 필터
+
+        shared: SID/스키마 $and 필터, partitioned: 컬렉션 자체가 파티션이므로 테이블 조건만 사용
+        """
+        if self.is_partitioned:
+            return {"table_name": table_name} if table_name else None
+
+        where_filter = {
+            "$and": [
+                {"database_sid": database_sid},
+                {"schema_name": schema_name}
+            ]
+        }
+        if table_name:
+            where_filter["$and"].append({"table_name": table_name})
+        return where_filter
+
+    # ------------------------------------------------------------------
+    # 삭제 / 이전
+    # ------------------------------------------------------------------
+    def delete_partition(self, base_name: str, database_sid: str, schema_name: str):
+        """
+        한 SID/스키마의 데이터 삭제
+
+        partitioned면 컬렉션 자체를 삭제(다른 스키마 인덱스는 그대로), shared면 where 조건으로 삭제
+        """
+        if not self.is_partitioned:
+            collection = self.get_collection(base_name)
+            if collection is not None:
+                collection.delete(where=self.where_filter(database_sid, schema_name))
+            return
+
+        name = partition_collection_name(base_name, database_sid, schema_name)
+        self._collections.pop(name, None)
+        try:
+            self.client.delete_collection(name)
+        except Exception as e:
+            logger.debug(f"삭제할 컬렉션 없음: {name} ({e})")
+        self._get_registry().delete(ids=[name])
+        logger.info(f"✓ 파티션 컬렉션 삭제: {name}")
+
+    def split_shared_collection(self, base_name: str) -> Dict[str, int]:
+        """
+        공용 컬렉션(base_name)의 데이터를 SID/스키마별 파티션 컬렉션으로 복사
+
+        원본 공용 컬렉션은 삭제하지 않습니다 (layout=shared 로 되돌릴 수 있도록).
+
+        Returns:
+            {"SID.SCHEMA": 복사된 항목 수, ...}
+        """
+        try:
+            source = self.client.get_collection(base_name)
+        except Exception:
+            logger.warning(f"공용 컬렉션 없음: {base_name}")
+            return {}
+
+        copied: Dict[str, int] = {}
+        partitioned = CollectionRouter(self.client, LAYOUT_PARTITIONED)
+        offset = 0
+
+        while True:
+            page = source.get(
+                include=["embeddings", "documents", "metadatas"],
+                limit=_COPY_PAGE_SIZE,
+                offset=offset
+            )
+            ids = page["ids"]
+            if not ids:
+                break
+
+            groups: Dict[Tuple[str, str], Dict[str, list]] = {}
+            for i, item_id in enumerate(ids):
+                metadata = page["metadatas"][i] or {}
+                key = (metadata.get("database_sid", "unknown"), metadata.get("schema_name", "unknown"))
+                group = groups.setdefault(key, {"ids": [], "embeddings": [], "documents": [], "metadatas": []})
+                group["ids"].append(item_id)
+                group["embeddings"].append(page["embeddings"][i])
+                group["documents"].append(page["documents"][i] if page["documents"] else None)
+                group["metadatas"].append(metadata)
+
+            for (database_sid, schema_name), group in groups.items():
+                target = partitioned.get_collection(
+                    base_name, database_sid, schema_name,
+                    create=True, metadata=source.metadata
+                )
+                target.upsert(**group)
+                copied_key = f"{database_sid}.{schema_name}"
+                copied[copied_key] = copied.get(copied_key, 0) + len(group["ids"])
+
+            offset += len(ids)
+            if len(ids) < _COPY_PAGE_SIZE:
+                break
+
+        return copied
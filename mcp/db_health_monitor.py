@@ -0,0 +1,261 @@
+"""
+* @file mcp/db_health_monitor.py
+* @description
+* 등록된 모든 DB(SID)의 연결 상태를 백그라운드에서 주기적으로 확인하고 결과를 캐시합니다.
+* 대시보드 / DB 목록 API 와 MCP `show_connection_status` Tool 은 요청마다 DB 에 접속하는 대신
+* 이 캐시(상태 / 응답 시간 / 마지막 오류)를 읽습니다.
+*
+* 초보자 가이드:
+* 1. **동시 확인**: SID 마다 스레드 풀에서 동시에 확인하므로 DB 수가 늘어도 한 번의 확인 시간은
+*    가장 느린 DB 하나의 시간과 비슷합니다.
+* 2. **짧은 제한 시간**: 먼저 host:port 로 TCP 연결만 시도(DB_HEALTH_TIMEOUT_SECONDS)하고,
+*    열리면 같은 제한 시간(tcp_connect_timeout)으로 실제 로그인합니다. 응답 없는 호스트가
+*    OS 의 TCP 타임아웃(수십 초~수 분)만큼 화면을 막지 않습니다.
+* 3. **주기**: DB_HEALTH_INTERVAL_SECONDS 마다 전체를 다시 확인합니다. DB 등록/삭제 직후에는
+*    request_refresh() 로 다음 주기를 기다리지 않고 바로 확인합니다.
+*
+* 유지보수 팁:
+* - 제한 시간 안에 끝나지 않은 확인은 "disconnected"(시간 초과)로 기록하고, 그 확인이 끝나기 전에는
+*   같은 SID 를 다시 확인하지 않고 진행 중인 확인을 제한 시간까지만 함께 기다립니다
+*   (멈춘 DB 하나가 스레드를 늘리지 않고, 백그라운드 확인 중인 SID 도 Tool 호출에서 결과를 받도록).
+* - OracleConnector 클래스는 생성자로 주입합니다. Backend 는 mcp 모듈을 importlib 로 불러오므로
+*   이 모듈에서 oracle_connector 를 직접 import 하지 않습니다.
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 전체 확인 주기 / SID 하나의 연결 제한 시간 / 동시 확인 스레드 수
+DB_HEALTH_INTERVAL_SECONDS = float(os.getenv("DB_HEALTH_INTERVAL_SECONDS", "60"))
+DB_HEALTH_TIMEOUT_SECONDS = float(os.getenv("DB_HEALTH_TIMEOUT_SECONDS", "5"))
+DB_HEALTH_MAX_WORKERS = int(os.getenv("DB_HEALTH_MAX_WORKERS", "8"))
+
+STATUS_CONNECTED = "connected"
+STATUS_DISCONNECTED = "disconnected"
+STATUS_UNKNOWN = "unknown"
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def unknown_status(database_sid: str) -> Dict[str, Any]:
+    """아직 확인하지 않은 SID 의 상태"""
+    return {
+        "database_sid": database_sid,
+        "status": STATUS_UNKNOWN,
+        "latency_ms": None,
+        "last_error": None,
+        "checked_at": None,
+        "last_connected_at": None,
+        "details": {}
+    }
+
+
+class DBHealthMonitor:
+    """등록된 DB 연결 상태 주기 확인 + 캐시"""
+
+    def __init__(
+        self,
+        credentials_manager,
+        connector_class,
+        interval: Optional[float] = None,
+        timeout: Optional[float] = None,
+        max_workers: Optional[int] = None,
+        probe_details: Optional[Callable[[Any], Dict[str, Any]]] = None
+    ):
+        """
+        Args:
+            credentials_manager: CredentialsManager (list_databases / load_credentials)
+            connector_class: OracleConnector 클래스
+            interval: 전체 확인 주기(초) (기본: DB_HEALTH_INTERVAL_SECONDS)
+            timeout: SID 하나의 연결 제한 시간(초) (기본: DB_HEALTH_TIMEOUT_SECONDS)
+            max_workers: 동시 확인 스레드 수 (기본: DB_HEALTH_MAX_WORKERS)
+            probe_details: 연결 성공 시 열린 커넥터로 추가 정보를 모으는 함수 (예: 스키마 목록).
+                           결과는 상태의 "details" 에 저장됩니다.
+        """
+        self.credentials_manager = credentials_manager
+        self.connector_class = connector_class
+        self.interval = interval if interval is not None else DB_HEALTH_INTERVAL_SECONDS
+        self.timeout = timeout if timeout is not None else DB_HEALTH_TIMEOUT_SECONDS
+        self.probe_details = probe_details
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers or DB_HEALTH_MAX_WORKERS),
+            thread_name_prefix="db-health"
+        )
+        # 완료 콜백이 submit 한 스레드에서 바로 실행될 수 있으므로 RLock
+        self._lock = threading.RLock()
+        self._statuses: Dict[str, Dict[str, Any]] = {}
+        self._in_flight: Dict[str, Future] = {}
+
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # 수명 주기
+    # ------------------------------------------------------------------
+    def start(self):
+        """백그라운드 확인 스레드 시작 (첫 확인은 바로 실행)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="db-health-monitor", daemon=True)
+        self._thread.start()
+        logger.info(f"DB 상태 모니터 시작 (주기 {self.interval:g}초, 제한 시간 {self.timeout:g}초)")
+
+    def stop(self):
+        """확인 스레드 종료 (진행 중인 확인은 기다리지 않음)"""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=self.timeout + 1)
+            self._thread = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def request_refresh(self):
+        """다음 주기를 기다리지 않고 곧바로 전체 확인 (DB 등록/삭제 직후)"""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"DB 상태 확인 실패: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    def get_status(self, database_sid: str) -> Dict[str, Any]:
+        """캐시된 상태 (아직 확인 전이면 status="unknown")"""
+        with self._lock:
+            status = self._statuses.get(database_sid)
+            return dict(status) if status else unknown_status(database_sid)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """모든 SID 의 캐시된 상태"""
+        with self._lock:
+            return {sid: dict(status) for sid, status in self._statuses.items()}
+
+    # ------------------------------------------------------------------
+    # 확인
+    # ------------------------------------------------------------------
+    def refresh(self, database_sids: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        지정한 SID(기본: 등록된 전체)를 동시에 확인하고 캐시를 갱신
+
+        SID 하나당 최대 2 * timeout(TCP 확인 + 로그인) 만 기다립니다.
+
+        Returns:
+            갱신 후 snapshot()
+        """
+        if database_sids is None:
+            database_sids = self.credentials_manager.list_databases()
+            with self._lock:
+                # 삭제된 SID 정리
+                for sid in set(self._statuses) - set(database_sids):
+                    del self._statuses[sid]
+
+        # 이전 확인이 아직 끝나지 않은 SID 는 다시 확인하지 않고 그 확인을 함께 기다림
+        futures: Dict[Future, str] = {}
+        with self._lock:
+            for sid in database_sids:
+                future = self._in_flight.get(sid)
+                if future is None:
+                    future = self._executor.submit(self._probe, sid)
+                    self._in_flight[sid] = future
+                    future.add_done_callback(lambda f, sid=sid: self._finish(sid, f))
+                futures[future] = sid
+
+        if futures:
+            done, pending = wait(futures, timeout=self.timeout * 2 + 1)
+            with self._lock:
+                # wait() 는 완료 콜백(_finish)보다 먼저 돌아올 수 있으므로 끝난 확인은 여기서도 기록
+                for future in done:
+                    self._finish(futures[future], future)
+                # 대기열에서 아직 시작하지 않은 확인은 이전 상태를 유지하고, 끝나면 _finish 가 기록
+                for future in pending:
+                    if future.running():
+                        sid = futures[future]
+                        self._store(sid, STATUS_DISCONNECTED, None,
+                                    f"health check timed out after {self.timeout * 2 + 1:g}s", {})
+
+        return self.snapshot()
+
+    def _finish(self, database_sid: str, future: Future):
+        with self._lock:
+            if self._in_flight.get(database_sid) is not future:
+                return   # 이미 기록됨 (refresh / 완료 콜백 중 먼저 실행된 쪽)
+            del self._in_flight[database_sid]
+            if future.cancelled():
+                return
+            status, latency_ms, error, details = future.result()
+            self._store(database_sid, status, latency_ms, error, details)
+
+    def _store(self, database_sid: str, status: str, latency_ms: Optional[float],
+               error: Optional[str], details: Dict[str, Any]):
+        previous = self._statuses.get(database_sid) or unknown_status(database_sid)
+        now = _now()
+        self._statuses[database_sid] = {
+            "database_sid": database_sid,
+            "status": status,
+            "latency_ms": latency_ms,
+            "last_error": error,
+            "checked_at": now,
+            "last_connected_at": now if status == STATUS_CONNECTED else previous["last_connected_at"],
+            "details": details
+        }
+        if status != previous["status"]:
+            logger.info(f"DB 상태 변경: {database_sid} {previous['status']} → {status}"
+                        + (f" ({error})" if error else ""))
+
+    def _probe(self, database_sid: str):
+        """(status, latency_ms, last_error, details) — 예외를 밖으로 던지지 않음"""
+        started = time.perf_counter()
+        try:
+            credentials = self.credentials_manager.load_credentials(database_sid)
+            if not credentials:
+                return STATUS_DISCONNECTED, None, "credentials not found", {}
+
+            # 1. TCP 연결만 먼저 확인 (도달 불가 호스트를 짧게 실패시킴)
+            with socket.create_connection((credentials["host"], int(credentials["port"])), timeout=self.timeout):
+                pass
+
+            # 2. 실제 로그인
+            connector = self.connector_class(
+                host=credentials["host"],
+                port=credentials["port"],
+                service_name=credentials["service_name"],
+                user=credentials["user"],
+                password=credentials["password"],
+                tcp_connect_timeout=self.timeout
+            )
+            if not connector.connect():
+                return STATUS_DISCONNECTED, None, connector.last_error or "connection failed", {}
+
+            try:
+                latency_ms = round((time.perf_counter() - started) * 1000, 1)
+                details = {}
+                if self.probe_details:
+                    try:
+                        details = self.probe_details(connector)
+                    except Exception as e:
+                        details = {"error": str(e)}
+                return STATUS_CONNECTED, latency_ms, None, details
+            finally:
+                connector.disconnect()
+
+        except Exception as e:
+            return STATUS_DISCONNECTED, None, str(e) or type(e).__name__, {}
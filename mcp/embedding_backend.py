@@ -0,0 +1,321 @@
+"""
+* @file mcp/embedding_backend.py
+* @description
+* 임베딩 모델 추론 백엔드를 선택하는 모듈입니다.
+*
+* - torch (기본): 기존과 동일하게 sentence-transformers(PyTorch)로 추론합니다.
+* - onnx: 같은 모델을 ONNX로 한 번 변환해 두고 ONNX Runtime(CPU)으로 추론합니다.
+*   선택적으로 동적 int8 양자화 모델을 사용할 수 있습니다.
+*
+* 두 백엔드 모두 SentenceTransformer.encode 와 같은 형태로 호출하므로,
+* 호출하는 쪽(VectorDBClient, EmbeddingService, vectorize_columns.py)은 코드를 바꿀 필요가 없습니다.
+*
+* 초보자 가이드:
+* 1. **load_embedding_model**: 환경 변수에 맞는 모델 객체를 반환합니다.
+* 2. **ONNX 변환 위치**: data/models/onnx/{모델명}/ (model.onnx, model_int8.onnx, 토크나이저, 설정)
+*    최초 1회만 변환하며 이후에는 PyTorch 없이 바로 로드합니다.
+* 3. **check_agreement**: 두 백엔드의 임베딩 코사인 유사도를 비교합니다.
+*    기존 Vector DB 벡터와 호환되는지 `python check_embedding_backend.py` 로 확인하세요.
+*
+* 유지보수 팁:
+* - EMBEDDING_BACKEND=torch | onnx, EMBEDDING_ONNX_QUANTIZE=true, EMBEDDING_NUM_THREADS=N
+* - ONNX 로드/변환에 실패하면 경고 후 torch 백엔드로 자동 전환합니다.
+* - MCP 서버, Backend, vectorize_columns.py 가 같은 함수를 사용합니다 (Backend는 importlib으로 로드).
+"""
+
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BACKEND_TORCH = "torch"
+BACKEND_ONNX = "onnx"
+
+# ONNX 변환 결과가 기존 벡터와 호환된다고 볼 최소 코사인 유사도
+AGREEMENT_THRESHOLD = {False: 0.999, True: 0.99}  # {양자화 여부: 임계값}
+
+_SAMPLE_TEXTS = [
+    "라인별 생산 수량 조회",
+    "테이블: PRODUCTION_PLAN\n컬럼명: LINE_CODE\n한글명: 라인코드",
+    "불량 유형별 검사 결과",
+    "Table: WORK_ORDER\nDescription: work order header",
+    "최근 7일 출하 실적",
+]
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "false").lower() in ("1", "true", "yes")
+
+
+def _safe_model_dir(model_name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+
+
+def _set_torch_threads(num_threads: Optional[int]):
+    if not num_threads:
+        return
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+    except Exception as e:
+        logger.warning(f"torch 스레드 수 설정 실패: {e}")
+
+
+class OnnxEmbeddingModel:
+    """
+    ONNX Runtime 기반 sentence-transformers 호환 임베딩 모델
+
+    Transformer → Pooling(mean / cls) → (Normalize) 파이프라인을 그대로 재현합니다.
+    """
+
+    def __init__(self, export_dir: Path, quantized: bool = False, num_threads: Optional[int] = None):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        with open(export_dir / "embedding_config.json", "r", encoding="utf-8") as f:
+            config = json.load(f)
+
+        self.model_name = config["model_name"]
+        self.max_seq_length = config["max_seq_length"]
+        self.pooling = config["pooling"]
+        self.normalize = config["normalize"]
+        self.embedding_dim = config["embedding_dim"]
+        self.do_lower_case = config.get("do_lower_case", False)
+        self.quantized = quantized
+
+        self.tokenizer = AutoTokenizer.from_pretrained(str(export_dir))
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+            options.inter_op_num_threads = 1
+
+        model_file = export_dir / ("model_int8.onnx" if quantized else "model.onnx")
+        self.session = ort.InferenceSession(
+            str(model_file),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.embedding_dim
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        # sentence-transformers Transformer.tokenize 와 같은 전처리
+        texts = [str(t).strip() for t in texts]
+        if self.do_lower_case:
+            texts = [t.lower() for t in texts]
+
+        tokens = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_seq_length,
+            return_tensors="np"
+        )
+        inputs = {
+            name: tokens[name].astype(np.int64)
+            for name in ("input_ids", "attention_mask", "token_type_ids")
+            if name in self._input_names and name in tokens
+        }
+        if "token_type_ids" in self._input_names and "token_type_ids" not in inputs:
+            inputs["token_type_ids"] = np.zeros_like(inputs["input_ids"])
+
+        hidden = self.session.run(None, inputs)[0]  # (batch, seq, dim)
+
+        if self.pooling == "cls":
+            pooled = hidden[:, 0]
+        else:
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+        if self.normalize:
+            norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+            pooled = pooled / np.clip(norms, 1e-12, None)
+
+        return pooled.astype(np.float32)
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+        convert_to_numpy: bool = True,
+        normalize_embeddings: bool = False,
+        **kwargs
+    ) -> np.ndarray:
+        """SentenceTransformer.encode 호환 (문자열 1개면 1차원, 리스트면 2차원 배열 반환)"""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        if not texts:
+            return np.zeros((0, self.embedding_dim), dtype=np.float32)
+
+        # 길이순 정렬로 배치 내 패딩 최소화 (sentence-transformers 와 같은 방식)
+        order = sorted(range(len(texts)), key=lambda i: -len(texts[i]))
+        embeddings = np.empty((len(texts), self.embedding_dim), dtype=np.float32)
+
+        for start in range(0, len(order), batch_size):
+            batch_index = order[start:start + batch_size]
+            embeddings[batch_index] = self._encode_batch([texts[i] for i in batch_index])
+
+        if normalize_embeddings and not self.normalize:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+
+        return embeddings[0] if single else embeddings
+
+
+def export_onnx_model(model_name: str, export_dir: Path, quantize: bool = False) -> Path:
+    """
+    sentence-transformers 모델을 ONNX 로 변환 (이미 있으면 건너뜀)
+
+    Returns:
+        변환 결과 디렉토리
+    """
+    config_path = export_dir / "embedding_config.json"
+    model_path = export_dir / "model.onnx"
+    quantized_path = export_dir / "model_int8.onnx"
+
+    if not (config_path.exists() and model_path.exists()):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        logger.info(f"ONNX 변환 중: {model_name} → {export_dir}")
+        st_model = SentenceTransformer(model_name, device="cpu")
+
+        transformer = st_model[0]
+        pooling = "mean"
+        normalize = False
+        for module in list(st_model)[1:]:
+            module_type = type(module).__name__
+            if module_type == "Pooling":
+                if getattr(module, "pooling_mode_cls_token", False):
+                    pooling = "cls"
+                elif not getattr(module, "pooling_mode_mean_tokens", True):
+                    raise ValueError(f"지원하지 않는 pooling 방식: {module.get_pooling_mode_str()}")
+            elif module_type == "Normalize":
+                normalize = True
+            else:
+                raise ValueError(f"지원하지 않는 모듈: {module_type}")
+
+        export_dir.mkdir(parents=True, exist_ok=True)
+        auto_model = transformer.auto_model.eval()
+        tokenizer = transformer.tokenizer
+
+        sample = tokenizer(["ONNX export sample"], return_tensors="pt")
+        input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+        tmp_path = export_dir / "model.onnx.tmp"
+        export_kwargs = dict(
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+            do_constant_folding=True
+        )
+        with torch.no_grad():
+            args = (auto_model, tuple(sample[name] for name in input_names), str(tmp_path))
+            try:
+                # torch 2.5+ 는 기본이 dynamo exporter 이므로 TorchScript exporter 를 명시
+                torch.onnx.export(*args, dynamo=False, **export_kwargs)
+            except TypeError:
+                torch.onnx.export(*args, **export_kwargs)
+        os.replace(tmp_path, model_path)
+
+        tokenizer.save_pretrained(str(export_dir))
+        with open(config_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "model_name": model_name,
+                "max_seq_length": st_model.max_seq_length,
+                "pooling": pooling,
+                "normalize": normalize,
+                "do_lower_case": bool(getattr(transformer, "do_lower_case", False)),
+                "embedding_dim": st_model.get_sentence_embedding_dimension()
+            }, f, ensure_ascii=False, indent=2)
+        logger.info(f"✓ ONNX 변환 완료: {model_path}")
+
+    if quantize and not quantized_path.exists():
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        logger.info(f"ONNX 동적 int8 양자화 중: {quantized_path}")
+        quantize_dynamic(str(model_path), str(quantized_path), weight_type=QuantType.QInt8)
+        logger.info(f"✓ 양자화 완료: {quantized_path}")
+
+    return export_dir
+
+
+def load_embedding_model(
+    model_name: str,
+    project_root: Path,
+    backend: Optional[str] = None,
+    quantize: Optional[bool] = None,
+    num_threads: Optional[int] = None
+):
+    """
+    임베딩 모델 로드 (SentenceTransformer 또는 OnnxEmbeddingModel)
+
+    Args:
+        model_name: sentence-transformers 모델 이름
+        project_root: 프로젝트 루트 (ONNX 변환 결과 저장 위치 기준)
+        backend: "torch" | "onnx" (None이면 EMBEDDING_BACKEND, 기본 torch)
+        quantize: ONNX 동적 int8 양자화 사용 (None이면 EMBEDDING_ONNX_QUANTIZE)
+        num_threads: intra-op 스레드 수 (None이면 EMBEDDING_NUM_THREADS, 미설정 시 라이브러리 기본값)
+    """
+    backend = (backend or os.getenv("EMBEDDING_BACKEND", BACKEND_TORCH)).lower()
+    if quantize is None:
+        quantize = _env_flag("EMBEDDING_ONNX_QUANTIZE")
+    if num_threads is None and os.getenv("EMBEDDING_NUM_THREADS"):
+        num_threads = int(os.getenv("EMBEDDING_NUM_THREADS"))
+
+    if backend == BACKEND_ONNX:
+        export_dir = Path(project_root) / "data" / "models" / "onnx" / _safe_model_dir(model_name)
+        try:
+            export_onnx_model(model_name, export_dir, quantize=quantize)
+            model = OnnxEmbeddingModel(export_dir, quantized=quantize, num_threads=num_threads)
+            logger.info(
+                f"✓ ONNX Runtime 임베딩 백엔드 사용 ({'int8' if quantize else 'fp32'}, "
+                f"threads={num_threads or 'auto'})"
+            )
+            return model
+        except Exception as e:
+            logger.warning(f"ONNX 백엔드 사용 불가, torch 백엔드로 전환: {e}")
+
+    from sentence_transformers import SentenceTransformer
+
+    _set_torch_threads(num_threads)
+    return SentenceTransformer(model_name)
+
+
+def check_agreement(
+    reference_model,
+    candidate_model,
+    texts: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    두 모델 임베딩의 코사인 유사도 비교 (기존 벡터와의 호환성 확인용)
+
+    Returns:
+        {"min_cosine", "mean_cosine", "count"}
+    """
+    texts = texts or _SAMPLE_TEXTS
+    reference = np.asarray(reference_model.encode(texts, show_progress_bar=False), dtype=np.float32)
+    candidate = np.asarray(candidate_model.encode(texts, show_progress_bar=False), dtype=np.float32)
+
+    cosine = (reference * candidate).sum(axis=1) / (
+        np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1) + 1e-12
+    )
+    return {
+        "min_cosine": float(cosine.min()),
+        "mean_cosine": float(cosine.mean()),
+        "count": len(texts)
+    }
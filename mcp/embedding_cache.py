@@ -0,0 +1,375 @@
+"""
+* @file mcp/embedding_cache.py
+* @description
+* 자연어 질의 임베딩 LRU 캐시입니다.
+* 같은 질문을 search_tables / search_columns 에서 반복해서 인코딩하지 않도록
+* (모델명 + 정규화된 질의 텍스트)를 키로 임베딩을 보관합니다.
+*
+* 초보자 가이드:
+* 1. **get_or_compute**: 캐시에 있으면 바로 반환, 없으면 encode 함수를 호출한 뒤 저장합니다.
+* 2. **persist_path**: 지정하면 JSON 파일로 저장/복원하여 프로세스 재시작 후에도 재사용합니다.
+* 3. **stats**: hits / misses / hit_rate 로 캐시 효율을 확인합니다.
+* 4. **EmbeddingStore**: 문서(요약 텍스트) 임베딩의 디스크 캐시입니다. sha256(모델명 + 텍스트)를 키로
+*    float32 바이트를 SQLite(data/cache/embeddings.sqlite3)에 저장합니다. 벡터화/메타데이터 처리 도구가
+*    모델을 호출하기 전에 조회하므로, 전체 재생성 때도 실제로 바뀐 텍스트만 임베딩합니다.
+*
+* 유지보수 팁:
+* - MCP 서버(VectorDBClient)와 Backend(EmbeddingService)가 같은 클래스를 사용합니다.
+*   질의 캐시 키의 모델명도 model_cache_key() 로 만들어 torch / ONNX 결과가 섞이지 않게 합니다.
+*   Backend는 importlib으로 이 파일을 로드합니다.
+* - EMBEDDING_STORE_ENABLED=false 로 디스크 캐시를 끌 수 있습니다.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """캐시 키용 질의 정규화 (유니코드 NFC + 공백 정리)"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text or "")).strip()
+
+
+class QueryEmbeddingCache:
+    """(모델명, 질의) → 임베딩 LRU 캐시"""
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        persist_path: Optional[str] = None,
+        persist_every: int = 50
+    ):
+        """
+        Args:
+            max_size: 최대 보관 항목 수 (초과 시 가장 오래 사용하지 않은 항목 제거)
+            persist_path: 디스크 저장 경로 (None이면 메모리 전용)
+            persist_every: 새 항목이 이 수만큼 쌓일 때마다 디스크에 저장 (나머지는 종료 시 flush)
+        """
+        self.max_size = max(1, max_size)
+        self.persist_path = Path(persist_path) if persist_path else None
+        self.persist_every = max(1, persist_every)
+
+        self._entries: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # 저장은 한 번에 하나씩 (put 이 _lock 을 기다리지 않도록 별도 잠금)
+        self._save_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._dirty = 0
+
+        if self.persist_path:
+            self._load()
+
+    # ------------------------------------------------------------------
+    # 조회 / 저장
+    # ------------------------------------------------------------------
+    def get(self, model_name: str, text: str) -> Optional[List[float]]:
+        key = (model_name, normalize_query(text))
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return embedding
+
+    def put(self, model_name: str, text: str, embedding: List[float]):
+        key = (model_name, normalize_query(text))
+        with self._lock:
+            self._entries[key] = list(embedding)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            self._dirty += 1
+            should_save = self.persist_path is not None and self._dirty >= self.persist_every
+
+        if should_save:
+            self.save()
+
+    def get_or_compute(
+        self,
+        model_name: str,
+        text: str,
+        compute: Callable[[str], List[float]]
+    ) -> List[float]:
+        """캐시 조회 후 없으면 compute(text)로 생성하여 저장"""
+        embedding = self.get(model_name, text)
+        if embedding is None:
+            embedding = list(compute(text))
+            self.put(model_name, text, embedding)
+        return embedding
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+            self._dirty = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0
+            }
+
+    # ------------------------------------------------------------------
+    # 디스크 저장
+    # ------------------------------------------------------------------
+    def _load(self):
+        if not self.persist_path.exists():
+            return
+        try:
+            with open(self.persist_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for item in data.get("entries", [])[-self.max_size:]:
+                self._entries[(item["model"], item["text"])] = item["embedding"]
+            logger.info(f"✓ 질의 임베딩 캐시 로드: {len(self._entries)}개 ({self.persist_path})")
+        except Exception as e:
+            logger.warning(f"질의 임베딩 캐시 로드 실패: {e}")
+
+    def save(self):
+        """
+        디스크에 저장 (고유한 임시 파일에 쓴 뒤 교체)
+
+        Backend 와 MCP 서버가 같은 파일을 쓰므로 임시 파일 이름을 프로세스/호출마다 다르게 만들어
+        동시에 저장해도 파일이 섞이지 않습니다 (마지막으로 교체한 쪽이 남음).
+        """
+        if self.persist_path is None:
+            return
+
+        with self._save_lock:
+            with self._lock:
+                entries = [
+                    {"model": model, "text": text, "embedding": embedding}
+                    for (model, text), embedding in self._entries.items()
+                ]
+                self._dirty = 0
+
+            tmp_path = None
+            try:
+                self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+                with tempfile.NamedTemporaryFile(
+                    "w",
+                    encoding="utf-8",
+                    dir=self.persist_path.parent,
+                    prefix=self.persist_path.name + ".",
+                    suffix=".tmp",
+                    delete=False
+                ) as f:
+                    tmp_path = f.name
+                    json.dump({"entries": entries}, f, ensure_ascii=False)
+                os.replace(tmp_path, self.persist_path)
+            except Exception as e:
+                logger.warning(f"질의 임베딩 캐시 저장 실패: {e}")
+                if tmp_path and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+    def flush(self):
+        """마지막 저장 이후 추가된 항목이 있으면 저장 (프로세스 종료 시 호출)"""
+        with self._lock:
+            dirty = self._dirty
+        if dirty and self.persist_path is not None:
+            self.save()
+
+
+def create_query_cache_from_env(project_root: Path) -> QueryEmbeddingCache:
+    """
+    환경 변수로 캐시 생성
+
+    - QUERY_EMBEDDING_CACHE_SIZE: 최대 항목 수 (기본 1024)
+    - QUERY_EMBEDDING_CACHE_PERSIST: "true"면 data/cache/query_embeddings.json 에 저장
+    """
+    max_size = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
+    persist = os.getenv("QUERY_EMBEDDING_CACHE_PERSIST", "false").lower() in ("1", "true", "yes")
+    persist_path = str(project_root / "data" / "cache" / "query_embeddings.json") if persist else None
+    return QueryEmbeddingCache(max_size=max_size, persist_path=persist_path)
+
+
+def model_cache_key(model: Any, model_name: str) -> str:
+    """
+    디스크 캐시 키에 사용할 모델 식별자
+
+    ONNX(특히 int8 양자화) 추론 결과는 PyTorch 결과와 미세하게 다르므로 백엔드별로 키 공간을 나눕니다.
+    """
+    if hasattr(model, "session"):  # embedding_backend.OnnxEmbeddingModel
+        return f"{model_name}#onnx{'-int8' if getattr(model, 'quantized', False) else ''}"
+    return model_name
+
+
+class EmbeddingStore:
+    """
+    내용 주소 기반(content-addressed) 문서 임베딩 디스크 캐시
+
+    키: sha256(모델명 + "\0" + 텍스트), 값: float32 바이트 (SQLite BLOB)
+    여러 프로세스(MCP 서버, Backend, 벡터화 스크립트)가 같은 파일을 동시에 사용할 수 있도록 WAL 모드를 사용합니다.
+    """
+
+    # SQLite IN 절 변수 개수 제한 대비 조회 단위
+    _LOOKUP_CHUNK = 500
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "  key BLOB PRIMARY KEY,"
+            "  model TEXT NOT NULL,"
+            "  dim INTEGER NOT NULL,"
+            "  vector BLOB NOT NULL"
+            ")"
+        )
+        self._conn.commit()
+
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def _key(model_name: str, text: str) -> bytes:
+        return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).digest()
+
+    def get_many(self, model_name: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """텍스트별 저장된 임베딩 (없으면 None)"""
+        keys = [self._key(model_name, text) for text in texts]
+        found: Dict[bytes, List[float]] = {}
+
+        with self._lock:
+            for start in range(0, len(keys), self._LOOKUP_CHUNK):
+                chunk = list(set(keys[start:start + self._LOOKUP_CHUNK]))
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    found[key] = vector.tolist()
+
+            result = [found.get(key) for key in keys]
+            hits = sum(1 for r in result if r is not None)
+            self._hits += hits
+            self._misses += len(result) - hits
+
+        return result
+
+    def put_many(self, model_name: str, texts: Sequence[str], embeddings: Sequence[Sequence[float]]):
+        rows = [
+            (self._key(model_name, text), model_name, len(embedding), array("f", embedding).tobytes())
+            for text, embedding in zip(texts, embeddings)
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, dim, vector) VALUES (?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    def encode(
+        self,
+        model: Any,
+        model_name: str,
+        texts: Sequence[str],
+        batch_size: int = 32
+    ) -> List[List[float]]:
+        """
+        캐시 조회 후 없는 텍스트만 모델로 batched encode 하여 저장
+
+        Args:
+            model: SentenceTransformer.encode 호환 객체
+            model_name: 캐시 키에 사용할 모델 이름
+            texts: 임베딩할 텍스트 목록 (순서 유지)
+        """
+        model_name = model_cache_key(model, model_name)
+        embeddings = self.get_many(model_name, texts)
+
+        # 같은 텍스트가 여러 번 있으면 한 번만 인코딩
+        missing: Dict[str, List[int]] = {}
+        for i, embedding in enumerate(embeddings):
+            if embedding is None:
+                missing.setdefault(texts[i], []).append(i)
+
+        if missing:
+            missing_texts = list(missing.keys())
+            encoded = model.encode(
+                missing_texts,
+                batch_size=batch_size,
+                show_progress_bar=False
+            ).tolist()
+            self.put_many(model_name, missing_texts, encoded)
+            for text, embedding in zip(missing_texts, encoded):
+                for i in missing[text]:
+                    embeddings[i] = embedding
+
+        return embeddings
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            total = self._hits + self._misses
+            return {
+                "entries": count,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def create_embedding_store_from_env(project_root: Path) -> Optional[EmbeddingStore]:
+    """
+    환경 변수로 문서 임베딩 디스크 캐시 생성
+
+    - EMBEDDING_STORE_ENABLED: "false"면 사용 안 함 (기본 true)
+    - 저장 위치: data/cache/embeddings.sqlite3
+    """
+    enabled = os.getenv("EMBEDDING_STORE_ENABLED", "true").lower() in ("1", "true", "yes")
+    if not enabled:
+        return None
+    try:
+        return EmbeddingStore(str(project_root / "data" / "cache" / "embeddings.sqlite3"))
+    except Exception as e:
+        logger.warning(f"임베딩 디스크 캐시 사용 불가: {e}")
+        return None
+
+
+def encode_documents(
+    store: Optional[EmbeddingStore],
+    model: Any,
+    model_name: str,
+    texts: Sequence[str],
+    batch_size: int = 32
+) -> List[List[float]]:
+    """디스크 캐시가 있으면 캐시를 거쳐, 없으면 바로 모델로 문서 임베딩 생성"""
+    if not texts:
+        return []
+    if store is not None:
+        return store.encode(model, model_name, texts, batch_size=batch_size)
+    return model.encode(list(texts), batch_size=batch_size, show_progress_bar=False).tolist()
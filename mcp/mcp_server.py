@@ -1,12 +1,14 @@
 """
 Oracle Database MCP 서버 메인
-18개 Tools 제공
+19개 Tools 제공
 - SQL 생성/실행 Tools (9개)
 - 메타데이터 조회 Tools (6개)
-- Vector DB 기반 검색 Tools (2개) ★ 컬럼 검색 추가
+- Vector DB 기반 검색 Tools (3개) ★ 컬럼 검색, 배치 검색 추가
 - 유틸리티 Tools (1개)
 """
 
+import asyncio
+import atexit
 import os
 import sys
 import logging
@@ -33,6 +35,7 @@ from metadata_manager import MetadataManager
 from sql_executor import SQLExecutor
 from vector_db_client import get_vector_db
 from feedback_manager import FeedbackManager
+from db_health_monitor import DBHealthMonitor, STATUS_CONNECTED, STATUS_UNKNOWN
 
 # 로깅 설정
 logging.basicConfig(
@@ -54,11 +57,14 @@ vector_db_dir = data_dir / "vector_db"
 # 전역 객체들
 credentials_manager = CredentialsManager(credentials_dir=str(credentials_dir))
 metadata_manager = MetadataManager(
-    metadata_dir=str(metadata_dir)
+    metadata_dir=str(metadata_dir),
+    storage=os.getenv("METADATA_STORAGE", MetadataManager.STORAGE_DIRECTORY)
 )
 
 # Vector DB 클라이언트 (피드백 시스템에 사용)
 vector_db_client = get_vector_db()
+# 질의 임베딩 캐시는 일정 개수마다만 저장되므로 종료 시 남은 항목을 저장
+atexit.register(vector_db_client.query_cache.flush)
 
 # 피드백 매니저 초기화
 feedback_manager = FeedbackManager(vector_db_client)
@@ -66,6 +72,10 @@ feedback_manager = FeedbackManager(vector_db_client)
 # DB 커넥터 캐시
 db_connectors = {}
 
+# DB 연결 상태 모니터 (연결 여부만 확인, show_connection_status 를 처음 호출할 때 시작)
+# Backend 도 자체 모니터를 돌리므로 MCP 서버는 상태 조회를 쓰지 않으면 DB 에 접속하지 않습니다.
+db_health_monitor = DBHealthMonitor(credentials_manager, OracleConnector)
+
 
 def get_connector(database_sid: str) -> OracleConnector:
     """DB 커넥터 가져오기 (캐싱)"""
@@ -86,6 +96,25 @@ def get_connector(database_sid: str) -> OracleConnector:
     return db_connectors[database_sid]
 
 
+def list_schemas_now(database_sid: str) -> list:
+    """스키마 목록을 짧은 제한 시간의 일회성 연결로 조회 (show_connection_status 용)"""
+    credentials = credentials_manager.load_credentials(database_sid)
+    connector = OracleConnector(
+        host=credentials['host'],
+        port=credentials['port'],
+        service_name=credentials['service_name'],
+        user=credentials['user'],
+        password=credentials['password'],
+        tcp_connect_timeout=db_health_monitor.timeout
+    )
+    if not connector.connect():
+        raise RuntimeError(connector.last_error or "connection failed")
+    try:
+        return connector.list_schemas()
+    finally:
+        connector.disconnect()
+
+
 # ============================================
 # Tools 목록 등록
 # ============================================
@@ -227,7 +256,8 @@ async def list_tools() -> list:
                 "properties": {
                     "database_sid": {"type": "string", "description": "Database SID"},
                     "schema_name": {"type": "string", "description": "스키마 이름"},
-                    "natural_query": {"type": "string", "description": "자연어 질문"}
+                    "natural_query": {"type": "string", "description": "자연어 질문"},
+                    "use_learned_patterns": {"type": "boolean", "description": "검증된 학습 SQL 이 있으면 바로 반환 (기본값: true, false 면 항상 테이블 검색)"}
                 },
                 "required": ["database_sid", "schema_name"]
             }
@@ -294,6 +324,29 @@ async def list_tools() -> list:
                 "required": ["database_sid", "schema_name", "query"]
             }
         ),
+        types.Tool(
+            name="search_multiple_questions",
+            description="★ 여러 자연어 질문을 한 번에 검색 (테이블/컬럼, 배치 임베딩 + 단일 Vector DB 조회)",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "database_sid": {"type": "string", "description": "Database SID"},
+                    "schema_name": {"type": "string", "description": "스키마 이름"},
+                    "questions": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "자연어 질문/검색어 목록 (예: ['라인별 생산량', '불량 유형'])"
+                    },
+                    "target": {
+                        "type": "string",
+                        "enum": ["tables", "columns", "both"],
+                        "description": "검색 대상 (기본값: tables)"
+                    },
+                    "n_results": {"type": "integer", "description": "질문당 반환할 결과 수 (기본값: 5)"}
+                },
+                "required": ["database_sid", "schema_name", "questions"]
+            }
+        ),
         types.Tool(
             name="generate_and_review_sql",
             description="★ SQL 생성 후 미리보기 (검토 기능 포함) - 옵션 A",
@@ -303,7 +356,8 @@ async def list_tools() -> list:
                     "database_sid": {"type": "string", "description": "Database SID"},
                     "schema_name": {"type": "string", "description": "스키마 이름"},
                     "natural_query": {"type": "string", "description": "자연어 질문 (예: 'Run Card의 당일 생산 계획수량을 모델별로 합계해서 보여줘')"},
-                    "created_by": {"type": "string", "description": "사용자 정보 (선택)"}
+                    "created_by": {"type": "string", "description": "사용자 정보 (선택)"},
+                    "use_learned_patterns": {"type": "boolean", "description": "검증된 학습 SQL 이 있으면 재사용 (기본값: true, false 면 항상 새로 생성)"}
                 },
                 "required": ["database_sid", "schema_name", "natural_query"]
             }
@@ -396,6 +450,8 @@ async def handle_call_tool(name: str, arguments: dict):
             result = await update_sql_rules(**arguments)
         elif name == "search_columns":
             result = await search_columns(**arguments)
+        elif name == "search_multiple_questions":
+            result = await search_multiple_questions(**arguments)
         elif name == "generate_and_review_sql":
             result = await generate_and_review_sql(**arguments)
         elif name == "submit_sql_feedback":
@@ -626,6 +682,7 @@ async def connect_database(
             # 캐시에서 커넥터 제거 (새로 연결하도록)
             if database_sid in db_connectors:
                 del db_connectors[database_sid]
+            db_health_monitor.request_refresh()
 
             return [{
                 "type": "text",
@@ -694,6 +751,23 @@ async def show_connection_status() -> list[dict]:
                 "text": "등록된 데이터베이스가 없습니다."
             }]
 
+        # 첫 호출 시 모니터 시작, 아직 확인하지 않은 DB 만 지금 동시에 확인 (나머지는 캐시 사용)
+        db_health_monitor.start()
+        statuses = db_health_monitor.snapshot()
+        unchecked = [sid for sid in databases if sid not in statuses]
+        if unchecked:
+            statuses = await asyncio.to_thread(db_health_monitor.refresh, unchecked)
+
+        # 연결 가능한 DB 의 스키마 목록은 호출 시점에 동시에 조회
+        connected = [
+            sid for sid in databases
+            if (statuses.get(sid) or {}).get("status") == STATUS_CONNECTED
+        ]
+        schema_results = dict(zip(connected, await asyncio.gather(
+            *(asyncio.to_thread(list_schemas_now, sid) for sid in connected),
+            return_exceptions=True
+        )))
+
         result_text = f"📊 **데이터베이스 연결 상태 보고**\n\n"
         result_text += f"등록된 데이터베이스: **{len(databases)}개**\n\n"
         result_text += "=" * 60 + "\n\n"
@@ -710,36 +784,27 @@ async def show_connection_status() -> list[dict]:
                 result_text += f"- **사용자**: {credentials['user']}\n"
                 result_text += f"- **비밀번호**: {'*' * len(credentials['password'])}\n\n"
 
-                # 2. 연결 테스트
-                try:
-                    connector = OracleConnector(
-                        host=credentials['host'],
-                        port=credentials['port'],
-                        service_name=credentials['service_name'],
-                        user=credentials['user'],
-                        password=credentials['password']
-                    )
-                    if connector.connect():
-                        result_text += f"- **연결 상태**: ✅ 연결 가능\n\n"
-
-                        # 3. 스키마 목록 조회
-                        try:
-                            schemas = connector.list_schemas()
-                            result_text += f"### 📂 스키마 목록\n"
-                            result_text += f"- **스키마 수**: {len(schemas)}개\n"
-                            result_text += f"- **목록**: {', '.join(schemas[:5])}"
-                            if len(schemas) > 5:
-                                result_text += f" 외 {len(schemas) - 5}개"
-                            result_text += "\n\n"
-                        except Exception as e:
-                            result_text += f"### 📂 스키마 목록\n"
-                            result_text += f"- ⚠️ 조회 실패: {str(e)}\n\n"
-
-                        connector.disconnect()
+                # 2. 연결 상태 (백그라운드 모니터 캐시)
+                health = statuses.get(db_sid) or db_health_monitor.get_status(db_sid)
+                checked = f" (확인: {health['checked_at']})" if health["checked_at"] else ""
+                if health["status"] == STATUS_CONNECTED:
+                    result_text += f"- **연결 상태**: ✅ 연결 가능 ({health['latency_ms']}ms){checked}\n\n"
+
+                    # 3. 스키마 목록
+                    schemas = schema_results.get(db_sid)
+                    result_text += f"### 📂 스키마 목록\n"
+                    if isinstance(schemas, list):
+                        result_text += f"- **스키마 수**: {len(schemas)}개\n"
+                        result_text += f"- **목록**: {', '.join(schemas[:5])}"
+                        if len(schemas) > 5:
+                            result_text += f" 외 {len(schemas) - 5}개"
+                        result_text += "\n\n"
                     else:
-                        result_text += f"- **연결 상태**: ❌ 연결 실패\n\n"
-                except Exception as e:
-                    result_text += f"- **연결 상태**: ❌ 연결 실패 ({str(e)})\n\n"
+                        result_text += f"- ⚠️ 조회 실패: {schemas or 'unknown'}\n\n"
+                elif health["status"] == STATUS_UNKNOWN:
+                    result_text += f"- **연결 상태**: ⏳ 확인 중\n\n"
+                else:
+                    result_text += f"- **연결 상태**: ❌ 연결 실패 ({health['last_error']}){checked}\n\n"
 
                 # 4. Vector DB 메타데이터 상태
                 result_text += f"### 🗂️ 통합 메타데이터 상태\n"
@@ -1072,6 +1137,35 @@ async def execute_sql(
         }]
 
 
+# ============================================
+# 학습된 SQL 패턴 재사용 (의미 기반 답변 캐시)
+# ============================================
+
+def find_reusable_pattern(vector_db, database_sid: str, schema_name: str, natural_query: str):
+    """
+    검증된 학습 SQL 패턴 조회 (없거나 조회 실패 시 None)
+
+    캐시 조회 실패가 SQL 생성 파이프라인을 막지 않도록 예외는 기록만 합니다.
+    """
+    try:
+        return vector_db.find_reusable_pattern(natural_query, database_sid, schema_name)
+    except Exception as e:
+        logger.warning(f"학습 패턴 조회 실패 (일반 검색으로 진행): {e}")
+        return None
+
+
+def format_reused_pattern(pattern: dict) -> str:
+    """재사용 패턴 정보 (마크다운)"""
+    text = f"**학습된 질문**: {pattern['question']}\n"
+    text += f"**패턴 ID**: `{pattern['pattern_id']}`\n"
+    text += f"**유사도**: {pattern['similarity'] * 100:.1f}%\n"
+    text += f"**성공률**: {pattern['success_rate'] * 100:.0f}% ({pattern['use_count']}회 사용)\n"
+    if pattern["tables_used"]:
+        text += f"**사용 테이블**: {', '.join(pattern['tables_used'])}\n"
+    text += f"\n**검증된 SQL**:\n```sql\n{pattern['sql_query']}\n```\n\n"
+    return text
+
+
 # ============================================
 # Tool 10: 자연어 쿼리를 위한 테이블 요약 제공 (Stage 1)
 # ============================================
@@ -1079,13 +1173,15 @@ async def execute_sql(
 async def get_table_summaries_for_query(
     database_sid: str,
     schema_name: str,
-    natural_query: str = ""
+    natural_query: str = "",
+    use_learned_patterns: bool = True
 ) -> list[dict]:
     """
     Vector DB 기반 테이블 요약 정보 제공 (Stage 1)
 
     Backend 없이 vector_db/ 폴더에서 직접 ChromaDB 읽기
     의미 기반 검색으로 관련 테이블 찾기
+    ★ 비슷한 질문의 검증된 SQL 이 학습되어 있으면 테이블 검색 없이 그 SQL 을 바로 반환
     """
     try:
         vector_db = get_vector_db()
@@ -1114,6 +1210,22 @@ async def get_table_summaries_for_query(
                 )
             }]
 
+        # 검증된 학습 SQL 이 있으면 Stage 1/2 와 SQL 생성을 건너뜀
+        pattern = find_reusable_pattern(vector_db, database_sid, schema_name, natural_query) \
+            if use_learned_patterns else None
+        if pattern:
+            result_text = f"♻️ **검증된 SQL 재사용** (학습 패턴)\n\n"
+            result_text += f"**질문**: {natural_query}\n\n"
+            result_text += f"**Database**: {database_sid}\n"
+            result_text += f"**Schema**: {schema_name}\n\n"
+            result_text += format_reused_pattern(pattern)
+            result_text += "---\n\n"
+            result_text += "**다음 단계**:\n"
+            result_text += "1. 질문과 의도가 같다면 `execute_sql` Tool 로 위 SQL 을 바로 실행하세요.\n"
+            result_text += "2. 조건이 다르면 위 SQL 을 필요한 만큼만 수정해서 실행하세요.\n\n"
+            result_text += "💡 **TIP**: 테이블 검색부터 다시 하려면 `use_learned_patterns: false` 로 호출하세요."
+            return [{"type": "text", "text": result_text}]
+
         # Vector DB에서 의미 기반 검색
         tables = vector_db.search_tables(
             question=natural_query,
@@ -1200,6 +1312,19 @@ async def check_vectordb_status() -> list[dict]:
             result_text = "✅ **Vector DB 정상 동작 중**\n\n"
             result_text += f"**위치**: vector_db/\n"
             result_text += f"**테이블 수**: {stats['table_count']}개\n"
+            cache_stats = vector_db.get_cache_stats()
+            result_text += (
+                f"**질의 임베딩 캐시**: {cache_stats['size']}/{cache_stats['max_size']}개, "
+                f"적중률 {cache_stats['hit_rate'] * 100:.1f}% "
+                f"(hit {cache_stats['hits']} / miss {cache_stats['misses']})\n"
+            )
+            if vector_db.partition_index is not None:
+                partition_stats = vector_db.partition_index.stats()
+                result_text += (
+                    f"**검색 방식**: NumPy 파티션 검색 "
+                    f"({partition_stats['partitions']}개 파티션, {partition_stats['rows']}행 로드됨, "
+                    f"컬럼 양자화: {partition_stats['quantization']})\n"
+                )
             result_text += "**상태**: 사용 가능\n"
             result_text += "**Backend**: 불필요 (이미 학습 완료)\n\n"
             result_text += "**사용 가능한 기능**:\n"
@@ -1461,7 +1586,7 @@ async def search_columns(
         vector_db = get_vector_db()
 
         # Vector DB 컬럼 컬렉션 확인
-        if vector_db.columns_collection is None:
+        if not vector_db.has_columns():
             return [{
                 "type": "text",
                 "text": (
@@ -1564,6 +1689,142 @@ async def search_columns(
         }]
 
 
+async def search_multiple_questions(
+    database_sid: str,
+    schema_name: str,
+    questions: list,
+    target: str = "tables",
+    n_results: int = 5
+) -> list[dict]:
+    """
+    ★ 여러 자연어 질문을 한 번에 검색 (배치 검색)
+
+    질문 목록을 한 번의 batched encode로 임베딩하고,
+    대상 컬렉션마다 ChromaDB query를 한 번만 호출합니다.
+    질문마다 search_columns / get_table_summaries_for_query를 반복 호출하는 것보다 빠릅니다.
+
+    Args:
+        database_sid: Database SID
+        schema_name: 스키마 이름
+        questions: 자연어 질문/검색어 목록
+        target: "tables" | "columns" | "both" (기본값: tables)
+        n_results: 질문당 반환할 결과 수 (기본값: 5)
+
+    Returns:
+        질문별 검색 결과
+    """
+    try:
+        vector_db = get_vector_db()
+
+        questions = [q for q in (questions or []) if q and q.strip()]
+        if not questions:
+            return [{
+                "type": "text",
+                "text": "❌ 검색할 질문이 없습니다. questions에 하나 이상의 질문을 입력하세요."
+            }]
+
+        if target not in ("tables", "columns", "both"):
+            return [{
+                "type": "text",
+                "text": f"❌ 잘못된 target: {target} (tables, columns, both 중 선택)"
+            }]
+
+        # ★ 피드백 가중치는 질문과 무관하므로 한 번만 계산
+        table_weights = feedback_manager.get_table_weights(database_sid, schema_name)
+
+        table_results = None
+        column_results = None
+
+        if target in ("tables", "both"):
+            if not vector_db.is_available():
+                return [{
+                    "type": "text",
+                    "text": "❌ 테이블 Vector DB를 사용할 수 없습니다. 메타데이터 벡터화를 먼저 진행하세요."
+                }]
+            table_results = vector_db.search_tables_batch(
+                questions=questions,
+                database_sid=database_sid,
+                schema_name=schema_name,
+                n_results=n_results,
+                weights=table_weights if table_weights else None
+            )
+
+        if target in ("columns", "both"):
+            if not vector_db.has_columns():
+                return [{
+                    "type": "text",
+                    "text": (
+                        "❌ **컬럼 Vector DB를 사용할 수 없습니다**\n\n"
+                        "루트 디렉토리에서 `python vectorize_columns.py`를 실행한 뒤 다시 시도하세요."
+                    )
+                }]
+            column_results = vector_db.search_columns_batch(
+                queries=questions,
+                database_sid=database_sid,
+                schema_name=schema_name,
+                n_results=n_results,
+                table_weights=table_weights if table_weights else None
+            )
+
+        # 결과 포맷팅
+        result_text = f"🔍 **배치 검색 결과** (의미 기반, {len(questions)}개 질문)\n\n"
+        result_text += f"**Database**: {database_sid}\n"
+        result_text += f"**Schema**: {schema_name}\n"
+        result_text += f"**검색 대상**: {target}\n\n"
+
+        for idx, question in enumerate(questions):
+            result_text += f"## {idx + 1}. {question}\n\n"
+
+            if table_results is not None:
+                tables = table_results[idx]
+                result_text += f"**관련 테이블** ({len(tables)}개):\n"
+                if not tables:
+                    result_text += "- (결과 없음)\n"
+                for table in tables:
+                    result_text += f"- **{table['table_name']}**"
+                    if table.get('korean_name'):
+                        result_text += f" ({table['korean_name']})"
+                    result_text += f" - 점수 {table['final_score']:.3f}\n"
+                result_text += "\n"
+
+            if column_results is not None:
+                columns = column_results[idx]
+                result_text += f"**관련 컬럼** ({len(columns)}개):\n"
+                if not columns:
+                    result_text += "- (결과 없음)\n"
+                for col in columns:
+                    result_text += f"- {col['table_name']}.{col['column_name']}"
+                    if col.get('is_pk'):
+                        result_text += " [PK]"
+                    if col.get('korean_name'):
+                        result_text += f" ({col['korean_name']})"
+                    result_text += f" - {col['similarity']}% 유사도\n"
+                result_text += "\n"
+
+        result_text += "---\n\n"
+        result_text += "💡 **TIP**: 여러 질문에 공통으로 등장하는 테이블이 JOIN 후보입니다."
+
+        return [{
+            "type": "text",
+            "text": result_text
+        }]
+
+    except RuntimeError as e:
+        logger.error(f"Vector DB error: {e}")
+        return [{
+            "type": "text",
+            "text": f"❌ Vector DB 오류: {str(e)}"
+        }]
+
+    except Exception as e:
+        import traceback
+        logger.error(f"배치 검색 실패: {e}\n{traceback.format_exc()}")
+        return [{
+            "type": "text",
+            "text": f"❌ 배치 검색 실패: {str(e)}\n\n{traceback.format_exc()}"
+        }]
+
+
 # ============================================
 # Tool: SQL 생성 및 미리보기 (피드백 포함)
 # ============================================
@@ -1572,13 +1833,15 @@ async def generate_and_review_sql(
     database_sid: str,
     schema_name: str,
     natural_query: str,
-    created_by: str = "system"
+    created_by: str = "system",
+    use_learned_patterns: bool = True
 ) -> list[dict]:
     """
     ★ SQL 생성 후 미리보기 (사용자 검토 기능)
 
     자연어 질문을 받아 SQL을 생성하고, 미리보기를 제공합니다.
     사용자가 검토 후 피드백을 제출할 수 있습니다.
+    비슷한 질문의 검증된 SQL 이 학습되어 있으면 테이블/컬럼 검색 없이 그 SQL 을 미리보기로 제공합니다.
     """
     try:
         # Step 1: Vector DB로 관련 테이블/컬럼 검색
@@ -1589,6 +1852,34 @@ async def generate_and_review_sql(
                 "text": "❌ Vector DB를 사용할 수 없습니다. 먼저 벡터화를 완료하세요."
             }]
 
+        # 검증된 학습 SQL 재사용 (테이블/컬럼 검색 및 SQL 생성 생략)
+        pattern = find_reusable_pattern(vector_db, database_sid, schema_name, natural_query) \
+            if use_learned_patterns else None
+        if pattern:
+            feedback_id = feedback_manager.save_sql_generation({
+                "user_query": natural_query,
+                "selected_table": pattern["tables_used"][0] if pattern["tables_used"] else "",
+                "selected_columns": [],
+                "generated_sql": pattern["sql_query"],
+                "database_sid": database_sid,
+                "schema_name": schema_name,
+                "created_by": created_by
+            })
+
+            result_text = f"♻️ **검증된 SQL 재사용** (ID: {feedback_id})\n\n"
+            result_text += f"**사용자 질문**: {natural_query}\n\n"
+            result_text += format_reused_pattern(pattern)
+
+            result_text += f"**다음 단계**:\n"
+            result_text += f"1. `submit_sql_feedback` Tool을 사용하여 다음 중 선택:\n"
+            result_text += f"   - action: 'approve' (승인 후 실행)\n"
+            result_text += f"   - action: 'modify' (수정 제안 후 재생성)\n"
+            result_text += f"   - action: 'reject' (거부)\n"
+            result_text += f"2. 새로 생성하려면 `use_learned_patterns: false` 로 다시 호출하세요.\n\n"
+            result_text += f"**Feedback ID**: `{feedback_id}`\n"
+
+            return [{"type": "text", "text": result_text}]
+
         # 테이블 검색 (가중치 적용)
         table_weights = feedback_manager.get_table_weights(database_sid, schema_name)
         tables = vector_db.search_tables(
@@ -1843,12 +2134,15 @@ async def main():
     logger.info("🚀 Oracle Database MCP 서버 시작")
     logger.info("="*60)
 
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            server.create_initialization_options()
-        )
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                server.create_initialization_options()
+            )
+    finally:
+        db_health_monitor.stop()
 
 
 if __name__ == "__main__":
@@ -1,6 +1,10 @@
 """
 메타정보 관리 모듈
 DB 스키마 정보 + 공통 메타데이터를 통합하여 unified_metadata 생성
+
+저장 방식 (storage):
+- "directory": {sid}/{schema}/{table}/unified_metadata.json (기본값, 기존 방식)
+- "packed": {sid}/{schema}/metadata.pack 단일 파일 (packed_metadata_store 참고)
 """
 
 import json
@@ -10,22 +14,38 @@ from datetime import datetime
 import logging
 import traceback
 
+from packed_metadata_store import PackedMetadataStore
+
 logger = logging.getLogger(__name__)
 
 
 class MetadataManager:
     """통합 메타정보 관리"""
 
-    def __init__(self, metadata_dir: str = "./metadata", common_metadata_manager=None):
+    STORAGE_DIRECTORY = "directory"
+    STORAGE_PACKED = "packed"
+
+    def __init__(
+        self,
+        metadata_dir: str = "./metadata",
+        common_metadata_manager=None,
+        storage: str = STORAGE_DIRECTORY
+    ):
         """
         Args:
             metadata_dir: 메타정보 저장 디렉토리
             common_metadata_manager: CommonMetadataManager 인스턴스
+            storage: 저장 방식 ("directory" 또는 "packed")
         """
+        if storage not in (self.STORAGE_DIRECTORY, self.STORAGE_PACKED):
+            raise ValueError(f"지원하지 않는 storage: {storage}")
+
         self.metadata_dir = Path(metadata_dir)
         self.metadata_dir.mkdir(parents=True, exist_ok=True)
         self.common_metadata_manager = common_metadata_manager
-        logger.info(f"MetadataManager 초기화: {self.metadata_dir}")
+        self.storage = storage
+        self.packed_store = PackedMetadataStore(str(self.metadata_dir)) if storage == self.STORAGE_PACKED else None
+        logger.info(f"MetadataManager 초기화: {self.metadata_dir} (storage={storage})")
 
     def integrate_metadata(
         self,
@@ -163,6 +183,11 @@ class MetadataManager:
         metadata: Dict
     ):
         """통합 메타정보 저장"""
+        if self.packed_store is not None:
+            if self.packed_store.save(database_sid, schema_name, table_name, metadata):
+                logger.info(f"✅ 통합 메타정보 저장 (packed): {database_sid}.{schema_name}.{table_name}")
+            return
+
         table_dir = self.metadata_dir / database_sid / schema_name / table_name
         table_dir.mkdir(parents=True, exist_ok=True)
 
@@ -180,6 +205,12 @@ class MetadataManager:
         table_name: str
     ) -> Dict:
         """통합 메타정보 로드"""
+        if self.packed_store is not None:
+            metadata = self.packed_store.load(database_sid, schema_name, table_name)
+            if metadata is None:
+                raise FileNotFoundError(f"메타정보가 없습니다: {database_sid}.{schema_name}.{table_name}")
+            return metadata
+
         file_path = self.metadata_dir / database_sid / schema_name / table_name / "unified_metadata.json"
 
         if not file_path.exists():
@@ -223,35 +254,11 @@ class MetadataManager:
 
         summaries = []
 
-        for table_dir in schema_dir.iterdir():
-            if not table_dir.is_dir():
-                continue
-
-            metadata_file = table_dir / "unified_metadata.json"
-            if not metadata_file.exists():
-                continue
-
+        for table_name, metadata in self._iter_unified_metadata(database_sid, schema_name):
             try:
-                metadata = self.load_unified_metadata(database_sid, schema_name, table_dir.name)
-
-                # 주요 칼럼 추출 (상위 5개)
-                key_columns = [col['name'] for col in metadata['columns'][:5]]
-
-                # 키워드 추출
-                keywords = []
-                if metadata['table_info']['business_purpose']:
-                    # 간단한 키워드 추출 (실제로는 더 정교한 처리 필요)
-                    keywords = metadata['table_info']['business_purpose'].split()[:5]
-
-                summaries.append({
-                    'table_name': metadata['database']['table'],
-                    'one_line_desc': f"{metadata['table_info']['business_purpose']} ({', '.join(key_columns)} 등 {len(metadata['columns'])}개 칼럼)",
-                    'keywords': keywords,
-                    'primary_use': ', '.join(metadata['table_info']['usage_scenarios'][:2])
-                })
-
+                summaries.append(self._build_table_summary(metadata))
             except Exception as e:
-                logger.error(f"테이블 요약 생성 실패 ({table_dir.name}): {e}\n{traceback.format_exc()}")
+                logger.error(f"테이블 요약 생성 실패 ({table_name}): {e}\n{traceback.format_exc()}")
                 continue
 
         result = {
@@ -270,6 +277,50 @@ class MetadataManager:
 
         return result
 
+    def _iter_unified_metadata(self, database_sid: str, schema_name: str):
+        """스키마의 (테이블명, 통합 메타정보) 순회"""
+        if self.packed_store is not None:
+            yield from self.packed_store.iter_records(database_sid, schema_name)
+            return
+
+        schema_dir = self.metadata_dir / database_sid / schema_name
+        for table_dir in schema_dir.iterdir():
+            if not table_dir.is_dir():
+                continue
+
+            metadata_file = table_dir / "unified_metadata.json"
+            if not metadata_file.exists():
+                continue
+
+            try:
+                yield table_dir.name, self.load_unified_metadata(database_sid, schema_name, table_dir.name)
+            except Exception as e:
+                logger.error(f"메타정보 로드 실패 ({table_dir.name}): {e}")
+                continue
+
+    def _build_table_summary(self, metadata: Dict) -> Dict:
+        """통합 메타정보 → Stage 1 요약 한 건"""
+        # 주요 칼럼 추출 (상위 5개)
+        key_columns = [col['name'] for col in metadata['columns'][:5]]
+
+        # 키워드 추출
+        keywords = []
+        if metadata['table_info']['business_purpose']:
+            # 간단한 키워드 추출 (실제로는 더 정교한 처리 필요)
+            keywords = metadata['table_info']['business_purpose'].split()[:5]
+
+        return {
+            'table_name': metadata['database']['table'],
+            'one_line_desc': f"{metadata['table_info']['business_purpose']} ({', '.join(key_columns)} 등 {len(metadata['columns'])}개 칼럼)",
+            'keywords': keywords,
+            'primary_use': ', '.join(metadata['table_info']['usage_scenarios'][:2])
+        }
+
+    def migrate_to_packed(self, database_sid: str, schema_name: str) -> Dict[str, int]:
+        """디렉토리 구조 메타정보를 팩 파일로 변환 (원본 디렉토리는 유지)"""
+        store = self.packed_store or PackedMetadataStore(str(self.metadata_dir))
+        return store.migrate_from_directory(database_sid, schema_name)
+
     def load_table_summaries(
         self,
         database_sid: str,
@@ -287,6 +338,9 @@ class MetadataManager:
 
     def list_tables(self, database_sid: str, schema_name: str) -> List[str]:
         """스키마의 테이블 목록"""
+        if self.packed_store is not None:
+            return self.packed_store.list_tables(database_sid, schema_name)
+
         schema_dir = self.metadata_dir / database_sid / schema_name
 
         if not schema_dir.exists():
@@ -10,12 +10,22 @@ from contextlib import contextmanager
 
 logger = logging.getLogger(__name__)
 
+# Oracle IN 목록 최대 항목 수 (ORA-01795)
+IN_LIST_CHUNK_SIZE = 1000
+
+# 대상 테이블이 이보다 많으면 IN 목록 대신 스키마 전체를 한 번에 조회 후 메모리에서 필터
+BULK_SCHEMA_SCAN_THRESHOLD = 5000
+
+# 대량 조회 시 fetch 배열 크기 (네트워크 왕복 횟수 감소)
+BULK_FETCH_ARRAYSIZE = 5000
+
 
 class OracleConnector:
     """Oracle Database 연결 관리"""
 
     def __init__(self, host: str, port: int, service_name: str,
-                 user: str, password: str):
+                 user: str, password: str,
+                 tcp_connect_timeout: Optional[float] = None):
         """
         Oracle DB 연결 초기화
 
@@ -25,13 +35,16 @@ class OracleConnector:
             service_name: 서비스명
             user: 사용자명
             password: 비밀번호
+            tcp_connect_timeout: TCP 연결 제한 시간(초). None이면 oracledb 기본값
         """
         self.host = host
         self.port = port
         self.service_name = service_name
         self.user = user
         self.password = password
+        self.tcp_connect_timeout = tcp_connect_timeout
         self.connection = None
+        self.last_error: Optional[str] = None
 
         logger.info(f"OracleConnector 초기화: {host}:{port}/{service_name}")
 
@@ -39,17 +52,23 @@ class OracleConnector:
         """DB 연결"""
         try:
             dsn = f"{self.host}:{self.port}/{self.service_name}"
+            options = {}
+            if self.tcp_connect_timeout is not None:
+                options["tcp_connect_timeout"] = self.tcp_connect_timeout
 
             self.connection = oracledb.connect(
                 user=self.user,
                 password=self.password,
-                dsn=dsn
+                dsn=dsn,
+                **options
             )
 
+            self.last_error = None
             logger.info(f"✅ Oracle DB 연결 성공: {self.service_name}")
             return True
 
         except Exception as e:
+            self.last_error = str(e)
             logger.error(f"❌ Oracle DB 연결 실패: {e}")
             return False
 
@@ -72,19 +91,24 @@ class OracleConnector:
         finally:
             cursor.close()
 
-    def execute_query(self, query: str, params: Dict = None) -> List[Dict[str, Any]]:
+    def execute_query(self, query: str, params: Dict = None,
+                      arraysize: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         SELECT 쿼리 실행
 
         Args:
             query: SQL SELECT 쿼리
             params: 바인딩 파라미터 (딕셔너리)
+            arraysize: fetch 배열 크기 (대량 조회 시 지정하면 왕복 횟수 감소)
 
         Returns:
             결과 행의 리스트 (딕셔너리 형태)
         """
         try:
             with self.get_cursor() as cursor:
+                if arraysize:
+                    cursor.arraysize = arraysize
+                    cursor.prefetchrows = arraysize + 1
                 cursor.execute(query, params or {})
 
                 # 컬럼명 가져오기
@@ -179,6 +203,105 @@ class OracleConnector:
 
         return [row['COLUMN_NAME'] for row in results]
 
+    def _query_by_tables(self, query: str, table_column: str, schema_name: str,
+                         table_names: Optional[List[str]]) -> List[Dict[str, Any]]:
+        """
+        여러 테이블에 대한 딕셔너리 뷰 조회 (테이블당 1회가 아닌 집합 단위)
+
+        query 의 {table_filter} 자리에 테이블 조건을 넣어 실행합니다.
+        - table_names 가 None 이거나 BULK_SCHEMA_SCAN_THRESHOLD 보다 많으면: 스키마 전체 1회 조회
+        - 그 외: IN_LIST_CHUNK_SIZE 단위 IN 목록 (바인드 변수)
+        """
+        names = sorted({name.upper() for name in table_names}) if table_names is not None else None
+
+        if names is None or len(names) > BULK_SCHEMA_SCAN_THRESHOLD:
+            rows = self.execute_query(
+                query.format(table_filter="1 = 1"),
+                {'p_schema': schema_name.upper()},
+                arraysize=BULK_FETCH_ARRAYSIZE
+            )
+            if names is None:
+                return rows
+            wanted = set(names)
+            return [row for row in rows if row['TABLE_NAME'] in wanted]
+
+        rows = []
+        for start in range(0, len(names), IN_LIST_CHUNK_SIZE):
+            chunk = names[start:start + IN_LIST_CHUNK_SIZE]
+            params = {'p_schema': schema_name.upper()}
+            params.update({f"t{i}": name for i, name in enumerate(chunk)})
+            placeholders = ", ".join(f":t{i}" for i in range(len(chunk)))
+            rows.extend(self.execute_query(
+                query.format(table_filter=f"{table_column} IN ({placeholders})"),
+                params,
+                arraysize=BULK_FETCH_ARRAYSIZE
+            ))
+        return rows
+
+    def extract_columns_bulk(self, schema_name: str,
+                             table_names: Optional[List[str]] = None) -> Dict[str, List[Dict]]:
+        """
+        여러 테이블의 칼럼 정보를 한 번에 추출
+
+        Args:
+            schema_name: 스키마 이름
+            table_names: 대상 테이블 목록 (None이면 스키마 전체)
+
+        Returns:
+            {테이블명: extract_table_columns 와 같은 형식의 칼럼 목록}
+        """
+        query = """
+            SELECT
+                c.TABLE_NAME,
+                c.COLUMN_NAME,
+                c.COLUMN_ID,
+                c.DATA_TYPE,
+                c.DATA_LENGTH,
+                c.DATA_PRECISION,
+                c.DATA_SCALE,
+                c.NULLABLE,
+                c.DATA_DEFAULT,
+                cc.COMMENTS
+            FROM ALL_TAB_COLUMNS c
+            LEFT JOIN ALL_COL_COMMENTS cc
+                ON c.OWNER = cc.OWNER
+                AND c.TABLE_NAME = cc.TABLE_NAME
+                AND c.COLUMN_NAME = cc.COLUMN_NAME
+            WHERE c.OWNER = :p_schema
+              AND {table_filter}
+            ORDER BY c.TABLE_NAME, c.COLUMN_ID
+        """
+
+        columns_by_table: Dict[str, List[Dict]] = {}
+        for row in self._query_by_tables(query, "c.TABLE_NAME", schema_name, table_names):
+            columns_by_table.setdefault(row['TABLE_NAME'], []).append(row)
+        return columns_by_table
+
+    def extract_primary_keys_bulk(self, schema_name: str,
+                                  table_names: Optional[List[str]] = None) -> Dict[str, List[str]]:
+        """
+        여러 테이블의 Primary Key 를 한 번에 추출
+
+        Returns:
+            {테이블명: [PK 칼럼명, ...]} (PK가 없는 테이블은 포함되지 않음)
+        """
+        query = """
+            SELECT cons.TABLE_NAME, cols.COLUMN_NAME
+            FROM ALL_CONSTRAINTS cons
+            JOIN ALL_CONS_COLUMNS cols
+                ON cons.CONSTRAINT_NAME = cols.CONSTRAINT_NAME
+                AND cons.OWNER = cols.OWNER
+            WHERE cons.CONSTRAINT_TYPE = 'P'
+              AND cons.OWNER = :p_schema
+              AND {table_filter}
+            ORDER BY cons.TABLE_NAME, cols.POSITION
+        """
+
+        pks_by_table: Dict[str, List[str]] = {}
+        for row in self._query_by_tables(query, "cons.TABLE_NAME", schema_name, table_names):
+            pks_by_table.setdefault(row['TABLE_NAME'], []).append(row['COLUMN_NAME'])
+        return pks_by_table
+
     def extract_foreign_keys(self, schema_name: str, table_name: str) -> List[Dict]:
         """Foreign Key 추출"""
         query = """
@@ -0,0 +1,331 @@
+"""
+* @file mcp/packed_metadata_store.py
+* @description
+* 스키마 단위로 모든 테이블의 통합 메타정보(unified_metadata)를 하나의 파일에 저장하는
+* 패킹 저장소입니다. 테이블마다 디렉토리/JSON 파일을 만드는 기존 방식 대신
+* `{metadata_dir}/{sid}/{schema}/metadata.pack` 한 파일에 레코드를 모아 두고,
+* 오프셋 인덱스로 테이블명 → 레코드 위치를 O(1)로 찾습니다.
+*
+* 파일 구조:
+*   [헤더 32 bytes] MAGIC(4) | VERSION(1) | CODEC(1) | 예약(2) | INDEX_OFFSET(8) | INDEX_LENGTH(8) | 예약(8)
+*   [레코드 영역]   인코딩된 unified_metadata 레코드들 (연속 배치)
+*   [인덱스]        {table_name: [offset, length, content_hash]} (JSON)
+*
+* 초보자 가이드:
+* 1. **읽기**: 파일을 mmap으로 열고 인덱스만 파싱합니다. 레코드는 필요할 때 해당 구간만 디코딩합니다.
+* 2. **쓰기**: 변경된 레코드만 인코딩하여 레코드 영역 끝에 추가하고 인덱스를 다시 씁니다.
+*    내용 해시가 같으면 아무것도 쓰지 않습니다.
+* 3. **압축(compact)**: 덮어쓰기로 생긴 빈 공간이 많아지면 살아있는 레코드만 복사해 파일을 재작성합니다.
+*
+* 유지보수 팁:
+* - msgpack이 설치되어 있으면 레코드를 msgpack으로, 없으면 compact JSON으로 인코딩합니다.
+*   코덱은 헤더에 기록되므로 두 방식으로 만든 파일을 모두 읽을 수 있습니다.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import msgpack
+except ImportError:  # 선택 의존성
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+PACK_FILE_NAME = "metadata.pack"
+
+_MAGIC = b"MDPK"
+_VERSION = 1
+_CODEC_JSON = 0
+_CODEC_MSGPACK = 1
+_HEADER = struct.Struct("<4sBB2xQQ8x")  # 32 bytes
+
+# 전체 레코드 영역 중 죽은 공간이 이 비율을 넘으면 자동으로 compact
+_COMPACT_RATIO = 0.5
+
+
+def _content_hash(metadata: Dict) -> str:
+    """레코드 내용 해시 (변경 감지용, 생성 시각 필드는 제외)"""
+    payload = {k: v for k, v in metadata.items() if k != "metadata_info"}
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class PackedSchemaFile:
+    """단일 스키마의 metadata.pack 파일 (읽기/쓰기)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._mmap: Optional[mmap.mmap] = None
+        self._file = None
+        self._mtime_ns: Optional[int] = None
+        self._codec = _CODEC_MSGPACK if msgpack is not None else _CODEC_JSON
+        self._index_offset = _HEADER.size
+        # table_name -> (offset, length, content_hash)
+        self._index: Dict[str, Tuple[int, int, str]] = {}
+
+    # ------------------------------------------------------------------
+    # 인코딩
+    # ------------------------------------------------------------------
+    def _encode(self, metadata: Dict) -> bytes:
+        if self._codec == _CODEC_MSGPACK:
+            return msgpack.packb(metadata, use_bin_type=True, default=str)
+        return json.dumps(metadata, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+    def _decode(self, raw: bytes) -> Dict:
+        if self._codec == _CODEC_MSGPACK:
+            if msgpack is None:
+                raise RuntimeError(f"msgpack 형식 파일을 읽으려면 msgpack 패키지가 필요합니다: {self.path}")
+            return msgpack.unpackb(raw, raw=False)
+        return json.loads(raw.decode("utf-8"))
+
+    # ------------------------------------------------------------------
+    # 열기 / 닫기
+    # ------------------------------------------------------------------
+    def _close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _refresh(self):
+        """파일이 바뀌었으면 mmap과 인덱스를 다시 읽음"""
+        if not self.path.exists():
+            self._close()
+            self._index = {}
+            self._mtime_ns = None
+            return
+
+        mtime_ns = self.path.stat().st_mtime_ns
+        if self._mmap is not None and mtime_ns == self._mtime_ns:
+            return
+
+        self._close()
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, codec, index_offset, index_length = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self._close()
+            raise ValueError(f"올바른 메타정보 팩 파일이 아닙니다: {self.path}")
+
+        self._codec = codec
+        self._index_offset = index_offset
+        raw_index = self._mmap[index_offset:index_offset + index_length]
+        self._index = {name: tuple(entry) for name, entry in json.loads(raw_index.decode("utf-8")).items()}
+        self._mtime_ns = mtime_ns
+
+    # ------------------------------------------------------------------
+    # 읽기
+    # ------------------------------------------------------------------
+    def table_names(self) -> List[str]:
+        with self._lock:
+            self._refresh()
+            return sorted(self._index.keys())
+
+    def contains(self, table_name: str) -> bool:
+        with self._lock:
+            self._refresh()
+            return table_name in self._index
+
+    def get(self, table_name: str) -> Optional[Dict]:
+        with self._lock:
+            self._refresh()
+            entry = self._index.get(table_name)
+            if entry is None:
+                return None
+            offset, length, _ = entry
+            return self._decode(self._mmap[offset:offset + length])
+
+    def iter_records(self) -> Iterator[Tuple[str, Dict]]:
+        with self._lock:
+            self._refresh()
+            items = sorted(self._index.items(), key=lambda item: item[1][0])
+            records = [(name, self._decode(self._mmap[offset:offset + length])) for name, (offset, length, _) in items]
+        return iter(records)
+
+    # ------------------------------------------------------------------
+    # 쓰기
+    # ------------------------------------------------------------------
+    def _write_header(self, f, index_offset: int, index_length: int):
+        f.seek(0)
+        f.write(_HEADER.pack(_MAGIC, _VERSION, self._codec, index_offset, index_length))
+
+    def _write_index(self, f, index_offset: int, index: Dict[str, Tuple[int, int, str]]):
+        raw_index = json.dumps(index, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        f.seek(index_offset)
+        f.write(raw_index)
+        f.truncate()
+        self._write_header(f, index_offset, len(raw_index))
+
+    def upsert_many(self, records: Dict[str, Dict]) -> int:
+        """
+        레코드 일괄 저장 (변경된 레코드만 기록)
+
+        Returns:
+            실제로 기록된 레코드 수
+        """
+        with self._lock:
+            self._refresh()
+
+            changed = {}
+            for table_name, metadata in records.items():
+                content_hash = _content_hash(metadata)
+                entry = self._index.get(table_name)
+                if entry is not None and entry[2] == content_hash:
+                    continue
+                changed[table_name] = (self._encode(metadata), content_hash)
+
+            if not changed:
+                return 0
+
+            index = dict(self._index)
+            self._close()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+            mode = "r+b" if self.path.exists() else "w+b"
+            with open(self.path, mode) as f:
+                if mode == "w+b":
+                    self._write_header(f, _HEADER.size, 0)
+
+                # 새 레코드는 항상 파일 끝에 추가하고 헤더는 마지막에 갱신
+                # (중간에 실패해도 기존 헤더/인덱스는 그대로 유효)
+                f.seek(0, os.SEEK_END)
+                write_pos = f.tell()
+                for table_name, (raw, content_hash) in changed.items():
+                    f.write(raw)
+                    index[table_name] = (write_pos, len(raw), content_hash)
+                    write_pos += len(raw)
+
+                self._write_index(f, write_pos, index)
+                f.flush()
+                os.fsync(f.fileno())
+
+            self._mtime_ns = None
+            live_bytes = sum(length for _, length, _ in index.values())
+            dead_ratio = 1 - live_bytes / max(write_pos - _HEADER.size, 1)
+
+        if dead_ratio > _COMPACT_RATIO:
+            self.compact()
+
+        return len(changed)
+
+    def delete(self, table_name: str) -> bool:
+        with self._lock:
+            self._refresh()
+            if table_name not in self._index:
+                return False
+
+            index = dict(self._index)
+            del index[table_name]
+            self._close()
+            with open(self.path, "r+b") as f:
+                f.seek(0, os.SEEK_END)
+                self._write_index(f, f.tell(), index)
+            self._mtime_ns = None
+            return True
+
+    def compact(self):
+        """살아있는 레코드만 새 파일로 복사 (디코딩/재인코딩 없이 원본 바이트 복사)"""
+        with self._lock:
+            self._refresh()
+            if self._mmap is None:
+                return
+
+            tmp_path = self.path.with_suffix(".pack.tmp")
+            index = {}
+            with open(tmp_path, "w+b") as f:
+                self._write_header(f, _HEADER.size, 0)
+                write_pos = _HEADER.size
+                for table_name, (offset, length, content_hash) in sorted(self._index.items()):
+                    f.write(self._mmap[offset:offset + length])
+                    index[table_name] = (write_pos, length, content_hash)
+                    write_pos += length
+                self._write_index(f, write_pos, index)
+                f.flush()
+                os.fsync(f.fileno())
+
+            self._close()
+            os.replace(tmp_path, self.path)
+            self._mtime_ns = None
+            logger.info(f"메타정보 팩 압축 완료: {self.path} ({len(index)}개 테이블)")
+
+
+class PackedMetadataStore:
+    """
+    스키마별 단일 파일 메타정보 저장소
+
+    MetadataManager의 storage="packed" 백엔드로 사용됩니다.
+    """
+
+    def __init__(self, metadata_dir: str):
+        self.metadata_dir = Path(metadata_dir)
+        self._files: Dict[Tuple[str, str], PackedSchemaFile] = {}
+        self._lock = threading.Lock()
+
+    def schema_file(self, database_sid: str, schema_name: str) -> PackedSchemaFile:
+        key = (database_sid, schema_name)
+        with self._lock:
+            if key not in self._files:
+                path = self.metadata_dir / database_sid / schema_name / PACK_FILE_NAME
+                self._files[key] = PackedSchemaFile(path)
+            return self._files[key]
+
+    def save(self, database_sid: str, schema_name: str, table_name: str, metadata: Dict) -> bool:
+        """단일 테이블 저장 (내용이 바뀐 경우에만 기록, 기록 여부 반환)"""
+        return self.schema_file(database_sid, schema_name).upsert_many({table_name: metadata}) > 0
+
+    def save_many(self, database_sid: str, schema_name: str, records: Dict[str, Dict]) -> int:
+        return self.schema_file(database_sid, schema_name).upsert_many(records)
+
+    def load(self, database_sid: str, schema_name: str, table_name: str) -> Optional[Dict]:
+        return self.schema_file(database_sid, schema_name).get(table_name)
+
+    def list_tables(self, database_sid: str, schema_name: str) -> List[str]:
+        return self.schema_file(database_sid, schema_name).table_names()
+
+    def iter_records(self, database_sid: str, schema_name: str) -> Iterator[Tuple[str, Dict]]:
+        return self.schema_file(database_sid, schema_name).iter_records()
+
+    def exists(self, database_sid: str, schema_name: str) -> bool:
+        return (self.metadata_dir / database_sid / schema_name / PACK_FILE_NAME).exists()
+
+    def migrate_from_directory(self, database_sid: str, schema_name: str) -> Dict[str, int]:
+        """
+        기존 디렉토리 구조({table}/unified_metadata.json)를 팩 파일로 변환
+
+        Returns:
+            {"found": 발견된 테이블 수, "written": 새로 기록된 테이블 수, "failed": 실패 수}
+        """
+        schema_dir = self.metadata_dir / database_sid / schema_name
+        records = {}
+        failed = 0
+
+        if schema_dir.exists():
+            for table_dir in schema_dir.iterdir():
+                metadata_file = table_dir / "unified_metadata.json"
+                if not table_dir.is_dir() or not metadata_file.exists():
+                    continue
+                try:
+                    with open(metadata_file, "r", encoding="utf-8") as f:
+                        records[table_dir.name] = json.load(f)
+                except Exception as e:
+                    logger.error(f"메타정보 변환 실패 ({table_dir.name}): {e}")
+                    failed += 1
+
+        written = self.save_many(database_sid, schema_name, records) if records else 0
+        logger.info(
+            f"✅ 팩 변환 완료: {database_sid}.{schema_name} "
+            f"({len(records)}개 발견, {written}개 기록, {failed}개 실패)"
+        )
+        return {"found": len(records), "written": written, "failed": failed}
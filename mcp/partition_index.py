@@ -0,0 +1,492 @@
+"""
+* @file mcp/partition_index.py
+* @description
+* (database_sid, schema_name) 파티션 단위의 NumPy 정확 검색(brute-force top-k) 인덱스입니다.
+* 스키마 하나에 수천 개 테이블 / 약 2만 개 컬럼 수준에서는 ChromaDB의 메타데이터 필터 + HNSW
+* 조회보다 정규화된 임베딩 행렬과의 내적 한 번 + argpartition 이 더 빠르고 결과도 정확합니다.
+*
+* 초보자 가이드:
+* 1. **파티션 파일**: data/partition_index/{컬렉션}/{sid}__{schema}.npy (정규화된 float32 행렬)
+*    + .norms.npy (원본 벡터 노름) + .json (ID/메타데이터 사이드 테이블).
+*    .npy 는 mmap 으로 열어 여러 프로세스가 OS 페이지 캐시를 공유합니다.
+* 2. **query**: ChromaDB `collection.query` 와 같은 형태({"ids","metadatas","distances"})를 반환하므로
+*    VectorDBClient 의 기존 결과 포맷팅 코드를 그대로 사용합니다.
+* 3. **갱신**: Vector DB 파일(chroma.sqlite3)의 수정 시각이 바뀌면 다음 조회 때 파티션을 다시 만듭니다.
+*
+* 유지보수 팁:
+* - 거리 값은 컬렉션의 hnsw:space(l2 / cosine / ip)에 맞춰 ChromaDB와 같은 식으로 계산합니다.
+* - 피드백 저장 등 다른 컬렉션 쓰기도 같은 sqlite 파일을 바꾸므로, 갱신 확인은
+*   PARTITION_INDEX_REFRESH_INTERVAL(초) 간격으로만 수행합니다.
+* - COLUMN_INDEX_QUANTIZATION=int8 | binary 이면 컬럼 컬렉션은 양자화 벡터(int8: 4배, binary: 32배 작음)만
+*   메모리에 올려 1차 후보를 고르고, mmap 된 float32 행렬로 후보만 재정렬합니다.
+*   정확도 비교는 benchmark_quantized_columns.py 로 확인하세요.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# collection.get 페이지 크기 (대형 파티션을 한 번에 읽지 않도록)
+_FETCH_PAGE_SIZE = 5000
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9_.-]")
+
+QUANTIZATION_NONE = "none"
+QUANTIZATION_INT8 = "int8"
+QUANTIZATION_BINARY = "binary"
+
+# 양자화 1차 검색 후보 수 = n_results × 배수 (binary는 근사 오차가 커서 더 많이 가져옴)
+_DEFAULT_RERANK_FACTOR = {QUANTIZATION_INT8: 4, QUANTIZATION_BINARY: 10}
+
+# int8 행렬을 float32로 변환하며 내적할 때의 행 블록 크기 (임시 메모리 제한)
+_INT8_BLOCK_ROWS = 4096
+
+# uint8 값별 1비트 개수 (binary 해밍 거리 계산용)
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _safe_name(value: str) -> str:
+    return _UNSAFE_CHARS.sub("_", value)
+
+
+class _Partition:
+    """메모리에 올라간 파티션 하나 (행렬 + 사이드 테이블)"""
+
+    __slots__ = ("matrix", "norms", "ids", "metadatas", "table_names", "signature",
+                 "quantization", "codes", "scale")
+
+    def __init__(self, matrix: np.ndarray, norms: np.ndarray, ids: List[str],
+                 metadatas: List[Dict[str, Any]], signature: Optional[str]):
+        self.matrix = matrix
+        self.norms = norms
+        self.ids = ids
+        self.metadatas = metadatas
+        self.table_names = np.array([m.get("table_name", "") for m in metadatas], dtype=object)
+        self.signature = signature
+        self.quantization = QUANTIZATION_NONE
+        self.codes: Optional[np.ndarray] = None
+        self.scale: Optional[np.ndarray] = None
+
+    def quantize(self, mode: str):
+        """
+        정규화 행렬로부터 양자화 코드 생성 (메모리 상주)
+
+        - int8: 차원별 스케일(최대 절댓값 / 127)로 대칭 양자화
+        - binary: 부호 비트만 남겨 8차원씩 uint8 로 압축
+        """
+        if mode == QUANTIZATION_NONE or self.matrix.size == 0:
+            return
+
+        if mode == QUANTIZATION_INT8:
+            max_abs = np.abs(self.matrix).max(axis=0)
+            scale = (np.where(max_abs > 0, max_abs, 1.0) / 127.0).astype(np.float32)
+            codes = np.empty(self.matrix.shape, dtype=np.int8)
+            for start in range(0, self.matrix.shape[0], _INT8_BLOCK_ROWS):
+                block = np.asarray(self.matrix[start:start + _INT8_BLOCK_ROWS])
+                codes[start:start + len(block)] = np.clip(np.rint(block / scale), -127, 127)
+            self.codes, self.scale = codes, scale
+        elif mode == QUANTIZATION_BINARY:
+            self.codes = np.packbits(np.asarray(self.matrix) > 0, axis=1)
+        else:
+            raise ValueError(f"지원하지 않는 양자화 방식: {mode}")
+
+        self.quantization = mode
+
+    def memory_bytes(self) -> Dict[str, int]:
+        """float32 행렬 / 양자화 코드 크기 (바이트)"""
+        return {
+            "float32": int(self.matrix.nbytes),
+            "quantized": int(self.codes.nbytes + (self.scale.nbytes if self.scale is not None else 0))
+            if self.codes is not None else 0
+        }
+
+
+class PartitionIndex:
+    """ChromaDB 컬렉션의 SID/스키마 파티션을 NumPy 행렬로 보관하고 정확 top-k 검색"""
+
+    def __init__(
+        self,
+        index_dir: str,
+        vector_db_path: str,
+        refresh_interval: float = 30.0,
+        quantization: str = QUANTIZATION_NONE,
+        quantized_collection: str = "oracle_columns",
+        rerank_factor: Optional[int] = None,
+        exact_search: bool = True
+    ):
+        """
+        Args:
+            index_dir: 파티션 파일 저장 디렉토리
+            vector_db_path: ChromaDB PersistentClient 경로 (변경 감지용)
+            refresh_interval: 변경 감지 최소 간격 (초)
+            quantization: "none" | "int8" | "binary" (quantized_collection 에만 적용)
+            quantized_collection: 양자화할 컬렉션 기본 이름 (파티션 컬렉션 oracle_columns__* 포함)
+            rerank_factor: 양자화 1차 후보 배수 (None이면 int8=4, binary=10)
+            exact_search: False면 양자화 대상 컬렉션만 처리 (나머지는 ChromaDB 검색 유지)
+        """
+        self.index_dir = Path(index_dir)
+        self.vector_db_path = Path(vector_db_path)
+        self.refresh_interval = max(0.0, refresh_interval)
+        if quantization not in (QUANTIZATION_NONE, QUANTIZATION_INT8, QUANTIZATION_BINARY):
+            raise ValueError(f"지원하지 않는 양자화 방식: {quantization}")
+        self.quantization = quantization
+        self.quantized_collection = quantized_collection
+        self.rerank_factor = rerank_factor or _DEFAULT_RERANK_FACTOR.get(quantization, 1)
+        self.exact_search = exact_search
+
+        self._partitions: Dict[Tuple[str, str, str], _Partition] = {}
+        self._lock = threading.Lock()
+        self._signature: Optional[str] = None
+        self._last_check = 0.0
+
+    # ------------------------------------------------------------------
+    # 변경 감지
+    # ------------------------------------------------------------------
+    def _source_signature(self) -> Optional[str]:
+        """Vector DB sqlite 파일의 (mtime, size) 서명"""
+        db_file = self.vector_db_path / "chroma.sqlite3"
+        try:
+            stat = db_file.stat()
+        except OSError:
+            return None
+        return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+    def _current_signature(self) -> Optional[str]:
+        now = time.monotonic()
+        if self._signature is None or now - self._last_check >= self.refresh_interval:
+            self._signature = self._source_signature()
+            self._last_check = now
+        return self._signature
+
+    def invalidate(self, collection_name: Optional[str] = None):
+        """메모리 파티션 무효화 (다음 조회 때 다시 검사/생성)"""
+        with self._lock:
+            if collection_name is None:
+                self._partitions.clear()
+            else:
+                for key in [k for k in self._partitions if k[0] == collection_name]:
+                    del self._partitions[key]
+            self._last_check = 0.0
+
+    # ------------------------------------------------------------------
+    # 파티션 파일
+    # ------------------------------------------------------------------
+    def _paths(self, collection_name: str, database_sid: str, schema_name: str) -> Tuple[Path, Path, Path]:
+        base = self.index_dir / _safe_name(collection_name) / f"{_safe_name(database_sid)}__{_safe_name(schema_name)}"
+        return (
+            base.with_name(base.name + ".npy"),
+            base.with_name(base.name + ".norms.npy"),
+            base.with_name(base.name + ".json"),
+        )
+
+    def _load_from_disk(self, collection_name: str, database_sid: str, schema_name: str,
+                        signature: Optional[str]) -> Optional[_Partition]:
+        matrix_path, norms_path, side_path = self._paths(collection_name, database_sid, schema_name)
+        if not (matrix_path.exists() and norms_path.exists() and side_path.exists()):
+            return None
+        try:
+            with open(side_path, "r", encoding="utf-8") as f:
+                side = json.load(f)
+            if signature is None or side.get("signature") != signature:
+                return None
+            matrix = np.load(matrix_path, mmap_mode="r")
+            norms = np.load(norms_path, mmap_mode="r")
+            if matrix.shape[0] != len(side["ids"]):
+                return None
+            return _Partition(matrix, norms, side["ids"], side["metadatas"], signature)
+        except Exception as e:
+            logger.warning(f"파티션 인덱스 로드 실패 ({side_path}): {e}")
+            return None
+
+    def _build(self, collection, database_sid: str, schema_name: str,
+               signature: Optional[str]) -> _Partition:
+        """컬렉션에서 파티션 임베딩을 읽어 정규화 행렬 생성 후 디스크에 저장"""
+        where = {
+            "$and": [
+                {"database_sid": database_sid},
+                {"schema_name": schema_name}
+            ]
+        }
+
+        ids: List[str] = []
+        metadatas: List[Dict[str, Any]] = []
+        chunks: List[np.ndarray] = []
+        offset = 0
+        while True:
+            page = collection.get(
+                where=where,
+                include=["embeddings", "metadatas"],
+                limit=_FETCH_PAGE_SIZE,
+                offset=offset
+            )
+            page_ids = page["ids"]
+            if not page_ids:
+                break
+            ids.extend(page_ids)
+            metadatas.extend(page["metadatas"])
+            chunks.append(np.asarray(page["embeddings"], dtype=np.float32))
+            offset += len(page_ids)
+            if len(page_ids) < _FETCH_PAGE_SIZE:
+                break
+
+        if chunks:
+            raw = np.ascontiguousarray(np.vstack(chunks), dtype=np.float32)
+        else:
+            raw = np.zeros((0, 0), dtype=np.float32)
+
+        norms = np.linalg.norm(raw, axis=1).astype(np.float32) if raw.size else np.zeros(0, dtype=np.float32)
+        safe_norms = np.where(norms > 0, norms, 1.0).astype(np.float32)
+        matrix = raw / safe_norms[:, None] if raw.size else raw
+
+        partition = _Partition(matrix, norms, ids, metadatas, signature)
+        if self._save(collection.name, database_sid, schema_name, partition):
+            # 저장한 파일을 mmap 으로 다시 열어 float32 행렬이 메모리에 상주하지 않게 합니다.
+            matrix_path, norms_path, _ = self._paths(collection.name, database_sid, schema_name)
+            partition.matrix = np.load(matrix_path, mmap_mode="r")
+            partition.norms = np.load(norms_path, mmap_mode="r")
+
+        logger.info(
+            f"✓ 파티션 인덱스 생성: {collection.name} {database_sid}.{schema_name} "
+            f"({len(ids)}개, dim={matrix.shape[1] if matrix.ndim == 2 else 0})"
+        )
+        return partition
+
+    def _save(self, collection_name: str, database_sid: str, schema_name: str, partition: _Partition) -> bool:
+        matrix_path, norms_path, side_path = self._paths(collection_name, database_sid, schema_name)
+        try:
+            matrix_path.parent.mkdir(parents=True, exist_ok=True)
+            # np.save 는 확장자가 .npy 가 아니면 덧붙이므로 임시 파일명도 .npy 로 끝나게 합니다.
+            for path, array in ((matrix_path, partition.matrix), (norms_path, partition.norms)):
+                tmp_path = path.with_name(path.stem + ".tmp.npy")
+                np.save(tmp_path, array)
+                os.replace(tmp_path, path)
+
+            # 사이드 테이블(서명 포함)은 마지막에 교체 → 중간 실패 시 서명 불일치로 재생성
+            tmp_side = side_path.with_name(side_path.name + ".tmp")
+            with open(tmp_side, "w", encoding="utf-8") as f:
+                json.dump({
+                    "signature": partition.signature,
+                    "ids": partition.ids,
+                    "metadatas": partition.metadatas
+                }, f, ensure_ascii=False)
+            os.replace(tmp_side, side_path)
+            return True
+        except Exception as e:
+            logger.warning(f"파티션 인덱스 저장 실패 ({side_path}): {e}")
+            return False
+
+    def get_partition(self, collection, database_sid: str, schema_name: str) -> _Partition:
+        """최신 파티션 반환 (메모리 → 디스크 → 컬렉션 순으로 확인)"""
+        key = (collection.name, database_sid, schema_name)
+        signature = self._current_signature()
+
+        with self._lock:
+            partition = self._partitions.get(key)
+            if partition is not None and partition.signature == signature:
+                return partition
+
+            # 기존 mmap 참조를 먼저 놓아야 (Windows 에서) 파티션 파일을 교체할 수 있습니다.
+            self._partitions.pop(key, None)
+            partition = None
+
+            partition = self._load_from_disk(collection.name, database_sid, schema_name, signature)
+            if partition is None:
+                partition = self._build(collection, database_sid, schema_name, signature)
+            partition.quantize(self._quantization_for(collection.name))
+            self._partitions[key] = partition
+            return partition
+
+    def handles(self, collection_name: str) -> bool:
+        """이 인덱스로 검색할 컬렉션인지 여부"""
+        return self.exact_search or self._quantization_for(collection_name) != QUANTIZATION_NONE
+
+    def _quantization_for(self, collection_name: str) -> str:
+        base = self.quantized_collection
+        if collection_name == base or collection_name.startswith(base + "__"):
+            return self.quantization
+        return QUANTIZATION_NONE
+
+    # ------------------------------------------------------------------
+    # 검색
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _distances(space: str, cosine: np.ndarray, query_norms: np.ndarray, norms: np.ndarray) -> np.ndarray:
+        """코사인 유사도 → 컬렉션 거리 공간(ChromaDB와 같은 식)의 거리"""
+        if space == "cosine":
+            return 1.0 - cosine
+        if space == "ip":
+            return 1.0 - cosine * query_norms[:, None] * norms[None, :]
+
+        # l2 (ChromaDB는 제곱 L2 거리 사용)
+        distances = (
+            query_norms[:, None] ** 2 + norms[None, :] ** 2
+            - 2.0 * cosine * query_norms[:, None] * norms[None, :]
+        )
+        np.maximum(distances, 0.0, out=distances)
+        return distances
+
+    def _quantized_candidates(
+        self,
+        partition: _Partition,
+        unit_queries: np.ndarray,
+        rows: Optional[np.ndarray],
+        n_candidates: int
+    ) -> np.ndarray:
+        """
+        양자화 코드로 1차 후보 선택
+
+        Returns:
+            (질의 수 × n_candidates) 후보 행 번호 (rows 기준 상대 위치)
+        """
+        codes = partition.codes if rows is None else partition.codes[rows]
+
+        if partition.quantization == QUANTIZATION_INT8:
+            scaled_queries = (unit_queries * partition.scale[None, :]).astype(np.float32)
+            scores = np.empty((len(unit_queries), codes.shape[0]), dtype=np.float32)
+            for start in range(0, codes.shape[0], _INT8_BLOCK_ROWS):
+                block = codes[start:start + _INT8_BLOCK_ROWS].astype(np.float32)
+                scores[:, start:start + len(block)] = scaled_queries @ block.T
+            ranking = -scores
+        else:
+            query_bits = np.packbits(unit_queries > 0, axis=1)
+            ranking = np.stack([
+                _POPCOUNT[np.bitwise_xor(codes, bits[None, :])].sum(axis=1, dtype=np.int32)
+                for bits in query_bits
+            ])
+
+        if n_candidates < codes.shape[0]:
+            return np.argpartition(ranking, n_candidates - 1, axis=1)[:, :n_candidates]
+        return np.tile(np.arange(codes.shape[0]), (len(unit_queries), 1))
+
+    def query(
+        self,
+        collection,
+        query_embeddings: List[List[float]],
+        database_sid: str,
+        schema_name: str,
+        n_results: int,
+        table_name: Optional[str] = None,
+        exact: bool = False
+    ) -> Dict[str, List[List[Any]]]:
+        """
+        top-k 검색 (ChromaDB `collection.query` 결과와 같은 형태)
+
+        양자화가 켜진 파티션은 양자화 코드로 후보를 고른 뒤 float32 벡터로 재정렬하고,
+        그 외에는 전체 행렬과의 정확 검색을 수행합니다.
+
+        Args:
+            collection: 대상 ChromaDB 컬렉션 (파티션 생성 및 거리 공간 확인용)
+            query_embeddings: 질의 임베딩 리스트
+            table_name: 지정 시 해당 테이블 행만 검색 (컬럼 검색용)
+            exact: True면 양자화를 건너뛰고 정확 검색 (recall 비교용)
+        """
+        partition = self.get_partition(collection, database_sid, schema_name)
+        space = (collection.metadata or {}).get("hnsw:space", "l2")
+
+        results: Dict[str, List[List[Any]]] = {"ids": [], "metadatas": [], "distances": []}
+        if not query_embeddings:
+            return results
+
+        if table_name:
+            rows = np.flatnonzero(partition.table_names == table_name)
+        else:
+            rows = None
+
+        matrix = partition.matrix if rows is None else partition.matrix[rows]
+        norms = partition.norms if rows is None else partition.norms[rows]
+        count = matrix.shape[0] if matrix.ndim == 2 else 0
+
+        if count == 0:
+            for _ in query_embeddings:
+                results["ids"].append([])
+                results["metadatas"].append([])
+                results["distances"].append([])
+            return results
+
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        query_norms = np.linalg.norm(queries, axis=1)
+        unit_queries = queries / np.where(query_norms > 0, query_norms, 1.0)[:, None]
+
+        k = min(n_results, count)
+
+        if partition.codes is not None and not exact:
+            # ★ 양자화 1차 후보 → 후보 행만 float32 로 재정렬 (mmap 에서 필요한 행만 읽음)
+            n_candidates = min(count, k * self.rerank_factor)
+            candidates = self._quantized_candidates(partition, unit_queries, rows, n_candidates)
+            source_index = candidates if rows is None else rows[candidates]
+
+            for q in range(len(queries)):
+                cand_rows = np.sort(source_index[q])
+                cosine = (partition.matrix[cand_rows] @ unit_queries[q])[None, :]
+                distances = self._distances(space, cosine, query_norms[q:q + 1], partition.norms[cand_rows])[0]
+                best = np.argsort(distances, kind="stable")[:k]
+                source_rows = cand_rows[best]
+                results["ids"].append([partition.ids[i] for i in source_rows])
+                results["metadatas"].append([partition.metadatas[i] for i in source_rows])
+                results["distances"].append(distances[best].astype(float).tolist())
+
+            return results
+
+        # (질의 수 × 파티션 크기) 코사인 행렬 한 번에 계산
+        cosine = unit_queries @ matrix.T
+        distances = self._distances(space, cosine, query_norms, norms)
+
+        if k < count:
+            top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        else:
+            top = np.tile(np.arange(count), (len(queries), 1))
+
+        for q in range(len(queries)):
+            candidates = top[q]
+            order = candidates[np.argsort(distances[q, candidates], kind="stable")]
+            source_rows = order if rows is None else rows[order]
+            results["ids"].append([partition.ids[i] for i in source_rows])
+            results["metadatas"].append([partition.metadatas[i] for i in source_rows])
+            results["distances"].append(distances[q, order].astype(float).tolist())
+
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "partitions": len(self._partitions),
+                "rows": sum(len(p.ids) for p in self._partitions.values()),
+                "quantization": self.quantization,
+                "quantized_bytes": sum(p.memory_bytes()["quantized"] for p in self._partitions.values())
+            }
+
+
+def create_partition_index_from_env(project_root: Path, vector_db_path: str) -> Optional[PartitionIndex]:
+    """
+    환경 변수로 파티션 인덱스 생성
+
+    - VECTOR_SEARCH_BACKEND: "numpy"면 파티션 정확 검색 사용 (기본 "chroma")
+    - PARTITION_INDEX_REFRESH_INTERVAL: 변경 감지 간격(초, 기본 30)
+    - COLUMN_INDEX_QUANTIZATION: 컬럼 인덱스 양자화 "none" | "int8" | "binary" (기본 none)
+      설정 시 VECTOR_SEARCH_BACKEND=chroma 여도 컬럼 컬렉션은 파티션 인덱스로 검색합니다.
+    - COLUMN_INDEX_RERANK_FACTOR: 양자화 1차 후보 배수 (기본 int8=4, binary=10)
+    """
+    backend = os.getenv("VECTOR_SEARCH_BACKEND", "chroma").lower()
+    quantization = os.getenv("COLUMN_INDEX_QUANTIZATION", QUANTIZATION_NONE).lower()
+    if backend != "numpy" and quantization == QUANTIZATION_NONE:
+        return None
+
+    refresh_interval = float(os.getenv("PARTITION_INDEX_REFRESH_INTERVAL", "30"))
+    rerank_factor = os.getenv("COLUMN_INDEX_RERANK_FACTOR")
+    return PartitionIndex(
+        index_dir=str(project_root / "data" / "partition_index"),
+        vector_db_path=vector_db_path,
+        refresh_interval=refresh_interval,
+        quantization=quantization,
+        rerank_factor=int(rerank_factor) if rerank_factor else None,
+        exact_search=(backend == "numpy")
+    )
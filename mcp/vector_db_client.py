@@ -13,15 +13,28 @@
 * 유지보수 팁:
 * - 검색 결과 수 조정: `search_tables`의 `n_results` 파라미터를 변경하세요.
 * - 모델 변경 시: `backend/app/core/embedding_service.py`와 함께 수정해야 정확도가 유지됩니다.
+* - 질의 임베딩은 `embedding_cache.QueryEmbeddingCache`에 캐시됩니다 (QUERY_EMBEDDING_CACHE_* 환경 변수).
+* - VECTOR_SEARCH_BACKEND=numpy 이면 `partition_index.PartitionIndex`로 파티션 정확 검색을 합니다.
+* - 임베딩 추론 백엔드(torch / ONNX Runtime)는 `embedding_backend.py`에서 선택합니다.
+* - VECTOR_COLLECTION_LAYOUT=partitioned 이면 SID/스키마별 컬렉션을 사용합니다 (`collection_router.py`).
+* - `find_reusable_pattern`: Backend 가 학습한 `sql_patterns` 에서 SID/스키마로 필터링해 검증된 SQL 을 찾습니다
+*   (PATTERN_REUSE_* 환경 변수, 기준은 Backend `LearningEngine.find_similar_pattern` 과 동일).
 """
 
 import chromadb
 from chromadb.config import Settings
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+import json
 import logging
+import threading
 from pathlib import Path
 import os
 
+from embedding_cache import create_query_cache_from_env, model_cache_key
+from partition_index import create_partition_index_from_env
+from collection_router import CollectionRouter
+from embedding_backend import load_embedding_model
+
 logger = logging.getLogger(__name__)
 
 # ChromaDB telemetry 오류 필터링
@@ -31,6 +44,65 @@ logging.getLogger("chromadb.telemetry.product.posthog").setLevel(logging.CRITICA
 os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
 
 
+# 학습된 SQL 패턴 재사용 (사용 여부 / 최소 유사도 / 최소 성공률 / 후보 수)
+PATTERN_REUSE_ENABLED = os.getenv("PATTERN_REUSE_ENABLED", "true").lower() == "true"
+PATTERN_REUSE_SIMILARITY_THRESHOLD = float(os.getenv("PATTERN_REUSE_SIMILARITY_THRESHOLD", "0.85"))
+PATTERN_REUSE_MIN_SUCCESS_RATE = float(os.getenv("PATTERN_REUSE_MIN_SUCCESS_RATE", "0.8"))
+PATTERN_REUSE_CANDIDATES = 5
+
+# 테이블 메타데이터 중 JSON 문자열로 저장되는 필드
+_JSON_TABLE_FIELDS = ("key_columns", "related_tables", "business_rules")
+
+
+class DecodedTableMetadataCache:
+    """
+    테이블 메타데이터 JSON 필드(key_columns, related_tables, business_rules) 디코딩 캐시
+
+    table_id 별로 한 번만 json.loads 하고, 이후 검색에서는 딕셔너리 조회만 합니다.
+    원본 JSON 문자열을 함께 보관하여 컬렉션 내용이 바뀌면(문자열이 다르면) 자동으로 다시 디코딩합니다.
+    값은 항상 방금 조회한 메타데이터와 비교하므로 다른 프로세스(Backend, 벡터화 스크립트)가 쓴 변경도
+    별도 무효화 없이 반영됩니다. 삭제된 테이블 항목은 다시 조회되지 않고 max_size 에서 정리됩니다.
+    디코딩된 리스트/딕셔너리는 여러 검색 결과가 공유하므로 수정하지 마세요.
+    """
+
+    def __init__(self, max_size: int = 50000):
+        self.max_size = max_size
+        self._entries: Dict[str, Tuple[Tuple[Any, ...], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, table_id: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """디코딩된 JSON 필드 ({필드명: 값}, 비어 있거나 파싱 실패한 필드는 제외)"""
+        raw = tuple(metadata.get(field) for field in _JSON_TABLE_FIELDS)
+
+        entry = self._entries.get(table_id)
+        if entry is not None and entry[0] == raw:
+            return entry[1]
+
+        decoded = {}
+        for field, value in zip(_JSON_TABLE_FIELDS, raw):
+            if not value:
+                continue
+            try:
+                parsed = json.loads(value)
+            except (TypeError, ValueError):
+                continue
+            if parsed:
+                decoded[field] = parsed
+
+        with self._lock:
+            if len(self._entries) >= self.max_size and table_id not in self._entries:
+                self._entries.clear()
+            self._entries[table_id] = (raw, decoded)
+        return decoded
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
 class VectorDBClient:
     """MCP Server가 Vector DB에 직접 접근"""
 
@@ -38,20 +110,32 @@ class VectorDBClient:
         """
         Initialize ChromaDB client and Embedding model
         """
+        project_root = Path(__file__).parent.parent
         if vector_db_path is None:
-            project_root = Path(__file__).parent.parent
             vector_db_path = str(project_root / "data" / "vector_db")
 
+        # 질의 임베딩 캐시 (search_tables / search_columns 공유)
+        self.query_cache = create_query_cache_from_env(project_root)
+
+        # 검색 결과 테이블 메타데이터 JSON 디코딩 캐시 (table_id 기준)
+        self.table_metadata_cache = DecodedTableMetadataCache()
+
+        # SID/스키마 파티션 NumPy 정확 검색 (VECTOR_SEARCH_BACKEND=numpy 일 때만)
+        self.partition_index = create_partition_index_from_env(project_root, vector_db_path)
+
         # Load Embedding Model (Consistent with Backend)
         self.model_name = "sentence-transformers/all-MiniLM-L6-v2"
         try:
-            from sentence_transformers import SentenceTransformer
-            self.model = SentenceTransformer(self.model_name)
+            # EMBEDDING_BACKEND=torch | onnx (embedding_backend.py)
+            self.model = load_embedding_model(self.model_name, project_root)
             logger.info(f"✓ Embedding model loaded: {self.model_name}")
         except Exception as e:
             logger.error(f"✗ Failed to load embedding model: {e}")
             self.model = None
 
+        # Backend 가 처음 패턴을 학습할 때 생성되므로 조회 시점에 연결 (_patterns)
+        self.patterns_collection = None
+
         try:
             self.client = chromadb.PersistentClient(
                 path=vector_db_path,
@@ -61,6 +145,17 @@ class VectorDBClient:
                 )
             )
 
+            # ★ 컬렉션 레이아웃 (shared: 공용 컬렉션 + where 필터 / partitioned: SID/스키마별 컬렉션)
+            self.router = CollectionRouter(self.client)
+
+            if self.router.is_partitioned:
+                # 파티션 컬렉션은 검색 시점에 SID/스키마로 선택
+                self.metadata_collection = None
+                self.columns_collection = None
+                partitions = self.router.list_partitions()
+                logger.info(f"✓ Vector DB connected (partitioned): {len(partitions)} collections")
+                return
+
             # Get collections
             try:
                 self.metadata_collection = self.client.get_collection("oracle_metadata")
@@ -82,12 +177,198 @@ class VectorDBClient:
         except Exception as e:
             logger.error(f"✗ Vector DB connection failed: {e}")
             self.client = None
+            self.router = None
             self.metadata_collection = None
             self.columns_collection = None
 
+    def _is_partitioned(self) -> bool:
+        return self.router is not None and self.router.is_partitioned
+
     def is_available(self) -> bool:
         """Vector DB와 임베딩 모델이 모두 사용 가능한지 확인"""
-        return self.metadata_collection is not None and self.model is not None
+        if self.model is None:
+            return False
+        return self.metadata_collection is not None or self._is_partitioned()
+
+    def has_columns(self) -> bool:
+        """컬럼 검색 가능 여부 (컬럼 컬렉션 + 임베딩 모델)"""
+        if self.model is None:
+            return False
+        return self.columns_collection is not None or self._is_partitioned()
+
+    def _table_collection(self, database_sid: str, schema_name: str):
+        """SID/스키마의 테이블 컬렉션 (partitioned면 전용 컬렉션, 없으면 None)"""
+        if self._is_partitioned():
+            return self.router.get_collection("oracle_metadata", database_sid, schema_name)
+        return self.metadata_collection
+
+    def _column_collection(self, database_sid: str, schema_name: str):
+        """SID/스키마의 컬럼 컬렉션 (partitioned면 전용 컬렉션, 없으면 None)"""
+        if self._is_partitioned():
+            return self.router.get_collection("oracle_columns", database_sid, schema_name)
+        return self.columns_collection
+
+    def encode_query(self, text: str) -> List[float]:
+        """질의 임베딩 생성 (캐시 우선)"""
+        return self.query_cache.get_or_compute(
+            model_cache_key(self.model, self.model_name),
+            text,
+            lambda t: self.model.encode(t, show_progress_bar=False).tolist()
+        )
+
+    def encode_queries(self, texts: List[str]) -> List[List[float]]:
+        """
+        여러 질의 임베딩을 한 번에 생성
+
+        캐시에 없는 질의만 모아서 단일 batched encode 호출로 처리합니다.
+        """
+        cache_key = model_cache_key(self.model, self.model_name)
+        embeddings: List[Optional[List[float]]] = [
+            self.query_cache.get(cache_key, text) for text in texts
+        ]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+
+        if missing:
+            encoded = self.model.encode(
+                [texts[i] for i in missing],
+                show_progress_bar=False
+            ).tolist()
+            for i, embedding in zip(missing, encoded):
+                embeddings[i] = embedding
+                self.query_cache.put(cache_key, texts[i], embedding)
+
+        return embeddings
+
+    def _query_partition(
+        self,
+        collection,
+        query_embeddings: List[List[float]],
+        database_sid: str,
+        schema_name: str,
+        n_results: int,
+        table_name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """SID/스키마 파티션 검색 (NumPy 정확 검색 또는 ChromaDB 필터 검색)"""
+        if self.partition_index is not None and self.partition_index.handles(collection.name):
+            return self.partition_index.query(
+                collection,
+                query_embeddings,
+                database_sid,
+                schema_name,
+                n_results,
+                table_name=table_name
+            )
+
+        return collection.query(
+            query_embeddings=query_embeddings,
+            n_results=n_results,
+            where=self.router.where_filter(database_sid, schema_name, table_name)
+        )
+
+    def _format_table_results(
+        self,
+        ids: List[str],
+        metadatas: List[Dict[str, Any]],
+        distances: List[float],
+        n_results: int,
+        weights: Optional[Dict[str, float]] = None
+    ) -> List[Dict[str, Any]]:
+        """테이블 검색 결과 한 건(질의 1개분) 포맷팅 + 가중치 정렬"""
+        tables = []
+        for i, table_id in enumerate(ids):
+            metadata = metadatas[i]
+            distance = distances[i]
+
+            # Convert distance to similarity (0-1)
+            similarity = max(0, 1 - (distance / 2))
+
+            # JSON fields (key_columns, related_tables, business_rules) - 캐시에서 조회
+            decoded_fields = self.table_metadata_cache.get(table_id, metadata)
+
+            table_name = metadata.get("table_name", "")
+
+            # ★ 가중치 적용 (피드백 기반)
+            feedback_weight = 1.0  # 기본값
+            if weights and table_name in weights:
+                feedback_weight = weights[table_name]
+
+            # 최종 점수 = 의미 기반 유사도 × 피드백 가중치
+            final_score = similarity * feedback_weight
+
+            table_info = {
+                "table_id": table_id,
+                "table_name": table_name,
+                "korean_name": metadata.get("korean_name", ""),
+                "description": metadata.get("description", ""),
+                "similarity": similarity,
+                "feedback_weight": round(feedback_weight, 4),  # 가중치 표시
+                "final_score": round(final_score, 4),         # 최종 점수
+                "column_count": metadata.get("column_count", 0),
+                "has_primary_key": metadata.get("has_primary_key", False),
+                "has_foreign_keys": metadata.get("has_foreign_keys", False)
+            }
+
+            # Add enhanced fields if available
+            table_info.update(decoded_fields)
+
+            tables.append(table_info)
+
+        # ★ 최종 점수로 정렬 후 요청한 개수만 반환
+        tables.sort(key=lambda x: x["final_score"], reverse=True)
+        return tables[:n_results]
+
+    def _format_column_results(
+        self,
+        ids: List[str],
+        metadatas: List[Dict[str, Any]],
+        distances: List[float],
+        n_results: int,
+        table_weights: Optional[Dict[str, float]] = None,
+        column_weights: Optional[Dict[str, Dict[str, float]]] = None
+    ) -> List[Dict[str, Any]]:
+        """컬럼 검색 결과 한 건(질의 1개분) 포맷팅 + 가중치 정렬"""
+        columns = []
+        for i, col_id in enumerate(ids):
+            metadata = metadatas[i]
+            distance = distances[i]
+            similarity = max(0, 1 - (distance / 2))
+
+            col_table_name = metadata.get("table_name", "")
+            col_column_name = metadata.get("column_name", "")
+
+            # ★ 가중치 적용
+            table_weight = 1.0
+            column_weight = 1.0
+
+            if table_weights and col_table_name in table_weights:
+                table_weight = table_weights[col_table_name]
+
+            if (column_weights and col_table_name in column_weights and
+                col_column_name in column_weights[col_table_name]):
+                column_weight = column_weights[col_table_name][col_column_name]
+
+            # 최종 점수 = 유사도 × 테이블 가중치 × 컬럼 가중치
+            final_score = similarity * table_weight * column_weight
+
+            columns.append({
+                "column_id": col_id,
+                "table_name": col_table_name,
+                "column_name": col_column_name,
+                "korean_name": metadata.get("korean_name", ""),
+                "description": metadata.get("description", ""),
+                "data_type": metadata.get("data_type", ""),
+                "is_pk": metadata.get("is_pk", False),
+                "column_comment": metadata.get("column_comment", ""),
+                "table_comment": metadata.get("table_comment", ""),
+                "similarity": round(similarity * 100, 1),
+                "table_weight": round(table_weight, 4),
+                "column_weight": round(column_weight, 4),
+                "final_score": round(final_score * 100, 1)
+            })
+
+        # ★ 최종 점수로 정렬 후 요청한 개수만 반환
+        columns.sort(key=lambda x: x["final_score"], reverse=True)
+        return columns[:n_results]
 
     def search_tables(
         self,
@@ -108,99 +389,89 @@ class VectorDBClient:
             raise RuntimeError("Vector DB or Embedding model not available.")
 
         # 1. 태스크에 맞는 임베딩 생성 (백엔드와 동일한 로직)
-        query_embedding = self.model.encode(question).tolist()
+        collection = self._table_collection(database_sid, schema_name)
+        if collection is None:
+            logger.info(f"Vector DB search: no collection for {database_sid}.{schema_name}")
+            return []
+
+        query_embedding = self.encode_query(question)
 
         # 2. 직접 생성한 임베딩으로 검색 (더 많이 가져옴)
-        results = self.metadata_collection.query(
-            query_embeddings=[query_embedding],
-            n_results=min(n_results * 2, 50),  # 최대 50개, 가중치로 정렬 후 상위 반환
-            where={
-                "$and": [
-                    {"database_sid": database_sid},
-                    {"schema_name": schema_name}
-                ]
-            }
+        results = self._query_partition(
+            collection,
+            [query_embedding],
+            database_sid,
+            schema_name,
+            n_results=min(n_results * 2, 50)  # 최대 50개, 가중치로 정렬 후 상위 반환
         )
 
-        # Format results with enhanced metadata
         tables = []
         if results["ids"] and results["ids"][0]:
-            for i, table_id in enumerate(results["ids"][0]):
-                metadata = results["metadatas"][0][i]
-                distance = results["distances"][0][i]
-
-                # Convert distance to similarity (0-1)
-                similarity = max(0, 1 - (distance / 2))
-
-                # Parse JSON fields if present
-                import json
-                key_columns = None
-                related_tables = None
-                business_rules = None
-
-                if metadata.get("key_columns"):
-                    try:
-                        key_columns = json.loads(metadata["key_columns"])
-                    except:
-                        pass
-
-                if metadata.get("related_tables"):
-                    try:
-                        related_tables = json.loads(metadata["related_tables"])
-                    except:
-                        pass
-
-                if metadata.get("business_rules"):
-                    try:
-                        business_rules = json.loads(metadata["business_rules"])
-                    except:
-                        pass
-
-                table_name = metadata.get("table_name", "")
-
-                # ★ 가중치 적용 (피드백 기반)
-                feedback_weight = 1.0  # 기본값
-                if weights and table_name in weights:
-                    feedback_weight = weights[table_name]
-
-                # 최종 점수 = 의미 기반 유사도 × 피드백 가중치
-                final_score = similarity * feedback_weight
-
-                table_info = {
-                    "table_id": table_id,
-                    "table_name": table_name,
-                    "korean_name": metadata.get("korean_name", ""),
-                    "description": metadata.get("description", ""),
-                    "similarity": similarity,
-                    "feedback_weight": round(feedback_weight, 4),  # 가중치 표시
-                    "final_score": round(final_score, 4),         # 최종 점수
-                    "column_count": metadata.get("column_count", 0),
-                    "has_primary_key": metadata.get("has_primary_key", False),
-                    "has_foreign_keys": metadata.get("has_foreign_keys", False)
-                }
+            tables = self._format_table_results(
+                results["ids"][0],
+                results["metadatas"][0],
+                results["distances"][0],
+                n_results,
+                weights
+            )
+
+        logger.info(
+            f"Vector DB search: '{question}' in {database_sid}.{schema_name} "
+            f"→ {len(tables)} tables found"
+        )
+
+        return tables
+
+    def search_tables_batch(
+        self,
+        questions: List[str],
+        database_sid: str,
+        schema_name: str,
+        n_results: int = 10,
+        weights: Optional[Dict[str, float]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        ★ 여러 질문의 테이블 검색을 한 번에 수행
+
+        질문들을 단일 batched encode로 임베딩하고, ChromaDB query 한 번에
+        모든 임베딩을 전달합니다. 반환값은 questions와 같은 순서의 결과 리스트입니다.
+        """
+        if not self.is_available():
+            raise RuntimeError("Vector DB or Embedding model not available.")
+        if not questions:
+            return []
 
-                # Add enhanced fields if available
-                if key_columns:
-                    table_info["key_columns"] = key_columns
-                if related_tables:
-                    table_info["related_tables"] = related_tables
-                if business_rules:
-                    table_info["business_rules"] = business_rules
+        collection = self._table_collection(database_sid, schema_name)
+        if collection is None:
+            return [[] for _ in questions]
 
-                tables.append(table_info)
+        query_embeddings = self.encode_queries(questions)
 
-            # ★ 최종 점수로 정렬
-            tables.sort(key=lambda x: x["final_score"], reverse=True)
+        results = self._query_partition(
+            collection,
+            query_embeddings,
+            database_sid,
+            schema_name,
+            n_results=min(n_results * 2, 50)
+        )
 
-            # 요청한 개수만 반환
-            tables = tables[:n_results]
+        all_tables = []
+        for q in range(len(questions)):
+            ids = results["ids"][q] if results["ids"] else []
+            all_tables.append(self._format_table_results(
+                ids,
+                results["metadatas"][q] if ids else [],
+                results["distances"][q] if ids else [],
+                n_results,
+                weights
+            ))
 
         logger.info(
-            f"Vector DB search: '{question}' in {database_sid}.{schema_name} "
-            f"→ {len(tables)} tables found"
+            f"Vector DB batch search: {len(questions)} questions in {database_sid}.{schema_name} "
+            f"→ {sum(len(t) for t in all_tables)} tables found"
         )
 
-        return tables
+        return all_tables
 
     def search_columns(
         self,
@@ -227,77 +498,37 @@ class VectorDBClient:
         Returns:
             관련 컬럼 정보 리스트
         """
-        if self.columns_collection is None or self.model is None:
+        if not self.has_columns():
             raise RuntimeError("Columns collection or Embedding model not available.")
 
-        # 쿼리 임베딩 생성
-        query_embedding = self.model.encode(query).tolist()
-
-        # 필터 조건 생성
-        where_filter = {
-            "$and": [
-                {"database_sid": database_sid},
-                {"schema_name": schema_name}
-            ]
-        }
+        collection = self._column_collection(database_sid, schema_name)
+        if collection is None:
+            logger.info(f"Vector DB column search: no collection for {database_sid}.{schema_name}")
+            return []
 
-        # 특정 테이블로 제한
-        if table_name:
-            where_filter["$and"].append({"table_name": table_name})
+        # 쿼리 임베딩 생성 (캐시 우선)
+        query_embedding = self.encode_query(query)
 
         # ChromaDB 검색 (더 많이 가져온 후 가중치 적용)
-        results = self.columns_collection.query(
-            query_embeddings=[query_embedding],
+        results = self._query_partition(
+            collection,
+            [query_embedding],
+            database_sid,
+            schema_name,
             n_results=min(n_results * 2, 50),  # 최대 50개
-            where=where_filter
+            table_name=table_name
         )
 
-        # 결과 포맷팅 (가중치 적용)
         columns = []
         if results["ids"] and results["ids"][0]:
-            for i, col_id in enumerate(results["ids"][0]):
-                metadata = results["metadatas"][0][i]
-                distance = results["distances"][0][i]
-                similarity = max(0, 1 - (distance / 2))
-
-                col_table_name = metadata.get("table_name", "")
-                col_column_name = metadata.get("column_name", "")
-
-                # ★ 가중치 적용
-                table_weight = 1.0
-                column_weight = 1.0
-
-                if table_weights and col_table_name in table_weights:
-                    table_weight = table_weights[col_table_name]
-
-                if (column_weights and col_table_name in column_weights and
-                    col_column_name in column_weights[col_table_name]):
-                    column_weight = column_weights[col_table_name][col_column_name]
-
-                # 최종 점수 = 유사도 × 테이블 가중치 × 컬럼 가중치
-                final_score = similarity * table_weight * column_weight
-
-                columns.append({
-                    "column_id": col_id,
-                    "table_name": col_table_name,
-                    "column_name": col_column_name,
-                    "korean_name": metadata.get("korean_name", ""),
-                    "description": metadata.get("description", ""),
-                    "data_type": metadata.get("data_type", ""),
-                    "is_pk": metadata.get("is_pk", False),
-                    "column_comment": metadata.get("column_comment", ""),
-                    "table_comment": metadata.get("table_comment", ""),
-                    "similarity": round(similarity * 100, 1),
-                    "table_weight": round(table_weight, 4),
-                    "column_weight": round(column_weight, 4),
-                    "final_score": round(final_score * 100, 1)
-                })
-
-        # ★ 최종 점수로 정렬
-        columns.sort(key=lambda x: x["final_score"], reverse=True)
-
-        # 요청한 개수만 반환
-        columns = columns[:n_results]
+            columns = self._format_column_results(
+                results["ids"][0],
+                results["metadatas"][0],
+                results["distances"][0],
+                n_results,
+                table_weights,
+                column_weights
+            )
 
         logger.info(
             f"Vector DB column search: '{query}' in {database_sid}.{schema_name} "
@@ -306,18 +537,183 @@ class VectorDBClient:
 
         return columns
 
+    def search_columns_batch(
+        self,
+        queries: List[str],
+        database_sid: str,
+        schema_name: str,
+        table_name: Optional[str] = None,
+        n_results: int = 10,
+        table_weights: Optional[Dict[str, float]] = None,
+        column_weights: Optional[Dict[str, Dict[str, float]]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        ★ 여러 검색어의 컬럼 검색을 한 번에 수행 (search_tables_batch와 동일한 방식)
+
+        Returns:
+            queries와 같은 순서의 컬럼 결과 리스트
+        """
+        if not self.has_columns():
+            raise RuntimeError("Columns collection or Embedding model not available.")
+        if not queries:
+            return []
+
+        collection = self._column_collection(database_sid, schema_name)
+        if collection is None:
+            return [[] for _ in queries]
+
+        query_embeddings = self.encode_queries(queries)
+
+        results = self._query_partition(
+            collection,
+            query_embeddings,
+            database_sid,
+            schema_name,
+            n_results=min(n_results * 2, 50),
+            table_name=table_name
+        )
+
+        all_columns = []
+        for q in range(len(queries)):
+            ids = results["ids"][q] if results["ids"] else []
+            all_columns.append(self._format_column_results(
+                ids,
+                results["metadatas"][q] if ids else [],
+                results["distances"][q] if ids else [],
+                n_results,
+                table_weights,
+                column_weights
+            ))
+
+        logger.info(
+            f"Vector DB batch column search: {len(queries)} queries in {database_sid}.{schema_name} "
+            f"→ {sum(len(c) for c in all_columns)} columns found"
+        )
+
+        return all_columns
+
+    def _patterns(self):
+        """학습된 SQL 패턴 컬렉션 (없으면 None, 생기면 연결)"""
+        if self.patterns_collection is None and self.client is not None:
+            try:
+                self.patterns_collection = self.client.get_collection("sql_patterns")
+            except Exception:
+                return None
+        return self.patterns_collection
+
+    def find_reusable_pattern(
+        self,
+        question: str,
+        database_sid: str,
+        schema_name: str,
+        similarity_threshold: Optional[float] = None,
+        min_success_rate: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        ★ 재사용 가능한 학습 SQL 패턴 검색 (의미 기반 답변 캐시)
+
+        SID/스키마 조건은 ChromaDB 쿼리의 where 로 걸어 상위 후보가 모두 해당 스키마의 패턴이 되게 하고,
+        유사도 / 성공률 기준을 넘는 패턴 중 점수(유사도 70% + 성공률 30%)가 가장 높은 것을 반환합니다.
+
+        Args:
+            similarity_threshold: 최소 유사도 (기본: PATTERN_REUSE_SIMILARITY_THRESHOLD)
+            min_success_rate: 최소 성공률 (기본: PATTERN_REUSE_MIN_SUCCESS_RATE)
+
+        Returns:
+            {"pattern_id", "question", "sql_query", "tables_used", "similarity", "success_rate",
+             "use_count", "overall_score"} 또는 None
+        """
+        if not PATTERN_REUSE_ENABLED or self.model is None or not question or not question.strip():
+            return None
+
+        collection = self._patterns()
+        if collection is None or collection.count() == 0:
+            return None
+
+        if similarity_threshold is None:
+            similarity_threshold = PATTERN_REUSE_SIMILARITY_THRESHOLD
+        if min_success_rate is None:
+            min_success_rate = PATTERN_REUSE_MIN_SUCCESS_RATE
+
+        results = collection.query(
+            query_embeddings=[self.encode_query(question)],
+            n_results=min(PATTERN_REUSE_CANDIDATES, collection.count()),
+            where={
+                "$and": [
+                    {"database_sid": database_sid},
+                    {"schema_name": schema_name}
+                ]
+            }
+        )
+
+        best_match = None
+        if results["ids"] and results["ids"][0]:
+            for i, pattern_id in enumerate(results["ids"][0]):
+                # Backend search_similar_patterns 와 같은 거리 → 유사도 변환
+                similarity = max(0, 1 - (results["distances"][0][i] / 2))
+                if similarity < similarity_threshold:
+                    continue
+
+                metadata = results["metadatas"][0][i]
+                use_count = metadata.get("use_count", 1)
+                success_count = metadata.get("success_count", 0)
+                success_rate = success_count / use_count if use_count > 0 else 0
+                if success_rate < min_success_rate:
+                    continue
+
+                score = 0.7 * similarity + 0.3 * success_rate
+                if best_match is not None and score <= best_match["overall_score"]:
+                    continue
+
+                parts = (results["documents"][0][i] or "").split("\n---\n")
+                try:
+                    tables_used = json.loads(metadata.get("tables_used", "[]"))
+                except (TypeError, ValueError):
+                    tables_used = []
+
+                best_match = {
+                    "pattern_id": pattern_id,
+                    "question": parts[0],
+                    "sql_query": parts[1] if len(parts) > 1 else metadata.get("sql", ""),
+                    "tables_used": tables_used,
+                    "similarity": similarity,
+                    "success_rate": success_rate,
+                    "use_count": use_count,
+                    "overall_score": score
+                }
+
+        if best_match:
+            logger.info(
+                f"Reusable pattern: '{question}' in {database_sid}.{schema_name} → {best_match['pattern_id']} "
+                f"(similarity: {best_match['similarity']:.2f}, success_rate: {best_match['success_rate']:.2f})"
+            )
+        return best_match
+
     def get_stats(self) -> Dict[str, int]:
         """Vector DB 통계"""
         if not self.is_available():
             return {"table_count": 0, "column_count": 0}
 
         stats = {
-            "table_count": self.metadata_collection.count() if self.metadata_collection else 0,
-            "column_count": self.columns_collection.count() if self.columns_collection else 0
+            "table_count": self.router.count("oracle_metadata"),
+            "column_count": self.router.count("oracle_columns")
         }
 
         return stats
 
+    def get_cache_stats(self) -> Dict[str, float]:
+        """질의 임베딩 캐시 통계 (hits / misses / hit_rate)"""
+        return self.query_cache.stats()
+
+    def invalidate_metadata_cache(self):
+        """
+        테이블 메타데이터 디코딩 캐시 초기화 (메모리 회수용)
+
+        내용 변경은 DecodedTableMetadataCache.get 의 원본 문자열 비교로 반영되므로 정확성을 위해
+        호출할 필요는 없습니다.
+        """
+        self.table_metadata_cache.clear()
+
 
 # Singleton instance
 _vector_db_client: Optional[VectorDBClient] = None
@@ -0,0 +1,54 @@
+"""
+@file pack_metadata.py
+@description
+기존 디렉토리 구조(data/metadata/{sid}/{schema}/{table}/unified_metadata.json)의
+통합 메타정보를 스키마당 단일 파일(metadata.pack)로 변환합니다.
+
+변환 후 .env 에 METADATA_STORAGE=packed 를 설정하면 MCP 서버가 팩 파일을 사용합니다.
+원본 디렉토리는 삭제하지 않으며, 다시 실행하면 내용이 바뀐 테이블만 기록됩니다.
+
+사용법:
+    python pack_metadata.py                       # 모든 SID/스키마 변환
+    python pack_metadata.py SMVNPDBext INFINITY21_JSMES
+"""
+
+import sys
+import logging
+from pathlib import Path
+
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root / "mcp"))
+
+from metadata_manager import MetadataManager
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger(__name__)
+
+
+def main():
+    metadata_dir = project_root / "data" / "metadata"
+    manager = MetadataManager(metadata_dir=str(metadata_dir))
+
+    if len(sys.argv) >= 3:
+        targets = [(sys.argv[1], sys.argv[2])]
+    else:
+        targets = [
+            (db_dir.name, schema_dir.name)
+            for db_dir in sorted(metadata_dir.iterdir()) if db_dir.is_dir()
+            for schema_dir in sorted(db_dir.iterdir()) if schema_dir.is_dir()
+        ]
+
+    if not targets:
+        logger.warning(f"변환할 메타정보가 없습니다: {metadata_dir}")
+        return
+
+    for database_sid, schema_name in targets:
+        result = manager.migrate_to_packed(database_sid, schema_name)
+        logger.info(
+            f"{database_sid}.{schema_name}: "
+            f"{result['found']}개 발견, {result['written']}개 기록, {result['failed']}개 실패"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+@file partition_vector_collections.py
+@description
+공용 컬렉션(oracle_metadata, oracle_columns)의 벡터를 SID/스키마별 파티션 컬렉션으로 복사합니다.
+
+복사 후 .env 에 VECTOR_COLLECTION_LAYOUT=partitioned 를 설정하면 MCP 서버, Backend,
+vectorize_columns.py 가 파티션 컬렉션을 사용합니다.
+원본 공용 컬렉션은 삭제하지 않으므로 layout=shared 로 언제든 되돌릴 수 있습니다.
+
+사용법:
+    python partition_vector_collections.py                  # oracle_metadata, oracle_columns
+    python partition_vector_collections.py oracle_columns   # 특정 컬렉션만
+"""
+
+import os
+import sys
+import logging
+from pathlib import Path
+
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root / "mcp"))
+
+import chromadb
+from chromadb.config import Settings
+from collection_router import CollectionRouter, LAYOUT_PARTITIONED
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logging.getLogger("chromadb").setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
+
+os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
+
+
+def main():
+    base_names = sys.argv[1:] or ["oracle_metadata", "oracle_columns"]
+
+    client = chromadb.PersistentClient(
+        path=str(project_root / "data" / "vector_db"),
+        settings=Settings(anonymized_telemetry=False)
+    )
+    router = CollectionRouter(client, LAYOUT_PARTITIONED)
+
+    for base_name in base_names:
+        logger.info(f"[{base_name}] 파티션 컬렉션으로 복사 중...")
+        copied = router.split_shared_collection(base_name)
+        if not copied:
+            logger.info(f"  - 복사할 데이터 없음")
+        for partition, count in sorted(copied.items()):
+            logger.info(f"  - {partition}: {count:,}개")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""
+@file vectorize_all.py
+@description
+data/{sid}/{schema}/csv_uploads 아래의 모든 CSV를 찾아 한 번에 벡터화하는 통합 실행 스크립트입니다.
+
+- table_column_definitions.csv  → oracle_columns  (vectorize_columns.ColumnVectorizer, 증분)
+- table_metadata_optimized.csv  → oracle_metadata (vectorize_optimized_csv.OptimizedCSVVectorizer)
+
+초보자 가이드:
+1. **임베딩 단계 (병렬)**: 프로세스 풀의 각 워커가 모델을 한 번만 로드하고, 스키마별 요약 텍스트를
+   임베딩하여 디스크 캐시(data/cache/embeddings.sqlite3)에 저장합니다.
+2. **저장 단계 (단일 프로세스)**: ChromaDB PersistentClient 는 여러 프로세스가 동시에 쓰면 안전하지 않으므로,
+   메인 프로세스가 임베딩이 끝난 스키마부터 차례로 upsert 합니다 (임베딩은 캐시에서 바로 읽음).
+3. **체크포인트**: 작업별 진행 상태를 data/vectorize_checkpoint.json 에 기록합니다.
+   중단 후 다시 실행하면 완료된 작업(CSV가 바뀌지 않은 경우)은 건너뛰고, 임베딩은 캐시에 남아 있어
+   중단된 지점부터 이어서 진행됩니다.
+4. force_vectorize.py 는 Oracle 접속이 필요하므로 대상에 포함하지 않습니다.
+
+사용법:
+    python vectorize_all.py                 # CPU 코어 수 기준 워커 수
+    python vectorize_all.py --workers 4
+    python vectorize_all.py --restart       # 체크포인트 무시하고 처음부터
+"""
+
+import sys
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "mcp"))
+
+from embedding_backend import load_embedding_model
+from embedding_cache import create_embedding_store_from_env, encode_documents
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger(__name__)
+
+logging.getLogger("chromadb").setLevel(logging.WARNING)
+logging.getLogger("sentence_transformers").setLevel(logging.WARNING)
+os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+# 작업 종류 → 입력 CSV
+JOB_INPUTS = {
+    "columns": "table_column_definitions.csv",
+    "tables": "table_metadata_optimized.csv",
+}
+
+CHECKPOINT_PATH = project_root / "data" / "vectorize_checkpoint.json"
+
+# 워커가 캐시에 저장하는 단위 (중단 시 이 단위까지는 보존)
+ENCODE_CHUNK_SIZE = 500
+
+STATUS_ENCODED = "encoded"
+STATUS_DONE = "done"
+
+
+# ----------------------------------------------------------------------
+# 워커 프로세스
+# ----------------------------------------------------------------------
+_worker_model = None
+_worker_store = None
+
+
+def _init_worker(num_threads: int):
+    """워커 초기화: 프로세스당 모델 1개 로드"""
+    global _worker_model, _worker_store
+    logging.getLogger().setLevel(logging.WARNING)
+    _worker_model = load_embedding_model(MODEL_NAME, project_root, num_threads=num_threads)
+    _worker_store = create_embedding_store_from_env(project_root)
+
+
+def _encode_job(job_key: str, documents: List[str]) -> Dict[str, Any]:
+    """요약 텍스트를 임베딩하여 디스크 캐시에 저장 (청크마다 저장되므로 중단돼도 진행분 보존)"""
+    start = time.perf_counter()
+    for i in range(0, len(documents), ENCODE_CHUNK_SIZE):
+        encode_documents(_worker_store, _worker_model, MODEL_NAME, documents[i:i + ENCODE_CHUNK_SIZE])
+    return {"job_key": job_key, "count": len(documents), "seconds": time.perf_counter() - start}
+
+
+# ----------------------------------------------------------------------
+# 작업 탐색 / 체크포인트
+# ----------------------------------------------------------------------
+def discover_jobs() -> List[Dict[str, Any]]:
+    """data/{sid}/{schema}/csv_uploads 에서 벡터화 대상 CSV 탐색"""
+    jobs = []
+    for upload_dir in sorted((project_root / "data").glob("*/*/csv_uploads")):
+        schema_dir = upload_dir.parent
+        database_sid, schema_name = schema_dir.parent.name, schema_dir.name
+        for kind, filename in JOB_INPUTS.items():
+            csv_path = upload_dir / filename
+            if not csv_path.exists():
+                continue
+            stat = csv_path.stat()
+            jobs.append({
+                "key": f"{database_sid}/{schema_name}/{kind}",
+                "database_sid": database_sid,
+                "schema_name": schema_name,
+                "kind": kind,
+                "signature": f"{stat.st_mtime_ns}:{stat.st_size}"
+            })
+    return jobs
+
+
+def load_checkpoint() -> Dict[str, Dict[str, Any]]:
+    if not CHECKPOINT_PATH.exists():
+        return {}
+    try:
+        with open(CHECKPOINT_PATH, "r", encoding="utf-8") as f:
+            return json.load(f).get("jobs", {})
+    except (OSError, ValueError) as e:
+        logger.warning(f"체크포인트 읽기 실패, 처음부터 진행: {e}")
+        return {}
+
+
+def save_checkpoint(checkpoint: Dict[str, Dict[str, Any]]):
+    """체크포인트 저장 (임시 파일 → replace 로 원자적 교체)"""
+    CHECKPOINT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = CHECKPOINT_PATH.with_name(CHECKPOINT_PATH.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"jobs": checkpoint}, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, CHECKPOINT_PATH)
+
+
+# ----------------------------------------------------------------------
+# 오케스트레이터
+# ----------------------------------------------------------------------
+class VectorizeOrchestrator:
+    """스키마별 벡터화 작업을 프로세스 풀(임베딩) + 메인 프로세스(저장)로 실행"""
+
+    def __init__(self, workers: int, restart: bool = False):
+        self.workers = max(1, workers)
+        self.checkpoint = {} if restart else load_checkpoint()
+        self.timings: Dict[str, Dict[str, Any]] = {}
+
+        self.store = create_embedding_store_from_env(project_root)
+        if self.store is None and self.workers > 1:
+            logger.warning("⚠️ 임베딩 디스크 캐시가 꺼져 있어 병렬 임베딩 없이 순차 실행합니다.")
+            self.workers = 1
+
+        # 저장 단계용 (캐시 미스 대비) 모델과 Vector DB 연결은 메인 프로세스에서 한 번만
+        import chromadb
+        from chromadb.config import Settings
+
+        self.model = load_embedding_model(MODEL_NAME, project_root)
+        self.client = chromadb.PersistentClient(
+            path=str(project_root / "data" / "vector_db"),
+            settings=Settings(anonymized_telemetry=False)
+        )
+
+    def _status(self, job: Dict[str, Any]) -> Optional[str]:
+        state = self.checkpoint.get(job["key"])
+        if state and state.get("signature") == job["signature"]:
+            return state.get("status")
+        return None
+
+    def _mark(self, job: Dict[str, Any], status: str, **extra):
+        state = self.checkpoint.setdefault(job["key"], {})
+        state.update({"signature": job["signature"], "status": status, **extra})
+        save_checkpoint(self.checkpoint)
+
+    def _create_vectorizer(self, job: Dict[str, Any]):
+        if job["kind"] == "columns":
+            from vectorize_columns import ColumnVectorizer
+            return ColumnVectorizer(
+                job["database_sid"], job["schema_name"], model=self.model, client=self.client
+            )
+        from vectorize_optimized_csv import OptimizedCSVVectorizer
+        return OptimizedCSVVectorizer(
+            job["database_sid"], job["schema_name"], model=self.model, client=self.client
+        )
+
+    @staticmethod
+    def _pending_documents(job: Dict[str, Any], vectorizer) -> List[str]:
+        """임베딩이 필요한 요약 텍스트 (컬럼은 추가/변경분만)"""
+        if job["kind"] == "columns":
+            plan = vectorizer.diff(vectorizer.load_csv())
+            return [entry["document"] for entry in plan["added"] + plan["changed"]]
+        return [entry["document"] for entry in vectorizer.build_entries()]
+
+    def _write(self, job: Dict[str, Any], vectorizer):
+        """저장 단계 (메인 프로세스, 임베딩은 캐시에서 읽음)"""
+        start = time.perf_counter()
+        if job["kind"] == "columns":
+            processed, deleted, _ = vectorizer.vectorize()
+        else:
+            processed, deleted = vectorizer.vectorize(), 0
+        seconds = time.perf_counter() - start
+
+        timing = self.timings.setdefault(job["key"], {"encode_seconds": 0.0})
+        timing.update({"write_seconds": seconds, "processed": processed, "deleted": deleted})
+        self._mark(job, STATUS_DONE, **timing)
+
+    def run(self, jobs: List[Dict[str, Any]]):
+        pending_jobs = []
+        for job in jobs:
+            if self._status(job) == STATUS_DONE:
+                logger.info(f"⏭ 완료됨 (체크포인트): {job['key']}")
+                self.timings[job["key"]] = {**self.checkpoint[job["key"]], "skipped": True}
+            else:
+                pending_jobs.append(job)
+
+        if not pending_jobs:
+            return
+
+        # 요약 텍스트 생성 (Vector DB 읽기가 필요하므로 메인 프로세스)
+        vectorizers = {job["key"]: self._create_vectorizer(job) for job in pending_jobs}
+        to_encode = []
+        for job in pending_jobs:
+            if self._status(job) == STATUS_ENCODED:
+                continue
+            documents = self._pending_documents(job, vectorizers[job["key"]])
+            if documents:
+                to_encode.append((job, documents))
+
+        jobs_by_key = {job["key"]: job for job in pending_jobs}
+        encoding_keys = {job["key"] for job, _ in to_encode}
+
+        # 임베딩할 것이 없는 작업 (삭제만 있거나 체크포인트상 임베딩 완료)
+        for job in pending_jobs:
+            if job["key"] not in encoding_keys:
+                logger.info(f"\n▶ 저장: {job['key']}")
+                self._write(job, vectorizers[job["key"]])
+
+        if not to_encode:
+            return
+
+        if self.workers == 1:
+            for job, documents in to_encode:
+                logger.info(f"\n▶ 벡터화: {job['key']} ({len(documents):,}개 텍스트)")
+                self._write(job, vectorizers[job["key"]])
+            return
+
+        # 워커 수만큼 코어를 나눠 쓰도록 intra-op 스레드 수 제한
+        num_threads = max(1, (os.cpu_count() or 1) // self.workers)
+        logger.info(f"\n워커 {self.workers}개 (워커당 {num_threads} 스레드)로 {len(to_encode)}개 작업 임베딩")
+
+        # spawn: 모델/스레드가 로드된 메인 프로세스를 fork 하지 않음 (Windows 와 동일한 동작)
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(num_threads,)
+        ) as executor:
+            futures = [executor.submit(_encode_job, job["key"], documents) for job, documents in to_encode]
+
+            for future in as_completed(futures):
+                result = future.result()
+                job = jobs_by_key[result["job_key"]]
+                self.timings[job["key"]] = {"encode_seconds": result["seconds"]}
+                self._mark(job, STATUS_ENCODED, encode_seconds=result["seconds"])
+                logger.info(
+                    f"\n✓ 임베딩 완료: {job['key']} ({result['count']:,}개, {result['seconds']:.1f}초) → 저장"
+                )
+                # 다른 워커가 임베딩하는 동안 메인 프로세스에서 저장
+                self._write(job, vectorizers[job["key"]])
+
+    def print_summary(self, total_seconds: float):
+        logger.info("\n" + "=" * 78)
+        logger.info("📊 스키마별 벡터화 요약")
+        logger.info("=" * 78)
+        logger.info(f"{'작업':40s} {'임베딩(s)':>10s} {'저장(s)':>10s} {'저장':>7s} {'삭제':>7s}")
+        for key, timing in self.timings.items():
+            mark = " (건너뜀)" if timing.get("skipped") else ""
+            logger.info(
+                f"{(key + mark):40s} {timing.get('encode_seconds', 0.0):10.1f} "
+                f"{timing.get('write_seconds', 0.0):10.1f} "
+                f"{timing.get('processed', 0):7,d} {timing.get('deleted', 0):7,d}"
+            )
+        logger.info(f"\n전체 소요 시간: {total_seconds:.1f}초")
+        if self.store is not None:
+            logger.info(f"임베딩 캐시: {self.store.stats()}")
+
+
+def main():
+    workers = os.cpu_count() or 1
+    if "--workers" in sys.argv:
+        workers = int(sys.argv[sys.argv.index("--workers") + 1])
+    restart = "--restart" in sys.argv
+
+    jobs = discover_jobs()
+    if not jobs:
+        logger.warning("벡터화할 CSV가 없습니다 (data/{sid}/{schema}/csv_uploads).")
+        return
+
+    logger.info("=" * 78)
+    logger.info(f"★ 전체 벡터화: {len(jobs)}개 작업")
+    for job in jobs:
+        logger.info(f"  - {job['key']}")
+    logger.info("=" * 78)
+
+    start = time.perf_counter()
+    orchestrator = VectorizeOrchestrator(workers=min(workers, len(jobs)), restart=restart)
+    try:
+        orchestrator.run(jobs)
+    except KeyboardInterrupt:
+        logger.warning("\n⚠️ 중단됨 - 다시 실행하면 체크포인트부터 이어서 진행합니다.")
+    finally:
+        orchestrator.print_summary(time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
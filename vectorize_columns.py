@@ -8,9 +8,19 @@
 1. **oracle_columns 컬렉션**: 테이블 컬렉션(oracle_metadata)과 별도로 컬럼 전용 컬렉션
 2. **컬럼 ID 형식**: {database_sid}:{schema_name}:{table_name}:{column_name}
 3. **벡터화 텍스트**: 테이블명 + 컬럼명 + 한국어설명 + 데이터타입을 조합
+4. **컬렉션 레이아웃**: VECTOR_COLLECTION_LAYOUT=partitioned 이면 SID/스키마별 컬렉션
+   (oracle_columns__{SID}__{SCHEMA})에 저장합니다 (mcp/collection_router.py).
+
+5. **증분 벡터화**: 각 항목 메타데이터에 content_hash 를 저장하고 CSV와 비교하여
+   추가/변경된 컬럼만 임베딩, CSV에서 사라진 컬럼은 삭제합니다.
+6. **파이프라인**: 청크 단위로 batched encode 하고, 청크 N의 upsert(백그라운드 스레드)와
+   청크 N+1의 encode 를 겹쳐 실행합니다. 단계별 처리량(컬럼/초)을 출력합니다.
 
 사용법:
-    python vectorize_columns.py
+    python vectorize_columns.py                                 # 증분 벡터화 (기본 SID/스키마)
+    python vectorize_columns.py SMVNPDBext INFINITY21_JSMES     # SID/스키마 지정
+    python vectorize_columns.py --dry-run                       # 변경 내역만 보고
+    python vectorize_columns.py --force-rebuild                 # 전체 삭제 후 재생성
 
 입력 파일:
     data/{db_sid}/{schema}/csv_uploads/table_column_definitions.csv
@@ -20,19 +30,25 @@
 
 import sys
 import csv
+import hashlib
 import json
 import logging
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 
 # 프로젝트 경로 설정
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "mcp"))
 
-from sentence_transformers import SentenceTransformer
 import chromadb
 from chromadb.config import Settings
+from collection_router import CollectionRouter
+from embedding_backend import load_embedding_model
+from embedding_cache import create_embedding_store_from_env, encode_documents, model_cache_key
 
 # 로깅 설정 (최소 로그)
 logging.basicConfig(
@@ -48,6 +64,16 @@ logging.getLogger("sentence_transformers").setLevel(logging.WARNING)
 # ChromaDB telemetry 비활성화
 os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
 
+# 임베딩 모델 (MCP 서버, 백엔드와 동일)
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+# upsert / delete 배치 크기
+BATCH_SIZE = 500
+DELETE_BATCH_SIZE = 5000
+
+# model.encode 내부 배치 크기
+ENCODE_BATCH_SIZE = 64
+
 
 class ColumnVectorizer:
     """
@@ -62,11 +88,21 @@ class ColumnVectorizer:
     # 컬렉션 이름 상수
     COLLECTION_NAME = "oracle_columns"
 
-    def __init__(self, database_sid: str, schema_name: str):
+    def __init__(
+        self,
+        database_sid: str,
+        schema_name: str,
+        collection_layout: Optional[str] = None,
+        model=None,
+        client=None
+    ):
         """
         Args:
             database_sid: 대상 데이터베이스 SID
             schema_name: 대상 스키마 이름
+            collection_layout: "shared" | "partitioned" (None이면 VECTOR_COLLECTION_LAYOUT 환경 변수)
+            model: 이미 로드된 임베딩 모델 (여러 스키마 처리 시 재사용, None이면 새로 로드)
+            client: 이미 연결된 chromadb PersistentClient (None이면 새로 연결)
         """
         self.database_sid = database_sid
         self.schema_name = schema_name
@@ -78,26 +114,46 @@ class ColumnVectorizer:
         self.vector_db_path = str(project_root / "data" / "vector_db")
 
         # 임베딩 모델 로드 (MCP 서버, 백엔드와 동일한 모델)
-        logger.info("임베딩 모델 로딩 중...")
-        self.model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
-        logger.info("✓ 임베딩 모델 로드 완료")
+        # EMBEDDING_BACKEND=onnx 이면 ONNX Runtime 으로 추론 (mcp/embedding_backend.py)
+        self.model_name = MODEL_NAME
+        if model is None:
+            logger.info("임베딩 모델 로딩 중...")
+            model = load_embedding_model(self.model_name, project_root)
+            logger.info("✓ 임베딩 모델 로드 완료")
+        self.model = model
+
+        # 임베딩 디스크 캐시 (요약 텍스트가 바뀐 컬럼만 다시 임베딩)
+        self.embedding_store = create_embedding_store_from_env(project_root)
 
         # ChromaDB 연결
-        logger.info(f"Vector DB 연결: {self.vector_db_path}")
-        self.client = chromadb.PersistentClient(
-            path=self.vector_db_path,
-            settings=Settings(anonymized_telemetry=False)
+        if client is None:
+            logger.info(f"Vector DB 연결: {self.vector_db_path}")
+            client = chromadb.PersistentClient(
+                path=self.vector_db_path,
+                settings=Settings(anonymized_telemetry=False)
+            )
+        self.client = client
+
+        # 컬럼 컬렉션 생성/가져오기 (레이아웃에 따라 공용 또는 SID/스키마 전용)
+        self.router = CollectionRouter(self.client, collection_layout)
+        self.collection = self._open_collection()
+        logger.info(
+            f"✓ 컬렉션 준비 완료: {self.collection.name} "
+            f"({self.collection.count()}개 기존 항목, layout={self.router.layout})"
         )
 
-        # 컬럼 컬렉션 생성/가져오기
-        self.collection = self.client.get_or_create_collection(
-            name=self.COLLECTION_NAME,
+    def _open_collection(self):
+        """레이아웃에 맞는 컬럼 컬렉션 생성/가져오기"""
+        return self.router.get_collection(
+            self.COLLECTION_NAME,
+            self.database_sid,
+            self.schema_name,
+            create=True,
             metadata={
                 "description": "Oracle column metadata for semantic search",
                 "hnsw:space": "cosine"
             }
         )
-        logger.info(f"✓ 컬렉션 준비 완료: {self.COLLECTION_NAME} ({self.collection.count()}개 기존 항목)")
 
     def load_csv(self) -> List[Dict[str, str]]:
         """
@@ -274,41 +330,182 @@ class ColumnVectorizer:
 
         return list(set(hints))  # 중복 제거
 
+    def _build_entry(self, row: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """
+        CSV 행 → 벡터 DB 항목 (id, 요약 텍스트, 메타데이터 + content_hash)
+
+        Returns:
+            {"id", "document", "metadata"} (테이블/컬럼명이 없으면 None)
+        """
+        table_name = row.get('table_name', '').strip()
+        column_name = row.get('column_name', '').strip()
+
+        if not table_name or not column_name:
+            return None
+
+        # 컬럼 ID 생성
+        column_id = f"{self.database_sid}:{self.schema_name}:{table_name}:{column_name}"
+
+        # CSV 필드 추출
+        korean_name = row.get('korean_name', '').strip()
+        description = row.get('description', '').strip()
+        data_type = row.get('data_type', '').strip()
+        is_pk = row.get('is_pk', 'N').strip()
+        table_comment = row.get('table_comment', '').strip()
+        column_comment = row.get('column_comment', '').strip()
+        code_values = row.get('code_values', '').strip()
+
+        # ★ 강화된 요약 텍스트 생성 (테이블 메타데이터 포함)
+        summary_text = self.create_column_summary_text(
+            table_name=table_name,
+            column_name=column_name,
+            korean_name=korean_name,
+            description=description,
+            data_type=data_type,
+            is_pk=is_pk,
+            table_comment=table_comment,
+            column_comment=column_comment,
+            code_values=code_values
+        )
+
+        # 메타데이터 구성
+        metadata = {
+            "database_sid": self.database_sid,
+            "schema_name": self.schema_name,
+            "table_name": table_name,
+            "column_name": column_name,
+            "korean_name": korean_name[:200] if korean_name else "",
+            "description": description[:500] if description else "",
+            "data_type": data_type,
+            "is_pk": is_pk == 'Y',
+            "column_comment": column_comment[:200] if column_comment else "",
+            "table_comment": table_comment[:200] if table_comment else ""
+        }
+
+        # code_values가 있으면 추가 (길이 제한)
+        if code_values:
+            metadata["code_values"] = code_values[:500]
+
+        metadata["content_hash"] = self._content_hash(summary_text, metadata)
+
+        return {"id": column_id, "document": summary_text, "metadata": metadata}
+
+    def _content_hash(self, summary_text: str, metadata: Dict[str, Any]) -> str:
+        """
+        변경 감지용 내용 해시
+
+        요약 텍스트 + 메타데이터 + 임베딩 모델을 함께 해시하므로
+        설명/데이터타입/코드값이 바뀌거나 모델(추론 백엔드)이 바뀌면 다시 벡터화됩니다.
+        """
+        payload = json.dumps(
+            {
+                "model": model_cache_key(self.model, self.model_name),
+                "document": summary_text,
+                "metadata": metadata
+            },
+            ensure_ascii=False,
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
     def _get_existing_column_ids(self) -> set:
         """
         ★ ChromaDB에 이미 저장된 컬럼 ID 조회
-        (진행 상황 추적용 - 중복 벡터화 방지)
 
         Returns:
             저장된 컬럼 ID 세트
         """
+        return set(self._get_existing_hashes().keys())
+
+    def _get_existing_hashes(self) -> Dict[str, str]:
+        """
+        ChromaDB에 저장된 컬럼 ID → content_hash
+        (content_hash 가 없는 이전 버전 항목은 빈 문자열 → 변경으로 간주)
+        """
         try:
-            # 데이터베이스+스키마로 필터링된 항목만 조회
+            # 데이터베이스+스키마로 필터링된 항목만 조회 (partitioned면 컬렉션 전체)
             results = self.collection.get(
-                where={
-                    "$and": [
-                        {"database_sid": self.database_sid},
-                        {"schema_name": self.schema_name}
-                    ]
-                }
+                where=self.router.where_filter(self.database_sid, self.schema_name),
+                include=["metadatas"]
             )
-            return set(results.get("ids", []))
         except Exception as e:
             logger.warning(f"기존 컬럼 조회 실패: {e}")
-            return set()
+            return {}
+
+        return {
+            column_id: (metadata or {}).get("content_hash", "")
+            for column_id, metadata in zip(results.get("ids", []), results.get("metadatas", []) or [])
+        }
 
-    def vectorize(self, force_rebuild: bool = False) -> tuple:
+    def diff(self, rows: List[Dict[str, str]]) -> Dict[str, Any]:
         """
-        컬럼 메타데이터 벡터화 수행
+        CSV와 컬렉션 비교
 
-        ★ 강화: 테이블 메타데이터를 포함한 향상된 벡터화
-        ★ force_rebuild=True일 때 기존 벡터 모두 삭제 후 재생성
+        Returns:
+            {
+                "added": [항목, ...],     # 컬렉션에 없는 컬럼
+                "changed": [항목, ...],   # content_hash 가 다른 컬럼
+                "removed": [컬럼 ID, ...], # CSV에서 사라진 컬럼
+                "unchanged": 변경 없는 컬럼 수
+            }
+        """
+        # 같은 컬럼이 CSV에 여러 번 있으면 마지막 행 사용 (upsert 배치 내 중복 ID 방지)
+        entries: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            entry = self._build_entry(row)
+            if entry:
+                entries[entry["id"]] = entry
+
+        existing = self._get_existing_hashes()
+
+        added, changed = [], []
+        unchanged = 0
+        for column_id, entry in entries.items():
+            stored_hash = existing.get(column_id)
+            if stored_hash is None:
+                added.append(entry)
+            elif stored_hash != entry["metadata"]["content_hash"]:
+                changed.append(entry)
+            else:
+                unchanged += 1
+
+        removed = sorted(set(existing) - set(entries))
+
+        return {"added": added, "changed": changed, "removed": removed, "unchanged": unchanged}
+
+    def _log_diff_report(self, plan: Dict[str, Any], limit: int = 20):
+        """diff 결과 요약 (dry-run 보고서)"""
+        logger.info(f"  - 추가: {len(plan['added']):,}개")
+        logger.info(f"  - 변경: {len(plan['changed']):,}개")
+        logger.info(f"  - 삭제: {len(plan['removed']):,}개")
+        logger.info(f"  - 변경 없음: {plan['unchanged']:,}개")
+
+        for label, ids in (
+            ("추가", [entry["id"] for entry in plan["added"]]),
+            ("변경", [entry["id"] for entry in plan["changed"]]),
+            ("삭제", plan["removed"])
+        ):
+            if not ids:
+                continue
+            logger.info(f"\n[{label}] (최대 {limit}개 표시)")
+            for column_id in ids[:limit]:
+                logger.info(f"  {column_id}")
+            if len(ids) > limit:
+                logger.info(f"  ... 외 {len(ids) - limit:,}개")
+
+    def vectorize(self, force_rebuild: bool = False, dry_run: bool = False) -> tuple:
+        """
+        컬럼 메타데이터 벡터화 수행 (증분)
+
+        CSV와 컬렉션을 content_hash 로 비교하여 추가/변경된 컬럼만 임베딩 후 upsert 하고,
+        CSV에서 사라진 컬럼은 삭제합니다.
 
         Args:
             force_rebuild: True면 기존 데이터 삭제 후 처음부터 다시 벡터화
+            dry_run: True면 변경 내역만 보고하고 Vector DB는 수정하지 않음
 
         Returns:
-            (새로 추가된 컬럼 수, 삭제된 컬럼 수, 총 처리 수)
+            (추가/변경되어 저장된 컬럼 수, 삭제된 컬럼 수, 총 저장 수)
         """
         # CSV 로드
         rows = self.load_csv()
@@ -316,138 +513,149 @@ class ColumnVectorizer:
             logger.warning("처리할 컬럼이 없습니다.")
             return 0, 0, 0
 
+        logger.info(f"CSV 컬럼 총 수: {len(rows):,}개")
+
+        if force_rebuild and dry_run:
+            logger.info("(dry-run) force_rebuild: 기존 벡터를 모두 삭제 후 재생성합니다.")
+            return 0, 0, self.collection.count()
+
         # ★ 기존 데이터 삭제 (강화된 벡터로 재생성하기 위함)
         deleted = 0
         if force_rebuild:
             logger.info("기존 벡터 삭제 중...")
             try:
                 # 현재 DB/스키마의 모든 벡터 삭제
-                self.collection.delete(
-                    where={
-                        "$and": [
-                            {"database_sid": self.database_sid},
-                            {"schema_name": self.schema_name}
-                        ]
-                    }
-                )
-                deleted = self.collection.count()
+                # (partitioned면 이 스키마의 컬렉션만 삭제 후 재생성 → 다른 스키마 인덱스는 그대로)
+                deleted = len(self._get_existing_column_ids())
+                self.router.delete_partition(self.COLLECTION_NAME, self.database_sid, self.schema_name)
+                self.collection = self._open_collection()
                 logger.info(f"✓ 기존 벡터 삭제 완료")
             except Exception as e:
                 logger.warning(f"기존 벡터 삭제 시 오류: {e}")
 
-        logger.info(f"CSV 컬럼 총 수: {len(rows):,}개")
+        diff_start = time.perf_counter()
+        plan = self.diff(rows)
+        diff_seconds = time.perf_counter() - diff_start
+        logger.info(f"\n{'(dry-run) ' if dry_run else ''}변경 감지 결과:")
+        self._log_diff_report(plan)
 
-        # 배치 처리를 위한 리스트
-        batch_ids = []
-        batch_embeddings = []
-        batch_documents = []
-        batch_metadatas = []
+        if dry_run:
+            return 0, 0, self.collection.count()
 
-        # 배치 크기: 500으로 증가 (로그 양 감소)
-        BATCH_SIZE = 500
-        processed = 0      # 처리된 컬럼
+        # 사라진 컬럼 삭제
+        removed = plan["removed"]
+        for i in range(0, len(removed), DELETE_BATCH_SIZE):
+            try:
+                self.collection.delete(ids=removed[i:i + DELETE_BATCH_SIZE])
+                deleted += len(removed[i:i + DELETE_BATCH_SIZE])
+            except Exception as e:
+                logger.error(f"삭제 실패: {e}")
+        if removed:
+            logger.info(f"✓ 삭제함: {len(removed):,}개")
 
-        for row in rows:
-            table_name = row.get('table_name', '').strip()
-            column_name = row.get('column_name', '').strip()
+        # 추가/변경된 컬럼만 임베딩 + upsert
+        pending = plan["added"] + plan["changed"]
+        processed, stage_seconds = self._encode_and_upsert(pending)
+        stage_seconds["summary"] = diff_seconds
 
-            if not table_name or not column_name:
-                continue
+        logger.info(f"\n✅ 벡터화 완료:")
+        logger.info(f"  - 처리함: {processed:,}개 (변경 없음 {plan['unchanged']:,}개 건너뜀)")
+        logger.info(f"  - 삭제됨: {deleted:,}개")
+        logger.info(f"  - 총 저장됨: {self.collection.count():,}개")
+        self._log_throughput(len(rows), len(pending), stage_seconds)
 
-            # 컬럼 ID 생성
-            column_id = f"{self.database_sid}:{self.schema_name}:{table_name}:{column_name}"
-
-            # CSV 필드 추출
-            korean_name = row.get('korean_name', '').strip()
-            description = row.get('description', '').strip()
-            data_type = row.get('data_type', '').strip()
-            is_pk = row.get('is_pk', 'N').strip()
-            table_comment = row.get('table_comment', '').strip()
-            column_comment = row.get('column_comment', '').strip()
-            code_values = row.get('code_values', '').strip()
-
-            # ★ 강화된 요약 텍스트 생성 (테이블 메타데이터 포함)
-            summary_text = self.create_column_summary_text(
-                table_name=table_name,
-                column_name=column_name,
-                korean_name=korean_name,
-                description=description,
-                data_type=data_type,
-                is_pk=is_pk,
-                table_comment=table_comment,
-                column_comment=column_comment,
-                code_values=code_values
+        return processed, deleted, self.collection.count()
+
+    def _upsert_chunk(self, chunk: List[Dict[str, Any]], embeddings: List[List[float]]) -> tuple:
+        """
+        청크 upsert (백그라운드 스레드에서 실행)
+
+        Returns:
+            (저장된 항목 수, 소요 시간 초)
+        """
+        start = time.perf_counter()
+        try:
+            self.collection.upsert(
+                ids=[entry["id"] for entry in chunk],
+                embeddings=embeddings,
+                documents=[entry["document"] for entry in chunk],
+                metadatas=[entry["metadata"] for entry in chunk]
             )
+            stored = len(chunk)
+        except Exception as e:
+            logger.error(f"배치 upsert 실패: {e}")
+            stored = 0
+        return stored, time.perf_counter() - start
 
-            # 임베딩 생성 (progress bar 비활성화)
-            embedding = self.model.encode(summary_text, show_progress_bar=False).tolist()
-
-            # 메타데이터 구성
-            metadata = {
-                "database_sid": self.database_sid,
-                "schema_name": self.schema_name,
-                "table_name": table_name,
-                "column_name": column_name,
-                "korean_name": korean_name[:200] if korean_name else "",
-                "description": description[:500] if description else "",
-                "data_type": data_type,
-                "is_pk": is_pk == 'Y',
-                "column_comment": column_comment[:200] if column_comment else "",
-                "table_comment": table_comment[:200] if table_comment else ""
-            }
+    def _encode_and_upsert(self, pending: List[Dict[str, Any]]) -> tuple:
+        """
+        청크 단위 batched encode + upsert 파이프라인
+
+        청크 N의 upsert 를 백그라운드 스레드에 넘기고 곧바로 청크 N+1 을 encode 합니다.
+        upsert 는 한 번에 하나만 실행되도록 다음 upsert 전에 이전 결과를 기다립니다.
 
-            # code_values가 있으면 추가 (길이 제한)
-            if code_values:
-                metadata["code_values"] = code_values[:500]
-
-            # 배치에 추가
-            batch_ids.append(column_id)
-            batch_embeddings.append(embedding)
-            batch_documents.append(summary_text)
-            batch_metadatas.append(metadata)
-
-            # 배치 크기 도달 시 upsert
-            if len(batch_ids) >= BATCH_SIZE:
-                try:
-                    self.collection.upsert(
-                        ids=batch_ids,
-                        embeddings=batch_embeddings,
-                        documents=batch_documents,
-                        metadatas=batch_metadatas
+        Returns:
+            (저장된 항목 수, {"encode": 초, "upsert": 초, "total": 초})
+        """
+        processed = 0
+        encode_seconds = 0.0
+        upsert_seconds = 0.0
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            in_flight = None
+
+            for i in range(0, len(pending), BATCH_SIZE):
+                chunk = pending[i:i + BATCH_SIZE]
+
+                # 임베딩 생성 (디스크 캐시 우선) - 이전 청크 upsert 와 동시에 실행
+                encode_start = time.perf_counter()
+                embeddings = encode_documents(
+                    self.embedding_store,
+                    self.model,
+                    self.model_name,
+                    [entry["document"] for entry in chunk],
+                    batch_size=ENCODE_BATCH_SIZE
+                )
+                encode_seconds += time.perf_counter() - encode_start
+
+                if in_flight is not None:
+                    stored, seconds = in_flight.result()
+                    processed += stored
+                    upsert_seconds += seconds
+                    logger.info(
+                        f"✓ 처리함: {processed:,}/{len(pending):,} ({processed / len(pending) * 100:.1f}%)"
                     )
-                    processed += len(batch_ids)
-                    progress_pct = (processed / len(rows)) * 100
-                    logger.info(f"✓ 처리함: {processed:,}/{len(rows):,} ({progress_pct:.1f}%)")
-                except Exception as e:
-                    logger.error(f"배치 upsert 실패: {e}")
-
-                # 배치 초기화
-                batch_ids = []
-                batch_embeddings = []
-                batch_documents = []
-                batch_metadatas = []
-
-        # 남은 배치 처리
-        if batch_ids:
-            try:
-                self.collection.upsert(
-                    ids=batch_ids,
-                    embeddings=batch_embeddings,
-                    documents=batch_documents,
-                    metadatas=batch_metadatas
+
+                in_flight = executor.submit(self._upsert_chunk, chunk, embeddings)
+
+            if in_flight is not None:
+                stored, seconds = in_flight.result()
+                processed += stored
+                upsert_seconds += seconds
+                logger.info(
+                    f"✓ 처리함: {processed:,}/{len(pending):,} ({processed / len(pending) * 100:.1f}%)"
                 )
-                processed += len(batch_ids)
-                logger.info(f"✓ 처리함: {processed:,}/{len(rows):,} (100.0%)")
-            except Exception as e:
-                logger.error(f"마지막 배치 upsert 실패: {e}")
 
-        logger.info(f"\n✅ 벡터화 완료:")
-        logger.info(f"  - 처리함: {processed:,}개")
-        if force_rebuild:
-            logger.info(f"  - 삭제됨: {deleted:,}개 (이전 약한 벡터)")
-        logger.info(f"  - 총 저장됨: {self.collection.count():,}개")
+        return processed, {
+            "encode": encode_seconds,
+            "upsert": upsert_seconds,
+            "total": time.perf_counter() - start
+        }
 
-        return processed, deleted, self.collection.count()
+    def _log_throughput(self, row_count: int, pending_count: int, stage_seconds: Dict[str, float]):
+        """단계별 처리량 (컬럼/초)"""
+        def rate(count: int, seconds: float) -> str:
+            return f"{count / seconds:,.0f} 컬럼/초" if seconds > 0 else "-"
+
+        logger.info(f"\n⏱ 단계별 처리량:")
+        logger.info(f"  - 요약/비교: {stage_seconds['summary']:.2f}초 ({rate(row_count, stage_seconds['summary'])})")
+        if pending_count:
+            logger.info(f"  - 임베딩:    {stage_seconds['encode']:.2f}초 ({rate(pending_count, stage_seconds['encode'])})")
+            logger.info(f"  - upsert:    {stage_seconds['upsert']:.2f}초 ({rate(pending_count, stage_seconds['upsert'])})")
+            logger.info(
+                f"  - 파이프라인 전체: {stage_seconds['total']:.2f}초 ({rate(pending_count, stage_seconds['total'])})"
+            )
 
     def search_columns(
         self,
@@ -469,23 +677,11 @@ class ColumnVectorizer:
         # 쿼리 임베딩 (progress bar 비활성화)
         query_embedding = self.model.encode(query, show_progress_bar=False).tolist()
 
-        # 필터 조건
-        where_filter = {
-            "$and": [
-                {"database_sid": self.database_sid},
-                {"schema_name": self.schema_name}
-            ]
-        }
-
-        # 특정 테이블로 제한
-        if table_name:
-            where_filter["$and"].append({"table_name": table_name})
-
-        # ChromaDB 검색
+        # ChromaDB 검색 (레이아웃에 맞는 필터, 특정 테이블 제한 포함)
         results = self.collection.query(
             query_embeddings=[query_embedding],
             n_results=n_results,
-            where=where_filter
+            where=self.router.where_filter(self.database_sid, self.schema_name, table_name)
         )
 
         # 결과 포맷팅
@@ -511,8 +707,12 @@ class ColumnVectorizer:
 
 def main():
     """메인 실행 함수"""
-    database_sid = "SMVNPDBext"
-    schema_name = "INFINITY21_JSMES"
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    dry_run = "--dry-run" in sys.argv
+    force_rebuild = "--force-rebuild" in sys.argv
+
+    database_sid = args[0] if len(args) > 0 else "SMVNPDBext"
+    schema_name = args[1] if len(args) > 1 else "INFINITY21_JSMES"
 
     logger.info("=" * 60)
     logger.info("★ 컬럼 메타데이터 벡터화 (강화 모드)")
@@ -523,13 +723,15 @@ def main():
 
     vectorizer = ColumnVectorizer(database_sid, schema_name)
 
-    # ★ 강화된 벡터로 재생성 (force_rebuild=True)
-    processed, deleted, total = vectorizer.vectorize(force_rebuild=True)
+    # 증분 벡터화 (--force-rebuild 면 전체 재생성)
+    processed, deleted, total = vectorizer.vectorize(force_rebuild=force_rebuild, dry_run=dry_run)
+    if dry_run:
+        return
 
     logger.info("=" * 60)
     logger.info(f"✅ 벡터화 완료:")
     logger.info(f"  - 처리함: {processed:,}개")
-    logger.info(f"  - 삭제됨: {deleted:,}개 (이전 벡터)")
+    logger.info(f"  - 삭제됨: {deleted:,}개")
     logger.info(f"  - 총 저장됨: {total:,}개")
     logger.info("=" * 60)
 
@@ -21,9 +21,12 @@ from typing import Dict, List, Any, Optional
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 sys.path.insert(0, str(project_root / "backend"))
+sys.path.insert(0, str(project_root / "mcp"))
 
-from sentence_transformers import SentenceTransformer
 import chromadb
+from collection_router import CollectionRouter
+from embedding_backend import load_embedding_model
+from embedding_cache import create_embedding_store_from_env, encode_documents
 
 # 로깅 설정
 logging.basicConfig(
@@ -46,11 +49,21 @@ class OptimizedCSVVectorizer:
     - sample_queries: 예상 질문 (파이프 구분)
     """
     
-    def __init__(self, database_sid: str, schema_name: str):
+    def __init__(
+        self,
+        database_sid: str,
+        schema_name: str,
+        collection_layout: Optional[str] = None,
+        model=None,
+        client=None
+    ):
         """
         Args:
             database_sid: 대상 데이터베이스 SID
             schema_name: 대상 스키마 이름
+            collection_layout: "shared" | "partitioned" (None이면 VECTOR_COLLECTION_LAYOUT 환경 변수)
+            model: 이미 로드된 임베딩 모델 (None이면 새로 로드)
+            client: 이미 연결된 chromadb PersistentClient (None이면 새로 연결)
         """
         self.database_sid = database_sid
         self.schema_name = schema_name
@@ -59,15 +72,29 @@ class OptimizedCSVVectorizer:
         self.csv_path = project_root / "data" / database_sid / schema_name / "csv_uploads" / "table_metadata_optimized.csv"
         self.vector_db_path = str(project_root / "data" / "vector_db")
         
-        # 임베딩 모델 로드
-        logger.info("임베딩 모델 로딩 중...")
-        self.model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+        # 임베딩 모델 로드 (EMBEDDING_BACKEND 에 따라 torch / ONNX Runtime)
+        self.model_name = "sentence-transformers/all-MiniLM-L6-v2"
+        if model is None:
+            logger.info("임베딩 모델 로딩 중...")
+            model = load_embedding_model(self.model_name, project_root)
+        self.model = model
+
+        # 임베딩 디스크 캐시 (요약 텍스트가 바뀐 테이블만 다시 임베딩)
+        self.embedding_store = create_embedding_store_from_env(project_root)
         
         # ChromaDB 연결
-        logger.info(f"Vector DB 연결: {self.vector_db_path}")
-        self.client = chromadb.PersistentClient(path=self.vector_db_path)
-        self.collection = self.client.get_or_create_collection(
-            name="oracle_metadata",
+        if client is None:
+            logger.info(f"Vector DB 연결: {self.vector_db_path}")
+            client = chromadb.PersistentClient(path=self.vector_db_path)
+        self.client = client
+
+        # 테이블 컬렉션 생성/가져오기 (레이아웃에 따라 공용 또는 SID/스키마 전용)
+        self.router = CollectionRouter(self.client, collection_layout)
+        self.collection = self.router.get_collection(
+            "oracle_metadata",
+            self.database_sid,
+            self.schema_name,
+            create=True,
             metadata={"hnsw:space": "cosine"}
         )
         
@@ -106,12 +133,7 @@ class OptimizedCSVVectorizer:
         try:
             # 현재 DB/스키마의 모든 메타데이터 조회
             results = self.collection.get(
-                where={
-                    "$and": [
-                        {"database_sid": {"$eq": self.database_sid}},
-                        {"schema_name": {"$eq": self.schema_name}}
-                    ]
-                },
+                where=self.router.where_filter(self.database_sid, self.schema_name),
                 include=["metadatas"]
             )
             
@@ -189,22 +211,21 @@ class OptimizedCSVVectorizer:
         
         return "\n".join(parts)
     
-    def vectorize(self) -> int:
+    def build_entries(self) -> List[Dict[str, Any]]:
         """
-        최적화된 CSV 데이터 벡터화 수행
-        
+        CSV 행 → 벡터 DB 항목 목록
+
         Returns:
-            처리된 테이블 수
+            [{"id", "document", "metadata"}, ...]
         """
         csv_rows = self.load_csv()
         if not csv_rows:
-            logger.warning("처리할 CSV 데이터가 없습니다.")
-            return 0
+            return []
         
         # 기존 컬럼 정보 로드
         existing_columns = self.load_existing_oracle_columns()
         
-        processed = 0
+        entries = []
         for row in csv_rows:
             table_name = row.get("table_name", "").strip()
             if not table_name:
@@ -231,9 +252,6 @@ class OptimizedCSVVectorizer:
                 columns=columns
             )
             
-            # 임베딩 생성
-            embedding = self.model.encode(summary_text).tolist()
-            
             # 메타데이터 구성
             metadata = {
                 "database_sid": self.database_sid,
@@ -250,23 +268,51 @@ class OptimizedCSVVectorizer:
             if columns:
                 metadata["columns"] = json.dumps(columns[:15], ensure_ascii=False)
             
+            entries.append({
+                "id": f"{self.database_sid}:{self.schema_name}:{table_name}",
+                "document": summary_text,
+                "metadata": metadata
+            })
+        
+        return entries
+    
+    def vectorize(self) -> int:
+        """
+        최적화된 CSV 데이터 벡터화 수행
+        
+        Returns:
+            처리된 테이블 수
+        """
+        entries = self.build_entries()
+        if not entries:
+            logger.warning("처리할 CSV 데이터가 없습니다.")
+            return 0
+        
+        # 임베딩 생성 (디스크 캐시 우선, 캐시에 없는 텍스트만 batched encode)
+        embeddings = encode_documents(
+            self.embedding_store,
+            self.model,
+            self.model_name,
+            [entry["document"] for entry in entries]
+        )
+        
+        processed = 0
+        for entry, embedding in zip(entries, embeddings):
             # Vector DB에 upsert (기존 데이터 업데이트)
-            table_id = f"{self.database_sid}:{self.schema_name}:{table_name}"
-            
             try:
                 self.collection.upsert(
-                    ids=[table_id],
+                    ids=[entry["id"]],
                     embeddings=[embedding],
-                    documents=[summary_text],
-                    metadatas=[metadata]
+                    documents=[entry["document"]],
+                    metadatas=[entry["metadata"]]
                 )
                 processed += 1
                 
                 if processed % 10 == 0:
-                    logger.info(f"진행중... {processed}/{len(csv_rows)}")
+                    logger.info(f"진행중... {processed}/{len(entries)}")
                     
             except Exception as e:
-                logger.error(f"벡터화 실패 ({table_name}): {e}")
+                logger.error(f"벡터화 실패 ({entry['metadata']['table_name']}): {e}")
         
         logger.info(f"완료: {processed}개 테이블 벡터화")
         return processed